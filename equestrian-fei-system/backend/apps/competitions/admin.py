@@ -4,8 +4,16 @@ from django.utils import timezone
 from django.urls import reverse
 from .models import (
     Discipline, Category, Venue, Competition,
-    CompetitionStaff, Horse, Participant, CompetitionSchedule
+    CompetitionStaff, Horse, Participant, CompetitionSchedule, StartListEntry
 )
+from . import reference_cache
+
+
+def refresh_competition_counters(queryset):
+    """Recalcular contadores tras un update() masivo (no pasa por save())"""
+    competition_ids = set(queryset.values_list('competition_id', flat=True))
+    for competition in Competition.objects.filter(pk__in=competition_ids):
+        competition.refresh_counters()
 
 
 @admin.register(Discipline)
@@ -42,11 +50,13 @@ class DisciplineAdmin(admin.ModelAdmin):
 
     def activate_disciplines(self, request, queryset):
         count = queryset.update(is_active=True)
+        reference_cache.invalidate('disciplines', 'scoring_criteria')
         self.message_user(request, f'{count} disciplinas activadas.')
     activate_disciplines.short_description = 'Activar disciplinas'
 
     def deactivate_disciplines(self, request, queryset):
         count = queryset.update(is_active=False)
+        reference_cache.invalidate('disciplines', 'scoring_criteria')
         self.message_user(request, f'{count} disciplinas desactivadas.')
     deactivate_disciplines.short_description = 'Desactivar disciplinas'
 
@@ -101,11 +111,13 @@ class CategoryAdmin(admin.ModelAdmin):
 
     def activate_categories(self, request, queryset):
         count = queryset.update(is_active=True)
+        reference_cache.invalidate('categories')
         self.message_user(request, f'{count} categorías activadas.')
     activate_categories.short_description = 'Activar categorías'
 
     def deactivate_categories(self, request, queryset):
         count = queryset.update(is_active=False)
+        reference_cache.invalidate('categories')
         self.message_user(request, f'{count} categorías desactivadas.')
     deactivate_categories.short_description = 'Desactivar categorías'
 
@@ -170,11 +182,13 @@ class VenueAdmin(admin.ModelAdmin):
 
     def activate_venues(self, request, queryset):
         count = queryset.update(is_active=True)
+        reference_cache.invalidate('venues')
         self.message_user(request, f'{count} sedes activadas.')
     activate_venues.short_description = 'Activar sedes'
 
     def deactivate_venues(self, request, queryset):
         count = queryset.update(is_active=False)
+        reference_cache.invalidate('venues')
         self.message_user(request, f'{count} sedes desactivadas.')
     deactivate_venues.short_description = 'Desactivar sedes'
 
@@ -199,7 +213,7 @@ class CompetitionAdmin(admin.ModelAdmin):
     """Admin para competencias"""
     list_display = [
         'name', 'organizer', 'venue', 'competition_type',
-        'status_badge', 'date_range', 'participants_count',
+        'status_badge', 'date_range', 'participants_display',
         'registration_status', 'created_at'
     ]
     list_filter = [
@@ -277,8 +291,8 @@ class CompetitionAdmin(admin.ModelAdmin):
         return f"{obj.start_date.strftime('%d/%m/%Y')} - {obj.end_date.strftime('%d/%m/%Y')}"
     date_range.short_description = 'Fechas'
 
-    def participants_count(self, obj):
-        count = obj.participants.count()
+    def participants_display(self, obj):
+        count = obj.participants_count
         if obj.max_participants:
             percentage = (count / obj.max_participants) * 100
             color = 'green' if percentage < 80 else 'orange' if percentage < 100 else 'red'
@@ -287,7 +301,7 @@ class CompetitionAdmin(admin.ModelAdmin):
                 color, count, obj.max_participants
             )
         return count
-    participants_count.short_description = 'Participantes'
+    participants_display.short_description = 'Participantes'
 
     def registration_status(self, obj):
         if obj.is_registration_open:
@@ -377,11 +391,13 @@ class CompetitionStaffAdmin(admin.ModelAdmin):
 
     def confirm_staff(self, request, queryset):
         count = queryset.update(is_confirmed=True)
+        refresh_competition_counters(queryset)
         self.message_user(request, f'{count} miembros del personal confirmados.')
     confirm_staff.short_description = 'Confirmar personal'
 
     def unconfirm_staff(self, request, queryset):
         count = queryset.update(is_confirmed=False)
+        refresh_competition_counters(queryset)
         self.message_user(request, f'{count} confirmaciones removidas.')
     unconfirm_staff.short_description = 'Quitar confirmación'
 
@@ -527,11 +543,13 @@ class ParticipantAdmin(admin.ModelAdmin):
 
     def confirm_participants(self, request, queryset):
         count = queryset.update(is_confirmed=True)
+        refresh_competition_counters(queryset)
         self.message_user(request, f'{count} participantes confirmados.')
     confirm_participants.short_description = 'Confirmar participantes'
 
     def mark_as_paid(self, request, queryset):
         count = queryset.update(is_paid=True)
+        refresh_competition_counters(queryset)
         self.message_user(request, f'{count} participantes marcados como pagados.')
     mark_as_paid.short_description = 'Marcar como pagados'
 
@@ -637,3 +655,13 @@ class CompetitionScheduleAdmin(admin.ModelAdmin):
         count = queryset.update(is_published=False)
         self.message_user(request, f'{count} eventos despublicados.')
     unpublish_events.short_description = 'Despublicar eventos'
+
+
+@admin.register(StartListEntry)
+class StartListEntryAdmin(admin.ModelAdmin):
+    """Admin para órdenes de salida generados"""
+    list_display = ['schedule', 'round_number', 'arena', 'start_position', 'start_time', 'participant', 'break_before']
+    list_filter = ['round_number', 'arena', 'schedule__competition']
+    search_fields = ['participant__rider__username', 'participant__horse__name', 'schedule__title']
+    list_select_related = ['schedule', 'participant__rider', 'participant__horse', 'participant__competition']
+    raw_id_fields = ['schedule', 'participant']
@@ -0,0 +1,269 @@
+"""
+Inscripción masiva de participantes desde CSV o JSON
+
+Las federaciones envían las inscripciones en planillas. El servicio resuelve
+jinetes, caballos y categorías con unas pocas consultas IN, valida cupos,
+elegibilidad y duplicados en memoria, e inserta con bulk_create por lotes.
+Cada fila con errores se informa con su número de fila, sin detener al resto.
+
+Columnas reconocidas (encabezados sin distinguir mayúsculas):
+    rider_username o rider_email, horse_registration_number o horse_fei_id,
+    category_code, bib_number, is_confirmed, is_paid,
+    emergency_contact_name, emergency_contact_phone, special_requirements
+"""
+
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import Competition, Horse, Participant
+
+MAX_ROWS = 10000
+LOOKUP_CHUNK_SIZE = 900
+INSERT_BATCH_SIZE = 500
+TRUE_VALUES = {'1', 'true', 'si', 'sí', 'yes', 'x'}
+TEXT_FIELDS = ['emergency_contact_name', 'emergency_contact_phone', 'special_requirements']
+
+
+class BulkRegistrationError(ValueError):
+    """El archivo no se puede procesar (formato o tamaño)"""
+
+
+def parse_csv(content):
+    """Filas de un CSV (bytes o texto) como diccionarios con encabezados normalizados"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    sample = content[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(content), dialect=dialect)
+    return [
+        {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+        for row in reader
+    ]
+
+
+def _in_chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def _age_at(birth_date, on_date):
+    return on_date.year - birth_date.year - ((on_date.month, on_date.day) < (birth_date.month, birth_date.day))
+
+
+class BulkRegistrationService:
+    """Valida e inserta un lote de inscripciones para una competencia"""
+
+    def __init__(self, competition, rows):
+        if len(rows) > MAX_ROWS:
+            raise BulkRegistrationError(f'Se admiten como máximo {MAX_ROWS} filas por importación')
+        self.competition = competition
+        self.rows = [{str(k).strip().lower(): v for k, v in row.items()} for row in rows]
+        self.errors = {}
+
+    # ------------------------------------------------------------------
+    # Resolución en lote
+    # ------------------------------------------------------------------
+
+    def _values(self, column):
+        return {str(row[column]).strip() for row in self.rows if row.get(column) not in (None, '')}
+
+    def _lookup(self, queryset, field, values):
+        found = {}
+        for chunk in _in_chunks(values):
+            for obj in queryset.filter(**{f'{field}__in': chunk}):
+                found[str(getattr(obj, field))] = obj
+        return found
+
+    def resolve(self):
+        User = get_user_model()
+        self.riders_by_username = self._lookup(User.objects.all(), 'username', self._values('rider_username'))
+        # El email se compara sin distinguir mayúsculas
+        self.riders_by_email = self._lookup(
+            User.objects.annotate(email_lower=Lower('email')), 'email_lower',
+            {value.lower() for value in self._values('rider_email')}
+        )
+        self.horses_by_registration = self._lookup(
+            Horse.objects.all(), 'registration_number', self._values('horse_registration_number')
+        )
+        self.horses_by_fei_id = self._lookup(Horse.objects.all(), 'fei_id', self._values('horse_fei_id'))
+        self.categories = {category.code: category for category in self.competition.categories.all()}
+
+        rider_ids = {r.pk for r in self.riders_by_username.values()} | {r.pk for r in self.riders_by_email.values()}
+        self.existing = set()
+        self.horses_per_rider = {}
+        self.category_counts = {}
+        # El cupo de la competencia cuenta los confirmados, como perform_create
+        self.confirmed_count = 0
+        participants = Participant.objects.filter(competition=self.competition).values_list(
+            'rider_id', 'horse_id', 'category_id', 'is_confirmed'
+        )
+        for rider_id, horse_id, category_id, is_confirmed in participants:
+            self.category_counts[category_id] = self.category_counts.get(category_id, 0) + 1
+            self.confirmed_count += is_confirmed
+            if rider_id in rider_ids:
+                self.existing.add((rider_id, horse_id, category_id))
+                self.horses_per_rider.setdefault(rider_id, set()).add(horse_id)
+
+    # ------------------------------------------------------------------
+    # Validación por fila
+    # ------------------------------------------------------------------
+
+    def _rider(self, row):
+        if row.get('rider_username'):
+            return self.riders_by_username.get(str(row['rider_username']).strip())
+        if row.get('rider_email'):
+            return self.riders_by_email.get(str(row['rider_email']).strip().lower())
+        return None
+
+    def _horse(self, row):
+        if row.get('horse_registration_number'):
+            return self.horses_by_registration.get(str(row['horse_registration_number']).strip())
+        if row.get('horse_fei_id'):
+            return self.horses_by_fei_id.get(str(row['horse_fei_id']).strip())
+        return None
+
+    def _eligibility_errors(self, rider, horse, category):
+        errors = []
+        if not category.is_active:
+            errors.append(f'La categoría {category.code} no está activa')
+        if not horse.is_active or not horse.is_available_for_competition:
+            errors.append(f'El caballo {horse.name} no está disponible para competir')
+
+        if category.min_age or category.max_age:
+            if rider.birth_date is None:
+                errors.append('El jinete no tiene fecha de nacimiento para validar la edad')
+            else:
+                age = _age_at(rider.birth_date, self.competition.start_date.date())
+                if category.min_age and age < category.min_age:
+                    errors.append(f'Edad {age} menor a la mínima de la categoría ({category.min_age})')
+                if category.max_age and age > category.max_age:
+                    errors.append(f'Edad {age} mayor a la máxima de la categoría ({category.max_age})')
+
+        if category.min_height_cm and horse.height < category.min_height_cm:
+            errors.append(f'Altura del caballo menor a {category.min_height_cm} cm')
+        if category.max_height_cm and horse.height > category.max_height_cm:
+            errors.append(f'Altura del caballo mayor a {category.max_height_cm} cm')
+        return errors
+
+    def validate(self):
+        """Construir los participantes válidos; los errores quedan en self.errors"""
+        self.resolve()
+        max_horses = self.competition.max_horses_per_rider
+        max_participants = self.competition.max_participants
+        valid = []
+
+        for number, row in enumerate(self.rows, start=1):
+            errors = []
+            rider = self._rider(row)
+            horse = self._horse(row)
+            category = self.categories.get(str(row.get('category_code') or '').strip())
+
+            if rider is None:
+                errors.append('Jinete no encontrado')
+            if horse is None:
+                errors.append('Caballo no encontrado')
+            if category is None:
+                errors.append('La categoría no existe o no pertenece a la competencia')
+
+            bib_number = row.get('bib_number')
+            if bib_number not in (None, ''):
+                try:
+                    bib_number = int(bib_number)
+                except (TypeError, ValueError):
+                    errors.append('Número de dorsal no válido')
+            else:
+                bib_number = None
+
+            if not errors:
+                errors.extend(self._eligibility_errors(rider, horse, category))
+
+            if not errors:
+                key = (rider.pk, horse.pk, category.pk)
+                horses = self.horses_per_rider.get(rider.pk, set())
+                if key in self.existing:
+                    errors.append('Inscripción duplicada (ya registrada o repetida en el archivo)')
+                elif horse.pk not in horses and len(horses) >= max_horses:
+                    errors.append(f'El jinete supera el máximo de {max_horses} caballo(s)')
+                elif max_participants and self.confirmed_count >= max_participants:
+                    errors.append('La competencia alcanzó el límite de participantes')
+                elif category.max_participants and self.category_counts.get(category.pk, 0) >= category.max_participants:
+                    errors.append(f'La categoría {category.code} alcanzó su cupo')
+
+            if errors:
+                self.errors[number] = errors
+                continue
+
+            # Reservar el cupo para las filas siguientes
+            self.existing.add(key)
+            self.horses_per_rider.setdefault(rider.pk, set()).add(horse.pk)
+            self.category_counts[category.pk] = self.category_counts.get(category.pk, 0) + 1
+            is_confirmed = _flag(row.get('is_confirmed'))
+            self.confirmed_count += is_confirmed
+
+            valid.append(Participant(
+                competition=self.competition, rider=rider, horse=horse, category=category,
+                bib_number=bib_number,
+                is_confirmed=is_confirmed,
+                is_paid=_flag(row.get('is_paid')),
+                **{field: str(row.get(field) or '') for field in TEXT_FIELDS}
+            ))
+
+        return valid
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    def run(self, dry_run=False, all_or_nothing=False):
+        """Validar e insertar. Devuelve el reporte por fila"""
+        from apps.sync.change_feed import record_changes
+
+        with transaction.atomic():
+            # Cupos y duplicados se validan con la competencia bloqueada: otra
+            # importación o inscripción espera a que esta termine
+            list(Competition.objects.select_for_update().filter(pk=self.competition.pk).values_list('pk'))
+            participants = self.validate()
+            skip_insert = dry_run or (all_or_nothing and self.errors)
+
+            if participants and not skip_insert:
+                Participant.objects.bulk_create(participants, batch_size=INSERT_BATCH_SIZE)
+
+                # bulk_create no pasa por save(): feed de cambios, contadores e
+                # índice de búsqueda en bloque
+                record_changes(participants)
+                Competition.apply_counter_changes(None, (self.competition.pk, {
+                    'participants_count': len(participants),
+                    'confirmed_participants_count': sum(p.is_confirmed for p in participants),
+                    'paid_participants_count': sum(p.is_paid for p in participants),
+                }))
+
+        if participants and not skip_insert:
+            from apps.rankings.models import LiveRanking
+            from apps.search.services import index_riders
+            index_riders({p.rider_id for p in participants})
+            LiveRanking.invalidate_competition_revisions(self.competition.pk)
+
+        return {
+            'total_rows': len(self.rows),
+            'valid_rows': len(participants),
+            'created': 0 if skip_insert else len(participants),
+            'dry_run': dry_run,
+            'errors': [
+                {'row': number, 'errors': errors}
+                for number, errors in sorted(self.errors.items())
+            ],
+        }
@@ -0,0 +1,191 @@
+"""
+Paquete de datos (bundle) para abrir una competencia en los clientes
+
+Reúne en una sola respuesta lo que los frontends de juez y organizador piden
+por separado al abrir una competencia. Cada sección cuesta un número fijo de
+consultas (las tablas de referencia salen del cache en proceso), la respuesta
+lleva un ETag del contenido y se comprime con brotli o gzip según
+Accept-Encoding.
+"""
+
+import gzip
+import hashlib
+
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from apps.sync.services.cache_service import build_etag, etag_matches
+from . import reference_cache
+from .permissions import CanManageCompetitionStaff, CompetitionPermissionChecker
+from .serializers import (
+    CategorySerializer, CompetitionBundleSerializer, CompetitionScheduleSerializer,
+    CompetitionStaffSerializer, DisciplineSerializer, ParticipantSerializer
+)
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él se ofrece solo gzip
+    brotli = None
+
+BUNDLE_SECTIONS = [
+    'competition', 'participants', 'schedule', 'staff',
+    'categories', 'disciplines', 'criteria', 'rankings',
+]
+# Permisos de las secciones con datos privados: los mismos que sus endpoints
+SECTION_PERMISSIONS = {
+    'schedule': [IsAuthenticated],
+    'staff': [CanManageCompetitionStaff],
+}
+MIN_COMPRESS_SIZE = 1024
+
+
+class BundleError(ValueError):
+    """Secciones pedidas no válidas"""
+
+
+def parse_sections(value):
+    """Secciones pedidas en ?sections=a,b (todas si no se indica), en orden canónico"""
+    if not value:
+        return list(BUNDLE_SECTIONS)
+    requested = {section.strip() for section in value.split(',') if section.strip()}
+    unknown = requested - set(BUNDLE_SECTIONS)
+    if unknown:
+        raise BundleError(f"Secciones no válidas: {', '.join(sorted(unknown))}")
+    return [section for section in BUNDLE_SECTIONS if section in requested]
+
+
+def denied_sections(request, view, sections, competition):
+    """Secciones de ``competition`` que el usuario no puede leer según SECTION_PERMISSIONS"""
+    return [
+        section for section in sections
+        if not all(
+            permission.has_permission(request, view)
+            and permission.has_object_permission(request, view, competition)
+            for permission in (
+                permission_class() for permission_class in SECTION_PERMISSIONS.get(section, [])
+            )
+        )
+    ]
+
+
+class CompetitionBundle:
+    """
+    Construye las secciones del paquete de una competencia.
+
+    La competencia debe venir con organizer y venue (select_related) y con
+    disciplines y categories precargadas, como la entrega CompetitionViewSet.
+    """
+
+    def __init__(self, competition, sections, user):
+        self.competition = competition
+        self.sections = sections
+        self.user = user
+
+    def build(self):
+        data = {'sections': self.sections}
+        for section in self.sections:
+            data[section] = getattr(self, f'get_{section}')()
+        return data
+
+    def _reference_rows(self, table, objects, serializer):
+        # Una fila creada en otro worker puede no estar aún en el cache local
+        return [table.serialized(obj.pk) or serializer(obj).data for obj in objects]
+
+    def get_competition(self):
+        return CompetitionBundleSerializer(self.competition).data
+
+    def get_participants(self):
+        participants = self.competition.participants.select_related('rider', 'horse')
+        return ParticipantSerializer(participants, many=True).data
+
+    def get_schedule(self):
+        return CompetitionScheduleSerializer(self.competition.schedule.all(), many=True).data
+
+    def get_staff(self):
+        staff = self.competition.staff.select_related('staff_member')
+        return CompetitionStaffSerializer(staff, many=True).data
+
+    def get_categories(self):
+        return self._reference_rows(
+            reference_cache.categories, self.competition.categories.all(), CategorySerializer
+        )
+
+    def get_disciplines(self):
+        return self._reference_rows(
+            reference_cache.disciplines, self.competition.disciplines.all(), DisciplineSerializer
+        )
+
+    def get_criteria(self):
+        discipline_ids = {discipline.pk for discipline in self.competition.disciplines.all()}
+        table = reference_cache.scoring_criteria
+        return [
+            table.serialized(criteria.pk)
+            for criteria in table.all(active_only=True)
+            if criteria.discipline_id in discipline_ids
+        ]
+
+    def get_rankings(self):
+        from apps.scoring.models import RankingEntry
+        from apps.scoring.serializers import CompetitionRankingSerializer
+
+        rankings = self.competition.rankings.prefetch_related(
+            Prefetch('entries', RankingEntry.objects.select_related('participant__rider', 'participant__horse'))
+        )
+        # Las clasificaciones sin publicar solo las ve quien gestiona la competencia
+        if not CompetitionPermissionChecker.can_manage_competition(self.user, self.competition):
+            rankings = rankings.filter(is_published=True)
+        return CompetitionRankingSerializer(rankings, many=True).data
+
+
+def accepted_encodings(request):
+    """Codificaciones aceptadas (q > 0) de la cabecera Accept-Encoding"""
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request, size):
+    """'br', 'gzip' o None según lo que acepta el cliente y el tamaño del contenido"""
+    if size < MIN_COMPRESS_SIZE:
+        return None
+    accepted = accepted_encodings(request)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def bundle_response(request, data):
+    """Respuesta JSON comprimida con ETag del contenido; 304 si el cliente ya la tiene"""
+    content = JSONRenderer().render(data)
+    encoding = choose_encoding(request, len(content))
+    etag = build_etag(request, 'bundle', hashlib.sha1(content).hexdigest(), encoding or 'identity')
+
+    if etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        if encoding == 'br':
+            content = brotli.compress(content)
+        elif encoding == 'gzip':
+            content = gzip.compress(content, compresslevel=6)
+        response = HttpResponse(content, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,260 @@
+"""
+Detección de conflictos de programación por recurso (pista, juez, jinete)
+
+Cada recurso tiene su propio índice de intervalos:
+
+- pista: eventos de CompetitionSchedule en la misma sede y ubicación;
+- juez: asignaciones de CompetitionStaff con rol de juez, usando las fechas
+  de cada competencia (dos competencias simultáneas, en la misma sede o no);
+- jinete: entradas de StartListEntry (dos caballos en turnos superpuestos).
+
+La validación incremental consulta un IntervalTree con los candidatos del
+recurso; la auditoría completa usa un barrido ordenado por inicio, O(n log n + k).
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Any, NamedTuple
+
+from django.db.models import Q
+
+from .models import CompetitionSchedule, CompetitionStaff, StartListEntry
+
+# Eventos que no ocupan la pista
+NON_ARENA_EVENT_TYPES = ['break', 'lunch']
+JUDGING_ROLES = ['chief_judge', 'judge', 'technical_delegate']
+
+
+class Interval(NamedTuple):
+    start: Any
+    end: Any
+    resource: Any
+    item: Any
+
+
+class IntervalTree:
+    """
+    Árbol de intervalos estático sobre un arreglo ordenado por inicio.
+
+    Cada nodo (el punto medio de su rango) guarda el fin máximo del subárbol,
+    lo que permite descartar ramas completas: construcción O(n log n) y
+    consulta O(log n + k). Los intervalos son semiabiertos [start, end).
+    """
+
+    def __init__(self, intervals):
+        self.items = sorted(intervals, key=lambda interval: interval.start)
+        self.max_end = [None] * len(self.items)
+        self._build(0, len(self.items))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self.items[mid].end
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self.max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end):
+        """Intervalos que se superponen con [start, end)"""
+        result = []
+        stack = [(0, len(self.items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] <= start:
+                continue
+            stack.append((lo, mid))
+            interval = self.items[mid]
+            if interval.start < end:
+                if interval.end > start:
+                    result.append(interval)
+                # Los de la derecha empiezan después; solo interesan si empiezan antes de end
+                stack.append((mid + 1, hi))
+        return result
+
+
+def sweep_overlaps(intervals):
+    """Todos los pares superpuestos de una lista de intervalos del mismo recurso"""
+    active = []
+    pairs = []
+    for index, interval in enumerate(sorted(intervals, key=lambda i: (i.start, i.end))):
+        while active and active[0][0] <= interval.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            pairs.append((other, interval))
+        heapq.heappush(active, (interval.end, index, interval))
+    return pairs
+
+
+def _by_resource(intervals):
+    groups = defaultdict(list)
+    for interval in intervals:
+        groups[interval.resource].append(interval)
+    return groups
+
+
+# ---------------------------------------------------------------------------
+# Intervalos por tipo de recurso
+# ---------------------------------------------------------------------------
+
+def event_bounds(event):
+    """(inicio, fin) de un evento; None si no tiene fin ni duración estimada"""
+    end = event.end_time
+    if end is None and event.estimated_duration:
+        end = event.start_time + event.estimated_duration
+    if end is None or end <= event.start_time:
+        return None
+    return event.start_time, end
+
+
+def arena_key(venue_id, location):
+    location = ' '.join((location or '').lower().split())
+    return (venue_id, location) if location else None
+
+
+def event_interval(event, venue_id):
+    bounds = event_bounds(event)
+    resource = arena_key(venue_id, event.location)
+    if bounds is None or resource is None or event.schedule_type in NON_ARENA_EVENT_TYPES:
+        return None
+    return Interval(bounds[0], bounds[1], resource, event)
+
+
+def staff_interval(staff):
+    competition = staff.competition
+    return Interval(competition.start_date, competition.end_date, staff.staff_member_id, staff)
+
+
+def start_list_interval(entry):
+    if entry.end_time is None:
+        return None
+    return Interval(entry.start_time, entry.end_time, entry.participant.rider_id, entry)
+
+
+# ---------------------------------------------------------------------------
+# Representación de conflictos
+# ---------------------------------------------------------------------------
+
+def _describe(item):
+    if isinstance(item, CompetitionSchedule):
+        return {'kind': 'schedule', 'id': item.pk, 'title': item.title,
+                'competition': item.competition_id, 'location': item.location}
+    if isinstance(item, CompetitionStaff):
+        return {'kind': 'staff', 'id': item.pk, 'competition': item.competition_id,
+                'competition_name': item.competition.name, 'role': item.role}
+    return {'kind': 'start_list', 'id': item.pk, 'schedule': item.schedule_id,
+            'participant': item.participant_id, 'arena': item.arena}
+
+
+def _conflict(conflict_type, first, second):
+    resource = first.resource
+    if conflict_type == 'arena':
+        resource = first.item.location
+    return {
+        'type': conflict_type,
+        'resource': resource,
+        'overlap_start': max(first.start, second.start),
+        'overlap_end': min(first.end, second.end),
+        'first': _describe(first.item),
+        'second': _describe(second.item),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Validación incremental
+# ---------------------------------------------------------------------------
+
+def check_schedule_event(event):
+    """Conflictos de pista de un evento (guardado o no) con los ya programados"""
+    venue_id = event.competition.venue_id
+    candidate = event_interval(event, venue_id)
+    if candidate is None:
+        return []
+
+    others = CompetitionSchedule.objects.filter(
+        competition__venue_id=venue_id,
+        location__iexact=event.location.strip(),
+        start_time__lt=candidate.end,
+    ).exclude(schedule_type__in=NON_ARENA_EVENT_TYPES).select_related('competition')
+    if event.pk:
+        others = others.exclude(pk=event.pk)
+
+    intervals = [interval for interval in (event_interval(other, venue_id) for other in others) if interval]
+    tree = IntervalTree(interval for interval in intervals if interval.resource == candidate.resource)
+    return [
+        _conflict('arena', candidate, other)
+        for other in tree.overlapping(candidate.start, candidate.end)
+    ]
+
+
+def check_staff_assignment(staff):
+    """Conflictos de un juez asignado a competencias simultáneas (en cualquier sede)"""
+    if staff.role not in JUDGING_ROLES:
+        return []
+
+    competition = staff.competition
+    candidate = staff_interval(staff)
+    others = CompetitionStaff.objects.filter(
+        staff_member_id=staff.staff_member_id,
+        role__in=JUDGING_ROLES,
+        competition__start_date__lt=competition.end_date,
+        competition__end_date__gt=competition.start_date,
+    ).exclude(competition_id=competition.pk).select_related('competition')
+
+    tree = IntervalTree(staff_interval(other) for other in others)
+    return [
+        _conflict('judge', candidate, other)
+        for other in tree.overlapping(candidate.start, candidate.end)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Auditoría completa
+# ---------------------------------------------------------------------------
+
+def audit_competition(competition):
+    """Todos los conflictos de pista, juez y jinete que involucran a la competencia"""
+    conflicts = []
+
+    # Pistas: eventos de cualquier competencia en la misma sede durante el evento
+    events = CompetitionSchedule.objects.filter(
+        competition__venue_id=competition.venue_id,
+        start_time__lt=competition.end_date,
+    ).filter(
+        Q(competition=competition) | Q(competition__end_date__gt=competition.start_date)
+    ).exclude(schedule_type__in=NON_ARENA_EVENT_TYPES).select_related('competition')
+    intervals = [i for i in (event_interval(e, competition.venue_id) for e in events) if i]
+    for group in _by_resource(intervals).values():
+        for first, second in sweep_overlaps(group):
+            if competition.pk in (first.item.competition_id, second.item.competition_id):
+                conflicts.append(_conflict('arena', first, second))
+
+    # Jueces: todas las asignaciones de los jueces de esta competencia que se superponen
+    judge_ids = competition.staff.filter(role__in=JUDGING_ROLES).values('staff_member_id')
+    assignments = CompetitionStaff.objects.filter(
+        staff_member_id__in=judge_ids,
+        role__in=JUDGING_ROLES,
+        competition__start_date__lt=competition.end_date,
+        competition__end_date__gt=competition.start_date,
+    ).select_related('competition')
+    for group in _by_resource(staff_interval(a) for a in assignments).values():
+        for first, second in sweep_overlaps(group):
+            first_competition, second_competition = first.item.competition, second.item.competition
+            if (competition.pk in (first_competition.pk, second_competition.pk)
+                    and first_competition.pk != second_competition.pk):
+                conflicts.append(_conflict('judge', first, second))
+
+    # Jinetes: turnos de salida superpuestos dentro de la competencia
+    entries = StartListEntry.objects.filter(
+        schedule__competition=competition, end_time__isnull=False
+    ).select_related('participant')
+    for group in _by_resource(start_list_interval(e) for e in entries).values():
+        conflicts.extend(_conflict('rider', first, second) for first, second in sweep_overlaps(group))
+
+    conflicts.sort(key=lambda conflict: (conflict['overlap_start'], conflict['type']))
+    return conflicts
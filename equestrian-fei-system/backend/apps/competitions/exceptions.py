@@ -0,0 +1,26 @@
+"""
+Manejo de excepciones de la API
+"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler
+
+from .models import RowVersionConflict
+
+
+class EditConflict(APIException):
+    """El objeto cambió en el servidor mientras se editaba"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'El registro cambió desde que se leyó; recárguelo y vuelva a intentarlo'
+    default_code = 'conflict'
+
+
+def api_exception_handler(exc, context):
+    """
+    exception_handler de DRF que además responde 409 a RowVersionConflict:
+    dos ediciones simultáneas del mismo registro no terminan en 500.
+    """
+    if isinstance(exc, RowVersionConflict):
+        exc = EditConflict()
+    return exception_handler(exc, context)
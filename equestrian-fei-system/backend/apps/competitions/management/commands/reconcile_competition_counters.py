@@ -0,0 +1,65 @@
+"""
+Reconciliar los contadores desnormalizados de Competition
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.competitions.models import Competition
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de participantes y personal de las competencias y corrige las diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--competition', type=int, action='append', dest='competitions',
+            help='ID de competencia a reconciliar (se puede repetir). Por defecto, todas'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo informar las diferencias, sin guardar'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Competencias procesadas por lote'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Competition.objects.order_by('pk')
+        if options['competitions']:
+            queryset = queryset.filter(pk__in=options['competitions'])
+
+        ids = list(queryset.values_list('pk', flat=True))
+        batch_size = options['batch_size']
+        fixed = 0
+
+        for start in range(0, len(ids), batch_size):
+            batch = Competition.objects.filter(pk__in=ids[start:start + batch_size])
+
+            with transaction.atomic():
+                stored = list(batch.select_for_update().values('pk', *Competition.COUNTER_FIELDS))
+                actual = Competition.actual_counters(batch)
+
+                drifted = []
+                for row in stored:
+                    expected = actual[row['pk']]
+                    diff = {
+                        counter: (row[counter], value)
+                        for counter, value in expected.items() if row[counter] != value
+                    }
+                    if not diff:
+                        continue
+
+                    details = ', '.join(f'{counter}: {old} -> {new}' for counter, (old, new) in diff.items())
+                    self.stdout.write(f'Competencia {row["pk"]}: {details}')
+                    drifted.append(Competition(pk=row['pk'], **expected))
+
+                if drifted and not options['dry_run']:
+                    Competition.objects.bulk_update(drifted, Competition.COUNTER_FIELDS)
+                fixed += len(drifted)
+
+        action = 'con diferencias' if options['dry_run'] else 'corregidas'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ids)} competencias revisadas, {fixed} {action}'
+        ))
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:16
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    """Inicializar los contadores a partir de los datos existentes"""
+    Competition = apps.get_model('competitions', 'Competition')
+    Participant = apps.get_model('competitions', 'Participant')
+    CompetitionStaff = apps.get_model('competitions', 'CompetitionStaff')
+
+    def count(model, condition=None):
+        rows = model.objects.filter(competition=OuterRef('pk'))
+        if condition is not None:
+            rows = rows.filter(condition)
+        return Coalesce(Subquery(
+            rows.order_by().values('competition').annotate(total=Count('id')).values('total'),
+            output_field=IntegerField()
+        ), 0)
+
+    Competition.objects.update(
+        participants_count=count(Participant),
+        confirmed_participants_count=count(Participant, Q(is_confirmed=True)),
+        paid_participants_count=count(Participant, Q(is_paid=True)),
+        staff_count=count(CompetitionStaff),
+        confirmed_staff_count=count(CompetitionStaff, Q(is_confirmed=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='confirmed_participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Participantes confirmados'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='confirmed_staff_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Personal confirmado'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='paid_participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Participantes con pago'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Participantes'),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='staff_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Personal asignado'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
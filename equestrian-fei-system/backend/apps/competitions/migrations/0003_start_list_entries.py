@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0002_competition_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartListEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round_number', models.PositiveSmallIntegerField(default=1, verbose_name='Ronda')),
+                ('draw_position', models.PositiveIntegerField(verbose_name='Posición en el sorteo')),
+                ('arena', models.PositiveSmallIntegerField(default=1, verbose_name='Pista')),
+                ('start_position', models.PositiveIntegerField(verbose_name='Orden de salida')),
+                ('start_time', models.DateTimeField(verbose_name='Hora de salida')),
+                ('break_before', models.BooleanField(default=False, verbose_name='Descanso previo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='start_list_entries', to='competitions.participant', verbose_name='Participante')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='start_list', to='competitions.competitionschedule', verbose_name='Programación')),
+            ],
+            options={
+                'verbose_name': 'Orden de Salida',
+                'verbose_name_plural': 'Órdenes de Salida',
+                'ordering': ['round_number', 'start_time', 'arena'],
+                'indexes': [models.Index(fields=['schedule', 'round_number', 'arena', 'start_position'], name='competition_schedul_fe7aae_idx')],
+                'unique_together': {('schedule', 'round_number', 'participant')},
+            },
+        ),
+    ]
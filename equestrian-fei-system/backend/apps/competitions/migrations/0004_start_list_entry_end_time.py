@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0003_start_list_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startlistentry',
+            name='end_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fin del turno'),
+        ),
+    ]
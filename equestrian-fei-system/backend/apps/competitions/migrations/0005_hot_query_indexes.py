@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0004_start_list_entry_end_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='competition',
+            index=models.Index(fields=['status', 'start_date'], name='competition_status_14ce74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['competition', 'category'], name='competition_competi_d75b9a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(condition=models.Q(('is_confirmed', True)), fields=['competition'], name='participant_confirmed_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='row_version',
+            field=models.PositiveBigIntegerField(default=1, verbose_name='Versión de fila'),
+        ),
+        migrations.AddField(
+            model_name='horse',
+            name='row_version',
+            field=models.PositiveBigIntegerField(default=1, verbose_name='Versión de fila'),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='row_version',
+            field=models.PositiveBigIntegerField(default=1, verbose_name='Versión de fila'),
+        ),
+    ]
@@ -1,14 +1,193 @@
 import uuid
 from decimal import Decimal
-from django.db import models
+from django.db import DatabaseError, models, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from datetime import timedelta
 
 
-class Discipline(models.Model):
+class CompetitionCountersMixin:
+    """
+    Mantiene los contadores desnormalizados de Competition.
+
+    Los modelos hijos definen COUNTERS: campo del contador en Competition ->
+    atributo booleano que lo condiciona (None cuenta todas las filas). Los
+    cambios se aplican con incrementos F() en la misma transacción.
+    """
+    COUNTERS = {}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        required = {'competition_id'} | {attr for attr in cls.COUNTERS.values() if attr}
+        if required.issubset(loaded):
+            instance._counter_state = instance._get_counter_state(loaded)
+        return instance
+
+    def _get_counter_state(self, values=None):
+        """(competition_id, {contador: 0/1}) según los valores indicados o actuales"""
+        def get(name):
+            return values[name] if values is not None else getattr(self, name)
+
+        return get('competition_id'), {
+            counter: int(bool(get(attr))) if attr else 1
+            for counter, attr in self.COUNTERS.items()
+        }
+
+    def _get_stored_counter_state(self):
+        """Estado con el que la fila está contada actualmente en la base de datos"""
+        state = getattr(self, '_counter_state', None)
+        if state is None and self.pk is not None:
+            attrs = ['competition_id'] + [attr for attr in self.COUNTERS.values() if attr]
+            values = type(self).objects.filter(pk=self.pk).values(*attrs).first()
+            state = self._get_counter_state(values) if values else None
+        return state
+
+    def save(self, *args, **kwargs):
+        previous = None if self._state.adding else self._get_stored_counter_state()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            current = self._get_counter_state()
+            if previous != current:
+                Competition.apply_counter_changes(previous, current)
+        self._counter_state = current
+
+    def delete(self, *args, **kwargs):
+        previous = self._get_stored_counter_state()
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Competition.apply_counter_changes(previous, None)
+        self._counter_state = None
+        return result
+
+
+class SearchIndexMixin:
+    """
+    Mantiene actualizado el documento de búsqueda (apps.search) al guardar o borrar.
+
+    SEARCH_FIELDS limita la reindexación: un save() con update_fields que no
+    toque ninguno de esos campos no modifica el índice.
+    """
+    SEARCH_FIELDS = None
+
+    def _affects_search_index(self, update_fields):
+        if update_fields is None or self.SEARCH_FIELDS is None:
+            return True
+        return bool(set(update_fields) & set(self.SEARCH_FIELDS))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self._affects_search_index(kwargs.get('update_fields')):
+            from apps.search.services import index_instance
+            index_instance(self)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.search.services import remove_instance
+        remove_instance(self)
+        return result
+
+
+class ChangeFeedMixin:
+    """
+    Anexa cada save() o delete() al feed de cambios de sincronización
+    (apps.sync.change_feed) dentro de la misma transacción.
+    """
+
+    def save(self, *args, **kwargs):
+        from apps.sync.change_feed import record_change
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            record_change(self)
+
+    def delete(self, *args, **kwargs):
+        from apps.sync.change_feed import record_change
+        object_id = self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            record_change(self, 'delete', object_id)
+        return result
+
+
+class RowVersionConflict(DatabaseError):
+    """La fila cambió en la base de datos desde que se leyó"""
+
+
+class RowVersionMixin:
+    """
+    Contador de versión de fila (row_version) para detectar conflictos de
+    sincronización: cada save() de una fila existente lo incrementa. Los
+    clientes guardan la versión que leyeron y el servidor la compara con la
+    actual. Los UPDATE en bloque deben incrementarlo ellos mismos.
+
+    El UPDATE de save() es condicional (WHERE row_version = <leída>): si otro
+    proceso guardó la fila entretanto no se pisa su cambio y se lanza
+    RowVersionConflict.
+    """
+
+    _row_version_base = None
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self._row_version_base = self.row_version
+            self.row_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'row_version'}
+        try:
+            super().save(*args, **kwargs)
+        except RowVersionConflict:
+            self.row_version = self._row_version_base
+            raise
+        finally:
+            self._row_version_base = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        base = self._row_version_base
+        if base is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if super()._do_update(
+            base_qs.filter(row_version=base), using, pk_val, values, update_fields, forced_update
+        ):
+            return True
+        # Sin fila que actualizar: si existe con otra versión es un conflicto;
+        # si no existe, save() sigue como siempre (INSERT)
+        if base_qs.filter(pk=pk_val).exists():
+            raise RowVersionConflict(
+                f"{self.__class__.__name__} {pk_val} cambió desde la versión {base}"
+            )
+        return False
+
+
+class ReferenceDataMixin:
+    """
+    Invalida el cache en proceso de datos de referencia al guardar o borrar.
+
+    REFERENCE_TABLES enumera las tablas de reference_cache afectadas (por
+    ejemplo, los criterios de puntuación incluyen el nombre de su disciplina).
+    """
+    REFERENCE_TABLES = ()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .reference_cache import invalidate
+        invalidate(*self.REFERENCE_TABLES)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .reference_cache import invalidate
+        invalidate(*self.REFERENCE_TABLES)
+        return result
+
+
+class Discipline(ReferenceDataMixin, models.Model):
     """Disciplinas ecuestres (Salto, Dressage, Concurso Completo, etc.)"""
+    REFERENCE_TABLES = ('disciplines', 'scoring_criteria')
+
     DISCIPLINE_TYPES = [
         ('jumping', 'Salto'),
         ('dressage', 'Dressage'),
@@ -44,8 +223,10 @@ class Discipline(models.Model):
         return f"{self.name} ({self.code})"
 
 
-class Category(models.Model):
+class Category(ReferenceDataMixin, models.Model):
     """Categorías de competencia basadas en edad, nivel, etc."""
+    REFERENCE_TABLES = ('categories',)
+
     CATEGORY_TYPES = [
         ('age', 'Por Edad'),
         ('level', 'Por Nivel'),
@@ -94,8 +275,11 @@ class Category(models.Model):
         return f"{self.name} ({self.code})"
 
 
-class Venue(models.Model):
+class Venue(ReferenceDataMixin, SearchIndexMixin, models.Model):
     """Lugares/Sedes donde se realizan las competencias"""
+    SEARCH_FIELDS = ['name', 'address', 'city', 'state_province', 'country', 'is_active']
+    REFERENCE_TABLES = ('venues',)
+
     # id se genera automáticamente como integer AutoField (primary key)
     name = models.CharField(max_length=200, verbose_name="Nombre")
     address = models.TextField(verbose_name="Dirección")
@@ -133,8 +317,10 @@ class Venue(models.Model):
         return f"{self.name}, {self.city}"
 
 
-class Competition(models.Model):
+class Competition(ChangeFeedMixin, RowVersionMixin, SearchIndexMixin, models.Model):
     """Competencias ecuestres"""
+    SEARCH_FIELDS = ['name', 'short_name', 'venue', 'status', 'competition_type']
+
     STATUS_CHOICES = [
         ('draft', 'Borrador'),
         ('published', 'Publicada'),
@@ -192,18 +378,94 @@ class Competition(models.Model):
     prize_money = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Premio en dinero")
     sponsors = models.TextField(blank=True, verbose_name="Patrocinadores")
     
+    # Contadores desnormalizados (mantenidos por Participant y CompetitionStaff)
+    participants_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Participantes")
+    confirmed_participants_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Participantes confirmados")
+    paid_participants_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Participantes con pago")
+    staff_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Personal asignado")
+    confirmed_staff_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Personal confirmado")
+
     # Metadatos
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    row_version = models.PositiveBigIntegerField(default=1, verbose_name="Versión de fila")
     
+    COUNTER_FIELDS = [
+        'participants_count', 'confirmed_participants_count', 'paid_participants_count',
+        'staff_count', 'confirmed_staff_count',
+    ]
+
     class Meta:
         verbose_name = "Competencia"
         verbose_name_plural = "Competencias"
         ordering = ['-start_date', 'name']
+        indexes = [
+            models.Index(fields=['status', 'start_date']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.start_date.strftime('%Y-%m-%d')}"
     
+    def save(self, *args, **kwargs):
+        # Los contadores solo cambian con F(): no sobrescribirlos con valores en memoria
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def apply_counter_changes(cls, previous, current):
+        """Aplicar la diferencia entre dos estados (competition_id, {contador: valor})"""
+        deltas = {}
+        for sign, state in ((-1, previous), (1, current)):
+            if state is None:
+                continue
+            competition_id, values = state
+            changes = deltas.setdefault(competition_id, {})
+            for counter, value in values.items():
+                changes[counter] = changes.get(counter, 0) + sign * value
+
+        for competition_id, changes in deltas.items():
+            updates = {
+                counter: Greatest(F(counter) + delta, Value(0))
+                for counter, delta in changes.items() if delta
+            }
+            if updates:
+                cls.objects.filter(pk=competition_id).update(**updates)
+
+    @classmethod
+    def actual_counters(cls, queryset=None):
+        """Contadores calculados desde Participant y CompetitionStaff: {id: {contador: valor}}"""
+        queryset = cls.objects.all() if queryset is None else queryset
+        counters = {pk: dict.fromkeys(cls.COUNTER_FIELDS, 0) for pk in queryset.values_list('pk', flat=True)}
+
+        participants = Participant.objects.filter(competition__in=queryset).values('competition_id').annotate(
+            participants_count=Count('id'),
+            confirmed_participants_count=Count('id', filter=Q(is_confirmed=True)),
+            paid_participants_count=Count('id', filter=Q(is_paid=True)),
+        ).order_by()
+        staff = CompetitionStaff.objects.filter(competition__in=queryset).values('competition_id').annotate(
+            staff_count=Count('id'),
+            confirmed_staff_count=Count('id', filter=Q(is_confirmed=True)),
+        ).order_by()
+
+        for row in list(participants) + list(staff):
+            competition_id = row.pop('competition_id')
+            if competition_id in counters:
+                counters[competition_id].update(row)
+
+        return counters
+
+    def refresh_counters(self):
+        """Recalcular y guardar los contadores de esta competencia"""
+        values = Competition.actual_counters(Competition.objects.filter(pk=self.pk))[self.pk]
+        Competition.objects.filter(pk=self.pk).update(**values)
+        for counter, value in values.items():
+            setattr(self, counter, value)
+        return values
+
     @property
     def is_registration_open(self):
         """Verifica si la inscripción está abierta"""
@@ -227,8 +489,13 @@ class Competition(models.Model):
         return (self.end_date.date() - self.start_date.date()).days + 1
 
 
-class CompetitionStaff(models.Model):
+class CompetitionStaff(CompetitionCountersMixin, models.Model):
     """Personal asignado a una competencia"""
+    COUNTERS = {
+        'staff_count': None,
+        'confirmed_staff_count': 'is_confirmed',
+    }
+
     ROLE_CHOICES = [
         ('organizer', 'Organizador'),
         ('chief_judge', 'Juez Principal'),
@@ -262,8 +529,10 @@ class CompetitionStaff(models.Model):
         return f"{self.staff_member.get_full_name()} - {self.get_role_display()} ({self.competition.name})"
 
 
-class Horse(models.Model):
+class Horse(ChangeFeedMixin, RowVersionMixin, SearchIndexMixin, models.Model):
     """Caballos registrados en el sistema"""
+    SEARCH_FIELDS = ['name', 'registration_number', 'breed', 'color', 'owner', 'fei_id', 'is_active']
+
     GENDER_CHOICES = [
         ('stallion', 'Semental'),
         ('mare', 'Yegua'),
@@ -300,6 +569,7 @@ class Horse(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    row_version = models.PositiveBigIntegerField(default=1, verbose_name="Versión de fila")
     
     class Meta:
         verbose_name = "Caballo"
@@ -317,8 +587,15 @@ class Horse(models.Model):
         return today.year - self.birth_date.year - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
 
 
-class Participant(models.Model):
+class Participant(ChangeFeedMixin, RowVersionMixin, CompetitionCountersMixin, SearchIndexMixin, models.Model):
     """Participante en una competencia específica"""
+    COUNTERS = {
+        'participants_count': None,
+        'confirmed_participants_count': 'is_confirmed',
+        'paid_participants_count': 'is_paid',
+    }
+    SEARCH_FIELDS = ['rider', 'horse']
+
     # id se genera automáticamente como integer AutoField (primary key)
     competition = models.ForeignKey(Competition, on_delete=models.CASCADE, related_name='participants')
     rider = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Jinete")
@@ -340,12 +617,21 @@ class Participant(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    row_version = models.PositiveBigIntegerField(default=1, verbose_name="Versión de fila")
     
     class Meta:
         verbose_name = "Participante"
         verbose_name_plural = "Participantes"
         unique_together = ['competition', 'rider', 'horse', 'category']
         ordering = ['bib_number', 'rider__last_name']
+        indexes = [
+            models.Index(fields=['competition', 'category']),
+            # Cupo de confirmados (perform_create y permisos de inscripción)
+            models.Index(
+                fields=['competition'], condition=Q(is_confirmed=True),
+                name='participant_confirmed_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.rider.get_full_name()} + {self.horse.name} ({self.competition.name})"
@@ -394,3 +680,32 @@ class CompetitionSchedule(models.Model):
     
     def __str__(self):
         return f"{self.title} - {self.start_time.strftime('%Y-%m-%d %H:%M')}"
+
+
+class StartListEntry(models.Model):
+    """Orden de salida generado para una programación (clase) y ronda"""
+    schedule = models.ForeignKey(CompetitionSchedule, on_delete=models.CASCADE, related_name='start_list', verbose_name="Programación")
+    participant = models.ForeignKey(Participant, on_delete=models.CASCADE, related_name='start_list_entries', verbose_name="Participante")
+    round_number = models.PositiveSmallIntegerField(default=1, verbose_name="Ronda")
+
+    # Posición en el sorteo y en la pista asignada
+    draw_position = models.PositiveIntegerField(verbose_name="Posición en el sorteo")
+    arena = models.PositiveSmallIntegerField(default=1, verbose_name="Pista")
+    start_position = models.PositiveIntegerField(verbose_name="Orden de salida")
+    start_time = models.DateTimeField(verbose_name="Hora de salida")
+    end_time = models.DateTimeField(null=True, blank=True, verbose_name="Fin del turno")
+    break_before = models.BooleanField(default=False, verbose_name="Descanso previo")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Orden de Salida"
+        verbose_name_plural = "Órdenes de Salida"
+        unique_together = ['schedule', 'round_number', 'participant']
+        ordering = ['round_number', 'start_time', 'arena']
+        indexes = [
+            models.Index(fields=['schedule', 'round_number', 'arena', 'start_position']),
+        ]
+
+    def __str__(self):
+        return f"R{self.round_number} P{self.arena} #{self.start_position} - {self.participant}"
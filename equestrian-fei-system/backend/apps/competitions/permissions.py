@@ -68,10 +68,16 @@ class CanManageCompetitionStaff(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # Para CompetitionStaff, verificar que el usuario pueda gestionar la competencia
         competition = obj.competition if hasattr(obj, 'competition') else obj
+        if not (request.user and request.user.is_authenticated):
+            return False
+        if competition.organizer == request.user or request.user.role == 'admin':
+            return True
+
+        # Los jueces solo leen el personal de las competencias donde están asignados
         return (
-            request.user and 
-            request.user.is_authenticated and
-            (competition.organizer == request.user or request.user.role == 'admin')
+            request.method in permissions.SAFE_METHODS and
+            request.user.role == 'judge' and
+            competition.staff.filter(staff_member=request.user).exists()
         )
 
 
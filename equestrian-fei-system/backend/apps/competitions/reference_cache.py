@@ -0,0 +1,243 @@
+"""
+Cache en proceso de los datos de referencia (disciplinas, categorías, sedes y criterios)
+
+Son tablas pequeñas que casi no cambian y se leen en cada serialización. Cada
+worker las guarda completas en memoria: las búsquedas por id o código son
+lecturas de diccionario y los listados se sirven ya serializados.
+
+La invalidación entre workers usa un contador de versión en el cache
+compartido (Redis en producción). Cada worker lo consulta como máximo una vez
+cada REFERENCE_CACHE_CHECK_SECONDS y recarga la tabla solo si cambió; guardar
+o borrar una fila incrementa el contador.
+"""
+
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = getattr(settings, 'REFERENCE_CACHE_CHECK_SECONDS', 1.0)
+
+
+def _version_key(name):
+    return f"refdata_version:{name}"
+
+
+class ReferenceTable:
+    """
+    Copia en memoria de una tabla de referencia.
+
+    ``code_key`` devuelve la clave de búsqueda por código de cada fila (los
+    criterios de puntuación son únicos por disciplina + código); None si la
+    tabla no tiene código, como las sedes. Los datos
+    derivados (listas serializadas, agrupaciones) se memorizan por versión.
+    """
+
+    def __init__(self, name, model, serializer, order_by=None, select_related=(),
+                 code_key=lambda instance: instance.code):
+        self.name = name
+        self.model_label = model
+        self.serializer_path = serializer
+        self.order_by = order_by
+        self.select_related = select_related
+        self.code_key = code_key
+        self._lock = threading.RLock()
+        self._state = None
+        self._version = None
+        self._checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Versión compartida
+    # ------------------------------------------------------------------
+
+    def _shared_version(self):
+        """Versión vigente en el cache compartido; None si no está disponible"""
+        key = _version_key(self.name)
+        try:
+            version = cache.get(key)
+            if version is None:
+                # Valor inicial distinto tras un reinicio o desalojo de la clave
+                cache.add(key, int(time.time() * 1000), None)
+                version = cache.get(key)
+            return version
+        except Exception as e:
+            logger.warning(f"No se pudo leer la versión de {self.name}: {e}")
+            return None
+
+    def invalidate(self):
+        """Descartar la copia local y avisar al resto de los workers"""
+        with self._lock:
+            self._state = None
+            self._checked_at = 0.0
+        key = _version_key(self.name)
+        try:
+            if not cache.add(key, int(time.time() * 1000), None):
+                cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+        except Exception as e:
+            logger.error(f"Error invalidando la tabla de referencia {self.name}: {e}")
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        model = apps.get_model(self.model_label)
+        queryset = model.objects.select_related(*self.select_related)
+        if self.order_by:
+            queryset = queryset.order_by(*self.order_by)
+        rows = list(queryset)
+        return {
+            'rows': rows,
+            'by_id': {str(row.pk): row for row in rows},
+            'by_code': {self.code_key(row): row for row in rows} if self.code_key else {},
+            'memo': {},
+        }
+
+    def _get_state(self):
+        now = time.monotonic()
+        state = self._state
+        if state is not None and now - self._checked_at < CHECK_INTERVAL:
+            return state
+
+        with self._lock:
+            version = self._shared_version()
+            if self._state is None or version is None or version != self._version:
+                self._state = self._load()
+                self._version = version
+            self._checked_at = now
+            return self._state
+
+    # ------------------------------------------------------------------
+    # Lecturas
+    # ------------------------------------------------------------------
+
+    def all(self, active_only=False):
+        rows = self._get_state()['rows']
+        if active_only:
+            return [row for row in rows if row.is_active]
+        return rows
+
+    def get(self, pk):
+        """Fila por clave primaria (int, UUID o texto); None si no existe"""
+        if pk is None:
+            return None
+        return self._get_state()['by_id'].get(str(pk))
+
+    def get_by_code(self, code):
+        return self._get_state()['by_code'].get(code)
+
+    def memoize(self, key, builder):
+        """Valor derivado de la tabla, calculado una vez por versión"""
+        memo = self._get_state()['memo']
+        if key not in memo:
+            memo[key] = builder(self)
+        return memo[key]
+
+    def serialized(self, pk):
+        """Representación serializada de una fila; None si no existe"""
+        data = self.memoize('serialized_by_id', lambda table: {
+            str(item['id']): item for item in table.serialized_list()
+        })
+        return data.get(str(pk))
+
+    def serialized_list(self, active_only=False):
+        """Lista serializada en el orden de la tabla"""
+        def build(table):
+            serializer = import_string(self.serializer_path)
+            return list(serializer(table.all(active_only), many=True).data)
+        return self.memoize(('serialized_list', active_only), build)
+
+
+TABLES = {}
+
+
+def register(table):
+    TABLES[table.name] = table
+    return table
+
+
+disciplines = register(ReferenceTable(
+    'disciplines', 'competitions.Discipline',
+    'apps.competitions.serializers.DisciplineSerializer',
+))
+categories = register(ReferenceTable(
+    'categories', 'competitions.Category',
+    'apps.competitions.serializers.CategorySerializer',
+))
+venues = register(ReferenceTable(
+    'venues', 'competitions.Venue',
+    'apps.competitions.serializers.VenueSerializer',
+    code_key=None,
+))
+scoring_criteria = register(ReferenceTable(
+    'scoring_criteria', 'scoring.ScoringCriteria',
+    'apps.scoring.serializers.ScoringCriteriaSerializer',
+    order_by=('discipline__name', 'order', 'name'),
+    select_related=('discipline',),
+    code_key=lambda criteria: (criteria.discipline_id, criteria.code),
+))
+
+
+def invalidate(*names):
+    """
+    Invalidar las tablas indicadas.
+
+    Se invalida de inmediato y otra vez al confirmar la transacción: un worker
+    que recargue antes del commit vería los datos anteriores.
+    """
+    def run():
+        for name in names:
+            TABLES[name].invalidate()
+
+    run()
+    transaction.on_commit(run)
+
+
+class ReferenceListMixin:
+    """
+    list/retrieve de un ViewSet de datos de referencia servidos desde el cache.
+
+    El cache se usa cuando la query string no trae filtros, búsqueda ni
+    orden; con cualquiera de ellos se consulta la base de datos como siempre.
+    """
+    reference_table = None
+    reference_active_only = True
+    reference_cached_params = ('page', 'page_size', 'format')
+
+    def get_reference_table(self):
+        return TABLES[self.reference_table]
+
+    def serves_from_reference_cache(self, request):
+        return not set(request.query_params) - set(self.reference_cached_params)
+
+    def list(self, request, *args, **kwargs):
+        if not self.serves_from_reference_cache(request):
+            return super().list(request, *args, **kwargs)
+
+        from rest_framework.response import Response
+
+        data = self.get_reference_table().serialized_list(self.reference_active_only)
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        table = self.get_reference_table()
+        row = table.get(kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        if row is None or (self.reference_active_only and not row.is_active):
+            return super().retrieve(request, *args, **kwargs)
+
+        from rest_framework.response import Response
+
+        self.check_object_permissions(request, row)
+        return Response(table.serialized(row.pk))
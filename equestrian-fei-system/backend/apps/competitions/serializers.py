@@ -3,12 +3,38 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import (
     Discipline, Category, Venue, Competition, 
-    CompetitionStaff, Horse, Participant, CompetitionSchedule
+    CompetitionStaff, Horse, Participant, CompetitionSchedule, StartListEntry
 )
 
 User = get_user_model()
 
 
+class ReferenceAttributeField(serializers.ReadOnlyField):
+    """
+    Atributo de una FK a datos de referencia (p. ej. el nombre de la categoría)
+    leído del cache en proceso, sin JOIN ni consulta adicional.
+    """
+
+    def __init__(self, table, relation, attr='name', **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+        self.table = table
+        self.relation = relation
+        self.attr = attr
+
+    def to_representation(self, instance):
+        from .reference_cache import TABLES
+
+        pk = getattr(instance, f'{self.relation}_id')
+        if pk is None:
+            return None
+        row = TABLES[self.table].get(pk)
+        if row is None:
+            # Fila creada en otro worker que este aún no recargó
+            row = getattr(instance, self.relation)
+        return getattr(row, self.attr)
+
+
 class SimpleCompetitionSerializer(serializers.ModelSerializer):
     """Serializer simple para competencias (evita problemas de choices)"""
     
@@ -84,9 +110,9 @@ class HorseSerializer(serializers.ModelSerializer):
             'birth_date', 'height', 'owner', 'owner_name', 'trainer', 'trainer_name',
             'microchip_number', 'passport_number', 'is_fei_registered', 'fei_id',
             'is_active', 'is_available_for_competition', 'notes', 'age',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'age', 'owner_name', 'trainer_name']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'row_version', 'age', 'owner_name', 'trainer_name']
     
     def validate_birth_date(self, value):
         """Validar que la fecha de nacimiento sea válida"""
@@ -114,8 +140,8 @@ class CompetitionStaffSerializer(serializers.ModelSerializer):
 
 class CompetitionScheduleSerializer(serializers.ModelSerializer):
     """Serializer para Programación de Competencias"""
-    discipline_name = serializers.CharField(source='discipline.name', read_only=True)
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    discipline_name = ReferenceAttributeField('disciplines', 'discipline')
+    category_name = ReferenceAttributeField('categories', 'category')
     schedule_type_display = serializers.CharField(source='get_schedule_type_display', read_only=True)
 
     # Hacer discipline y category explícitamente opcionales (permiten null)
@@ -178,11 +204,40 @@ class CompetitionScheduleSerializer(serializers.ModelSerializer):
         return data
 
 
+class StartListEntrySerializer(serializers.ModelSerializer):
+    """Serializer para el orden de salida"""
+    rider_name = serializers.CharField(source='participant.rider.get_full_name', read_only=True)
+    horse_name = serializers.CharField(source='participant.horse.name', read_only=True)
+    bib_number = serializers.IntegerField(source='participant.bib_number', read_only=True)
+
+    class Meta:
+        model = StartListEntry
+        fields = [
+            'id', 'participant', 'rider_name', 'horse_name', 'bib_number', 'round_number',
+            'draw_position', 'arena', 'start_position', 'start_time', 'end_time', 'break_before'
+        ]
+        read_only_fields = fields
+
+
+class StartListGenerateSerializer(serializers.Serializer):
+    """Parámetros para generar el orden de salida de una programación"""
+    method = serializers.ChoiceField(choices=['random', 'reverse_standing'], default='random')
+    round_number = serializers.IntegerField(min_value=1, default=1)
+    start_time = serializers.DateTimeField(required=False)
+    interval_seconds = serializers.IntegerField(min_value=1, default=90)
+    arenas = serializers.IntegerField(min_value=1, max_value=50, default=1)
+    rider_gap = serializers.IntegerField(min_value=0, default=3)
+    break_every = serializers.IntegerField(min_value=0, default=0)
+    break_minutes = serializers.IntegerField(min_value=0, default=10)
+    seed = serializers.IntegerField(required=False)
+    top = serializers.IntegerField(min_value=1, required=False)
+
+
 class ParticipantSerializer(serializers.ModelSerializer):
     """Serializer para Participantes"""
     rider_name = serializers.CharField(source='rider.get_full_name', read_only=True)
     horse_name = serializers.CharField(source='horse.name', read_only=True)
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = ReferenceAttributeField('categories', 'category')
     competition_name = serializers.CharField(source='competition.name', read_only=True)
     
     class Meta:
@@ -192,10 +247,10 @@ class ParticipantSerializer(serializers.ModelSerializer):
             'horse', 'horse_name', 'category', 'category_name', 'bib_number',
             'registration_date', 'is_confirmed', 'is_paid', 
             'emergency_contact_name', 'emergency_contact_phone', 'special_requirements',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
         read_only_fields = [
-            'id', 'registration_date', 'created_at', 'updated_at',
+            'id', 'registration_date', 'created_at', 'updated_at', 'row_version',
             'rider_name', 'horse_name', 'category_name', 'competition_name'
         ]
 
@@ -207,8 +262,8 @@ class CompetitionListSerializer(serializers.ModelSerializer):
     venue_city = serializers.CharField(source='venue.city', read_only=True, allow_null=True)
     status_display = serializers.SerializerMethodField()
     competition_type_display = serializers.SerializerMethodField()
-    participant_count = serializers.SerializerMethodField()
-    staff_count = serializers.SerializerMethodField()
+    participant_count = serializers.IntegerField(source='confirmed_participants_count', read_only=True)
+    staff_count = serializers.IntegerField(read_only=True)
     is_registration_open = serializers.SerializerMethodField()
     days_until_start = serializers.SerializerMethodField()
     duration_days = serializers.SerializerMethodField()
@@ -230,14 +285,6 @@ class CompetitionListSerializer(serializers.ModelSerializer):
             'days_until_start', 'duration_days', 'created_at', 'updated_at'
         ]
 
-    def get_participant_count(self, obj):
-        """Obtener número de participantes confirmados"""
-        return obj.participants.filter(is_confirmed=True).count()
-
-    def get_staff_count(self, obj):
-        """Obtener número de staff asignados"""
-        return obj.staff.count()
-    
     def get_status_display(self, obj):
         """Obtener display del status"""
         return obj.get_status_display() if hasattr(obj, 'get_status_display') else obj.status
@@ -284,8 +331,8 @@ class CompetitionDetailSerializer(serializers.ModelSerializer):
     # Campos calculados
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     competition_type_display = serializers.CharField(source='get_competition_type_display', read_only=True)
-    participant_count = serializers.SerializerMethodField()
-    confirmed_participant_count = serializers.SerializerMethodField()
+    participant_count = serializers.IntegerField(source='participants_count', read_only=True)
+    confirmed_participant_count = serializers.IntegerField(source='confirmed_participants_count', read_only=True)
     is_registration_open = serializers.ReadOnlyField()
     days_until_start = serializers.ReadOnlyField()
     duration_days = serializers.ReadOnlyField()
@@ -304,22 +351,14 @@ class CompetitionDetailSerializer(serializers.ModelSerializer):
             'staff', 'participants', 'schedule',
             'participant_count', 'confirmed_participant_count',
             'is_registration_open', 'days_until_start', 'duration_days',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
         read_only_fields = [
             'id', 'organizer_name', 'status_display', 'competition_type_display',
             'participant_count', 'confirmed_participant_count', 'is_registration_open',
-            'days_until_start', 'duration_days', 'created_at', 'updated_at'
+            'days_until_start', 'duration_days', 'created_at', 'updated_at', 'row_version'
         ]
     
-    def get_participant_count(self, obj):
-        """Obtener número total de participantes"""
-        return obj.participants.count()
-    
-    def get_confirmed_participant_count(self, obj):
-        """Obtener número de participantes confirmados"""
-        return obj.participants.filter(is_confirmed=True).count()
-    
     def validate(self, data):
         """Validaciones personalizadas"""
         # Validar fechas
@@ -396,6 +435,18 @@ class CompetitionDetailSerializer(serializers.ModelSerializer):
         return instance
 
 
+class CompetitionBundleSerializer(CompetitionDetailSerializer):
+    """Competencia para el paquete de datos: las relaciones van como ids en sus propias secciones"""
+    disciplines = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    categories = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta(CompetitionDetailSerializer.Meta):
+        fields = [
+            field for field in CompetitionDetailSerializer.Meta.fields
+            if field not in ('venue_id', 'discipline_ids', 'category_ids', 'staff', 'participants', 'schedule')
+        ]
+
+
 class CompetitionCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear competencias (simplificado)"""
     venue_id = serializers.UUIDField()
@@ -493,9 +544,9 @@ class JudgeAssignedCompetitionSerializer(serializers.ModelSerializer):
     disciplines = DisciplineSerializer(many=True, read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
 
-    # Counts (annotated in view)
-    participant_count = serializers.IntegerField(read_only=True, default=0)
-    staff_count = serializers.IntegerField(read_only=True, default=0)
+    # Counts (contadores desnormalizados de Competition)
+    participant_count = serializers.IntegerField(source='participants_count', read_only=True)
+    staff_count = serializers.IntegerField(read_only=True)
 
     # Display fields
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -530,5 +581,6 @@ class JudgeAssignedCompetitionSerializer(serializers.ModelSerializer):
         Obtener la asignación de staff del juez actual
         Este campo debe ser configurado en el contexto del serializer
         """
-        # El view debe pasar 'staff_assignment' en el contexto
-        return self.context.get('staff_assignment', None)
\ No newline at end of file
+        # El view adjunta 'staff_assignment' a cada competencia (listas) o lo
+        # pasa en el contexto (una sola competencia)
+        return getattr(obj, 'staff_assignment', self.context.get('staff_assignment', None))
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Generación de órdenes de salida (start lists) para CompetitionSchedule
+
+El sorteo produce una secuencia global que se reparte en turnos: el turno t
+ocupa las posiciones t*pistas .. t*pistas + pistas - 1, una por pista, todas a
+la misma hora. Así la separación entre caballos de un mismo jinete se mide en
+turnos (tiempo real) aunque la clase se corra en varias pistas a la vez.
+"""
+
+import heapq
+import random
+from collections import deque
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Participant, StartListEntry
+
+DRAW_METHODS = ['random', 'reverse_standing']
+
+
+class StartListError(ValueError):
+    """Parámetros o datos insuficientes para generar el orden de salida"""
+
+
+class StartListGenerator:
+    """
+    Genera el orden de salida de una clase aplicando las reglas de sorteo:
+
+    - random: sorteo aleatorio (reproducible con seed).
+    - reverse_standing: orden inverso a la clasificación de la ronda anterior
+      (el líder sale último); los participantes sin clasificación salen primero.
+    - rider_gap: turnos mínimos entre dos caballos del mismo jinete.
+    - break_every / break_minutes: descanso cada N salidas por pista.
+    """
+
+    def __init__(self, schedule, method='random', round_number=1, start_time=None,
+                 interval_seconds=90, arenas=1, rider_gap=3, break_every=0,
+                 break_minutes=10, seed=None, top=None):
+        if method not in DRAW_METHODS:
+            raise StartListError(f'Método de sorteo no válido: {method}')
+        if schedule.category_id is None:
+            raise StartListError('La programación debe tener una categoría para generar el orden de salida')
+        if arenas < 1 or interval_seconds < 1:
+            raise StartListError('Se requiere al menos una pista y un intervalo positivo')
+
+        self.schedule = schedule
+        self.method = method
+        self.round_number = round_number
+        self.start_time = start_time or schedule.start_time
+        self.interval = timedelta(seconds=interval_seconds)
+        self.arenas = arenas
+        self.rider_gap = max(rider_gap, 0)
+        self.break_every = max(break_every, 0)
+        self.break_duration = timedelta(minutes=break_minutes)
+        self.seed = seed
+        self.top = top
+        self.warnings = []
+
+    def get_participants(self):
+        return list(
+            Participant.objects.filter(
+                competition_id=self.schedule.competition_id,
+                category_id=self.schedule.category_id
+            ).order_by('pk')
+        )
+
+    def draw(self, participants):
+        """Orden base según el método, antes de aplicar la separación de jinetes"""
+        if self.method == 'random':
+            participants = list(participants)
+            random.Random(self.seed).shuffle(participants)
+            return participants
+
+        from apps.scoring.models import RankingEntry
+
+        positions = dict(
+            RankingEntry.objects.filter(
+                ranking__competition_id=self.schedule.competition_id,
+                ranking__category_id=self.schedule.category_id,
+                participant__in=participants
+            ).values_list('participant_id', 'position')
+        )
+        ranked = [p for p in participants if p.pk in positions]
+        unranked = [p for p in participants if p.pk not in positions]
+
+        ranked.sort(key=lambda p: positions[p.pk])
+        if self.top:
+            ranked = ranked[:self.top]
+            unranked = []
+        random.Random(self.seed).shuffle(unranked)
+        return unranked + ranked[::-1]
+
+    def apply_rider_spacing(self, ordered):
+        """
+        Reordenar respetando la separación mínima entre caballos del mismo jinete.
+
+        Greedy O(n log n): en cada posición sale el participante con menor
+        índice de sorteo cuyo jinete ya cumplió la separación. Si ninguno está
+        disponible (p. ej. un jinete con muchos caballos al final) sale el que
+        quede libre antes y se registra una advertencia.
+        """
+        if not ordered:
+            return []
+
+        queues = {}
+        for index, participant in enumerate(ordered):
+            queues.setdefault(participant.rider_id, deque()).append((index, participant))
+
+        ready = [(queue[0][0], rider_id) for rider_id, queue in queues.items()]
+        heapq.heapify(ready)
+        cooling = []
+        result = []
+
+        for position in range(len(ordered)):
+            while cooling and cooling[0][0] <= position:
+                _, index, rider_id = heapq.heappop(cooling)
+                heapq.heappush(ready, (index, rider_id))
+
+            if ready:
+                _, rider_id = heapq.heappop(ready)
+            else:
+                _, _, rider_id = heapq.heappop(cooling)
+                self.warnings.append(
+                    f'No se pudo respetar la separación del jinete {rider_id} en la posición {position + 1}'
+                )
+
+            _, participant = queues[rider_id].popleft()
+            result.append(participant)
+
+            if queues[rider_id]:
+                slot = position // self.arenas
+                available_at = (slot + self.rider_gap + 1) * self.arenas
+                heapq.heappush(cooling, (available_at, queues[rider_id][0][0], rider_id))
+
+        return result
+
+    def slot_time(self, slot):
+        breaks = slot // self.break_every if self.break_every else 0
+        return self.start_time + self.interval * slot + self.break_duration * breaks
+
+    def build_entries(self, ordered):
+        entries = []
+        for position, participant in enumerate(ordered):
+            slot, arena = divmod(position, self.arenas)
+            entries.append(StartListEntry(
+                schedule=self.schedule,
+                participant=participant,
+                round_number=self.round_number,
+                draw_position=position + 1,
+                arena=arena + 1,
+                start_position=slot + 1,
+                start_time=self.slot_time(slot),
+                end_time=self.slot_time(slot) + self.interval,
+                break_before=bool(self.break_every and slot and slot % self.break_every == 0),
+            ))
+        return entries
+
+    def generate(self):
+        """Entradas sin guardar del orden de salida"""
+        ordered = self.draw(self.get_participants())
+        if self.rider_gap:
+            ordered = self.apply_rider_spacing(ordered)
+        return self.build_entries(ordered)
+
+    def save(self):
+        """Generar y reemplazar el orden de salida de la ronda en una transacción"""
+        entries = self.generate()
+        with transaction.atomic():
+            StartListEntry.objects.filter(schedule=self.schedule, round_number=self.round_number).delete()
+            StartListEntry.objects.bulk_create(entries)
+
+            if entries:
+                slots = (len(entries) + self.arenas - 1) // self.arenas
+                end_time = self.slot_time(slots - 1) + self.interval
+                if self.schedule.end_time is None or end_time > self.schedule.end_time:
+                    self.schedule.end_time = end_time
+                    self.schedule.estimated_duration = end_time - self.schedule.start_time
+                    self.schedule.save(update_fields=['end_time', 'estimated_duration', 'updated_at'])
+        return entries
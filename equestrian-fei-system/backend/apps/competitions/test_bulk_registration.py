@@ -0,0 +1,158 @@
+"""
+Tests para la inscripción masiva de participantes (ParticipantViewSet.bulk_register)
+"""
+
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.search.models import SearchDocument
+from apps.sync.models import ChangeFeedEntry
+from .models import Category, Competition, Horse, Participant, Venue
+
+User = get_user_model()
+
+
+class BulkRegistrationTest(APITestCase):
+    """Tests para la importación de inscripciones en bloque"""
+
+    url = '/api/competitions/participants/bulk_register/'
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Test', organizer=self.organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now - timedelta(days=1), registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        self.open_category = Category.objects.create(name='Abierta', code='OPEN', category_type='level')
+        self.junior = Category.objects.create(name='Juvenil', code='JUV', category_type='age', max_age=18)
+        self.competition.categories.add(self.open_category, self.junior)
+        self.client.force_authenticate(self.organizer)
+
+    def _riders(self, count):
+        riders = User.objects.bulk_create(
+            User(username=f'rider{i}', email=f'rider{i}@test.com', birth_date=date(1990, 1, 1))
+            for i in range(count)
+        )
+        Horse.objects.bulk_create(
+            Horse(
+                name=f'Caballo {i}', registration_number=f'REG-{i}', breed='Criollo', color='Alazán',
+                gender='mare', birth_date='2015-01-01', height=160, owner=rider
+            )
+            for i, rider in enumerate(riders)
+        )
+        return riders
+
+    def test_json_rows_report_errors_per_row(self):
+        self._riders(3)
+        rows = [
+            {'rider_username': 'rider0', 'horse_registration_number': 'REG-0', 'category_code': 'OPEN', 'is_paid': 'si'},
+            {'rider_email': 'RIDER1@test.com', 'horse_registration_number': 'REG-1', 'category_code': 'OPEN'},
+            {'rider_username': 'rider0', 'horse_registration_number': 'REG-0', 'category_code': 'OPEN'},
+            {'rider_username': 'nadie', 'horse_registration_number': 'REG-9', 'category_code': 'OPEN'},
+            {'rider_username': 'rider2', 'horse_registration_number': 'REG-2', 'category_code': 'JUV'},
+        ]
+
+        response = self.client.post(self.url, {'competition': self.competition.id, 'rows': rows}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4, 5])
+        self.assertIn('Jinete no encontrado', response.data['errors'][1]['errors'])
+
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.participants_count, 2)
+        self.assertEqual(self.competition.paid_participants_count, 1)
+        self.assertEqual(SearchDocument.objects.filter(entity_type='rider').count(), 2)
+        # Los clientes reciben las inscripciones por el feed de cambios
+        self.assertCountEqual(
+            ChangeFeedEntry.objects.filter(model_name='Participant').values_list('object_id', 'competition_id'),
+            [(str(pk), self.competition.pk) for pk in self.competition.participants.values_list('pk', flat=True)]
+        )
+
+    def test_csv_upload_and_dry_run(self):
+        self._riders(2)
+        content = (
+            'Rider_Username;Horse_Registration_Number;Category_Code;Bib_Number\n'
+            'rider0;REG-0;OPEN;10\n'
+            'rider1;REG-1;OPEN;11\n'
+        ).encode('utf-8')
+
+        dry = self.client.post(self.url, {
+            'competition': self.competition.id, 'dry_run': 'true',
+            'file': SimpleUploadedFile('entries.csv', content, content_type='text/csv'),
+        })
+        self.assertEqual(dry.status_code, status.HTTP_200_OK)
+        self.assertEqual((dry.data['valid_rows'], dry.data['created']), (2, 0))
+        self.assertFalse(Participant.objects.exists())
+
+        response = self.client.post(self.url, {
+            'competition': self.competition.id,
+            'file': SimpleUploadedFile('entries.csv', content, content_type='text/csv'),
+        })
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            sorted(Participant.objects.values_list('bib_number', flat=True)), [10, 11]
+        )
+
+    def test_quota_counts_confirmed_participants(self):
+        riders = self._riders(5)
+        self.competition.max_participants = 2
+        self.competition.save()
+        # Las inscripciones sin confirmar no ocupan cupo, como en perform_create
+        for index in range(2):
+            Participant.objects.create(
+                competition=self.competition, rider=riders[index], horse=Horse.objects.get(owner=riders[index]),
+                category=self.open_category
+            )
+        rows = [
+            {'rider_username': f'rider{index}', 'horse_registration_number': f'REG-{index}',
+             'category_code': 'OPEN', 'is_confirmed': 'si'}
+            for index in range(2, 5)
+        ]
+
+        response = self.client.post(self.url, {'competition': self.competition.id, 'rows': rows}, format='json')
+
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['errors'], [
+            {'row': 3, 'errors': ['La competencia alcanzó el límite de participantes']}
+        ])
+
+    def test_only_organizer_can_bulk_register(self):
+        other = User.objects.create_user(
+            username='organizer2', email='organizer2@test.com', password='testpass123', role='organizer'
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.post(self.url, {'competition': self.competition.id, 'rows': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_5000_entries(self):
+        self._riders(5000)
+        rows = [
+            {'rider_username': f'rider{i}', 'horse_registration_number': f'REG-{i}', 'category_code': 'OPEN'}
+            for i in range(5000)
+        ]
+
+        started = time.perf_counter()
+        response = self.client.post(self.url, {'competition': self.competition.id, 'rows': rows}, format='json')
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.data['created'], 5000)
+        self.assertEqual(Participant.objects.filter(competition=self.competition).count(), 5000)
+        self.assertLess(elapsed, 10)
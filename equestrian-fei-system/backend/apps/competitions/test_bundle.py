@@ -0,0 +1,183 @@
+"""
+Tests para el paquete de datos (bundle) de una competencia
+"""
+
+import gzip
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.scoring.models import CompetitionRanking, RankingEntry, ScoringCriteria
+from . import reference_cache
+from .models import (
+    Category, Competition, CompetitionSchedule, CompetitionStaff, Discipline, Horse, Participant, Venue
+)
+
+User = get_user_model()
+
+
+class CompetitionBundleTest(APITestCase):
+    """Una sola respuesta con las secciones de trabajo de la competencia"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.discipline = Discipline.objects.create(name='Salto', code='JUMP', discipline_type='jumping')
+        other = Discipline.objects.create(name='Dressage', code='DRE', discipline_type='dressage')
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        ScoringCriteria.objects.create(discipline=self.discipline, name='Técnica', code='TEC', criteria_type='technical')
+        ScoringCriteria.objects.create(discipline=other, name='Artística', code='ART', criteria_type='artistic')
+
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Bundle', organizer=self.organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        self.competition.disciplines.add(self.discipline)
+        self.competition.categories.add(self.category)
+
+        judge = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        CompetitionStaff.objects.create(competition=self.competition, staff_member=judge, role='judge')
+        CompetitionSchedule.objects.create(
+            competition=self.competition, title='Clase 1', schedule_type='category_start',
+            start_time=now + timedelta(days=10), discipline=self.discipline, category=self.category
+        )
+        for index in range(3):
+            self._participant(index)
+
+        self.published = CompetitionRanking.objects.create(
+            competition=self.competition, category=self.category, is_published=True
+        )
+        senior = Category.objects.create(name='Senior', code='SEN', category_type='level')
+        CompetitionRanking.objects.create(competition=self.competition, category=senior)
+        RankingEntry.objects.create(
+            ranking=self.published, participant=Participant.objects.first(), position=1,
+            total_score=70, final_score=70
+        )
+        self.url = f'/api/competitions/competitions/{self.competition.pk}/bundle/'
+
+    def _participant(self, index):
+        rider = User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com')
+        horse = Horse.objects.create(
+            name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo',
+            color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+        )
+        return Participant.objects.create(
+            competition=self.competition, rider=rider, horse=horse, category=self.category
+        )
+
+    def test_returns_all_sections(self):
+        self.client.force_authenticate(self.organizer)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+
+        self.assertEqual(data['sections'], [
+            'competition', 'participants', 'schedule', 'staff',
+            'categories', 'disciplines', 'criteria', 'rankings',
+        ])
+        self.assertEqual(data['competition']['name'], 'Copa Bundle')
+        self.assertEqual(data['competition']['categories'], [self.category.pk])
+        self.assertEqual(len(data['participants']), 3)
+        self.assertEqual(data['schedule'][0]['category_name'], 'Juvenil')
+        self.assertEqual(len(data['staff']), 1)
+        self.assertEqual([c['code'] for c in data['categories']], ['JUV'])
+        self.assertEqual([d['code'] for d in data['disciplines']], ['JUMP'])
+        self.assertEqual([c['code'] for c in data['criteria']], ['TEC'])
+        self.assertEqual(len(data['rankings']), 2)
+
+    def test_anonymous_user_gets_public_sections_only(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+
+        # Sin sesión no se entregan el personal (emails, notas) ni el horario
+        self.assertEqual(data['sections'], [
+            'competition', 'participants', 'categories', 'disciplines', 'criteria', 'rankings',
+        ])
+        self.assertNotIn('staff', data)
+        self.assertNotIn('schedule', data)
+        # y solo se ven las clasificaciones publicadas
+        self.assertEqual([r['id'] for r in data['rankings']], [str(self.published.pk)])
+
+        for sections in ['staff', 'participants,schedule']:
+            response = self.client.get(self.url, {'sections': sections})
+            self.assertEqual(response.status_code, 403)
+
+        # Un jinete autenticado ve el horario pero no el personal
+        rider = User.objects.get(username='rider0')
+        self.client.force_authenticate(rider)
+        data = json.loads(self.client.get(self.url).content)
+        self.assertIn('schedule', data)
+        self.assertNotIn('staff', data)
+        self.assertEqual(self.client.get(self.url, {'sections': 'staff'}).status_code, 403)
+
+    def test_staff_of_other_competitions_is_hidden(self):
+        other_organizer = User.objects.create(username='organizer2', email='organizer2@test.com', role='organizer')
+        other_judge = User.objects.create(username='judge2', email='judge2@test.com', role='judge')
+        assigned_judge = User.objects.get(username='judge1')
+
+        for user in (other_organizer, other_judge):
+            self.client.force_authenticate(user)
+            data = json.loads(self.client.get(self.url).content)
+            self.assertNotIn('staff', data)
+            self.assertEqual(self.client.get(self.url, {'sections': 'staff'}).status_code, 403)
+
+        # El juez asignado sí lee el personal de su competencia
+        self.client.force_authenticate(assigned_judge)
+        response = self.client.get(self.url, {'sections': 'staff'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['staff']), 1)
+
+    def test_sections_can_be_selected(self):
+        self.client.force_authenticate(self.organizer)
+        response = self.client.get(self.url, {'sections': 'staff,participants'})
+        data = json.loads(response.content)
+        self.assertEqual(data['sections'], ['participants', 'staff'])
+        self.assertNotIn('competition', data)
+
+        response = self.client.get(self.url, {'sections': 'participants,invoices'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_data(self):
+        for table in reference_cache.TABLES.values():
+            table.all()
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        for index in range(3, 13):
+            self._participant(index)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(json.loads(response.content)['participants']), 13)
+        self.assertEqual(len(large), len(small))
+
+    def test_etag_and_gzip(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data['participants']), 3)
+
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Un cambio en los datos cambia el ETag
+        self._participant(99)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,164 @@
+"""
+Tests para la detección de conflictos de programación (pistas, jueces y jinetes)
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .conflicts import Interval, IntervalTree, audit_competition, sweep_overlaps
+from .models import (
+    Category, Competition, CompetitionSchedule, CompetitionStaff, Horse,
+    Participant, StartListEntry, Venue
+)
+
+User = get_user_model()
+
+
+class IntervalIndexTest(SimpleTestCase):
+    """El árbol y el barrido devuelven lo mismo que la comparación por pares"""
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.intervals = []
+        for i in range(300):
+            start = rng.randint(0, 1000)
+            self.intervals.append(Interval(start, start + rng.randint(1, 40), 'pista', i))
+
+    def test_tree_query_matches_brute_force(self):
+        tree = IntervalTree(self.intervals)
+        for start, end in [(0, 10), (500, 520), (990, 1100), (250, 251)]:
+            expected = {i.item for i in self.intervals if i.start < end and i.end > start}
+            self.assertEqual({i.item for i in tree.overlapping(start, end)}, expected)
+
+    def test_sweep_matches_brute_force(self):
+        expected = {
+            frozenset((a.item, b.item))
+            for index, a in enumerate(self.intervals) for b in self.intervals[index + 1:]
+            if a.start < b.end and b.start < a.end
+        }
+        found = {frozenset((a.item, b.item)) for a, b in sweep_overlaps(self.intervals)}
+        self.assertEqual(found, expected)
+
+
+class ScheduleConflictTest(APITestCase):
+    """Tests para la validación incremental y la auditoría por competencia"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        self.judge = User.objects.create_user(
+            username='judge1', email='judge1@test.com', password='testpass123', role='judge'
+        )
+        self.venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.start = timezone.now() + timedelta(days=10)
+        self.competition = self._competition('Copa Test', self.venue)
+        self.client.force_authenticate(self.organizer)
+
+    def _competition(self, name, venue):
+        return Competition.objects.create(
+            name=name, organizer=self.organizer, venue=venue,
+            start_date=self.start, end_date=self.start + timedelta(days=2),
+            registration_start=timezone.now(), registration_end=self.start - timedelta(days=1),
+            competition_type='national'
+        )
+
+    def _event_data(self, title, hours_from_start, location='Pista 1'):
+        start_time = self.start + timedelta(hours=hours_from_start)
+        return {
+            'competition': self.competition.id, 'title': title, 'schedule_type': 'category_start',
+            'start_time': start_time.isoformat(), 'end_time': (start_time + timedelta(hours=2)).isoformat(),
+            'location': location,
+        }
+
+    def test_overlapping_event_in_same_arena_is_rejected(self):
+        url = '/api/competitions/schedule/'
+        self.assertEqual(self.client.post(url, self._event_data('Juvenil', 1)).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, self._event_data('Senior', 2, location='pista 1'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['conflicts'][0]['type'], 'arena')
+
+        other_arena = self.client.post(url, self._event_data('Senior', 2, location='Pista 2'))
+        self.assertEqual(other_arena.status_code, status.HTTP_201_CREATED)
+
+        forced = self.client.post(f'{url}?force=true', self._event_data('Amateur', 2))
+        self.assertEqual(forced.status_code, status.HTTP_201_CREATED)
+
+    def test_judge_in_simultaneous_competition_elsewhere_is_rejected(self):
+        other_venue = Venue.objects.create(
+            name='Hípico Sur', address='Calle 2', city='Tarija', state_province='Tarija', country='Bolivia'
+        )
+        other = self._competition('Copa Sur', other_venue)
+        CompetitionStaff.objects.create(competition=other, staff_member=self.judge, role='judge')
+
+        response = self.client.post('/api/competitions/staff/', {
+            'competition': self.competition.id, 'staff_member': self.judge.id, 'role': 'judge'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['conflicts'][0]['type'], 'judge')
+
+    def test_judge_in_simultaneous_competition_at_same_venue_is_rejected(self):
+        # Dos competencias a la vez en la misma sede: el juez no puede estar en dos pistas
+        other = self._competition('Copa Noche', self.venue)
+        CompetitionStaff.objects.create(competition=other, staff_member=self.judge, role='judge')
+
+        response = self.client.post('/api/competitions/staff/', {
+            'competition': self.competition.id, 'staff_member': self.judge.id, 'role': 'judge'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['conflicts'][0]['type'], 'judge')
+
+        CompetitionStaff.objects.create(competition=self.competition, staff_member=self.judge, role='judge')
+        conflicts = audit_competition(self.competition)
+        self.assertEqual([conflict['type'] for conflict in conflicts], ['judge'])
+
+    def test_audit_reports_arena_judge_and_rider_overlaps(self):
+        for title in ('Juvenil', 'Senior'):
+            CompetitionSchedule.objects.create(
+                competition=self.competition, title=title, schedule_type='category_start',
+                start_time=self.start, end_time=self.start + timedelta(hours=2), location='Pista 1'
+            )
+        other_venue = Venue.objects.create(
+            name='Hípico Sur', address='Calle 2', city='Tarija', state_province='Tarija', country='Bolivia'
+        )
+        CompetitionStaff.objects.create(competition=self.competition, staff_member=self.judge, role='judge')
+        CompetitionStaff.objects.create(
+            competition=self._competition('Copa Sur', other_venue), staff_member=self.judge, role='chief_judge'
+        )
+
+        rider = User.objects.create_user(username='rider1', email='rider1@test.com', password='testpass123')
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        schedule = CompetitionSchedule.objects.create(
+            competition=self.competition, title='Clase A', schedule_type='category_start',
+            start_time=self.start, location='Pista 2'
+        )
+        for i in range(2):
+            horse = Horse.objects.create(
+                name=f'Caballo {i}', registration_number=f'REG-{i}', breed='Criollo',
+                color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+            )
+            participant = Participant.objects.create(
+                competition=self.competition, rider=rider, horse=horse, category=category
+            )
+            StartListEntry.objects.create(
+                schedule=schedule, participant=participant, draw_position=i + 1, arena=i + 1,
+                start_position=1, start_time=self.start, end_time=self.start + timedelta(minutes=2)
+            )
+
+        response = self.client.get(f'/api/competitions/competitions/{self.competition.id}/schedule_conflicts/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary'], {'arena': 1, 'judge': 1, 'rider': 1})
@@ -0,0 +1,134 @@
+"""
+Tests para los contadores desnormalizados de Competition
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Category, Competition, CompetitionStaff, Horse, Participant, Venue
+
+User = get_user_model()
+
+
+class CompetitionCountersTest(APITestCase):
+    """Tests para el mantenimiento de contadores en save()/delete()"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        self.venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.competition = self._competition('Copa Test')
+
+    def _competition(self, name):
+        now = timezone.now()
+        return Competition.objects.create(
+            name=name, organizer=self.organizer, venue=self.venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+
+    def _participant(self, index, competition=None, **kwargs):
+        rider = User.objects.create_user(
+            username=f'rider{index}', email=f'rider{index}@test.com', password='testpass123'
+        )
+        horse = Horse.objects.create(
+            name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo',
+            color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+        )
+        return Participant.objects.create(
+            competition=competition or self.competition, rider=rider,
+            horse=horse, category=self.category, **kwargs
+        )
+
+    def _counters(self, competition=None):
+        competition = competition or self.competition
+        return Competition.objects.filter(pk=competition.pk).values(*Competition.COUNTER_FIELDS).get()
+
+    def test_participant_create_update_delete(self):
+        participant = self._participant(1)
+        self._participant(2, is_confirmed=True, is_paid=True)
+        self.assertEqual(self._counters()['participants_count'], 2)
+        self.assertEqual(self._counters()['confirmed_participants_count'], 1)
+
+        participant = Participant.objects.get(pk=participant.pk)
+        participant.is_confirmed = True
+        participant.save()
+        participant.save()
+        self.assertEqual(self._counters()['confirmed_participants_count'], 2)
+
+        participant.delete()
+        counters = self._counters()
+        self.assertEqual(counters['participants_count'], 1)
+        self.assertEqual(counters['confirmed_participants_count'], 1)
+        self.assertEqual(counters['paid_participants_count'], 1)
+
+    def test_moving_participant_between_competitions(self):
+        other = self._competition('Copa Otra')
+        participant = self._participant(1, is_confirmed=True)
+
+        participant.competition = other
+        participant.save()
+
+        self.assertEqual(self._counters()['confirmed_participants_count'], 0)
+        self.assertEqual(self._counters(other)['confirmed_participants_count'], 1)
+
+    def test_staff_counters(self):
+        staff = CompetitionStaff.objects.create(
+            competition=self.competition, staff_member=self.organizer, role='judge'
+        )
+        staff.is_confirmed = True
+        staff.save()
+
+        counters = self._counters()
+        self.assertEqual(counters['staff_count'], 1)
+        self.assertEqual(counters['confirmed_staff_count'], 1)
+
+    def test_competition_save_does_not_overwrite_counters(self):
+        stale = Competition.objects.get(pk=self.competition.pk)
+        self._participant(1)
+
+        stale.name = 'Copa Renombrada'
+        stale.save()
+
+        self.assertEqual(self._counters()['participants_count'], 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        self._participant(1, is_confirmed=True)
+        Competition.objects.filter(pk=self.competition.pk).update(
+            participants_count=7, confirmed_participants_count=0
+        )
+
+        out = StringIO()
+        call_command('reconcile_competition_counters', stdout=out)
+
+        counters = self._counters()
+        self.assertEqual(counters['participants_count'], 1)
+        self.assertEqual(counters['confirmed_participants_count'], 1)
+        self.assertIn('1 corregidas', out.getvalue())
+
+    def test_list_reads_counters_without_extra_queries(self):
+        self.client.force_authenticate(self.organizer)
+        self._participant(1, is_confirmed=True)
+        url = '/api/competitions/competitions/upcoming/'
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data[0]['participant_count'], 1)
+
+        self._competition('Copa Dos')
+        self._participant(2, is_confirmed=True)
+        with self.assertNumQueries(1):
+            self.client.get(url)
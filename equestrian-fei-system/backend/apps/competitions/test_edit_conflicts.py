@@ -0,0 +1,49 @@
+"""
+Tests para las ediciones simultáneas de un registro con row_version
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from rest_framework.test import APITestCase
+
+from .models import Horse
+from .views import HorseViewSet
+
+User = get_user_model()
+
+
+class EditConflictTest(APITestCase):
+    """Un UPDATE sobre una versión que ya no existe responde 409"""
+
+    def setUp(self):
+        self.owner = User.objects.create(username='rider1', email='rider1@test.com', role='rider')
+        self.client.force_authenticate(self.owner)
+        self.horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=self.owner
+        )
+        self.url = f'/api/competitions/horses/{self.horse.pk}/'
+
+    def test_concurrent_edit_returns_409(self):
+        perform_update = HorseViewSet.perform_update
+
+        def racing_update(view, serializer):
+            # Otra petición guarda el caballo entre la lectura y la escritura
+            Horse.objects.filter(pk=self.horse.pk).update(color='Tordo', row_version=F('row_version') + 1)
+            perform_update(view, serializer)
+
+        with mock.patch.object(HorseViewSet, 'perform_update', racing_update):
+            response = self.client.patch(self.url, {'color': 'Bayo'}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['detail'].code, 'conflict')
+        self.horse.refresh_from_db()
+        self.assertEqual((self.horse.color, self.horse.row_version), ('Tordo', 2))
+
+        # Sin carrera la edición se aplica
+        response = self.client.patch(self.url, {'color': 'Bayo'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.horse.refresh_from_db()
+        self.assertEqual((self.horse.color, self.horse.row_version), ('Bayo', 3))
@@ -0,0 +1,117 @@
+"""
+Tests para el listado de competencias asignadas a un juez (my_assigned)
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Category, Competition, CompetitionStaff, Discipline, Horse, Participant, Venue
+
+User = get_user_model()
+
+
+class MyAssignedCompetitionsTest(APITestCase):
+    """Tests para CompetitionViewSet.my_assigned"""
+
+    url = '/api/competitions/competitions/my_assigned/'
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        self.judge = User.objects.create_user(
+            username='judge1', email='judge1@test.com',
+            password='testpass123', role='judge'
+        )
+        self.venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.discipline = Discipline.objects.create(
+            name='Salto', code='JUMP', discipline_type='jumping'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.client.force_authenticate(self.judge)
+
+    def _assigned_competition(self, days_ago, participants=0):
+        end_date = timezone.now() - timedelta(days=days_ago)
+        competition = Competition.objects.create(
+            name=f'Copa {days_ago}', organizer=self.organizer, venue=self.venue,
+            start_date=end_date - timedelta(days=1), end_date=end_date,
+            registration_start=end_date - timedelta(days=20),
+            registration_end=end_date - timedelta(days=2),
+            competition_type='national'
+        )
+        competition.disciplines.add(self.discipline)
+        competition.categories.add(self.category)
+        CompetitionStaff.objects.create(competition=competition, staff_member=self.judge, role='judge')
+        CompetitionStaff.objects.create(competition=competition, staff_member=self.organizer, role='organizer')
+
+        for i in range(participants):
+            rider = User.objects.create_user(
+                username=f'rider{days_ago}_{i}', email=f'rider{days_ago}_{i}@test.com',
+                password='testpass123'
+            )
+            horse = Horse.objects.create(
+                name=f'Caballo {i}', registration_number=f'REG-{days_ago}-{i}', breed='Criollo',
+                color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+            )
+            Participant.objects.create(
+                competition=competition, rider=rider, horse=horse, category=self.category
+            )
+        return competition
+
+    def test_lists_assignments_with_counts(self):
+        competition = self._assigned_competition(5, participants=2)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        item = response.data[0]
+        self.assertEqual(item['id'], competition.id)
+        self.assertEqual(item['participant_count'], 2)
+        self.assertEqual(item['staff_count'], 2)
+        self.assertEqual(item['staff_assignment']['role'], 'judge')
+        self.assertEqual(len(item['disciplines']), 1)
+
+    def test_query_count_does_not_grow_with_assignments(self):
+        self._assigned_competition(5, participants=1)
+        self.client.get(self.url)
+
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        for days_ago in (10, 20, 30):
+            self._assigned_competition(days_ago, participants=2)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 4)
+
+    def test_since_filter(self):
+        recent = self._assigned_competition(5)
+        self._assigned_competition(60)
+
+        since = (timezone.now() - timedelta(days=30)).date().isoformat()
+        response = self.client.get(self.url, {'since': since})
+
+        self.assertEqual([item['id'] for item in response.data], [recent.id])
+
+    def test_invalid_since_returns_400(self):
+        response = self.client.get(self.url, {'since': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pagination_is_opt_in(self):
+        for days_ago in (5, 10, 15):
+            self._assigned_competition(days_ago)
+
+        response = self.client.get(self.url, {'page': 1})
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 3)
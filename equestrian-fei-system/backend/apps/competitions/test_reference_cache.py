@@ -0,0 +1,83 @@
+"""
+Tests para el cache en proceso de datos de referencia
+"""
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from apps.scoring.models import ScoringCriteria
+from . import reference_cache
+from .models import Category, Discipline
+
+
+class ReferenceCacheTest(APITestCase):
+    """Lecturas desde memoria e invalidación por versión compartida"""
+
+    def setUp(self):
+        for table in reference_cache.TABLES.values():
+            table.invalidate()
+        self.discipline = Discipline.objects.create(name='Salto', code='JUMP', discipline_type='jumping')
+        self.junior = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.senior = Category.objects.create(name='Senior', code='SEN', category_type='level', is_active=False)
+        self.criteria = ScoringCriteria.objects.create(
+            discipline=self.discipline, name='Técnica', code='TEC', criteria_type='technical'
+        )
+
+    def test_lookups_are_dictionary_reads(self):
+        reference_cache.categories.all()
+        reference_cache.scoring_criteria.all()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reference_cache.categories.get(self.junior.pk).code, 'JUV')
+            self.assertEqual(reference_cache.categories.get_by_code('SEN').pk, self.senior.pk)
+            self.assertEqual(
+                reference_cache.scoring_criteria.get_by_code((self.discipline.pk, 'TEC')).pk,
+                self.criteria.pk
+            )
+            self.assertEqual(reference_cache.scoring_criteria.get(str(self.criteria.pk)).name, 'Técnica')
+
+    def test_list_is_served_pre_serialized(self):
+        url = '/api/competitions/categories/'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([c['code'] for c in first.data['results']], ['JUV'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+            by_type = self.client.get(f'{url}by_type/')
+        self.assertEqual(response.data, first.data)
+        self.assertEqual(list(by_type.data), ['Por Edad'])
+
+        # Con filtros se consulta la base de datos
+        filtered = self.client.get(url, {'category_type': 'level'})
+        self.assertEqual(filtered.data['results'], [])
+
+    def test_save_invalidates_cached_rows(self):
+        reference_cache.categories.get(self.junior.pk)
+        self.junior.name = 'Juvenil A'
+        self.junior.save()
+
+        self.assertEqual(reference_cache.categories.get(self.junior.pk).name, 'Juvenil A')
+        response = self.client.get(f'/api/competitions/categories/{self.junior.pk}/')
+        self.assertEqual(response.data['name'], 'Juvenil A')
+
+        # El nombre de la disciplina forma parte de los criterios serializados
+        self.discipline.name = 'Salto Ecuestre'
+        self.discipline.save()
+        self.assertEqual(
+            reference_cache.scoring_criteria.serialized(self.criteria.pk)['discipline_name'], 'Salto Ecuestre'
+        )
+
+    def test_other_worker_invalidation_uses_shared_version(self):
+        table = reference_cache.categories
+        table.get(self.junior.pk)
+
+        # Cambio hecho por otro worker: la fila cambia sin pasar por este proceso
+        Category.objects.filter(pk=self.junior.pk).update(name='Renombrada')
+        table._checked_at = 0.0
+        self.assertEqual(table.get(self.junior.pk).name, 'Juvenil')
+
+        cache.incr(reference_cache._version_key('categories'))
+        self.assertEqual(table.get(self.junior.pk).name, 'Juvenil')  # dentro del intervalo de verificación
+        table._checked_at = 0.0
+        self.assertEqual(table.get(self.junior.pk).name, 'Renombrada')
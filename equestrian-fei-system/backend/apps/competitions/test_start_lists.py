@@ -0,0 +1,149 @@
+"""
+Tests para la generación de órdenes de salida (StartListGenerator)
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.scoring.models import CompetitionRanking, RankingEntry
+from .models import Category, Competition, CompetitionSchedule, Horse, Participant, StartListEntry, Venue
+from .start_lists import StartListGenerator
+
+User = get_user_model()
+
+
+class StartListGeneratorTest(APITestCase):
+    """Tests para sorteo, separación de jinetes, pistas y descansos"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.start = timezone.now() + timedelta(days=10)
+        self.competition = Competition.objects.create(
+            name='Copa Test', organizer=self.organizer, venue=venue,
+            start_date=self.start, end_date=self.start + timedelta(days=2),
+            registration_start=timezone.now(), registration_end=self.start - timedelta(days=1),
+            competition_type='national'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.schedule = CompetitionSchedule.objects.create(
+            competition=self.competition, start_time=self.start, title='Juvenil 1.10m',
+            schedule_type='category_start', category=self.category
+        )
+
+    def _participants(self, riders, horses_per_rider):
+        participants = []
+        users = User.objects.bulk_create(
+            User(username=f'rider{r}', email=f'rider{r}@test.com') for r in range(riders)
+        )
+        for r, rider in enumerate(users):
+            horses = [
+                Horse(
+                    name=f'Caballo {r}-{h}', registration_number=f'REG-{r}-{h}', breed='Criollo',
+                    color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+                )
+                for h in range(horses_per_rider)
+            ]
+            Horse.objects.bulk_create(horses)
+            participants.extend(
+                Participant(competition=self.competition, rider=rider, horse=horse, category=self.category)
+                for horse in horses
+            )
+        return Participant.objects.bulk_create(participants)
+
+    def _slots_by_rider(self, entries, arenas):
+        slots = {}
+        for entry in entries:
+            slots.setdefault(entry.participant.rider_id, []).append((entry.draw_position - 1) // arenas)
+        return slots
+
+    def test_random_draw_is_reproducible_and_respects_rider_gap(self):
+        self._participants(riders=10, horses_per_rider=3)
+
+        first = StartListGenerator(self.schedule, seed=7, rider_gap=3).generate()
+        second = StartListGenerator(self.schedule, seed=7, rider_gap=3).generate()
+
+        self.assertEqual([e.participant_id for e in first], [e.participant_id for e in second])
+        for slots in self._slots_by_rider(first, arenas=1).values():
+            gaps = [b - a for a, b in zip(slots, slots[1:])]
+            self.assertTrue(all(gap > 3 for gap in gaps), gaps)
+
+    def test_multiple_arenas_never_overlap_a_rider(self):
+        self._participants(riders=8, horses_per_rider=2)
+
+        entries = StartListGenerator(self.schedule, seed=1, arenas=4, rider_gap=1).generate()
+
+        self.assertEqual({e.arena for e in entries}, {1, 2, 3, 4})
+        for slots in self._slots_by_rider(entries, arenas=4).values():
+            self.assertGreater(slots[1] - slots[0], 1)
+
+    def test_breaks_shift_start_times(self):
+        self._participants(riders=6, horses_per_rider=1)
+
+        entries = StartListGenerator(
+            self.schedule, seed=1, interval_seconds=60, break_every=3, break_minutes=10
+        ).generate()
+
+        self.assertEqual(entries[2].start_time, self.start + timedelta(minutes=2))
+        self.assertTrue(entries[3].break_before)
+        self.assertEqual(entries[3].start_time, self.start + timedelta(minutes=13))
+
+    def test_reverse_order_of_standing(self):
+        participants = self._participants(riders=4, horses_per_rider=1)
+        ranking = CompetitionRanking.objects.create(competition=self.competition, category=self.category)
+        for position, participant in enumerate(participants, start=1):
+            RankingEntry.objects.create(
+                ranking=ranking, participant=participant, position=position,
+                total_score=Decimal('70'), final_score=Decimal('70')
+            )
+
+        entries = StartListGenerator(
+            self.schedule, method='reverse_standing', round_number=2, rider_gap=0, top=3
+        ).generate()
+
+        self.assertEqual(
+            [e.participant_id for e in entries],
+            [participants[2].pk, participants[1].pk, participants[0].pk]
+        )
+
+    def test_500_starters_on_10_arenas_generate_in_under_a_second(self):
+        self._participants(riders=250, horses_per_rider=2)
+
+        started = time.perf_counter()
+        entries = StartListGenerator(self.schedule, seed=3, arenas=10, rider_gap=2).save()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(entries), 500)
+        self.assertEqual(StartListEntry.objects.filter(schedule=self.schedule).count(), 500)
+        self.assertLess(elapsed, 1.0)
+
+    def test_generate_endpoint_replaces_previous_list(self):
+        self._participants(riders=5, horses_per_rider=2)
+        self.client.force_authenticate(self.organizer)
+        url = f'/api/competitions/schedule/{self.schedule.id}/generate_start_list/'
+
+        self.client.post(url, {'seed': 1}, format='json')
+        response = self.client.post(url, {'seed': 2, 'arenas': 2}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 10)
+        self.assertEqual(StartListEntry.objects.filter(schedule=self.schedule).count(), 10)
+        self.schedule.refresh_from_db()
+        self.assertIsNotNone(self.schedule.end_time)
+
+        listed = self.client.get(
+            f'/api/competitions/schedule/{self.schedule.id}/start_list/', {'arena': 2}
+        )
+        self.assertEqual(len(listed.data), 5)
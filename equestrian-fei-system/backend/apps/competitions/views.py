@@ -6,29 +6,59 @@ from .filters import (
     CompetitionFilterBackend, CategoryFilterBackend, VenueFilterBackend,
     HorseFilterBackend, ParticipantFilterBackend
 )
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 
 from .models import (
     Discipline, Category, Venue, Competition, 
-    CompetitionStaff, Horse, Participant, CompetitionSchedule
+    CompetitionStaff, Horse, Participant, CompetitionSchedule, StartListEntry
 )
 from .serializers import (
     DisciplineSerializer, CategorySerializer, VenueSerializer,
     CompetitionListSerializer, CompetitionDetailSerializer, CompetitionCreateSerializer,
     CompetitionStaffSerializer, HorseSerializer, ParticipantSerializer,
-    CompetitionScheduleSerializer, SimpleCompetitionSerializer
+    CompetitionScheduleSerializer, SimpleCompetitionSerializer,
+    StartListEntrySerializer, StartListGenerateSerializer
 )
 from .permissions import (
     IsOrganizerOrReadOnly, CanManageCompetitionStaff, CanRegisterParticipant,
     CanManageHorses, CanManageVenues, CanManageCompetitionSchedule,
     CanViewCompetitionDetails, CompetitionPermissionChecker, IsOrganizerOrAdmin
 )
+from .start_lists import StartListError, StartListGenerator
+from .bulk_registration import BulkRegistrationError, BulkRegistrationService, parse_csv
+from .bundle import BundleError, CompetitionBundle, bundle_response, denied_sections, parse_sections
+from .conflicts import audit_competition, check_schedule_event, check_staff_assignment
+from .reference_cache import ReferenceListMixin
 from apps.users.middleware import create_audit_log
 
 
-class DisciplineViewSet(viewsets.ModelViewSet):
+def reject_conflicts(request, conflicts):
+    """Rechazar la operación si hay conflictos, salvo que se envíe ?force=true"""
+    from rest_framework import serializers as drf_serializers
+
+    if conflicts and request.query_params.get('force') != 'true':
+        raise drf_serializers.ValidationError({
+            'error': 'La operación genera conflictos de programación',
+            'conflicts': conflicts,
+        })
+
+
+def pending_instance(serializer):
+    """Instancia con los datos validados aplicados, sin guardar"""
+    import copy
+
+    model = serializer.Meta.model
+    instance = copy.copy(serializer.instance) if serializer.instance else model()
+    for field, value in serializer.validated_data.items():
+        setattr(instance, field, value)
+    return instance
+
+
+class DisciplineViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar disciplinas"""
+    reference_table = 'disciplines'
     queryset = Discipline.objects.filter(is_active=True)
     serializer_class = DisciplineSerializer
     filter_backends = [SearchFilter, OrderingFilter]
@@ -50,13 +80,12 @@ class DisciplineViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Obtener solo disciplinas activas"""
-        disciplines = self.queryset.filter(is_active=True)
-        serializer = self.get_serializer(disciplines, many=True)
-        return Response(serializer.data)
+        return Response(self.get_reference_table().serialized_list(active_only=True))
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar categorías"""
+    reference_table = 'categories'
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     filter_backends = [CategoryFilterBackend, SearchFilter, OrderingFilter]
@@ -78,19 +107,21 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_type(self, request):
         """Obtener categorías agrupadas por tipo"""
-        categories = self.queryset.all()
-        grouped = {}
-        for category in categories:
-            category_type = category.get_category_type_display()
-            if category_type not in grouped:
-                grouped[category_type] = []
-            grouped[category_type].append(CategorySerializer(category).data)
-        
-        return Response(grouped)
+        def group(table):
+            grouped = {}
+            for category in table.all(active_only=True):
+                category_type = category.get_category_type_display()
+                if category_type not in grouped:
+                    grouped[category_type] = []
+                grouped[category_type].append(table.serialized(category.pk))
+            return grouped
+
+        return Response(self.get_reference_table().memoize('by_type', group))
 
 
-class VenueViewSet(viewsets.ModelViewSet):
+class VenueViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar sedes"""
+    reference_table = 'venues'
     queryset = Venue.objects.filter(is_active=True)
     serializer_class = VenueSerializer
     filter_backends = [VenueFilterBackend, SearchFilter, OrderingFilter]
@@ -112,15 +143,16 @@ class VenueViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_country(self, request):
         """Obtener sedes agrupadas por país"""
-        venues = self.queryset.all()
-        grouped = {}
-        for venue in venues:
-            country = venue.country
-            if country not in grouped:
-                grouped[country] = []
-            grouped[country].append(VenueSerializer(venue).data)
-        
-        return Response(grouped)
+        def group(table):
+            grouped = {}
+            for venue in table.all(active_only=True):
+                country = venue.country
+                if country not in grouped:
+                    grouped[country] = []
+                grouped[country].append(table.serialized(venue.pk))
+            return grouped
+
+        return Response(self.get_reference_table().memoize('by_country', group))
 
 
 class CompetitionViewSet(viewsets.ModelViewSet):
@@ -132,8 +164,10 @@ class CompetitionViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         """Permisos dinámicos: lectura pública, escritura solo para organizadores/admin"""
-        if self.action in ['list', 'retrieve', 'participants', 'my_assigned']:
+        if self.action in ['list', 'retrieve', 'participants', 'my_assigned', 'bundle']:
             permission_classes = [permissions.AllowAny]
+        elif self.action == 'offline_pack':
+            permission_classes = [permissions.IsAuthenticated]
         else:
             permission_classes = [permissions.IsAuthenticated, IsOrganizerOrAdmin]
         return [permission() for permission in permission_classes]
@@ -141,35 +175,29 @@ class CompetitionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filtrar competencias según permisos del usuario"""
         user = self.request.user
+        public_statuses = ['published', 'open_registration', 'registration_closed', 'in_progress', 'completed']
+
+        # Los listados leen los contadores desnormalizados: sin prefetch
+        queryset = Competition.objects.select_related('organizer', 'venue')
+        if self.action in ['statistics', 'bundle', 'offline_pack']:
+            queryset = queryset.prefetch_related('disciplines', 'categories')
+        elif self.action not in ['list', 'upcoming', 'current']:
+            queryset = queryset.prefetch_related('disciplines', 'categories', 'participants', 'staff')
 
         # Usuarios no autenticados solo ven competencias públicas completadas
         if not user.is_authenticated:
-            return Competition.objects.filter(
-                status__in=['published', 'open_registration', 'registration_closed', 'in_progress', 'completed']
-            ).select_related('organizer', 'venue').prefetch_related(
-                'disciplines', 'categories', 'participants', 'staff'
-            )
+            return queryset.filter(status__in=public_statuses)
 
         # Admin ve todas
         if user.role == 'admin':
-            return Competition.objects.select_related('organizer', 'venue').prefetch_related(
-                'disciplines', 'categories', 'participants', 'staff'
-            )
+            return queryset
 
         # Organizadores ven las suyas + las públicas
         if user.role == 'organizer':
-            return Competition.objects.filter(
-                Q(organizer=user) | Q(status__in=['published', 'open_registration', 'registration_closed', 'in_progress', 'completed'])
-            ).select_related('organizer', 'venue').prefetch_related(
-                'disciplines', 'categories', 'participants', 'staff'
-            )
+            return queryset.filter(Q(organizer=user) | Q(status__in=public_statuses))
 
         # Otros usuarios solo ven las públicas
-        return Competition.objects.filter(
-            status__in=['published', 'open_registration', 'registration_closed', 'in_progress', 'completed']
-        ).select_related('organizer', 'venue').prefetch_related(
-            'disciplines', 'categories', 'participants', 'staff'
-        )
+        return queryset.filter(status__in=public_statuses)
 
     def get_serializer_class(self):
         """Usar diferentes serializers según la acción"""
@@ -301,9 +329,15 @@ class CompetitionViewSet(viewsets.ModelViewSet):
     def my_assigned(self, request):
         """
         Obtener competencias donde el usuario está asignado como juez/chief_judge
-        con datos COMPLETOS incluyendo staff_assignment
+        con datos COMPLETOS incluyendo staff_assignment.
+
+        Número fijo de consultas: asignaciones (con los contadores
+        desnormalizados de la competencia), disciplinas y categorías. Acepta ?since=<fecha> (competencias que
+        terminan desde esa fecha) y paginación opcional con ?page=.
         """
-        from django.db.models import Count
+        from datetime import datetime, time
+        from django.db.models import Prefetch
+        from django.utils.dateparse import parse_date, parse_datetime
         from .serializers import JudgeAssignedCompetitionSerializer
 
         user = request.user
@@ -320,38 +354,54 @@ class CompetitionViewSet(viewsets.ModelViewSet):
             'competition__venue',
             'competition__organizer'
         ).prefetch_related(
-            'competition__disciplines',
-            'competition__categories'
-        ).order_by('-competition__start_date')
+            Prefetch('competition__disciplines', queryset=Discipline.objects.order_by('name')),
+            Prefetch('competition__categories', queryset=Category.objects.all())
+        ).order_by('-competition__start_date', 'id')
 
-        # Construir respuesta con datos completos
-        result = []
-        for assignment in staff_assignments:
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since_value = parse_datetime(since)
+                if since_value is None:
+                    since_date = parse_date(since)
+                    since_value = datetime.combine(since_date, time.min) if since_date else None
+            except ValueError:
+                since_value = None
+
+            if since_value is None:
+                return Response(
+                    {'error': 'Formato de fecha inválido para since (use YYYY-MM-DD o ISO 8601)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since_value):
+                since_value = timezone.make_aware(since_value)
+            staff_assignments = staff_assignments.filter(competition__end_date__gte=since_value)
+
+        # Paginación opcional: sin ?page= se mantiene la respuesta como lista
+        page = None
+        if 'page' in request.query_params:
+            page = self.paginate_queryset(staff_assignments)
+        assignments = page if page is not None else staff_assignments
+
+        competitions = []
+        for assignment in assignments:
             competition = assignment.competition
-
-            # Anotar counts dinámicamente
-            competition_with_counts = Competition.objects.filter(id=competition.id).annotate(
-                participant_count=Count('participants', distinct=True),
-                staff_count=Count('staff', distinct=True)
-            ).first()
-
-            # Serializar competencia con contexto de staff_assignment
-            staff_assignment_data = {
+            competition.staff_assignment = {
                 'id': assignment.id,
                 'role': assignment.role,
                 'is_confirmed': assignment.is_confirmed,
                 'assigned_date': assignment.assigned_date.isoformat() if assignment.assigned_date else None,
                 'notes': assignment.notes or '',
             }
+            competitions.append(competition)
 
-            serializer = JudgeAssignedCompetitionSerializer(
-                competition_with_counts,
-                context={'request': request, 'staff_assignment': staff_assignment_data}
-            )
-
-            result.append(serializer.data)
+        serializer = JudgeAssignedCompetitionSerializer(
+            competitions, many=True, context={'request': request}
+        )
 
-        return Response(result)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def participants(self, request, pk=None):
@@ -361,23 +411,101 @@ class CompetitionViewSet(viewsets.ModelViewSet):
         serializer = ParticipantSerializer(participants, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """
+        Paquete con los datos de trabajo de una competencia en una sola respuesta.
+
+        ?sections=participants,schedule limita las secciones (por defecto todas
+        las que el usuario puede leer: staff y schedule siguen los permisos de
+        sus endpoints). Pedir una sección sin permiso responde 403.
+        Responde 304 si el ETag coincide y comprime con brotli o gzip.
+        """
+        competition = self.get_object()
+        requested = request.query_params.get('sections')
+        try:
+            sections = parse_sections(requested)
+        except BundleError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        denied = denied_sections(request, self, sections, competition)
+        if denied and requested:
+            return Response(
+                {'error': f"Sin permiso para las secciones: {', '.join(denied)}"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        sections = [section for section in sections if section not in denied]
+
+        data = CompetitionBundle(competition, sections, request.user).build()
+        return bundle_response(request, data)
+
+    @action(detail=True, methods=['get'])
+    def offline_pack(self, request, pk=None):
+        """
+        Paquete offline de la competencia para el dispositivo de un juez.
+
+        El juez descarga el suyo; quien gestiona la competencia puede pedir el
+        de cualquier juez asignado con ?judge=<id>. Con If-None-Match (o
+        ?since=<versión>) responde 304 o solo los cambios desde esa versión.
+        """
+        from apps.sync.offline_pack import assigned_judge_ids, current_pack, pack_response
+
+        competition = self.get_object()
+        try:
+            judge_id = int(request.query_params.get('judge') or request.user.pk)
+            since = request.query_params.get('since')
+            since = int(since) if since else None
+        except ValueError:
+            return Response({'error': 'judge y since deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if judge_id != request.user.pk and not CompetitionPermissionChecker.can_manage_competition(request.user, competition):
+            return Response(
+                {'error': 'Solo puede descargar su propio paquete offline'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if judge_id not in assigned_judge_ids(competition):
+            return Response(
+                {'error': 'El usuario no es juez de esta competencia'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return pack_response(request, current_pack(competition, judge_id), since)
+
     @action(detail=True, methods=['get'])
     def statistics(self, request, pk=None):
         """Obtener estadísticas de una competencia"""
         competition = self.get_object()
         
+        # Contadores desnormalizados; disciplinas y categorías vienen prefetched
         stats = {
-            'total_participants': competition.participants.count(),
-            'confirmed_participants': competition.participants.filter(is_confirmed=True).count(),
-            'paid_participants': competition.participants.filter(is_paid=True).count(),
-            'staff_assigned': competition.staff.count(),
-            'staff_confirmed': competition.staff.filter(is_confirmed=True).count(),
-            'disciplines_count': competition.disciplines.count(),
-            'categories_count': competition.categories.count(),
+            'total_participants': competition.participants_count,
+            'confirmed_participants': competition.confirmed_participants_count,
+            'paid_participants': competition.paid_participants_count,
+            'staff_assigned': competition.staff_count,
+            'staff_confirmed': competition.confirmed_staff_count,
+            'disciplines_count': len(competition.disciplines.all()),
+            'categories_count': len(competition.categories.all()),
         }
         
         return Response(stats)
 
+    @action(detail=True, methods=['get'])
+    def schedule_conflicts(self, request, pk=None):
+        """Auditoría de conflictos de pista, jueces y jinetes de la competencia"""
+        competition = self.get_object()
+        conflicts = audit_competition(competition)
+
+        summary = {}
+        for conflict in conflicts:
+            summary[conflict['type']] = summary.get(conflict['type'], 0) + 1
+
+        return Response({
+            'competition': competition.id,
+            'count': len(conflicts),
+            'summary': summary,
+            'conflicts': conflicts,
+        })
+
     @action(detail=False, methods=['get'])
     def my_competitions(self, request):
         """Obtener competencias del usuario actual (organizador)"""
@@ -387,7 +515,7 @@ class CompetitionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        competitions = Competition.objects.filter(organizer=request.user)
+        competitions = Competition.objects.filter(organizer=request.user).select_related('organizer', 'venue')
         serializer = CompetitionListSerializer(competitions, many=True)
         return Response(serializer.data)
 
@@ -510,6 +638,7 @@ class CompetitionStaffViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Crear asignación de personal con auditoría"""
+        reject_conflicts(self.request, check_staff_assignment(pending_instance(serializer)))
         staff = serializer.save()
 
         # Auditar la creación
@@ -522,6 +651,11 @@ class CompetitionStaffViewSet(viewsets.ModelViewSet):
             request=self.request
         )
 
+    def perform_update(self, serializer):
+        """Actualizar asignación validando conflictos del juez"""
+        reject_conflicts(self.request, check_staff_assignment(pending_instance(serializer)))
+        serializer.save()
+
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
         """Confirmar asignación de personal"""
@@ -585,17 +719,80 @@ class ParticipantViewSet(viewsets.ModelViewSet):
         if not competition.is_registration_open:
             raise drf_serializers.ValidationError("La inscripción no está abierta para esta competencia")
         
-        # Verificar límite de participantes
-        if competition.max_participants:
-            current_participants = competition.participants.filter(is_confirmed=True).count()
-            if current_participants >= competition.max_participants:
-                raise drf_serializers.ValidationError("La competencia ha alcanzado el límite de participantes")
-        
-        # Crear participación con el usuario actual como jinete por defecto
-        if not serializer.validated_data.get('rider'):
-            serializer.save(rider=self.request.user)
-        else:
-            serializer.save()
+        with transaction.atomic():
+            # El cupo se cuenta con la competencia bloqueada, igual que en la
+            # inscripción masiva
+            list(Competition.objects.select_for_update().filter(pk=competition.pk).values_list('pk'))
+
+            # Verificar límite de participantes
+            if competition.max_participants:
+                current_participants = competition.participants.filter(is_confirmed=True).count()
+                if current_participants >= competition.max_participants:
+                    raise drf_serializers.ValidationError("La competencia ha alcanzado el límite de participantes")
+
+            # Crear participación con el usuario actual como jinete por defecto
+            if not serializer.validated_data.get('rider'):
+                serializer.save(rider=self.request.user)
+            else:
+                serializer.save()
+
+    @action(detail=False, methods=['post'])
+    def bulk_register(self, request):
+        """
+        Inscripción masiva desde CSV (campo file o cuerpo text/csv) o JSON (rows).
+        Parámetros: competition, dry_run, all_or_nothing. Devuelve un reporte por fila.
+        """
+        # Un cuerpo text/csv no pasa por los parsers de DRF: los parámetros van en la URL
+        csv_body = request.content_type.startswith('text/csv')
+        data = {} if csv_body else request.data
+
+        competition_id = data.get('competition') or request.query_params.get('competition')
+        try:
+            competition = Competition.objects.get(pk=competition_id)
+        except (Competition.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Competencia no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+        if not (competition.organizer == request.user or request.user.role == 'admin'):
+            return Response(
+                {'error': 'Solo el organizador puede inscribir participantes en bloque'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not competition.is_registration_open:
+            return Response(
+                {'error': 'La inscripción no está abierta para esta competencia'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            if csv_body:
+                rows = parse_csv(request.body)
+            elif 'file' in request.FILES:
+                rows = parse_csv(request.FILES['file'].read())
+            else:
+                rows = data.get('rows')
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    raise BulkRegistrationError('Se requiere un archivo CSV o una lista "rows"')
+            service = BulkRegistrationService(competition, rows)
+        except (BulkRegistrationError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def flag(name):
+            value = data.get(name, request.query_params.get(name))
+            return str(value).lower() in ('1', 'true')
+
+        report = service.run(dry_run=flag('dry_run'), all_or_nothing=flag('all_or_nothing'))
+
+        if report['created']:
+            create_audit_log(
+                user=request.user,
+                action='create',
+                model_name='Participant',
+                object_id=str(competition.id),
+                changes={'message': f"Inscripción masiva: {report['created']} participantes en '{competition.name}'"},
+                request=request
+            )
+
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -662,7 +859,9 @@ class CompetitionScheduleViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """
         Registra la creación de un evento en el log de auditoría.
+        Rechaza eventos que se superponen con otro en la misma pista.
         """
+        reject_conflicts(self.request, check_schedule_event(pending_instance(serializer)))
         schedule_event = serializer.save()
         create_audit_log(
             user=self.request.user,
@@ -676,7 +875,9 @@ class CompetitionScheduleViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """
         Registra la actualización de un evento en el log de auditoría.
+        Rechaza cambios que superponen el evento con otro en la misma pista.
         """
+        reject_conflicts(self.request, check_schedule_event(pending_instance(serializer)))
         schedule_event = serializer.save()
         create_audit_log(
             user=self.request.user,
@@ -724,3 +925,56 @@ class CompetitionScheduleViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def generate_start_list(self, request, pk=None):
+        """
+        Genera y guarda el orden de salida de la clase (sorteo, separación de
+        jinetes, pistas y descansos). Reemplaza el orden previo de la ronda.
+        """
+        schedule_event = self.get_object()
+        params = StartListGenerateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        try:
+            generator = StartListGenerator(schedule_event, **params.validated_data)
+            entries = generator.save()
+        except StartListError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        create_audit_log(
+            user=request.user,
+            action='update',
+            model_name='CompetitionSchedule',
+            object_id=str(schedule_event.id),
+            changes={'message': f'Orden de salida generado ({len(entries)} participantes, ronda {generator.round_number})'},
+            request=request
+        )
+
+        queryset = StartListEntry.objects.filter(
+            schedule=schedule_event, round_number=generator.round_number
+        ).select_related('participant__rider', 'participant__horse')
+        return Response({
+            'round_number': generator.round_number,
+            'count': len(entries),
+            'end_time': schedule_event.end_time,
+            'warnings': generator.warnings,
+            'entries': StartListEntrySerializer(queryset, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def start_list(self, request, pk=None):
+        """Orden de salida guardado. Parámetros: round, arena"""
+        schedule_event = self.get_object()
+        queryset = schedule_event.start_list.select_related('participant__rider', 'participant__horse')
+
+        round_number = request.query_params.get('round', '1')
+        arena = request.query_params.get('arena')
+        try:
+            queryset = queryset.filter(round_number=int(round_number))
+            if arena:
+                queryset = queryset.filter(arena=int(arena))
+        except ValueError:
+            return Response({'error': 'round y arena deben ser números'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(StartListEntrySerializer(queryset, many=True).data)
@@ -6,9 +6,11 @@ from django.utils import timezone
 from .models import (
     LiveRanking,
     LiveRankingEntry,
+    LiveRankingRoundResult,
     RankingSnapshot,
     RankingRule,
-    TeamRanking
+    TeamRanking,
+    ParticipantResultHistory
 )
 
 
@@ -61,11 +63,15 @@ class LiveRankingAdmin(admin.ModelAdmin):
 
     def activate_rankings(self, request, queryset):
         count = queryset.update(status='active', is_live=True)
+        for ranking in queryset:
+            ranking.invalidate_revision()
         self.message_user(request, f'{count} rankings activados.')
     activate_rankings.short_description = 'Activar rankings'
 
     def deactivate_rankings(self, request, queryset):
         count = queryset.update(status='paused', is_live=False)
+        for ranking in queryset:
+            ranking.invalidate_revision()
         self.message_user(request, f'{count} rankings desactivados.')
     deactivate_rankings.short_description = 'Desactivar rankings'
 
@@ -134,6 +140,18 @@ class LiveRankingEntryAdmin(admin.ModelAdmin):
     position_change_indicator.short_description = 'Cambio'
 
 
+@admin.register(LiveRankingRoundResult)
+class LiveRankingRoundResultAdmin(admin.ModelAdmin):
+    list_display = [
+        'ranking', 'round_number', 'cumulative_position', 'participant',
+        'round_score', 'round_position', 'cumulative_score', 'position_change'
+    ]
+    list_filter = ['round_number', 'ranking__competition']
+    search_fields = ['ranking__name', 'ranking__competition__name']
+    raw_id_fields = ['ranking', 'participant']
+    readonly_fields = ['created_at']
+
+
 @admin.register(RankingSnapshot)
 class RankingSnapshotAdmin(admin.ModelAdmin):
     list_display = [
@@ -244,4 +262,20 @@ class TeamRankingAdmin(admin.ModelAdmin):
     def disqualify_teams(self, request, queryset):
         count = queryset.update(is_qualified=False)
         self.message_user(request, f'{count} equipos descalificados.')
-    disqualify_teams.short_description = 'Descalificar equipos'
\ No newline at end of file
+    disqualify_teams.short_description = 'Descalificar equipos'
+
+
+@admin.register(ParticipantResultHistory)
+class ParticipantResultHistoryAdmin(admin.ModelAdmin):
+    list_display = [
+        'rider_name', 'horse_name', 'competition', 'position',
+        'score', 'is_final', 'wins', 'competitions_count', 'recorded_at'
+    ]
+    list_filter = ['is_final', 'recorded_at']
+    search_fields = ['rider_name', 'horse_name', 'competition__name']
+    raw_id_fields = ['rider', 'horse', 'participant', 'competition', 'ranking', 'snapshot']
+    readonly_fields = ['recorded_at']
+
+    def has_add_permission(self, request):
+        # El historial se genera desde los rankings, no manualmente
+        return False
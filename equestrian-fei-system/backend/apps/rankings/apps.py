@@ -5,3 +5,6 @@ class RankingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.rankings'
     verbose_name = 'Rankings'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -5,7 +5,13 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import F, Sum, Avg, Count, Q
+from django.db.models import F, Func, OuterRef, Subquery, Sum, Avg, Count, Q
+
+
+class WindowSum(Func):
+    """SUM() aplicable sobre un agregado dentro de una ventana: SUM(SUM(x)) OVER (...)"""
+    function = 'SUM'
+    window_compatible = True
 
 
 class LiveRanking(models.Model):
@@ -63,6 +69,41 @@ class LiveRanking(models.Model):
     def __str__(self):
         return f"{self.competition.name} - {self.name}"
 
+    FINAL_STATUSES = ['completed', 'archived']
+    MULTI_ROUND = 'multi_round'
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_revision()
+
+        # Al volverse definitivo, consolidar los resultados en el historial
+        if self.status in self.FINAL_STATUSES:
+            ParticipantResultHistory.record_ranking(self, is_final=True)
+
+    def invalidate_revision(self):
+        """Invalidar los ETags cacheados de este ranking y de su competencia"""
+        from apps.sync.services.cache_service import invalidate_revision
+        invalidate_revision(
+            f'live_ranking:{self.pk}',
+            f'competition_rankings:{self.competition_id}'
+        )
+
+    @classmethod
+    def invalidate_competition_revisions(cls, competition_id):
+        """Invalidar los ETags de todos los rankings de una competencia (cambió un participante)"""
+        from apps.sync.services.cache_service import invalidate_revision
+        ranking_ids = cls.objects.filter(competition_id=competition_id).values_list('pk', flat=True)
+        invalidate_revision(
+            f'competition_rankings:{competition_id}',
+            *[f'live_ranking:{pk}' for pk in ranking_ids]
+        )
+
+    def higher_score_wins(self):
+        """Indica si gana la mayor puntuación (en eventing/cross gana la menor)"""
+        discipline = self.competition.disciplines.first()
+        discipline_name = discipline.name.lower() if discipline else ''
+        return 'eventing' not in discipline_name and 'cross' not in discipline_name
+
     def update_rankings(self):
         """Actualizar todas las posiciones del ranking"""
         from django.db import transaction
@@ -90,9 +131,102 @@ class LiveRanking(models.Model):
                     time_score=participant_data.get('time_score', 0),
                 )
 
+            if self.calculation_method == self.MULTI_ROUND:
+                self.update_round_results()
+
             self.last_updated = timezone.now()
             self.save()
 
+    def update_round_results(self):
+        """
+        Recalcular las posiciones por ronda y acumuladas de todas las rondas.
+
+        Una sola consulta agrega las tarjetas por participante y ronda, y con
+        funciones de ventana obtiene el acumulado (SUM OVER participante) y la
+        posición de cada ronda (RANK OVER ronda). Los resultados se guardan
+        por ronda para consultar la clasificación tras cualquier ronda.
+        """
+        from django.db import transaction
+        from django.db.models import Window
+        from django.db.models.functions import Rank
+        from apps.scoring.models import ScoreCard
+
+        higher_is_better = self.higher_score_wins()
+        round_total = Sum('final_score')
+        round_order = F('round_score').desc() if higher_is_better else F('round_score').asc()
+
+        score_cards = ScoreCard.objects.filter(
+            participant__competition=self.competition,
+            status__in=['completed', 'validated', 'published'],
+            round_number__lte=self.round_number
+        )
+        if self.category:
+            score_cards = score_cards.filter(participant__category=self.category)
+
+        rows = score_cards.values('participant_id', 'round_number').annotate(
+            round_score=round_total
+        ).annotate(
+            cumulative_score=Window(
+                WindowSum(F('round_score')),
+                partition_by=[F('participant_id')],
+                order_by=F('round_number').asc()
+            ),
+            round_position=Window(
+                Rank(),
+                partition_by=[F('round_number')],
+                order_by=round_order
+            )
+        ).order_by('round_number')
+
+        by_round = {}
+        for row in rows:
+            by_round.setdefault(row['round_number'], []).append(row)
+
+        # La clasificación acumulada incluye a quien no compitió en la ronda
+        # con su último acumulado conocido
+        cumulative = {}
+        previous_positions = {}
+        results = []
+        for round_number in sorted(by_round):
+            round_rows = {row['participant_id']: row for row in by_round[round_number]}
+            for participant_id, row in round_rows.items():
+                cumulative[participant_id] = row['cumulative_score']
+
+            standings = sorted(
+                cumulative.items(),
+                key=lambda item: -item[1] if higher_is_better else item[1]
+            )
+            positions = {}
+            last_score = None
+            for index, (participant_id, score) in enumerate(standings, 1):
+                # Mismo criterio que RANK(): empates comparten posición
+                if score != last_score:
+                    position = index
+                    last_score = score
+                positions[participant_id] = position
+
+                row = round_rows.get(participant_id)
+                previous_position = previous_positions.get(participant_id)
+                results.append(LiveRankingRoundResult(
+                    ranking=self,
+                    participant_id=participant_id,
+                    round_number=round_number,
+                    round_score=row['round_score'] if row else None,
+                    round_position=row['round_position'] if row else None,
+                    cumulative_score=score,
+                    cumulative_position=position,
+                    previous_position=previous_position,
+                    position_change=(previous_position - position) if previous_position else 0
+                ))
+
+            previous_positions = positions
+
+        with transaction.atomic():
+            self.round_results.all().delete()
+            LiveRankingRoundResult.objects.bulk_create(results)
+
+        return len(results)
+
     def _get_ranked_participants(self):
         """Obtener participantes ordenados por puntuación"""
         from apps.competitions.models import Participant
@@ -122,7 +256,7 @@ class LiveRanking(models.Model):
                     total_score=Sum('final_score'),
                     best_score=models.Max('final_score'),
                     average_score=Avg('final_score'),
-                    rounds_completed=Count('id'),
+                    rounds_completed=Count('round_number', distinct=True),
                     total_penalties=Sum('penalty_score'),
                     technical_total=Sum('technical_score'),
                     artistic_total=Sum('artistic_score'),
@@ -145,9 +279,7 @@ class LiveRanking(models.Model):
 
         # Ordenar por puntuación (descendente para la mayoría de disciplinas)
         # Para disciplinas como eventing donde menos es mejor, invertir orden
-        disciplines = self.competition.disciplines.all()
-        discipline_name = disciplines.first().name.lower() if disciplines.exists() else ''
-        reverse_order = 'eventing' not in discipline_name and 'cross' not in discipline_name
+        reverse_order = self.higher_score_wins()
 
         return sorted(
             ranked_participants,
@@ -204,10 +336,22 @@ class LiveRankingEntry(models.Model):
         verbose_name_plural = "Entradas de Rankings en Vivo"
         ordering = ['position']
         unique_together = ['ranking', 'participant']
+        indexes = [
+            models.Index(fields=['ranking', 'position']),
+        ]
 
     def __str__(self):
         return f"#{self.position} - {self.participant.rider_name} ({self.current_score})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.ranking.invalidate_revision()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.ranking.invalidate_revision()
+        return result
+
     def calculate_position_change(self):
         """Calcular cambio de posición desde la última actualización"""
         if self.previous_position:
@@ -249,6 +393,38 @@ class LiveRankingEntry(models.Model):
         return self.consistency_score
 
 
+class LiveRankingRoundResult(models.Model):
+    """Resultado de un participante tras una ronda (rankings multi-ronda)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ranking = models.ForeignKey(LiveRanking, on_delete=models.CASCADE, related_name='round_results')
+    participant = models.ForeignKey('competitions.Participant', on_delete=models.CASCADE, related_name='live_round_results')
+    round_number = models.PositiveIntegerField(verbose_name="Número de ronda")
+
+    # Resultado de la ronda (nulo si no compitió en ella)
+    round_score = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True, verbose_name="Puntuación de la ronda")
+    round_position = models.PositiveIntegerField(null=True, blank=True, verbose_name="Posición en la ronda")
+
+    # Clasificación acumulada tras la ronda
+    cumulative_score = models.DecimalField(max_digits=10, decimal_places=3, default=0, verbose_name="Puntuación acumulada")
+    cumulative_position = models.PositiveIntegerField(verbose_name="Posición acumulada")
+    previous_position = models.PositiveIntegerField(null=True, blank=True, verbose_name="Posición acumulada anterior")
+    position_change = models.IntegerField(default=0, verbose_name="Cambio de posición")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Resultado por Ronda"
+        verbose_name_plural = "Resultados por Ronda"
+        ordering = ['round_number', 'cumulative_position']
+        unique_together = ['ranking', 'participant', 'round_number']
+        indexes = [
+            models.Index(fields=['ranking', 'round_number', 'cumulative_position']),
+        ]
+
+    def __str__(self):
+        return f"R{self.round_number} #{self.cumulative_position} - {self.participant}"
+
+
 class RankingSnapshot(models.Model):
     """Instantánea de un ranking en un momento específico"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -275,6 +451,139 @@ class RankingSnapshot(models.Model):
     def __str__(self):
         return f"Snapshot: {self.live_ranking.name} - {self.snapshot_time}"
 
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+
+        if is_new:
+            ParticipantResultHistory.record_ranking(self.live_ranking, snapshot=self)
+
+
+class ParticipantResultHistory(models.Model):
+    """
+    Historial inmutable de resultados por jinete y caballo.
+
+    Se agrega una fila por participante cada vez que se toma una instantánea
+    o un ranking se vuelve definitivo. Cada fila guarda los acumulados
+    (mejor posición, victorias y competencias) hasta ese momento, de modo
+    que el historial se obtiene con un único recorrido del índice.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    rider = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='result_history')
+    horse = models.ForeignKey('competitions.Horse', on_delete=models.CASCADE, related_name='result_history')
+    participant = models.ForeignKey('competitions.Participant', on_delete=models.SET_NULL, null=True, blank=True, related_name='result_history')
+    competition = models.ForeignKey('competitions.Competition', on_delete=models.CASCADE, related_name='result_history')
+    ranking = models.ForeignKey(LiveRanking, on_delete=models.SET_NULL, null=True, blank=True, related_name='result_history')
+    snapshot = models.ForeignKey(RankingSnapshot, on_delete=models.SET_NULL, null=True, blank=True, related_name='result_history')
+
+    # Nombres al momento del resultado
+    rider_name = models.CharField(max_length=200, verbose_name="Nombre del jinete")
+    horse_name = models.CharField(max_length=100, verbose_name="Nombre del caballo")
+
+    # Resultado
+    is_final = models.BooleanField(default=False, verbose_name="Resultado definitivo")
+    position = models.PositiveIntegerField(verbose_name="Posición")
+    score = models.DecimalField(max_digits=10, decimal_places=3, default=0, verbose_name="Puntuación")
+    total_participants = models.PositiveIntegerField(default=0, verbose_name="Total de participantes")
+
+    # Acumulados hasta este registro (inclusive)
+    best_position = models.PositiveIntegerField(verbose_name="Mejor posición")
+    wins = models.PositiveIntegerField(default=0, verbose_name="Victorias")
+    competitions_count = models.PositiveIntegerField(default=0, verbose_name="Competencias")
+
+    recorded_at = models.DateTimeField(default=timezone.now, verbose_name="Registrado en")
+
+    class Meta:
+        verbose_name = "Historial de Resultados"
+        verbose_name_plural = "Historial de Resultados"
+        ordering = ['-recorded_at']
+        indexes = [
+            models.Index(fields=['rider', 'horse', '-recorded_at']),
+            models.Index(fields=['horse', '-recorded_at']),
+            models.Index(fields=['competition', 'is_final']),
+        ]
+
+    def __str__(self):
+        return f"{self.rider_name} / {self.horse_name} - #{self.position} ({self.recorded_at:%Y-%m-%d})"
+
+    @property
+    def win_rate(self):
+        """Porcentaje de competencias ganadas"""
+        if not self.competitions_count:
+            return 0
+        return self.wins / self.competitions_count * 100
+
+    @classmethod
+    def record_ranking(cls, ranking, snapshot=None, is_final=False):
+        """Agregar al historial las posiciones actuales de un ranking"""
+        if is_final and cls.objects.filter(ranking=ranking, is_final=True).exists():
+            return []
+
+        entries = list(ranking.entries.select_related('participant__rider', 'participant__horse'))
+        if not entries:
+            return []
+
+        pairs = Q()
+        for key in {(entry.participant.rider_id, entry.participant.horse_id) for entry in entries}:
+            pairs |= Q(rider_id=key[0], horse_id=key[1])
+
+        # Último registro de cada binomio: contiene los acumulados vigentes.
+        # Solo se lee una fila por binomio, con el índice (rider, horse, -recorded_at)
+        latest = cls.objects.filter(
+            rider_id=OuterRef('rider_id'), horse_id=OuterRef('horse_id')
+        ).order_by('-recorded_at').values('pk')[:1]
+        previous = {
+            (row.rider_id, row.horse_id): row
+            for row in cls.objects.filter(pairs).filter(pk=Subquery(latest)).only(
+                'rider_id', 'horse_id', 'best_position', 'wins', 'competitions_count'
+            )
+        }
+
+        # Binomios que ya tienen un resultado definitivo en esta competencia
+        already_counted = set(cls.objects.filter(
+            pairs, competition_id=ranking.competition_id, is_final=True
+        ).values_list('rider_id', 'horse_id'))
+
+        now = timezone.now()
+        rows = []
+        for entry in entries:
+            participant = entry.participant
+            key = (participant.rider_id, participant.horse_id)
+            last = previous.get(key)
+
+            # Solo los resultados definitivos cuentan como mejor posición; 0 = aún ninguno
+            best_position = last.best_position if last else 0
+            if is_final:
+                best_position = min(best_position, entry.position) if best_position else entry.position
+            wins = last.wins if last else 0
+            competitions_count = last.competitions_count if last else 0
+
+            if is_final and key not in already_counted:
+                competitions_count += 1
+                if entry.position == 1:
+                    wins += 1
+
+            rows.append(cls(
+                rider_id=participant.rider_id,
+                horse_id=participant.horse_id,
+                participant=participant,
+                competition_id=ranking.competition_id,
+                ranking=ranking,
+                snapshot=snapshot,
+                rider_name=participant.rider.get_full_name(),
+                horse_name=participant.horse.name,
+                is_final=is_final,
+                position=entry.position,
+                score=entry.current_score,
+                total_participants=len(entries),
+                best_position=best_position,
+                wins=wins,
+                competitions_count=competitions_count,
+                recorded_at=now,
+            ))
+
+        return cls.objects.bulk_create(rows)
+
 
 class RankingRule(models.Model):
     """Reglas de clasificación para diferentes tipos de competencias"""
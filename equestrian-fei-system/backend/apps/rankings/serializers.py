@@ -3,11 +3,12 @@ from django.contrib.auth import get_user_model
 from .models import (
     LiveRanking,
     LiveRankingEntry,
+    LiveRankingRoundResult,
     RankingSnapshot,
     RankingRule,
     TeamRanking
 )
-from apps.competitions.serializers import CompetitionSerializer, CategorySerializer, ParticipantSerializer
+from apps.competitions.serializers import CategorySerializer, SimpleCompetitionSerializer
 
 User = get_user_model()
 
@@ -77,7 +78,7 @@ class LiveRankingEntrySerializer(serializers.ModelSerializer):
 class LiveRankingDetailSerializer(LiveRankingSerializer):
     """Serializer detallado para ranking en vivo con entradas"""
     entries = LiveRankingEntrySerializer(many=True, read_only=True)
-    competition = CompetitionSerializer(read_only=True)
+    competition = SimpleCompetitionSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
 
     class Meta(LiveRankingSerializer.Meta):
@@ -176,6 +177,20 @@ class QuickRankingSerializer(serializers.ModelSerializer):
         ]
 
 
+class LiveRankingRoundResultSerializer(serializers.ModelSerializer):
+    """Serializer para la clasificación tras una ronda"""
+    participant_name = serializers.CharField(source='participant.rider.get_full_name', read_only=True)
+    horse_name = serializers.CharField(source='participant.horse.name', read_only=True)
+
+    class Meta:
+        model = LiveRankingRoundResult
+        fields = [
+            'participant', 'participant_name', 'horse_name', 'round_number',
+            'round_score', 'round_position', 'cumulative_score',
+            'cumulative_position', 'previous_position', 'position_change'
+        ]
+
+
 class CompetitionRankingOverviewSerializer(serializers.Serializer):
     """Serializer para vista general de rankings de una competencia"""
     competition_id = serializers.UUIDField()
@@ -3,6 +3,7 @@ Servicios para el sistema de rankings
 """
 
 import logging
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
 from decimal import Decimal
 from typing import List, Dict, Any, Optional
@@ -25,6 +26,18 @@ from apps.scoring.models import ScoreCard
 logger = logging.getLogger(__name__)
 
 
+def ranking_sort_key(score, penalties, best_score, rounds, higher_is_better=True):
+    """
+    Clave de orden de un participante (menor clave = mejor posición).
+
+    El primer elemento es la puntuación; el resto son los criterios de
+    desempate: penalizaciones, mejor puntuación y rondas completadas.
+    """
+    if higher_is_better:
+        return (-score, penalties, -best_score, -rounds)
+    return (score, -penalties, best_score, rounds)
+
+
 class RankingCalculationService:
     """Servicio para cálculos de rankings"""
 
@@ -53,6 +66,10 @@ class RankingCalculationService:
             # Ordenar participantes
             ranked_participants = self._sort_participants(ranking, participants_data)
 
+            # Resultados por ronda antes de guardar el ranking (que cambia su revisión)
+            if ranking.calculation_method == LiveRanking.MULTI_ROUND:
+                ranking.update_round_results()
+
             # Actualizar entradas del ranking
             updated_entries = self._update_ranking_entries(ranking, ranked_participants)
 
@@ -151,7 +168,7 @@ class RankingCalculationService:
             total_score=Sum('final_score'),
             best_score=Max('final_score'),
             average_score=Avg('final_score'),
-            rounds_completed=Count('id'),
+            rounds_completed=Count('round_number', distinct=True),
             total_penalties=Sum('penalty_score'),
             technical_total=Sum('technical_score'),
             artistic_total=Sum('artistic_score'),
@@ -278,10 +295,8 @@ class RankingCalculationService:
 
     def _sort_participants(self, ranking: LiveRanking, participants_data: List[Dict]) -> List[Dict]:
         """Ordenar participantes según criterios de ranking"""
-        discipline_name = ranking.competition.discipline.name.lower() if ranking.competition.discipline else ''
-
         # Para ciertas disciplinas, menor puntuación es mejor
-        reverse_order = 'eventing' not in discipline_name and 'cross' not in discipline_name
+        reverse_order = ranking.higher_score_wins()
 
         # Función de ordenamiento personalizada
         def sort_key(participant_data):
@@ -289,15 +304,13 @@ class RankingCalculationService:
             if participant_data.get('is_eliminated', False):
                 return (1, 0, 0, 0)  # Los eliminados al final
 
-            score = participant_data['total_score']
-            penalties = participant_data.get('total_penalties', 0)
-            best_score = participant_data.get('best_score', 0)
-            rounds = participant_data.get('rounds_completed', 0)
-
-            if reverse_order:
-                return (0, -score, penalties, -best_score, -rounds)
-            else:
-                return (0, score, -penalties, best_score, rounds)
+            return (0,) + ranking_sort_key(
+                participant_data['total_score'],
+                participant_data.get('total_penalties', 0),
+                participant_data.get('best_score', 0),
+                participant_data.get('rounds_completed', 0),
+                reverse_order
+            )
 
         return sorted(participants_data, key=sort_key)
 
@@ -375,6 +388,7 @@ class RankingCalculationService:
         cache_keys = [
             f'ranking_{ranking.id}_entries',
             f'ranking_{ranking.id}_quick',
+            f'ranking_{ranking.id}_score_index',
             f'competition_{ranking.competition_id}_rankings'
         ]
 
@@ -382,6 +396,133 @@ class RankingCalculationService:
             cache.delete(key)
 
 
+class RequiredScoreService:
+    """
+    Puntuación necesaria para alcanzar una posición y posición hipotética
+    para una puntuación dada.
+
+    Trabaja sobre un arreglo ordenado de claves de ranking cacheado por
+    versión del ranking, por lo que cada consulta es una búsqueda binaria.
+    """
+
+    SCORE_STEP = Decimal('0.001')  # Resolución de LiveRankingEntry.current_score
+
+    def __init__(self, ranking: LiveRanking):
+        self.ranking = ranking
+        self.cache_timeout = getattr(settings, 'RANKING_CACHE_TIMEOUT', 300)
+        self.index = self._get_index()
+
+    def _get_index(self) -> Dict[str, Any]:
+        """Obtener el índice ordenado desde caché o reconstruirlo si cambió el ranking"""
+        cache_key = f'ranking_{self.ranking.id}_score_index'
+        version = self.ranking.last_updated.isoformat()
+
+        index = cache.get(cache_key)
+        if index is None or index['version'] != version:
+            index = self._build_index(version)
+            cache.set(cache_key, index, self.cache_timeout)
+
+        return index
+
+    def _build_index(self, version: str) -> Dict[str, Any]:
+        higher_is_better = self.ranking.higher_score_wins()
+        rows = self.ranking.entries.filter(is_eliminated=False).values_list(
+            'participant_id', 'current_score', 'total_penalties',
+            'best_score', 'rounds_completed', 'is_active'
+        )
+
+        participants = {}
+        keys = []
+        for participant_id, score, penalties, best_score, rounds, is_active in rows:
+            key = ranking_sort_key(score, penalties, best_score, rounds, higher_is_better)
+            keys.append(key)
+            participants[participant_id] = {
+                'key': key,
+                'score': score,
+                'rounds_completed': rounds,
+                'is_active': is_active,
+            }
+
+        keys.sort()
+        return {
+            'version': version,
+            'higher_is_better': higher_is_better,
+            'keys': keys,
+            'participants': participants,
+        }
+
+    def _own_index(self, info: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Índice del propio participante en el arreglo ordenado"""
+        if info is None:
+            return None
+        return bisect_left(self.index['keys'], info['key'])
+
+    def required_score(self, participant_id: int, target_position: int) -> Optional[Dict[str, Any]]:
+        """Puntuación total mínima para terminar en target_position o mejor"""
+        info = self.index['participants'].get(participant_id)
+        if info is None:
+            return None
+
+        keys = self.index['keys']
+        higher_is_better = self.index['higher_is_better']
+        own = self._own_index(info)
+        result = {
+            'participant_id': participant_id,
+            'current_score': info['score'],
+            'current_position': own + 1,
+            'target_position': target_position,
+        }
+
+        # Sin suficientes rivales, la posición está asegurada
+        if target_position > len(keys) - 1:
+            result.update({'required_score': None, 'score_difference': None, 'guaranteed': True})
+            return result
+
+        # Rival a superar: el que ocupa target_position excluyendo al participante
+        rival_index = target_position - 1 if target_position - 1 < own else target_position
+        rival_key = keys[rival_index]
+
+        # Con igual puntuación deciden los desempates actuales del participante
+        normalized = rival_key[0]
+        if not info['key'][1:] < rival_key[1:]:
+            normalized -= self.SCORE_STEP
+        required = -normalized if higher_is_better else normalized
+
+        result.update({
+            'required_score': required,
+            'score_difference': required - info['score'],
+            'guaranteed': False,
+        })
+        return result
+
+    def position_for_score(self, score: Decimal, participant_id: Optional[int] = None) -> int:
+        """Posición que obtendría un participante con la puntuación total indicada"""
+        info = self.index['participants'].get(participant_id)
+        keys = self.index['keys']
+
+        tiebreak = info['key'][1:] if info else ranking_sort_key(
+            score, 0, score, 0, self.index['higher_is_better']
+        )[1:]
+        primary = -score if self.index['higher_is_better'] else score
+
+        # Los empates exactos cuentan por delante (criterio conservador)
+        position = bisect_right(keys, (primary,) + tuple(tiebreak))
+        own = self._own_index(info)
+        if own is not None and own < position:
+            position -= 1
+
+        return position + 1
+
+    def remaining_starters(self) -> List[int]:
+        """Participantes activos que aún no completaron la ronda actual"""
+        round_number = self.ranking.round_number
+        return [
+            participant_id
+            for participant_id, info in self.index['participants'].items()
+            if info['is_active'] and info['rounds_completed'] < round_number
+        ]
+
+
 class TeamRankingService:
     """Servicio para rankings por equipos"""
 
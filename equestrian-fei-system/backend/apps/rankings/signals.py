@@ -0,0 +1,19 @@
+"""
+Invalidación de los ETags de rankings cuando cambian datos de otras apps
+
+Los rankings en vivo muestran datos de los participantes y la vista general
+cuenta los inscritos: al guardar o borrar un participante se invalidan las
+revisiones cacheadas de su competencia. Las escrituras en bloque que no
+emiten señales (bulk_create) llaman a LiveRanking.invalidate_competition_revisions.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.competitions.models import Participant
+from .models import LiveRanking
+
+
+@receiver([post_save, post_delete], sender=Participant)
+def invalidate_participant_rankings(sender, instance, **kwargs):
+    LiveRanking.invalidate_competition_revisions(instance.competition_id)
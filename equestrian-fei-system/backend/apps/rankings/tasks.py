@@ -16,7 +16,7 @@ from .services import (
     cleanup_old_snapshots,
     generate_ranking_analytics
 )
-from .models import LiveRanking, TeamRanking
+from .models import LiveRanking, TeamRanking, ParticipantResultHistory
 from apps.competitions.models import Competition
 
 logger = logging.getLogger(__name__)
@@ -282,6 +282,9 @@ def archive_completed_competitions():
             # Crear snapshot final si no existe
             final_snapshots = []
             for ranking in competition.live_rankings.all():
+                ranking.invalidate_revision()
+                # update() no pasa por save(): consolidar historial aquí
+                ParticipantResultHistory.record_ranking(ranking, is_final=True)
                 if not ranking.snapshots.filter(event_trigger='final_archive').exists():
                     snapshot = ranking.snapshots.create(
                         round_number=ranking.round_number,
@@ -0,0 +1,110 @@
+"""
+Tests para peticiones condicionales (ETag / If-None-Match) en rankings en vivo
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from .models import LiveRanking, LiveRankingEntry
+
+User = get_user_model()
+
+
+class LiveRankingETagTest(APITestCase):
+    """Tests para ETags en LiveRankingViewSet"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='organizer1',
+            email='organizer1@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Test', organizer=self.user, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='in_progress'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.ranking = LiveRanking.objects.create(
+            competition=self.competition, category=self.category, name='General'
+        )
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/rankings/live/{self.ranking.pk}/'
+
+    def test_response_includes_strong_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_matching_etag_returns_304_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_private_ranking_is_served_without_etag(self):
+        self.ranking.is_public = False
+        self.ranking.save()
+
+        response = self.client.get(self.url)
+
+        self.assertNotIn('ETag', response)
+
+    def _participant(self, index):
+        rider = User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com')
+        horse = Horse.objects.create(
+            name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo',
+            color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+        )
+        return Participant.objects.create(
+            competition=self.competition, rider=rider, horse=horse, category=self.category
+        )
+
+    def test_entry_changes_return_new_etag(self):
+        participant = self._participant(0)
+        etag = self.client.get(self.url)['ETag']
+
+        entry = LiveRankingEntry.objects.create(ranking=self.ranking, participant=participant, position=1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['entries']), 1)
+
+        etag = response['ETag']
+        entry.current_score = 75
+        entry.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['entries'][0]['current_score'], '75.000')
+
+    def test_competition_overview_etag(self):
+        url = f'/api/rankings/stats/competition_overview/?competition_id={self.competition.pk}'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Una inscripción nueva cambia el total de participantes
+        participant = self._participant(0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_participants'], 1)
+
+        etag = response['ETag']
+        participant.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['total_participants'], 0)
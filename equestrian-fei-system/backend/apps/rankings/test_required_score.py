@@ -0,0 +1,87 @@
+"""
+Tests para el cálculo de puntuación necesaria en rankings en vivo
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from .models import LiveRanking, LiveRankingEntry
+from .services import RequiredScoreService
+
+User = get_user_model()
+
+
+class RequiredScoreServiceTest(TestCase):
+    """Búsqueda binaria sobre las claves ordenadas del ranking"""
+
+    def setUp(self):
+        cache.clear()
+        organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        now = timezone.now()
+        competition = Competition.objects.create(
+            name='Copa en Vivo', organizer=organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='in_progress'
+        )
+        self.ranking = LiveRanking.objects.create(competition=competition, name='General', round_number=2)
+
+        # Posiciones: 80 (1), 75 (2), 70 (3) y un eliminado
+        self.participants = []
+        for index, (score, eliminated) in enumerate([(80, False), (75, False), (70, False), (90, True)]):
+            rider = User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com', role='rider')
+            horse = Horse.objects.create(
+                name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo', color='Alazán',
+                gender='mare', birth_date='2015-01-01', height=160, owner=organizer
+            )
+            participant = Participant.objects.create(
+                competition=competition, rider=rider, horse=horse, category=category
+            )
+            LiveRankingEntry.objects.create(
+                ranking=self.ranking, participant=participant, position=index + 1,
+                current_score=Decimal(score), best_score=Decimal(score),
+                rounds_completed=2 if index == 0 else 1, is_eliminated=eliminated
+            )
+            self.participants.append(participant)
+        self.service = RequiredScoreService(self.ranking)
+
+    def test_reachable_target(self):
+        third = self.participants[2].pk
+        result = self.service.required_score(third, 1)
+
+        self.assertEqual(result['current_position'], 3)
+        self.assertFalse(result['guaranteed'])
+        self.assertGreater(result['score_difference'], 0)
+        # La puntuación calculada es la mínima que alcanza la posición
+        self.assertEqual(self.service.position_for_score(result['required_score'], third), 1)
+        self.assertEqual(
+            self.service.position_for_score(result['required_score'] - RequiredScoreService.SCORE_STEP, third), 2
+        )
+
+    def test_unreachable_participant(self):
+        # Un eliminado no está en el índice: no puede alcanzar ninguna posición
+        self.assertIsNone(self.service.required_score(self.participants[3].pk, 1))
+        self.assertNotIn(self.participants[3].pk, self.service.remaining_starters())
+        # Sin mejorar su puntuación el tercero no sube
+        self.assertEqual(self.service.position_for_score(Decimal('70'), self.participants[2].pk), 3)
+
+    def test_already_leading(self):
+        leader = self.participants[0].pk
+        result = self.service.required_score(leader, 1)
+
+        self.assertEqual(result['current_position'], 1)
+        self.assertLessEqual(result['score_difference'], 0)
+        # Con menos rivales que la posición objetivo el puesto está asegurado
+        self.assertTrue(self.service.required_score(leader, 3)['guaranteed'])
+        self.assertCountEqual(self.service.remaining_starters(), [self.participants[1].pk, self.participants[2].pk])
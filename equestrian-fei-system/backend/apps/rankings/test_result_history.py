@@ -0,0 +1,125 @@
+"""
+Tests para el historial precalculado de resultados por binomio
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from .models import LiveRanking, LiveRankingEntry, ParticipantResultHistory
+
+User = get_user_model()
+
+
+class ParticipantResultHistoryTest(TestCase):
+    """Los acumulados salen del último registro de cada binomio"""
+
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        self.venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.riders = [
+            User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com', role='rider')
+            for index in range(2)
+        ]
+        self.horses = [
+            Horse.objects.create(
+                name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo', color='Alazán',
+                gender='mare', birth_date='2015-01-01', height=160, owner=self.organizer
+            )
+            for index in range(2)
+        ]
+
+    def create_ranking(self, name, positions):
+        """Ranking con los binomios (jinete i, caballo i) en las posiciones dadas"""
+        now = timezone.now()
+        competition = Competition.objects.create(
+            name=name, organizer=self.organizer, venue=self.venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='in_progress'
+        )
+        ranking = LiveRanking.objects.create(competition=competition, name=name)
+        for index, position in enumerate(positions):
+            participant = Participant.objects.create(
+                competition=competition, rider=self.riders[index], horse=self.horses[index], category=self.category
+            )
+            LiveRankingEntry.objects.create(
+                ranking=ranking, participant=participant, position=position, current_score=Decimal(100 - position)
+            )
+        return ranking
+
+    def test_final_rankings_accumulate_per_pair(self):
+        first = self.create_ranking('Copa 1', [1, 2])
+        first.status = 'completed'
+        first.save()
+        # Un snapshot intermedio no suma competencias
+        second = self.create_ranking('Copa 2', [2, 1])
+        ParticipantResultHistory.record_ranking(second)
+        second.status = 'completed'
+        second.save()
+
+        latest = {
+            row.rider_id: row
+            for row in ParticipantResultHistory.objects.filter(ranking=second, is_final=True)
+        }
+        leader, runner_up = latest[self.riders[0].pk], latest[self.riders[1].pk]
+        self.assertEqual((leader.competitions_count, leader.wins, leader.best_position), (2, 1, 1))
+        self.assertEqual((runner_up.competitions_count, runner_up.wins, runner_up.best_position), (2, 1, 1))
+        self.assertEqual(leader.win_rate, 50)
+
+        # Volver a consolidar el mismo ranking no duplica
+        self.assertEqual(ParticipantResultHistory.record_ranking(second, is_final=True), [])
+
+    def test_snapshots_do_not_set_best_position(self):
+        ranking = self.create_ranking('Copa 1', [1, 2])
+        ParticipantResultHistory.record_ranking(ranking)
+        self.assertEqual(
+            set(ParticipantResultHistory.objects.values_list('best_position', flat=True)), {0}
+        )
+
+        final = self.create_ranking('Copa 2', [2, 1])
+        ParticipantResultHistory.record_ranking(final, is_final=True)
+        # Un snapshot posterior con mejor posición tampoco la cambia
+        later = self.create_ranking('Copa 3', [1, 2])
+        ParticipantResultHistory.record_ranking(later)
+
+        row = ParticipantResultHistory.objects.get(ranking=later, rider=self.riders[0])
+        self.assertEqual((row.position, row.best_position), (1, 2))
+
+    def test_other_pairs_are_ignored(self):
+        # Historial del jinete 0 con el caballo 1: otro binomio
+        ranking = self.create_ranking('Copa 1', [1, 2])
+        ParticipantResultHistory.objects.create(
+            rider=self.riders[0], horse=self.horses[1], competition=ranking.competition,
+            rider_name='Jinete 0', horse_name='Caballo 1', is_final=True, position=1,
+            best_position=1, wins=7, competitions_count=9,
+        )
+
+        ParticipantResultHistory.record_ranking(ranking, is_final=True)
+
+        row = ParticipantResultHistory.objects.get(ranking=ranking, rider=self.riders[0], horse=self.horses[0])
+        self.assertEqual((row.wins, row.competitions_count), (1, 1))
+
+    def test_queries_do_not_grow_with_history(self):
+        ranking = self.create_ranking('Copa 1', [1, 2])
+        ParticipantResultHistory.record_ranking(ranking)
+        with CaptureQueriesContext(connection) as short_history:
+            ParticipantResultHistory.record_ranking(ranking)
+
+        for _ in range(5):
+            ParticipantResultHistory.record_ranking(ranking)
+        with CaptureQueriesContext(connection) as long_history:
+            rows = ParticipantResultHistory.record_ranking(ranking)
+
+        self.assertEqual(len(long_history.captured_queries), len(short_history.captured_queries))
+        self.assertEqual(len(rows), 2)
@@ -0,0 +1,127 @@
+"""
+Tests para las posiciones por ronda y acumuladas de rankings multi-ronda
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from apps.scoring.models import ScoreCard
+from .models import LiveRanking
+from .services import RequiredScoreService
+
+User = get_user_model()
+
+
+class RoundResultsTest(TestCase):
+    """Acumulado (SUM OVER) y posición por ronda (RANK OVER) en una consulta"""
+
+    # Puntuación por ronda de cada participante; None = no compitió
+    SCORES = [
+        (10, 5),     # 0: empata la ronda 1, cae al tercer puesto acumulado
+        (8, 8),      # 1: gana la ronda 2 y empata el primer puesto acumulado
+        (10, 6),     # 2
+        (3, None),   # 3: solo la ronda 1, conserva su acumulado
+    ]
+
+    def setUp(self):
+        organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        judges = [
+            User.objects.create(username=f'judge{index}', email=f'judge{index}@test.com', role='judge')
+            for index in range(2)
+        ]
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        now = timezone.now()
+        competition = Competition.objects.create(
+            name='Copa Rondas', organizer=organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='in_progress'
+        )
+        self.ranking = LiveRanking.objects.create(
+            competition=competition, name='General', calculation_method=LiveRanking.MULTI_ROUND, round_number=2
+        )
+
+        self.participants = []
+        for index, scores in enumerate(self.SCORES):
+            rider = User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com', role='rider')
+            horse = Horse.objects.create(
+                name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo', color='Alazán',
+                gender='mare', birth_date='2015-01-01', height=160, owner=organizer
+            )
+            participant = Participant.objects.create(
+                competition=competition, rider=rider, horse=horse, category=category
+            )
+            self.participants.append(participant)
+            for round_number, score in enumerate(scores, 1):
+                if score is None:
+                    continue
+                # La puntuación de la ronda se reparte entre dos jueces
+                half = Decimal(score) / 2
+                for judge in judges:
+                    ScoreCard.objects.create(
+                        participant=participant, judge=judge, round_number=round_number,
+                        status='completed', final_score=half
+                    )
+        # Una tarjeta sin completar no cuenta
+        ScoreCard.objects.create(
+            participant=self.participants[3], judge=judges[0], round_number=2, final_score=Decimal('50')
+        )
+
+    def results(self):
+        return {
+            (self.participants.index(result.participant), result.round_number): result
+            for result in self.ranking.round_results.select_related('participant')
+        }
+
+    def test_round_and_cumulative_positions(self):
+        self.assertEqual(self.ranking.update_round_results(), 8)
+        results = self.results()
+
+        def row(index, round_number):
+            result = results[(index, round_number)]
+            return (
+                result.round_score, result.round_position,
+                result.cumulative_score, result.cumulative_position, result.position_change,
+            )
+
+        # Ronda 1: empate en el primer puesto, el siguiente es tercero (RANK)
+        self.assertEqual(row(0, 1), (Decimal('10'), 1, Decimal('10'), 1, 0))
+        self.assertEqual(row(2, 1), (Decimal('10'), 1, Decimal('10'), 1, 0))
+        self.assertEqual(row(1, 1), (Decimal('8'), 3, Decimal('8'), 3, 0))
+        self.assertEqual(row(3, 1), (Decimal('3'), 4, Decimal('3'), 4, 0))
+
+        # Ronda 2: 1 y 2 empatan con 16 acumulados; 0 baja al tercer puesto
+        self.assertEqual(row(1, 2), (Decimal('8'), 1, Decimal('16'), 1, 2))
+        self.assertEqual(row(2, 2), (Decimal('6'), 2, Decimal('16'), 1, 0))
+        self.assertEqual(row(0, 2), (Decimal('5'), 3, Decimal('15'), 3, -2))
+        # Quien no compitió en la ronda conserva su acumulado
+        self.assertEqual(row(3, 2), (None, None, Decimal('3'), 4, 0))
+
+    def test_rounds_completed_counts_rounds_not_cards(self):
+        self.ranking.update_rankings()
+
+        rounds = {
+            self.participants.index(entry.participant): entry.rounds_completed
+            for entry in self.ranking.entries.select_related('participant')
+        }
+        # Cada ronda tiene una tarjeta por juez: cuentan las rondas
+        self.assertEqual(rounds, {0: 2, 1: 2, 2: 2, 3: 1})
+        self.assertEqual(RequiredScoreService(self.ranking).remaining_starters(), [self.participants[3].pk])
+
+    def test_recalculation_replaces_results(self):
+        self.ranking.update_round_results()
+        self.ranking.round_number = 1
+        self.ranking.update_round_results()
+
+        results = self.results()
+        self.assertEqual(len(results), 4)
+        self.assertEqual({round_number for _, round_number in results}, {1})
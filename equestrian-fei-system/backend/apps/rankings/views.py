@@ -4,22 +4,26 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count, Avg, Sum, Max, Min
+from django.db.models import Q, Count, Avg, Sum, Max, Min, OuterRef, Subquery
 from django.core.cache import cache
+from django.core.exceptions import ValidationError
 import json
+from decimal import Decimal, InvalidOperation
 
 from .models import (
     LiveRanking,
     LiveRankingEntry,
     RankingSnapshot,
     RankingRule,
-    TeamRanking
+    TeamRanking,
+    ParticipantResultHistory
 )
 from .serializers import (
     LiveRankingSerializer,
     LiveRankingDetailSerializer,
     LiveRankingEntrySerializer,
     RankingSnapshotSerializer,
+    LiveRankingRoundResultSerializer,
     RankingRuleSerializer,
     TeamRankingSerializer,
     RankingStatsSerializer,
@@ -32,6 +36,74 @@ from .serializers import (
 from apps.users.permissions import IsAdminOrOrganizer, IsJudgeOrAbove
 from apps.competitions.models import Competition, Category, Participant
 from apps.scoring.models import ScoreCard
+from apps.sync.pagination import KeysetPagination
+from apps.sync.services.cache_service import conditional_etag, get_cached_revision
+from .services import RequiredScoreService
+
+
+def _live_ranking_revision(view, request, pk=None, **kwargs):
+    """Revisión de un ranking en vivo público (una consulta por PK o ninguna)"""
+    def load():
+        try:
+            # Las entradas y sus participantes se escriben sin tocar el ranking
+            row = LiveRanking.objects.filter(pk=pk).annotate(
+                entries_count=Count('entries'),
+                entries_updated=Max('entries__updated_at'),
+                participants_updated=Max('entries__participant__updated_at'),
+            ).values_list(
+                'last_updated', 'is_public', 'is_live',
+                'entries_count', 'entries_updated', 'participants_updated'
+            ).first()
+        except (ValueError, ValidationError):
+            return None
+
+        if row is None:
+            return None
+
+        last_updated, is_public, is_live, *entries = row
+        # Los rankings no públicos dependen de permisos: se sirven sin ETag
+        if not (is_public and is_live):
+            return None
+        return ':'.join(
+            value.isoformat() if hasattr(value, 'isoformat') else str(value or 0)
+            for value in (last_updated, *entries)
+        )
+
+    return get_cached_revision(f'live_ranking:{pk}', load)
+
+
+def _competition_rankings_revision(view, request, *args, **kwargs):
+    """Revisión del conjunto de rankings en vivo de una competencia"""
+    competition_id = request.query_params.get('competition_id')
+    if not competition_id:
+        return None
+
+    def load():
+        participants_count = Participant.objects.filter(
+            competition=OuterRef('pk')
+        ).order_by().values('competition').annotate(total=Count('id')).values('total')
+
+        try:
+            row = Competition.objects.filter(pk=competition_id).annotate(
+                rankings_count=Count('live_rankings', distinct=True),
+                rankings_updated=Max('live_rankings__last_updated'),
+                entries_count=Count('live_rankings__entries', distinct=True),
+                entries_updated=Max('live_rankings__entries__updated_at'),
+                participants_total=Subquery(participants_count),
+            ).values_list(
+                'rankings_count', 'rankings_updated', 'entries_count', 'entries_updated', 'participants_total'
+            ).first()
+        except (ValueError, ValidationError):
+            return None
+
+        if row is None:
+            return None
+
+        return ':'.join(
+            value.isoformat() if hasattr(value, 'isoformat') else str(value or 0) for value in row
+        )
+
+    return get_cached_revision(f'competition_rankings:{competition_id}', load)
 
 
 class LiveRankingViewSet(viewsets.ModelViewSet):
@@ -83,6 +155,11 @@ class LiveRankingViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-last_updated')
 
+    @conditional_etag(_live_ranking_revision)
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle del ranking con soporte para If-None-Match"""
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['post'])
     def force_update(self, request, pk=None):
         """Forzar actualización del ranking"""
@@ -118,6 +195,7 @@ class LiveRankingViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=True, methods=['get'])
+    @conditional_etag(_live_ranking_revision)
     def entries(self, request, pk=None):
         """Obtener entradas del ranking con paginación"""
         ranking = self.get_object()
@@ -157,6 +235,7 @@ class LiveRankingViewSet(viewsets.ModelViewSet):
         return Response(data)
 
     @action(detail=True, methods=['get'])
+    @conditional_etag(_live_ranking_revision)
     def quick_view(self, request, pk=None):
         """Vista rápida del ranking (top 10)"""
         ranking = self.get_object()
@@ -172,6 +251,80 @@ class LiveRankingViewSet(viewsets.ModelViewSet):
             'top_entries': serializer.data
         })
 
+    @action(detail=True, methods=['get'])
+    @conditional_etag(_live_ranking_revision)
+    def round_standings(self, request, pk=None):
+        """Clasificación por ronda y acumulada tras la ronda indicada (rankings multi-ronda)"""
+        ranking = get_object_or_404(self.get_queryset().prefetch_related(None), pk=pk)
+        self.check_object_permissions(request, ranking)
+
+        try:
+            round_number = int(request.query_params.get('round', ranking.round_number))
+        except ValueError:
+            return Response({
+                'error': 'round debe ser un número entero'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = ranking.round_results.filter(
+            round_number=round_number
+        ).select_related('participant__rider', 'participant__horse').order_by('cumulative_position')
+
+        serializer = LiveRankingRoundResultSerializer(results, many=True)
+        return Response({
+            'ranking_id': ranking.id,
+            'round_number': round_number,
+            'last_updated': ranking.last_updated,
+            'results': serializer.data
+        })
+
+    @action(detail=True, methods=['get'])
+    def required_score(self, request, pk=None):
+        """Puntuación necesaria para alcanzar una posición (sin participant_id: todos los que faltan por competir)"""
+        # Sin prefetch de entradas: el cálculo usa el índice ordenado cacheado
+        ranking = get_object_or_404(self.get_queryset().prefetch_related(None), pk=pk)
+        self.check_object_permissions(request, ranking)
+
+        try:
+            target_position = int(request.query_params.get('target_position', 3))
+            participant_id = request.query_params.get('participant_id')
+            participant_id = int(participant_id) if participant_id is not None else None
+            score = request.query_params.get('score')
+            score = Decimal(score) if score is not None else None
+        except (ValueError, InvalidOperation):
+            return Response({
+                'error': 'Parámetros inválidos'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if target_position < 1:
+            return Response({
+                'error': 'target_position debe ser mayor o igual a 1'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        calculator = RequiredScoreService(ranking)
+
+        if participant_id is None:
+            results = [
+                calculator.required_score(starter_id, target_position)
+                for starter_id in calculator.remaining_starters()
+            ]
+            return Response({
+                'ranking_id': ranking.id,
+                'target_position': target_position,
+                'last_updated': ranking.last_updated,
+                'results': results
+            })
+
+        result = calculator.required_score(participant_id, target_position)
+        if result is None:
+            return Response({
+                'error': 'El participante no está en el ranking'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if score is not None:
+            result['projected_position'] = calculator.position_for_score(score, participant_id)
+
+        return Response(result)
+
     @action(detail=True, methods=['post'])
     def create_snapshot(self, request, pk=None):
         """Crear instantánea manual del ranking"""
@@ -236,6 +389,8 @@ class LiveRankingEntryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = LiveRankingEntry.objects.all()
     serializer_class = LiveRankingEntrySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('ranking_id', 'position', 'id')
 
     def get_queryset(self):
         """Filtrar entradas según parámetros"""
@@ -446,6 +601,7 @@ class RankingStatsViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @conditional_etag(_competition_rankings_revision)
     def competition_overview(self, request):
         """Vista general de rankings por competencia"""
         competition_id = request.query_params.get('competition_id')
@@ -479,23 +635,44 @@ class RankingStatsViewSet(viewsets.ViewSet):
                 'error': 'participant_id es requerido'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        participant = get_object_or_404(Participant, id=participant_id)
-
-        # Obtener historial de entradas en rankings
-        entries = LiveRankingEntry.objects.filter(
-            participant=participant
-        ).select_related('ranking').order_by('-created_at')
+        # El historial está precalculado por binomio (jinete + caballo): una
+        # sola consulta sobre el índice (rider, horse, -recorded_at)
+        binomial = Participant.objects.filter(id=participant_id)
+        rows = list(ParticipantResultHistory.objects.filter(
+            rider_id=Subquery(binomial.values('rider_id')[:1]),
+            horse_id=Subquery(binomial.values('horse_id')[:1])
+        ).order_by('-recorded_at').values_list(
+            'rider_name', 'horse_name', 'position', 'score',
+            'best_position', 'wins', 'competitions_count'
+        ))
+
+        if not rows:
+            participant = get_object_or_404(
+                Participant.objects.select_related('rider', 'horse'), id=participant_id
+            )
+            return Response({
+                'participant_id': participant.id,
+                'participant_name': participant.rider.get_full_name(),
+                'horse_name': participant.horse.name,
+                'position_history': [],
+                'score_history': [],
+                'best_position': 0,
+                'current_position': 0,
+                'total_competitions': 0,
+                'win_rate': 0
+            })
 
+        rider_name, horse_name, current_position, _, best_position, wins, total_competitions = rows[0]
         history = {
-            'participant_id': participant.id,
-            'participant_name': participant.rider_name,
-            'horse_name': participant.horse_name,
-            'position_history': list(entries.values_list('position', flat=True)),
-            'score_history': list(entries.values_list('current_score', flat=True)),
-            'best_position': entries.aggregate(Min('position'))['position__min'] or 0,
-            'current_position': entries.first().position if entries.exists() else 0,
-            'total_competitions': entries.values('ranking__competition').distinct().count(),
-            'win_rate': self._calculate_win_rate(participant)
+            'participant_id': int(participant_id),
+            'participant_name': rider_name,
+            'horse_name': horse_name,
+            'position_history': [row[2] for row in rows],
+            'score_history': [row[3] for row in rows],
+            'best_position': best_position,
+            'current_position': current_position,
+            'total_competitions': total_competitions,
+            'win_rate': (wins / total_competitions * 100) if total_competitions > 0 else 0
         }
 
         return Response(history)
@@ -513,16 +690,3 @@ class RankingStatsViewSet(viewsets.ViewSet):
             'score_distribution': {},  # Se podría implementar un análisis más detallado
             'recent_updates': []  # Lista de actualizaciones recientes
         }
-
-    def _calculate_win_rate(self, participant):
-        """Calcular tasa de victorias de un participante"""
-        total_competitions = LiveRankingEntry.objects.filter(
-            participant=participant
-        ).values('ranking__competition').distinct().count()
-
-        wins = LiveRankingEntry.objects.filter(
-            participant=participant,
-            position=1
-        ).count()
-
-        return (wins / total_competitions * 100) if total_competitions > 0 else 0
\ No newline at end of file
@@ -5,8 +5,11 @@ from django.db.models import Avg, Sum, Count
 from .models import (
     ScoringCriteria, ScoreCard, IndividualScore,
     JumpingFault, DressageMovement, EventingPhase,
-    CompetitionRanking, RankingEntry
+    CompetitionRanking, RankingEntry, RankingPointsTable,
+    RankingPointsResult, RankingStanding
 )
+from apps.competitions import reference_cache
+from .utils import invalidate_competition_results, award_ranking_points
 
 
 @admin.register(ScoringCriteria)
@@ -70,11 +73,13 @@ class ScoringCriteriaAdmin(admin.ModelAdmin):
 
     def activate_criteria(self, request, queryset):
         count = queryset.update(is_active=True)
+        reference_cache.invalidate('scoring_criteria')
         self.message_user(request, f'{count} criterios activados.')
     activate_criteria.short_description = 'Activar criterios'
 
     def deactivate_criteria(self, request, queryset):
         count = queryset.update(is_active=False)
+        reference_cache.invalidate('scoring_criteria')
         self.message_user(request, f'{count} criterios desactivados.')
     deactivate_criteria.short_description = 'Desactivar criterios'
 
@@ -558,16 +563,26 @@ class CompetitionRankingAdmin(admin.ModelAdmin):
 
     def publish_rankings(self, request, queryset):
         count = queryset.update(is_published=True)
+        for competition_id in set(queryset.values_list('competition_id', flat=True)):
+            invalidate_competition_results(competition_id)
         self.message_user(request, f'{count} rankings publicados.')
     publish_rankings.short_description = 'Publicar rankings'
 
     def unpublish_rankings(self, request, queryset):
         count = queryset.update(is_published=False)
+        for competition_id in set(queryset.values_list('competition_id', flat=True)):
+            invalidate_competition_results(competition_id)
         self.message_user(request, f'{count} rankings despublicados.')
     unpublish_rankings.short_description = 'Despublicar rankings'
 
     def mark_as_final(self, request, queryset):
+        newly_final = list(queryset.filter(is_final=False).select_related('competition'))
         count = queryset.update(is_final=True)
+        for competition_id in set(queryset.values_list('competition_id', flat=True)):
+            invalidate_competition_results(competition_id)
+        # update() no pasa por save(): otorgar los puntos de ranking aquí
+        for ranking in newly_final:
+            award_ranking_points(ranking)
         self.message_user(request, f'{count} rankings marcados como finales.')
     mark_as_final.short_description = 'Marcar como finales'
 
@@ -661,3 +676,34 @@ class RankingEntryAdmin(admin.ModelAdmin):
             )
         return format_html('<span style="color: green;">✓ Activo</span>')
     elimination_status.short_description = 'Estado'
+
+
+@admin.register(RankingPointsTable)
+class RankingPointsTableAdmin(admin.ModelAdmin):
+    """Admin para tablas de puntos del ranking de temporada"""
+    list_display = ['competition_type', 'positions_count', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def positions_count(self, obj):
+        return len(obj.points)
+    positions_count.short_description = 'Posiciones con puntos'
+
+
+@admin.register(RankingPointsResult)
+class RankingPointsResultAdmin(admin.ModelAdmin):
+    """Admin para resultados con puntos de ranking"""
+    list_display = ['rider', 'horse', 'competition', 'position', 'points', 'earned_at', 'is_expired']
+    list_filter = ['is_expired', 'earned_at']
+    search_fields = ['rider__first_name', 'rider__last_name', 'horse__name', 'competition__name']
+    raw_id_fields = ['ranking', 'rider', 'horse', 'competition']
+    readonly_fields = ['created_at']
+
+
+@admin.register(RankingStanding)
+class RankingStandingAdmin(admin.ModelAdmin):
+    """Admin para totales del ranking de temporada"""
+    list_display = ['rider', 'total_points', 'counted_results', 'valid_results', 'updated_at']
+    search_fields = ['rider__first_name', 'rider__last_name']
+    raw_id_fields = ['rider']
+    readonly_fields = ['total_points', 'counted_results', 'valid_results', 'updated_at']
@@ -0,0 +1,39 @@
+"""
+Expirar los puntos de ranking de temporada que salieron de la ventana
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.scoring.utils import expire_ranking_points, rebuild_ranking_standings
+
+
+class Command(BaseCommand):
+    help = (
+        'Marca como expirados los resultados de puntos de ranking fuera de la ventana '
+        'de 12 meses y recalcula los totales de los jinetes afectados'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Recalcular además los totales de todos los jinetes desde cero'
+        )
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Repetir indefinidamente cada --interval segundos'
+        )
+        parser.add_argument('--interval', type=float, default=3600, help='Segundos entre pasadas con --watch')
+
+    def handle(self, *args, **options):
+        while True:
+            if options['rebuild']:
+                riders = rebuild_ranking_standings()
+                self.stdout.write(self.style.SUCCESS(f'Totales de {riders} jinetes reconstruidos'))
+            else:
+                expired = expire_ranking_points()
+                self.stdout.write(self.style.SUCCESS(f'{expired} resultados de puntos expirados'))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0001_initial'),
+        ('scoring', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPointsTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('competition_type', models.CharField(choices=[('national', 'Nacional'), ('international', 'Internacional'), ('regional', 'Regional'), ('local', 'Local'), ('championship', 'Campeonato'), ('friendly', 'Amistoso')], max_length=20, unique=True, verbose_name='Nivel de competencia')),
+                ('points', models.JSONField(default=list, help_text='Lista de puntos: el primer valor corresponde al 1er lugar', verbose_name='Puntos por posición')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activa')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tabla de Puntos de Ranking',
+                'verbose_name_plural': 'Tablas de Puntos de Ranking',
+                'ordering': ['competition_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RankingPointsResult',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(verbose_name='Posición')),
+                ('points', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Puntos')),
+                ('earned_at', models.DateTimeField(verbose_name='Obtenido en')),
+                ('expires_at', models.DateTimeField(verbose_name='Expira en')),
+                ('is_expired', models.BooleanField(default=False, verbose_name='Expirado')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_points', to='competitions.competition')),
+                ('horse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_points', to='competitions.horse')),
+                ('ranking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_results', to='scoring.competitionranking')),
+                ('rider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_points', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resultado de Puntos de Ranking',
+                'verbose_name_plural': 'Resultados de Puntos de Ranking',
+                'ordering': ['-earned_at'],
+                'indexes': [models.Index(fields=['is_expired', 'expires_at'], name='scoring_ran_is_expi_44b25e_idx'), models.Index(fields=['rider', 'is_expired', '-points'], name='scoring_ran_rider_i_cd0580_idx')],
+                'unique_together': {('ranking', 'rider', 'horse')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RankingStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Puntos totales')),
+                ('counted_results', models.PositiveIntegerField(default=0, verbose_name='Resultados computados')),
+                ('valid_results', models.PositiveIntegerField(default=0, verbose_name='Resultados vigentes')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('rider', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_standing', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Posición en Ranking de Temporada',
+                'verbose_name_plural': 'Posiciones en Ranking de Temporada',
+                'ordering': ['-total_points'],
+                'indexes': [models.Index(fields=['-total_points'], name='scoring_ran_total_p_074e46_idx')],
+            },
+        ),
+    ]
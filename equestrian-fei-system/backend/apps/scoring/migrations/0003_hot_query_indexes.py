@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0005_hot_query_indexes'),
+        ('scoring', '0002_ranking_points'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rankingentry',
+            index=models.Index(fields=['ranking', 'position'], name='scoring_ran_ranking_5233b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scorecard',
+            index=models.Index(fields=['participant', 'status', 'round_number'], name='scoring_sco_partici_671049_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scorecard',
+            index=models.Index(fields=['judge', 'status', '-updated_at'], name='scoring_sco_judge_i_a94ce3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scorecard',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress', 'disputed'])), fields=['judge', '-updated_at'], name='scorecard_judge_open_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0003_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scorecard',
+            index=models.Index(fields=['updated_at', 'id'], name='scorecard_keyset_idx'),
+        ),
+    ]
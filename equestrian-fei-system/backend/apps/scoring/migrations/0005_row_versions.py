@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='individualscore',
+            name='row_version',
+            field=models.PositiveBigIntegerField(default=1, verbose_name='Versión de fila'),
+        ),
+        migrations.AddField(
+            model_name='scorecard',
+            name='row_version',
+            field=models.PositiveBigIntegerField(default=1, verbose_name='Versión de fila'),
+        ),
+    ]
@@ -7,9 +7,13 @@ from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
+from apps.competitions.models import ChangeFeedMixin, Competition, ReferenceDataMixin, RowVersionMixin
 
-class ScoringCriteria(models.Model):
+
+class ScoringCriteria(ReferenceDataMixin, models.Model):
     """Criterios de puntuación para diferentes disciplinas"""
+    REFERENCE_TABLES = ('scoring_criteria',)
+
     CRITERIA_TYPES = [
         ('technical', 'Técnico'),
         ('artistic', 'Artístico'),
@@ -53,7 +57,7 @@ class ScoringCriteria(models.Model):
         return f"{self.discipline.name} - {self.name}"
 
 
-class ScoreCard(models.Model):
+class ScoreCard(ChangeFeedMixin, RowVersionMixin, models.Model):
     """Tarjeta de puntuación para un participante en una competencia"""
     STATUS_CHOICES = [
         ('pending', 'Pendiente'),
@@ -101,12 +105,25 @@ class ScoreCard(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    row_version = models.PositiveBigIntegerField(default=1, verbose_name="Versión de fila")
     
     class Meta:
         verbose_name = "Tarjeta de Puntuación"
         verbose_name_plural = "Tarjetas de Puntuación"
         ordering = ['-created_at']
         unique_together = ['participant', 'judge', 'round_number', 'attempt_number']
+        indexes = [
+            models.Index(fields=['participant', 'status', 'round_number']),
+            models.Index(fields=['judge', 'status', '-updated_at']),
+            # Bandeja de trabajo del juez: solo tarjetas abiertas
+            models.Index(
+                fields=['judge', '-updated_at'],
+                condition=models.Q(status__in=['pending', 'in_progress', 'disputed']),
+                name='scorecard_judge_open_idx',
+            ),
+            # Cursor de paginación (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='scorecard_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"ScoreCard: {self.participant} - {self.judge} - R{self.round_number}"
@@ -157,7 +174,7 @@ class ScoreCard(models.Model):
         self.save()
 
 
-class IndividualScore(models.Model):
+class IndividualScore(ChangeFeedMixin, RowVersionMixin, models.Model):
     """Puntuación individual para cada criterio"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     score_card = models.ForeignKey(ScoreCard, on_delete=models.CASCADE, related_name='individual_scores')
@@ -173,6 +190,7 @@ class IndividualScore(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    row_version = models.PositiveBigIntegerField(default=1, verbose_name="Versión de fila")
     
     class Meta:
         verbose_name = "Puntuación Individual"
@@ -180,8 +198,10 @@ class IndividualScore(models.Model):
         unique_together = ['score_card', 'criteria']
     
     def save(self, *args, **kwargs):
-        # Calcular puntuación ponderada
-        self.weighted_score = Decimal(str(self.raw_score)) * Decimal(str(self.criteria.weight))
+        # Calcular puntuación ponderada (el peso se lee del cache de referencia)
+        from apps.competitions.reference_cache import scoring_criteria
+        criteria = scoring_criteria.get(self.criteria_id) or self.criteria
+        self.weighted_score = Decimal(str(self.raw_score)) * Decimal(str(criteria.weight))
         super().save(*args, **kwargs)
         
         # Recalcular totales de la tarjeta
@@ -365,6 +385,21 @@ class CompetitionRanking(models.Model):
     def __str__(self):
         return f"Ranking: {self.competition.name} - {self.category.name}"
 
+    def save(self, *args, **kwargs):
+        was_final = not self._state.adding and CompetitionRanking.objects.filter(
+            pk=self.pk, is_final=True
+        ).exists()
+        super().save(*args, **kwargs)
+
+        # Otorgar puntos de ranking de temporada al cerrar la clasificación
+        # y retirarlos si se vuelve a abrir
+        if self.is_final and not was_final:
+            from .utils import award_ranking_points
+            award_ranking_points(self)
+        elif was_final and not self.is_final:
+            from .utils import revoke_ranking_points
+            revoke_ranking_points(self)
+
 
 class RankingEntry(models.Model):
     """Entrada individual en una clasificación"""
@@ -399,6 +434,85 @@ class RankingEntry(models.Model):
         verbose_name_plural = "Entradas de Clasificación"
         ordering = ['position']
         unique_together = ['ranking', 'participant']
+        indexes = [
+            models.Index(fields=['ranking', 'position']),
+        ]
     
     def __str__(self):
         return f"#{self.position} - {self.participant} ({self.final_score})"
+
+
+class RankingPointsTable(models.Model):
+    """Tabla de puntos por posición para el ranking de temporada, según el nivel de la competencia"""
+    competition_type = models.CharField(max_length=20, choices=Competition.COMPETITION_TYPES, unique=True, verbose_name="Nivel de competencia")
+    points = models.JSONField(default=list, verbose_name="Puntos por posición", help_text="Lista de puntos: el primer valor corresponde al 1er lugar")
+    is_active = models.BooleanField(default=True, verbose_name="Activa")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Tabla de Puntos de Ranking"
+        verbose_name_plural = "Tablas de Puntos de Ranking"
+        ordering = ['competition_type']
+
+    def __str__(self):
+        return f"Puntos {self.get_competition_type_display()}"
+
+    def points_for(self, position):
+        """Puntos otorgados a una posición (0 si está fuera de la tabla)"""
+        if not position or position > len(self.points):
+            return Decimal('0')
+        return Decimal(str(self.points[position - 1]))
+
+
+class RankingPointsResult(models.Model):
+    """Puntos obtenidos por un jinete en una clasificación final"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ranking = models.ForeignKey(CompetitionRanking, on_delete=models.CASCADE, related_name='points_results')
+    rider = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ranking_points')
+    horse = models.ForeignKey('competitions.Horse', on_delete=models.CASCADE, related_name='ranking_points')
+    competition = models.ForeignKey('competitions.Competition', on_delete=models.CASCADE, related_name='ranking_points')
+
+    position = models.PositiveIntegerField(verbose_name="Posición")
+    points = models.DecimalField(max_digits=8, decimal_places=2, verbose_name="Puntos")
+
+    # Ventana deslizante: el resultado deja de contar al llegar a expires_at
+    earned_at = models.DateTimeField(verbose_name="Obtenido en")
+    expires_at = models.DateTimeField(verbose_name="Expira en")
+    is_expired = models.BooleanField(default=False, verbose_name="Expirado")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Resultado de Puntos de Ranking"
+        verbose_name_plural = "Resultados de Puntos de Ranking"
+        ordering = ['-earned_at']
+        unique_together = ['ranking', 'rider', 'horse']
+        indexes = [
+            models.Index(fields=['is_expired', 'expires_at']),
+            models.Index(fields=['rider', 'is_expired', '-points']),
+        ]
+
+    def __str__(self):
+        return f"{self.rider} - {self.points} pts ({self.competition})"
+
+
+class RankingStanding(models.Model):
+    """Total vigente de puntos de un jinete (mejores N resultados dentro de la ventana)"""
+    rider = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ranking_standing')
+    total_points = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Puntos totales")
+    counted_results = models.PositiveIntegerField(default=0, verbose_name="Resultados computados")
+    valid_results = models.PositiveIntegerField(default=0, verbose_name="Resultados vigentes")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Posición en Ranking de Temporada"
+        verbose_name_plural = "Posiciones en Ranking de Temporada"
+        ordering = ['-total_points']
+        indexes = [
+            models.Index(fields=['-total_points']),
+        ]
+
+    def __str__(self):
+        return f"{self.rider} - {self.total_points} pts"
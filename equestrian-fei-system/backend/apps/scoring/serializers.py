@@ -1,15 +1,17 @@
 from rest_framework import serializers
 from .models import (
     ScoringCriteria, ScoreCard, IndividualScore, JumpingFault,
-    DressageMovement, EventingPhase, CompetitionRanking, RankingEntry
+    DressageMovement, EventingPhase, CompetitionRanking, RankingEntry,
+    RankingStanding
 )
 from apps.competitions.models import Competition, Participant
+from apps.competitions.serializers import ReferenceAttributeField
 from apps.users.models import User
 
 
 class ScoringCriteriaSerializer(serializers.ModelSerializer):
-    discipline_name = serializers.CharField(source='discipline.name', read_only=True)
-    discipline_code = serializers.CharField(source='discipline.code', read_only=True)
+    discipline_name = ReferenceAttributeField('disciplines', 'discipline')
+    discipline_code = ReferenceAttributeField('disciplines', 'discipline', attr='code')
     
     class Meta:
         model = ScoringCriteria
@@ -23,17 +25,17 @@ class ScoringCriteriaSerializer(serializers.ModelSerializer):
 
 
 class IndividualScoreSerializer(serializers.ModelSerializer):
-    criteria_name = serializers.CharField(source='criteria.name', read_only=True)
-    criteria_code = serializers.CharField(source='criteria.code', read_only=True)
+    criteria_name = ReferenceAttributeField('scoring_criteria', 'criteria')
+    criteria_code = ReferenceAttributeField('scoring_criteria', 'criteria', attr='code')
 
     class Meta:
         model = IndividualScore
         fields = [
             'id', 'score_card', 'criteria', 'criteria_name', 'criteria_code',
             'raw_score', 'weighted_score', 'comments', 'time_value',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
-        read_only_fields = ['id', 'weighted_score', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'weighted_score', 'created_at', 'updated_at', 'row_version']
     
     def validate_raw_score(self):
         """Validar que la puntuación esté dentro del rango permitido"""
@@ -106,11 +108,11 @@ class ScoreCardDetailSerializer(serializers.ModelSerializer):
             'penalty_score', 'final_score', 'notes',
             'individual_scores', 'jumping_faults',
             'dressage_movements', 'eventing_phases',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
         read_only_fields = [
             'id', 'participant', 'judge', 'final_score',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'row_version'
         ]
 
 
@@ -149,7 +151,7 @@ class RankingEntrySerializer(serializers.ModelSerializer):
 
 class CompetitionRankingSerializer(serializers.ModelSerializer):
     competition_name = serializers.CharField(source='competition.name', read_only=True)
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = ReferenceAttributeField('categories', 'category')
     entries = RankingEntrySerializer(many=True, read_only=True)
 
     class Meta:
@@ -163,6 +165,20 @@ class CompetitionRankingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'ranking_date']
 
 
+class RankingStandingSerializer(serializers.ModelSerializer):
+    """Serializer para la lista de ranking de temporada"""
+    position = serializers.IntegerField(read_only=True)
+    rider_name = serializers.CharField(source='rider.get_full_name', read_only=True)
+
+    class Meta:
+        model = RankingStanding
+        fields = [
+            'position', 'rider', 'rider_name', 'total_points',
+            'counted_results', 'valid_results', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class ScoreCardCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear nuevos scorecards"""
     
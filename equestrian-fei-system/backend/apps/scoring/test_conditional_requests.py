@@ -0,0 +1,76 @@
+"""
+Tests para peticiones condicionales (ETag / If-None-Match) en resultados
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Category, Competition, Venue
+from .models import CompetitionRanking
+from .utils import invalidate_competition_results
+
+User = get_user_model()
+
+
+class CompetitionRankingLiveETagTest(APITestCase):
+    """Tests para ETags en CompetitionRankingViewSet.live"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='organizer1',
+            email='organizer1@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Test', organizer=self.user, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='in_progress'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        CompetitionRanking.objects.create(
+            competition=self.competition, category=self.category, is_published=True
+        )
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/scoring/rankings/live/?competition={self.competition.id}'
+
+    def test_response_includes_strong_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_matching_etag_returns_304_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_revision_change_returns_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        other_category = Category.objects.create(name='Senior', code='SEN', category_type='age')
+        CompetitionRanking.objects.create(
+            competition=self.competition, category=other_category, is_published=True
+        )
+        invalidate_competition_results(self.competition.id)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
@@ -0,0 +1,222 @@
+"""
+Regresión de planes de consulta (EXPLAIN) para las consultas más frecuentes
+
+Siembra un volumen de datos representativo, actualiza las estadísticas del
+planificador y verifica que ninguna de las consultas calientes recorra
+completa la tabla que filtra (SCAN en SQLite, Seq Scan en PostgreSQL).
+"""
+
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, CompetitionStaff, Horse, Participant, Venue
+from .models import CompetitionRanking, RankingEntry, ScoreCard
+
+User = get_user_model()
+
+COMPETITIONS = 20
+RIDERS = 1000
+JUDGES = 10
+OPEN_STATUSES = ['pending', 'in_progress', 'disputed']
+FINAL_STATUSES = ['completed', 'validated', 'published']
+
+
+def hot_queries(data):
+    """(nombre, tabla vigilada, queryset) de las consultas calientes"""
+    competition = data['competition']
+    category = data['category']
+    participant = data['participant']
+    judge = data['judge']
+    rider = data['rider']
+    ranking = data['ranking']
+    now = timezone.now()
+
+    return [
+        ('scorecards por participante/estado/ronda', 'scoring_scorecard',
+         ScoreCard.objects.filter(participant=participant, status='completed', round_number=1)),
+        ('scorecards del juez por estado', 'scoring_scorecard',
+         ScoreCard.objects.filter(judge=judge, status='completed').order_by('-updated_at')),
+        ('bandeja abierta del juez', 'scoring_scorecard',
+         ScoreCard.objects.filter(judge=judge, status__in=OPEN_STATUSES).order_by('-updated_at')),
+        ('scorecard existente participante/juez', 'scoring_scorecard',
+         ScoreCard.objects.filter(participant=participant, judge=judge)),
+        ('scorecards de una competencia', 'scoring_scorecard',
+         ScoreCard.objects.filter(participant__competition=competition, status='completed')),
+        ('participantes por competencia/categoría', 'competitions_participant',
+         Participant.objects.filter(competition=competition, category=category)),
+        ('participantes confirmados', 'competitions_participant',
+         Participant.objects.filter(competition=competition, is_confirmed=True)),
+        ('participaciones de un jinete', 'competitions_participant',
+         Participant.objects.filter(rider=rider)),
+        ('entradas de clasificación por posición', 'scoring_rankingentry',
+         RankingEntry.objects.filter(ranking=ranking, position__lte=10).order_by('position')),
+        ('clasificación por competencia/categoría', 'scoring_competitionranking',
+         CompetitionRanking.objects.filter(competition=competition, category=category)),
+        ('competencias próximas', 'competitions_competition',
+         Competition.objects.filter(
+             status__in=['published', 'open_registration'], start_date__gte=now
+         ).order_by('start_date')),
+        ('asignaciones del juez', 'competitions_competitionstaff',
+         CompetitionStaff.objects.filter(staff_member=judge, role='judge')),
+        ('personal de una competencia', 'competitions_competitionstaff',
+         CompetitionStaff.objects.filter(competition=competition)),
+        ('scorecards finales de un participante hasta la ronda', 'scoring_scorecard',
+         ScoreCard.objects.filter(
+             participant=participant, status__in=FINAL_STATUSES, round_number__lte=2
+         )),
+        ('historial del juez', 'scoring_scorecard',
+         ScoreCard.objects.filter(judge=judge).order_by('-updated_at')),
+        ('participantes de una categoría por dorsal', 'competitions_participant',
+         Participant.objects.filter(competition=competition, category=category).order_by('bib_number')),
+        ('inscripción existente en una categoría', 'competitions_participant',
+         Participant.objects.filter(competition=competition, category=category, rider=rider)),
+    ] + live_ranking_queries(data)
+
+
+def live_ranking_queries(data):
+    """Consultas de LiveRankingEntry (solo si la app de rankings está instalada)"""
+    if not apps.is_installed('apps.rankings'):
+        return []
+    from apps.rankings.models import LiveRankingEntry
+
+    live_ranking = data['live_ranking']
+    return [
+        ('ranking en vivo por posición', 'rankings_liverankingentry',
+         LiveRankingEntry.objects.filter(ranking=live_ranking).order_by('position')),
+        ('podio del ranking en vivo', 'rankings_liverankingentry',
+         LiveRankingEntry.objects.filter(ranking=live_ranking, position__lte=3).order_by('position')),
+        ('entrada de un participante en el ranking en vivo', 'rankings_liverankingentry',
+         LiveRankingEntry.objects.filter(ranking=live_ranking, participant=data['participant'])),
+    ]
+
+
+def full_scans(plan, table):
+    """Líneas del plan que recorren la tabla completa"""
+    if connection.vendor == 'postgresql':
+        pattern = rf'Seq Scan on {table}\b'
+    else:
+        # "SCAN tabla USING INDEX ..." recorre un índice; solo "SCAN tabla" es la tabla entera
+        pattern = rf'\bSCAN {table}\b(?! USING)'
+    return [line for line in plan.splitlines() if re.search(pattern, line)]
+
+
+class HotQueryPlanTest(TestCase):
+    """Ninguna consulta caliente debe degradarse a un recorrido secuencial"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        judges = User.objects.bulk_create(
+            User(username=f'judge{i}', email=f'judge{i}@test.com', role='judge') for i in range(JUDGES)
+        )
+        riders = User.objects.bulk_create(
+            User(username=f'rider{i}', email=f'rider{i}@test.com') for i in range(RIDERS)
+        )
+        horses = Horse.objects.bulk_create(
+            Horse(
+                name=f'Caballo {i}', registration_number=f'REG-{i}', breed='Criollo', color='Alazán',
+                gender='mare', birth_date='2015-01-01', height=160, owner=rider
+            )
+            for i, rider in enumerate(riders)
+        )
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        categories = Category.objects.bulk_create(
+            Category(name=f'Categoría {i}', code=f'CAT{i}', category_type='level') for i in range(4)
+        )
+        competitions = Competition.objects.bulk_create(
+            Competition(
+                name=f'Copa {i}', organizer=organizer, venue=venue,
+                start_date=now + timedelta(days=i * 7 - 60), end_date=now + timedelta(days=i * 7 - 58),
+                registration_start=now - timedelta(days=90), registration_end=now + timedelta(days=i * 7 - 61),
+                competition_type='national', status=['completed', 'open_registration', 'published'][i % 3]
+            )
+            for i in range(COMPETITIONS)
+        )
+
+        participants = Participant.objects.bulk_create(
+            Participant(
+                competition=competitions[c], rider=riders[r], horse=horses[r],
+                category=categories[r % 4], is_confirmed=r % 2 == 0
+            )
+            for c in range(COMPETITIONS) for r in range(c * 40, c * 40 + 200) if r < RIDERS
+        )
+        statuses = ['pending', 'in_progress', 'completed', 'validated', 'published', 'disputed']
+        ScoreCard.objects.bulk_create(
+            ScoreCard(
+                participant=participant, judge=judges[(i + offset) % JUDGES], round_number=1,
+                status=statuses[(i + offset) % len(statuses)]
+            )
+            for i, participant in enumerate(participants) for offset in range(2)
+        )
+        CompetitionStaff.objects.bulk_create(
+            CompetitionStaff(competition=competition, staff_member=judge, role='judge')
+            for competition in competitions for judge in judges[:4]
+        )
+
+        rankings = CompetitionRanking.objects.bulk_create(
+            CompetitionRanking(competition=competition, category=category)
+            for competition in competitions for category in categories
+        )
+        ranking_by_key = {(r.competition_id, r.category_id): r for r in rankings}
+        RankingEntry.objects.bulk_create(
+            RankingEntry(
+                ranking=ranking_by_key[(p.competition_id, p.category_id)], participant=p,
+                position=i + 1, total_score=Decimal('70'), final_score=Decimal('70')
+            )
+            for i, p in enumerate(participants)
+        )
+        if apps.is_installed('apps.rankings'):
+            from apps.rankings.models import LiveRanking, LiveRankingEntry
+
+            live_rankings = LiveRanking.objects.bulk_create(
+                LiveRanking(competition=competition, name='General') for competition in competitions
+            )
+            live_by_competition = {live.competition_id: live for live in live_rankings}
+            entries = []
+            counts = {}
+            for p in participants:
+                counts[p.competition_id] = counts.get(p.competition_id, 0) + 1
+                entries.append(LiveRankingEntry(
+                    ranking=live_by_competition[p.competition_id], participant=p,
+                    position=counts[p.competition_id], current_score=Decimal('70')
+                ))
+            LiveRankingEntry.objects.bulk_create(entries)
+            live_ranking = live_rankings[5]
+        else:
+            live_ranking = None
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.data = {
+            'competition': competitions[5], 'category': categories[1],
+            'participant': participants[300], 'judge': judges[3], 'rider': riders[250],
+            'ranking': rankings[21], 'live_ranking': live_ranking,
+        }
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('Solo se interpretan planes de SQLite y PostgreSQL')
+
+        queries = hot_queries(self.data)
+        # Las 3 consultas de LiveRankingEntry requieren la app de rankings
+        self.assertEqual(len(queries), 20 if apps.is_installed('apps.rankings') else 17)
+
+        regressions = {}
+        for name, table, queryset in queries:
+            plan = queryset.explain()
+            scans = full_scans(plan, table)
+            if scans:
+                regressions[name] = plan
+        self.assertEqual(regressions, {}, 'Consultas con recorrido secuencial')
@@ -0,0 +1,160 @@
+"""
+Tests para el ranking de temporada (puntos por posición en ventana deslizante)
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from . import utils
+from .models import (
+    CompetitionRanking, RankingEntry, RankingPointsResult,
+    RankingPointsTable, RankingStanding, ScoreCard
+)
+from .utils import expire_ranking_points, get_ranking_list
+
+User = get_user_model()
+
+
+class RankingPointsTest(TestCase):
+    """Tests para el cálculo incremental de puntos de ranking"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        self.venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        RankingPointsTable.objects.create(competition_type='national', points=[20, 15, 10])
+
+        self.riders = []
+        self.horses = []
+        for i in range(3):
+            rider = User.objects.create_user(
+                username=f'rider{i}', email=f'rider{i}@test.com',
+                password='testpass123'
+            )
+            self.riders.append(rider)
+            self.horses.append(Horse.objects.create(
+                name=f'Caballo {i}', registration_number=f'REG-{i}', breed='Criollo',
+                color='Alazán', gender='gelding', birth_date='2015-01-01', height=160, owner=rider
+            ))
+
+    def _final_ranking(self, end_date, order):
+        """Crear una competencia finalizada con los jinetes en el orden dado"""
+        competition = Competition.objects.create(
+            name=f'Copa {end_date:%Y%m%d}', organizer=self.organizer, venue=self.venue,
+            start_date=end_date - timedelta(days=2), end_date=end_date,
+            registration_start=end_date - timedelta(days=30),
+            registration_end=end_date - timedelta(days=3),
+            competition_type='national', status='completed'
+        )
+        ranking = CompetitionRanking.objects.create(competition=competition, category=self.category)
+        for position, index in enumerate(order, start=1):
+            participant = Participant.objects.create(
+                competition=competition, rider=self.riders[index],
+                horse=self.horses[index], category=self.category
+            )
+            RankingEntry.objects.create(
+                ranking=ranking, participant=participant, position=position,
+                total_score=Decimal('70'), final_score=Decimal('70')
+            )
+        ranking.is_final = True
+        ranking.save()
+        return ranking
+
+    def test_marking_final_awards_points(self):
+        self._final_ranking(timezone.now() - timedelta(days=10), [0, 1, 2])
+
+        totals = dict(RankingStanding.objects.values_list('rider_id', 'total_points'))
+        self.assertEqual(totals[self.riders[0].id], Decimal('20'))
+        self.assertEqual(totals[self.riders[2].id], Decimal('10'))
+
+    def test_saving_final_ranking_again_does_not_duplicate_points(self):
+        ranking = self._final_ranking(timezone.now() - timedelta(days=10), [0, 1, 2])
+        ranking.is_published = True
+        ranking.save()
+
+        self.assertEqual(RankingPointsResult.objects.filter(ranking=ranking).count(), 3)
+
+    def test_only_best_results_are_counted(self):
+        now = timezone.now()
+        with mock.patch.object(utils, 'RANKING_POINTS_BEST_RESULTS', 2):
+            self._final_ranking(now - timedelta(days=30), [0, 1, 2])
+            self._final_ranking(now - timedelta(days=20), [2, 0, 1])
+            self._final_ranking(now - timedelta(days=10), [1, 2, 0])
+
+        standing = RankingStanding.objects.get(rider=self.riders[0])
+        self.assertEqual(standing.total_points, Decimal('35'))
+        self.assertEqual(standing.counted_results, 2)
+        self.assertEqual(standing.valid_results, 3)
+
+    def test_results_outside_window_expire(self):
+        now = timezone.now()
+        self._final_ranking(now - timedelta(days=400), [0, 1, 2])
+        self._final_ranking(now - timedelta(days=300), [1, 0, 2])
+
+        self.assertEqual(
+            RankingStanding.objects.get(rider=self.riders[0]).total_points, Decimal('15')
+        )
+
+        expired = expire_ranking_points(now + timedelta(days=70))
+        self.assertEqual(expired, 3)
+        self.assertFalse(RankingStanding.objects.filter(total_points__gt=0).exists())
+
+    def test_ranking_list_positions(self):
+        self._final_ranking(timezone.now() - timedelta(days=10), [2, 0, 1])
+
+        ranking_list = list(get_ranking_list())
+        expected = [self.riders[2].id, self.riders[0].id, self.riders[1].id]
+        self.assertEqual([s.rider_id for s in ranking_list], expected)
+        self.assertEqual([s.position for s in ranking_list], [1, 2, 3])
+
+    def test_reopening_ranking_revokes_points(self):
+        ranking = self._final_ranking(timezone.now() - timedelta(days=10), [0, 1, 2])
+        ranking.is_final = False
+        ranking.save()
+
+        self.assertFalse(RankingPointsResult.objects.filter(ranking=ranking).exists())
+        self.assertFalse(RankingStanding.objects.filter(total_points__gt=0).exists())
+
+    def test_recalculating_final_ranking_reawards_points(self):
+        ranking = self._final_ranking(timezone.now() - timedelta(days=10), [0, 1, 2])
+        for entry, score in zip(ranking.entries.order_by('position'), ['60', '65', '80']):
+            ScoreCard.objects.create(
+                participant=entry.participant, judge=self.organizer,
+                status='completed', final_score=Decimal(score)
+            )
+
+        utils.calculate_competition_ranking(ranking.competition, category=self.category)
+
+        positions = dict(ranking.entries.values_list('participant__rider_id', 'position'))
+        self.assertEqual(positions, {self.riders[2].id: 1, self.riders[1].id: 2, self.riders[0].id: 3})
+        totals = dict(RankingStanding.objects.values_list('rider_id', 'total_points'))
+        self.assertEqual(totals[self.riders[2].id], Decimal('20'))
+        self.assertEqual(totals[self.riders[0].id], Decimal('10'))
+        self.assertEqual(RankingPointsResult.objects.filter(ranking=ranking).count(), 3)
+
+    def test_ranking_list_does_not_write(self):
+        self._final_ranking(timezone.now() - timedelta(days=10), [0, 1, 2])
+        RankingPointsResult.objects.update(expires_at=timezone.now() - timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(get_ranking_list()), 3)
+
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+        # Los resultados vencidos se retiran desde el comando programado
+        call_command('expire_ranking_points', verbosity=0)
+        self.assertEqual(list(get_ranking_list()), [])
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     ScoringCriteriaViewSet, ScoreCardViewSet, IndividualScoreViewSet,
     JumpingFaultViewSet, DressageMovementViewSet, EventingPhaseViewSet,
-    CompetitionRankingViewSet, ScoringStatisticsViewSet
+    CompetitionRankingViewSet, RankingStandingViewSet, ScoringStatisticsViewSet
 )
 
 app_name = 'scoring'
@@ -16,6 +16,7 @@ router.register(r'jumping-faults', JumpingFaultViewSet)
 router.register(r'dressage-movements', DressageMovementViewSet)
 router.register(r'eventing-phases', EventingPhaseViewSet)
 router.register(r'rankings', CompetitionRankingViewSet)
+router.register(r'ranking-points', RankingStandingViewSet)
 router.register(r'statistics', ScoringStatisticsViewSet, basename='scoring-statistics')
 
 urlpatterns = [
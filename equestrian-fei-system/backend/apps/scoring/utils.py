@@ -1,151 +1,103 @@
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, F, Max, Sum, Window
+from django.db.models.functions import Rank
 from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
-from .models import CompetitionRanking, RankingEntry, ScoreCard
+from .models import (
+    CompetitionRanking, RankingEntry, ScoreCard,
+    RankingPointsTable, RankingPointsResult, RankingStanding
+)
+
+
+RANKING_POINTS_WINDOW_DAYS = getattr(settings, 'RANKING_POINTS_WINDOW_DAYS', 365)
+RANKING_POINTS_BEST_RESULTS = getattr(settings, 'RANKING_POINTS_BEST_RESULTS', 6)
+RANKING_STANDINGS_BATCH_SIZE = 2000
+
+
+def competition_results_scope(competition_id):
+    """Ámbito de revisión (ETag) de los resultados publicados de una competencia"""
+    return f'competition_results:{competition_id}'
+
+
+def invalidate_competition_results(competition_id):
+    """Invalidar el ETag de los resultados de una competencia"""
+    from apps.sync.services.cache_service import invalidate_revision
+    invalidate_revision(competition_results_scope(competition_id))
 
 
 def calculate_competition_ranking(competition, discipline=None, category=None):
     """
     Calcular rankings para una competencia específica
+
+    CompetitionRanking es por categoría: ``discipline`` se acepta por
+    compatibilidad pero no separa clasificaciones.
     """
-    # Si no se especifican disciplina y categoría, recalcular todos los rankings
-    if discipline is None and category is None:
-        disciplines = competition.disciplines.all()
-        categories = competition.categories.all()
-        
-        for disc in disciplines:
-            for cat in categories:
-                _calculate_specific_ranking(competition, disc, cat)
-    else:
-        _calculate_specific_ranking(competition, discipline, category)
+    categories = [category] if category is not None else competition.categories.all()
+    for cat in categories:
+        _calculate_specific_ranking(competition, discipline, cat)
+
+    invalidate_competition_results(competition.id)
 
 
 def _calculate_specific_ranking(competition, discipline, category):
     """
-    Calcular ranking para una combinación específica de competencia/disciplina/categoría
+    Calcular la clasificación de una competencia y categoría.
+
+    Una entrada por participante con la suma de sus tarjetas completadas; los
+    empates comparten posición (1, 1, 3). Si la clasificación ya es final,
+    sus puntos de ranking se reemplazan en la misma transacción.
     """
     with transaction.atomic():
-        # Obtener o crear el ranking
         ranking, created = CompetitionRanking.objects.get_or_create(
             competition=competition,
-            discipline=discipline,
             category=category,
-            defaults={
-                'ranking_type': 'general',
-                'calculation_method': 'standard',
-                'is_final': False,
-                'is_published': False
-            }
         )
-        
+        if not created:
+            # Dos recálculos de la misma clasificación no se intercalan
+            ranking = CompetitionRanking.objects.select_for_update().get(pk=ranking.pk)
+
         # Limpiar entradas existentes
         ranking.entries.all().delete()
-        
-        # Obtener scorecards completados para esta combinación
-        scorecards = ScoreCard.objects.filter(
-            competition=competition,
-            participant__categories__in=[category],
+
+        results = ScoreCard.objects.filter(
+            participant__competition=competition,
+            participant__category=category,
             status='completed'
-        ).select_related(
-            'participant__user', 'participant__horse'
-        ).exclude(is_disqualified=True)
-        
-        # Filtrar por disciplina si el participante tiene disciplinas específicas
-        # (esto depende de cómo esté estructurada la relación participante-disciplina)
-        
-        # Ordenar por puntuación final (descendente)
-        scorecards = scorecards.order_by('-final_score', '-technical_score', '-artistic_score')
-        
-        # Crear entradas de ranking
-        position = 1
-        previous_score = None
-        tied_participants = []
-        
-        for i, scorecard in enumerate(scorecards):
-            current_score = scorecard.final_score
-            
-            # Manejar empates
-            is_tied = False
-            if previous_score is not None and current_score == previous_score:
-                is_tied = True
-                position = tied_participants[0].position if tied_participants else position
-                tied_participants.append(scorecard)
-            else:
-                if tied_participants:
-                    # Resolver empates anteriores
-                    _resolve_ties(ranking, tied_participants)
-                    tied_participants = []
-                
-                position = i + 1
-                tied_participants = [scorecard]
-            
-            # Crear entrada de ranking
-            entry = RankingEntry.objects.create(
+        ).values('participant_id').annotate(
+            total_score=Sum('final_score'),
+            total_penalties=Sum('penalty_score'),
+            technical=Sum('technical_score'),
+            artistic=Sum('artistic_score'),
+            time=Sum('time_score'),
+            best_round_score=Max('final_score'),
+            rounds_completed=Count('round_number', distinct=True),
+            position=Window(Rank(), order_by=F('total_score').desc()),
+        ).order_by('position', '-technical', '-artistic', 'participant_id')
+
+        RankingEntry.objects.bulk_create([
+            RankingEntry(
                 ranking=ranking,
-                participant=scorecard.participant,
-                position=position,
-                final_score=scorecard.final_score,
-                technical_score=scorecard.technical_score,
-                artistic_score=scorecard.artistic_score,
-                time_score=scorecard.time_score,
-                penalty_points=scorecard.penalties,
-                is_tied=is_tied
+                participant_id=row['participant_id'],
+                position=row['position'],
+                total_score=row['total_score'],
+                final_score=row['total_score'],
+                total_penalties=row['total_penalties'],
+                technical_score=row['technical'],
+                artistic_score=row['artistic'],
+                time_score=row['time'],
+                best_round_score=row['best_round_score'],
+                rounds_completed=row['rounds_completed'],
             )
-            
-            previous_score = current_score
-        
-        # Resolver empates finales si los hay
-        if tied_participants:
-            _resolve_ties(ranking, tied_participants)
+            for row in results
+        ])
 
+        # Las posiciones cambiaron: los puntos otorgados al cerrarla ya no valen
+        if ranking.is_final:
+            award_ranking_points(ranking)
 
-def _resolve_ties(ranking, tied_scorecards):
-    """
-    Resolver empates usando criterios de desempate
-    """
-    if len(tied_scorecards) <= 1:
-        return
-    
-    # Criterios de desempate en orden de prioridad:
-    # 1. Mayor puntuación técnica
-    # 2. Mayor puntuación artística  
-    # 3. Menor tiempo (si aplicable)
-    # 4. Menores penalizaciones
-    
-    # Ordenar por criterios de desempate
-    tied_scorecards.sort(key=lambda x: (
-        -x.technical_score,  # Mayor técnica (negativo para orden descendente)
-        -x.artistic_score,   # Mayor artística
-        x.time_score if x.time_score else 0,  # Menor tiempo
-        x.penalties          # Menores penalizaciones
-    ))
-    
-    # Actualizar entradas con información de desempate
-    for i, scorecard in enumerate(tied_scorecards):
-        try:
-            entry = RankingEntry.objects.get(
-                ranking=ranking,
-                participant=scorecard.participant
-            )
-            
-            if len(tied_scorecards) > 1 and i > 0:
-                # Generar información de desempate
-                tie_info = []
-                if scorecard.technical_score != tied_scorecards[0].technical_score:
-                    tie_info.append(f"Técnica: {scorecard.technical_score}")
-                if scorecard.artistic_score != tied_scorecards[0].artistic_score:
-                    tie_info.append(f"Artística: {scorecard.artistic_score}")
-                if scorecard.time_score and tied_scorecards[0].time_score:
-                    if scorecard.time_score != tied_scorecards[0].time_score:
-                        tie_info.append(f"Tiempo: {scorecard.time_score}")
-                if scorecard.penalties != tied_scorecards[0].penalties:
-                    tie_info.append(f"Penalizaciones: {scorecard.penalties}")
-                
-                entry.tie_break_info = "; ".join(tie_info)
-                entry.save()
-                
-        except RankingEntry.DoesNotExist:
-            continue
+    return ranking
 
 
 def calculate_fei_jumping_score(time_taken, time_allowed, faults, penalties):
@@ -349,4 +301,170 @@ def validate_scorecard_completion(scorecard):
                 if not phases.filter(phase_type=phase).exists():
                     errors.append(f"Falta fase de concurso completo: {phase}")
     
-    return errors
\ No newline at end of file
+    return errors
+
+
+def award_ranking_points(ranking):
+    """
+    Registrar los puntos de ranking de una clasificación final.
+
+    Solo se recalcula el total de los jinetes presentes en la clasificación,
+    no la lista completa.
+    """
+    competition = ranking.competition
+    if not competition.points_for_ranking:
+        return 0
+
+    table = RankingPointsTable.objects.filter(
+        competition_type=competition.competition_type,
+        is_active=True
+    ).first()
+    if table is None:
+        return 0
+
+    earned_at = competition.end_date
+    expires_at = earned_at + timedelta(days=RANKING_POINTS_WINDOW_DAYS)
+    is_expired = expires_at <= timezone.now()
+
+    results = []
+    entries = ranking.entries.filter(is_eliminated=False).values_list(
+        'position', 'participant__rider_id', 'participant__horse_id'
+    )
+    for position, rider_id, horse_id in entries:
+        points = table.points_for(position)
+        if points <= 0:
+            continue
+        results.append(RankingPointsResult(
+            ranking=ranking,
+            rider_id=rider_id,
+            horse_id=horse_id,
+            competition=competition,
+            position=position,
+            points=points,
+            earned_at=earned_at,
+            expires_at=expires_at,
+            is_expired=is_expired
+        ))
+
+    with transaction.atomic():
+        # Reemplazar puntos previos si la clasificación se vuelve a cerrar
+        affected = set(ranking.points_results.values_list('rider_id', flat=True))
+        ranking.points_results.all().delete()
+        RankingPointsResult.objects.bulk_create(results)
+
+        affected.update(result.rider_id for result in results)
+        refresh_ranking_standings(affected)
+
+    return len(results)
+
+
+def revoke_ranking_points(ranking):
+    """Retirar los puntos de una clasificación que dejó de ser final"""
+    with transaction.atomic():
+        affected = set(ranking.points_results.values_list('rider_id', flat=True))
+        if not affected:
+            return 0
+        revoked, _ = ranking.points_results.all().delete()
+        refresh_ranking_standings(affected)
+    return revoked
+
+
+def expire_ranking_points(now=None):
+    """
+    Expirar los resultados que salieron de la ventana de 12 meses.
+
+    Recorre únicamente el índice (is_expired, expires_at), por lo que el costo
+    depende de los resultados que expiran y no del total acumulado.
+    """
+    now = now or timezone.now()
+    expiring = list(RankingPointsResult.objects.filter(
+        is_expired=False,
+        expires_at__lte=now
+    ).values_list('id', 'rider_id'))
+    if not expiring:
+        return 0
+
+    with transaction.atomic():
+        for start in range(0, len(expiring), RANKING_STANDINGS_BATCH_SIZE):
+            batch = expiring[start:start + RANKING_STANDINGS_BATCH_SIZE]
+            RankingPointsResult.objects.filter(
+                id__in=[result_id for result_id, _ in batch]
+            ).update(is_expired=True)
+
+        refresh_ranking_standings({rider_id for _, rider_id in expiring})
+
+    return len(expiring)
+
+
+def refresh_ranking_standings(rider_ids):
+    """Recalcular el total (mejores N resultados vigentes) de los jinetes indicados"""
+    rider_ids = list(rider_ids)
+    now = timezone.now()
+
+    for start in range(0, len(rider_ids), RANKING_STANDINGS_BATCH_SIZE):
+        batch = rider_ids[start:start + RANKING_STANDINGS_BATCH_SIZE]
+        totals = {rider_id: [Decimal('0'), 0, 0] for rider_id in batch}
+
+        results = RankingPointsResult.objects.filter(
+            rider_id__in=batch,
+            is_expired=False
+        ).order_by('rider_id', '-points').values_list('rider_id', 'points')
+
+        for rider_id, points in results.iterator():
+            total = totals[rider_id]
+            total[2] += 1
+            if total[1] < RANKING_POINTS_BEST_RESULTS:
+                total[0] += points
+                total[1] += 1
+
+        existing = {
+            standing.rider_id: standing
+            for standing in RankingStanding.objects.filter(rider_id__in=batch)
+        }
+        to_create = []
+        to_update = []
+        for rider_id, (total_points, counted, valid) in totals.items():
+            standing = existing.get(rider_id)
+            if standing is None:
+                if valid:
+                    to_create.append(RankingStanding(
+                        rider_id=rider_id,
+                        total_points=total_points,
+                        counted_results=counted,
+                        valid_results=valid
+                    ))
+                continue
+
+            standing.total_points = total_points
+            standing.counted_results = counted
+            standing.valid_results = valid
+            standing.updated_at = now
+            to_update.append(standing)
+
+        RankingStanding.objects.bulk_create(to_create)
+        RankingStanding.objects.bulk_update(
+            to_update, ['total_points', 'counted_results', 'valid_results', 'updated_at']
+        )
+
+
+def rebuild_ranking_standings():
+    """Reconstruir todos los totales desde cero (mantenimiento)"""
+    expire_ranking_points()
+    rider_ids = set(RankingPointsResult.objects.values_list('rider_id', flat=True).distinct())
+    rider_ids.update(RankingStanding.objects.values_list('rider_id', flat=True))
+    refresh_ranking_standings(rider_ids)
+    return len(rider_ids)
+
+
+def get_ranking_list():
+    """
+    Lista de ranking de temporada vigente, con posición calculada en la base de datos.
+
+    Solo lee los totales materializados; la expiración de resultados la
+    ejecuta el comando programado expire_ranking_points.
+    """
+    return RankingStanding.objects.filter(
+        total_points__gt=0
+    ).select_related('rider').annotate(
+        position=Window(Rank(), order_by=F('total_points').desc())
+    ).order_by('-total_points', 'rider_id')
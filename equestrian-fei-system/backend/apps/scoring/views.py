@@ -1,4 +1,4 @@
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, status, permissions, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
@@ -8,21 +8,53 @@ from datetime import datetime, timedelta
 
 from .models import (
     ScoringCriteria, ScoreCard, IndividualScore, JumpingFault,
-    DressageMovement, EventingPhase, CompetitionRanking, RankingEntry
+    DressageMovement, EventingPhase, CompetitionRanking, RankingEntry,
+    RankingStanding
 )
 from .serializers import (
     ScoringCriteriaSerializer, ScoreCardDetailSerializer, ScoreCardListSerializer,
     ScoreCardCreateSerializer, IndividualScoreSerializer, JumpingFaultSerializer,
     DressageMovementSerializer, EventingPhaseSerializer, CompetitionRankingSerializer,
     RankingEntrySerializer, CompetitionScoresSummarySerializer,
-    JudgeScoresSummarySerializer
+    JudgeScoresSummarySerializer, RankingStandingSerializer
 )
 from apps.competitions.models import Competition, Participant
+from apps.competitions.reference_cache import ReferenceListMixin
 from apps.users.permissions import CanJudgeCompetition, CanCreateCompetition
+from apps.sync.pagination import KeysetPagination
+from apps.sync.services.cache_service import conditional_etag, get_cached_revision
+from .utils import competition_results_scope
 
 
-class ScoringCriteriaViewSet(viewsets.ModelViewSet):
+def _competition_results_revision(view, request, *args, **kwargs):
+    """Revisión de los rankings publicados de una competencia"""
+    competition_id = request.query_params.get('competition')
+    if not competition_id:
+        return None
+
+    def load():
+        try:
+            stats = CompetitionRanking.objects.filter(
+                competition_id=competition_id,
+                is_published=True
+            ).aggregate(
+                rankings_count=Count('id', distinct=True),
+                entries_count=Count('entries'),
+                last_update=Max('entries__updated_at')
+            )
+        except (ValueError, TypeError):
+            return None
+
+        last_update = stats['last_update'].isoformat() if stats['last_update'] else ''
+        return f"{stats['rankings_count']}:{stats['entries_count']}:{last_update}"
+
+    return get_cached_revision(competition_results_scope(competition_id), load)
+
+
+class ScoringCriteriaViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     """ViewSet para criterios de puntuación"""
+    reference_table = 'scoring_criteria'
+    reference_active_only = False
     queryset = ScoringCriteria.objects.select_related('discipline').all()
     serializer_class = ScoringCriteriaSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -43,6 +75,18 @@ class ScoringCriteriaViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_discipline(self, request):
         """Obtener criterios agrupados por disciplina"""
+        def group(table):
+            disciplines = {}
+            for criterion in table.all():
+                discipline_name = criterion.discipline.name
+                if discipline_name not in disciplines:
+                    disciplines[discipline_name] = []
+                disciplines[discipline_name].append(table.serialized(criterion.pk))
+            return disciplines
+
+        if self.serves_from_reference_cache(request):
+            return Response(self.get_reference_table().memoize('by_discipline', group))
+
         criteria = self.get_queryset()
         disciplines = {}
         
@@ -65,6 +109,8 @@ class ScoreCardViewSet(viewsets.ModelViewSet):
         'dressage_movements'
     ).all()
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-updated_at', '-id')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -401,6 +447,9 @@ class CompetitionRankingViewSet(viewsets.ModelViewSet):
         ranking = self.get_object()
         ranking.is_published = True
         ranking.save()
+
+        from .utils import invalidate_competition_results
+        invalidate_competition_results(ranking.competition_id)
         
         return Response({'message': 'Ranking publicado correctamente'})
     
@@ -410,11 +459,12 @@ class CompetitionRankingViewSet(viewsets.ModelViewSet):
         ranking = self.get_object()
         
         from .utils import calculate_competition_ranking
-        calculate_competition_ranking(ranking.competition, ranking.discipline, ranking.category)
+        calculate_competition_ranking(ranking.competition, category=ranking.category)
         
         return Response({'message': 'Ranking recalculado correctamente'})
     
     @action(detail=False, methods=['get'])
+    @conditional_etag(_competition_results_revision)
     def live(self, request):
         """Obtener rankings en vivo"""
         competition_id = request.query_params.get('competition')
@@ -433,6 +483,17 @@ class CompetitionRankingViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class RankingStandingViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """ViewSet para la lista de ranking de temporada (mejores resultados en 12 meses)"""
+    queryset = RankingStanding.objects.all()
+    serializer_class = RankingStandingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        from .utils import get_ranking_list
+        return get_ranking_list()
+
+
 class ScoringStatisticsViewSet(viewsets.ViewSet):
     """ViewSet para estadísticas de puntuación"""
     permission_classes = [permissions.IsAuthenticated]
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import SearchDocument
+from .services import rebuild_index
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ['title', 'entity_type', 'object_id', 'subtitle', 'is_public', 'updated_at']
+    list_filter = ['entity_type', 'is_public']
+    search_fields = ['title', 'object_id']
+    readonly_fields = ['entity_type', 'object_id', 'title', 'subtitle', 'search_title', 'search_text', 'is_public', 'updated_at']
+    actions = ['rebuild_search_index']
+
+    def has_add_permission(self, request):
+        return False
+
+    def rebuild_search_index(self, request, queryset):
+        counts = rebuild_index()
+        self.message_user(request, f'Índice reconstruido: {sum(counts.values())} documentos.')
+    rebuild_search_index.short_description = "Reconstruir el índice completo"
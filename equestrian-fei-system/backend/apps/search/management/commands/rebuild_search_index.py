@@ -0,0 +1,29 @@
+"""
+Reconstruir el índice de búsqueda desde los modelos de origen
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.search.models import SearchDocument
+from apps.search.services import REBUILD_BATCH_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Regenera los documentos de búsqueda de jinetes, caballos, competencias y sedes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='entity_types',
+            choices=[choice for choice, _ in SearchDocument.ENTITY_TYPES],
+            help='Tipo de documento a reconstruir (se puede repetir). Por defecto, todos'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+            help='Documentos insertados por lote'
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_index(options['entity_types'], batch_size=options['batch_size'])
+        for entity_type, count in counts.items():
+            self.stdout.write(f'{entity_type}: {count} documentos')
+        self.stdout.write(self.style.SUCCESS(f'Índice reconstruido: {sum(counts.values())} documentos'))
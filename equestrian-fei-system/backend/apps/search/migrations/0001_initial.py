@@ -0,0 +1,93 @@
+from django.db import migrations, models
+
+
+def create_search_indexes(apps, schema_editor):
+    """Índices de texto completo propios de cada motor"""
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "ALTER TABLE search_searchdocument ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', search_title), 'A') || "
+            "setweight(to_tsvector('simple', search_text), 'B')"
+            ") STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX search_doc_vector_gin ON search_searchdocument USING GIN (search_vector)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX search_doc_text_trgm ON search_searchdocument "
+            "USING GIN (search_text gin_trgm_ops)"
+        )
+    elif connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5("
+                "search_title, search_text, content='search_searchdocument', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite compilado sin FTS5: la búsqueda usa icontains
+            return
+        schema_editor.execute(
+            "CREATE TRIGGER search_searchdocument_ai AFTER INSERT ON search_searchdocument BEGIN "
+            "INSERT INTO search_searchdocument_fts(rowid, search_title, search_text) "
+            "VALUES (new.id, new.search_title, new.search_text); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER search_searchdocument_ad AFTER DELETE ON search_searchdocument BEGIN "
+            "INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, search_title, search_text) "
+            "VALUES ('delete', old.id, old.search_title, old.search_text); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER search_searchdocument_au AFTER UPDATE ON search_searchdocument BEGIN "
+            "INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, search_title, search_text) "
+            "VALUES ('delete', old.id, old.search_title, old.search_text); "
+            "INSERT INTO search_searchdocument_fts(rowid, search_title, search_text) "
+            "VALUES (new.id, new.search_title, new.search_text); END"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS search_doc_text_trgm")
+        schema_editor.execute("DROP INDEX IF EXISTS search_doc_vector_gin")
+        schema_editor.execute("ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS search_vector")
+    elif connection.vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS search_searchdocument_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS search_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('rider', 'Jinete'), ('horse', 'Caballo'), ('competition', 'Competencia'), ('venue', 'Sede')], max_length=20, verbose_name='Tipo')),
+                ('object_id', models.CharField(max_length=64, verbose_name='ID del objeto')),
+                ('title', models.CharField(max_length=255, verbose_name='Título')),
+                ('subtitle', models.CharField(blank=True, max_length=255, verbose_name='Subtítulo')),
+                ('search_title', models.CharField(max_length=255, verbose_name='Título normalizado')),
+                ('search_text', models.TextField(verbose_name='Texto normalizado')),
+                ('is_public', models.BooleanField(default=True, verbose_name='Público')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Documento de Búsqueda',
+                'verbose_name_plural': 'Documentos de Búsqueda',
+                'indexes': [models.Index(fields=['entity_type', 'is_public'], name='search_sear_entity__2b6fa2_idx')],
+                'unique_together': {('entity_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
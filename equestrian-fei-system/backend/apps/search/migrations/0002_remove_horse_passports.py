@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def remove_horse_passports(apps, schema_editor):
+    """Regenerar el texto de los caballos ya indexados sin el número de pasaporte"""
+    from apps.search.services import _join, normalize
+
+    Horse = apps.get_model('competitions', 'Horse')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+
+    horses = {
+        str(horse.pk): horse
+        for horse in Horse.objects.exclude(passport_number='').select_related('owner')
+    }
+    documents = list(SearchDocument.objects.filter(entity_type='horse', object_id__in=list(horses)))
+    for document in documents:
+        horse = horses[document.object_id]
+        owner = f'{horse.owner.first_name} {horse.owner.last_name}'.strip() or horse.owner.username
+        document.search_text = normalize(_join(
+            horse.name, horse.registration_number, horse.fei_id, horse.breed, horse.color, owner
+        ))
+    SearchDocument.objects.bulk_update(documents, ['search_text'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0006_row_versions'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_horse_passports, migrations.RunPython.noop),
+    ]
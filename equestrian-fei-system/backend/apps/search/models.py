@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Documento de búsqueda desnormalizado para jinetes, caballos, competencias y sedes.
+
+    search_title y search_text guardan el texto normalizado (minúsculas, sin
+    acentos). La migración agrega el índice propio de cada motor: en PostgreSQL
+    una columna tsvector generada con índice GIN más un índice de trigramas, y
+    en SQLite una tabla FTS5 sincronizada por triggers.
+    """
+    ENTITY_TYPES = [
+        ('rider', 'Jinete'),
+        ('horse', 'Caballo'),
+        ('competition', 'Competencia'),
+        ('venue', 'Sede'),
+    ]
+
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES, verbose_name="Tipo")
+    object_id = models.CharField(max_length=64, verbose_name="ID del objeto")
+
+    # Datos para mostrar en resultados
+    title = models.CharField(max_length=255, verbose_name="Título")
+    subtitle = models.CharField(max_length=255, blank=True, verbose_name="Subtítulo")
+
+    # Texto normalizado indexado
+    search_title = models.CharField(max_length=255, verbose_name="Título normalizado")
+    search_text = models.TextField(verbose_name="Texto normalizado")
+
+    is_public = models.BooleanField(default=True, verbose_name="Público")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Documento de Búsqueda"
+        verbose_name_plural = "Documentos de Búsqueda"
+        unique_together = ['entity_type', 'object_id']
+        indexes = [
+            models.Index(fields=['entity_type', 'is_public']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_type_display()}: {self.title}"
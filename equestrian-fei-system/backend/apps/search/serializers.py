@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    """Resultado de búsqueda con su puntaje de relevancia"""
+    type = serializers.CharField(source='entity_type', read_only=True)
+    id = serializers.CharField(source='object_id', read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SearchDocument
+        fields = ['type', 'id', 'title', 'subtitle', 'score']
+
+    def get_score(self, obj):
+        rank = getattr(obj, 'rank', None)
+        return round(float(rank), 4) if rank is not None else None
@@ -0,0 +1,311 @@
+"""
+Índice de búsqueda: construcción de documentos y consultas por motor
+
+Cada jinete, caballo, competencia y sede tiene un SearchDocument con su texto
+normalizado. Los modelos de origen lo actualizan al guardarse; la consulta usa
+tsvector + trigramas en PostgreSQL, FTS5 en SQLite y icontains en otro caso.
+"""
+
+import re
+import unicodedata
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from .models import SearchDocument
+
+FTS_TABLE = 'search_searchdocument_fts'
+PUBLIC_COMPETITION_STATUSES = ['published', 'open_registration', 'registration_closed', 'in_progress', 'completed']
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+REBUILD_BATCH_SIZE = 1000
+
+
+def normalize(text):
+    """Minúsculas y sin acentos, para indexar y consultar igual en todos los motores"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower().strip()
+
+
+def tokenize(query):
+    """Palabras de la consulta normalizada (solo caracteres alfanuméricos)"""
+    return re.findall(r'\w+', normalize(query))
+
+
+def _join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+# ---------------------------------------------------------------------------
+# Construcción de documentos
+# ---------------------------------------------------------------------------
+
+def _document(entity_type, instance, title, subtitle, text, is_public=True):
+    return SearchDocument(
+        entity_type=entity_type,
+        object_id=str(instance.pk),
+        title=title[:255],
+        subtitle=subtitle[:255],
+        search_title=normalize(title)[:255],
+        search_text=normalize(_join(title, text)),
+        is_public=is_public,
+    )
+
+
+def build_rider_document(user, horse_names=()):
+    title = user.get_full_name() or user.username
+    return _document(
+        'rider', user, title, user.nationality or '',
+        _join(user.username, user.nationality, *sorted(set(horse_names)))
+    )
+
+
+def build_horse_document(horse):
+    owner = horse.owner.get_full_name() or horse.owner.username
+    return _document(
+        'horse', horse, horse.name, _join(horse.breed, horse.color),
+        _join(horse.registration_number, horse.fei_id, horse.breed, horse.color, owner),
+        is_public=horse.is_active
+    )
+
+
+def build_competition_document(competition):
+    venue = competition.venue
+    return _document(
+        'competition', competition, competition.name, f"{venue.city}, {venue.country}",
+        _join(competition.short_name, competition.get_competition_type_display(),
+              venue.name, venue.city, venue.state_province, venue.country),
+        is_public=competition.status in PUBLIC_COMPETITION_STATUSES
+    )
+
+
+def build_venue_document(venue):
+    return _document(
+        'venue', venue, venue.name, f"{venue.city}, {venue.country}",
+        _join(venue.city, venue.state_province, venue.country, venue.address),
+        is_public=venue.is_active
+    )
+
+
+def _rider_horse_names(rider_ids):
+    """{rider_id: [nombres de caballos montados]} en una sola consulta"""
+    from apps.competitions.models import Participant
+
+    names = {}
+    rows = Participant.objects.filter(rider_id__in=rider_ids).values_list('rider_id', 'horse__name').distinct()
+    for rider_id, horse_name in rows:
+        names.setdefault(rider_id, []).append(horse_name)
+    return names
+
+
+def _save_document(document):
+    SearchDocument.objects.update_or_create(
+        entity_type=document.entity_type,
+        object_id=document.object_id,
+        defaults={
+            'title': document.title,
+            'subtitle': document.subtitle,
+            'search_title': document.search_title,
+            'search_text': document.search_text,
+            'is_public': document.is_public,
+        }
+    )
+
+
+def _remove_document(entity_type, object_id):
+    SearchDocument.objects.filter(entity_type=entity_type, object_id=str(object_id)).delete()
+
+
+# ---------------------------------------------------------------------------
+# Sincronización desde los modelos de origen
+# ---------------------------------------------------------------------------
+
+def index_rider(user):
+    """Indexar a un usuario como jinete; se elimina si ya no tiene participaciones"""
+    horse_names = _rider_horse_names([user.pk]).get(user.pk)
+    if horse_names:
+        _save_document(build_rider_document(user, horse_names))
+    else:
+        _remove_document('rider', user.pk)
+
+
+def index_riders(rider_ids):
+    """Reindexar varios jinetes a la vez (p. ej. tras una inscripción masiva con bulk_create)"""
+    rider_ids = list(rider_ids)
+    horse_names = _rider_horse_names(rider_ids)
+    riders = get_user_model().objects.filter(pk__in=horse_names.keys())
+    with transaction.atomic():
+        SearchDocument.objects.filter(entity_type='rider', object_id__in=[str(pk) for pk in rider_ids]).delete()
+        SearchDocument.objects.bulk_create(
+            build_rider_document(rider, horse_names[rider.pk]) for rider in riders
+        )
+
+
+def index_instance(instance):
+    """Actualizar el documento de búsqueda asociado a una instancia guardada"""
+    from apps.competitions.models import Competition, Horse, Participant, Venue
+
+    if isinstance(instance, Participant):
+        index_rider(instance.rider)
+    elif isinstance(instance, Horse):
+        _save_document(build_horse_document(instance))
+        # El nombre del caballo forma parte del documento de sus jinetes
+        riders = get_user_model().objects.filter(participant__horse=instance).distinct()
+        for rider in riders:
+            index_rider(rider)
+    elif isinstance(instance, Competition):
+        _save_document(build_competition_document(instance))
+    elif isinstance(instance, Venue):
+        _save_document(build_venue_document(instance))
+        # Las competencias incluyen los datos de su sede
+        for competition in instance.competition_set.select_related('venue'):
+            _save_document(build_competition_document(competition))
+    elif isinstance(instance, get_user_model()):
+        index_rider(instance)
+
+
+def remove_instance(instance):
+    """Eliminar (o recalcular) el documento de una instancia borrada"""
+    from apps.competitions.models import Competition, Horse, Participant, Venue
+
+    if isinstance(instance, Participant):
+        index_rider(instance.rider)
+    elif isinstance(instance, Horse):
+        _remove_document('horse', instance.pk)
+    elif isinstance(instance, Competition):
+        _remove_document('competition', instance.pk)
+    elif isinstance(instance, Venue):
+        _remove_document('venue', instance.pk)
+    elif isinstance(instance, get_user_model()):
+        _remove_document('rider', instance.pk)
+
+
+def _rebuild_documents(entity_type, queryset, builder, batch_size):
+    SearchDocument.objects.filter(entity_type=entity_type).delete()
+    total = 0
+    batch = []
+    for instance in queryset.iterator(chunk_size=batch_size):
+        batch.append(builder(instance))
+        if len(batch) >= batch_size:
+            SearchDocument.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        SearchDocument.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def rebuild_index(entity_types=None, batch_size=REBUILD_BATCH_SIZE):
+    """Reconstruir el índice completo (o los tipos indicados). Devuelve {tipo: documentos}"""
+    from apps.competitions.models import Competition, Horse, Venue
+
+    User = get_user_model()
+    entity_types = entity_types or [choice for choice, _ in SearchDocument.ENTITY_TYPES]
+    counts = {}
+
+    with transaction.atomic():
+        if 'rider' in entity_types:
+            riders = User.objects.filter(participant__isnull=False).distinct().order_by('pk')
+            rider_ids = list(riders.values_list('pk', flat=True))
+            counts['rider'] = 0
+            SearchDocument.objects.filter(entity_type='rider').delete()
+            for start in range(0, len(rider_ids), batch_size):
+                ids = rider_ids[start:start + batch_size]
+                horse_names = _rider_horse_names(ids)
+                documents = [
+                    build_rider_document(user, horse_names.get(user.pk, ()))
+                    for user in User.objects.filter(pk__in=ids)
+                ]
+                SearchDocument.objects.bulk_create(documents)
+                counts['rider'] += len(documents)
+
+        if 'horse' in entity_types:
+            counts['horse'] = _rebuild_documents(
+                'horse', Horse.objects.select_related('owner').order_by('pk'),
+                build_horse_document, batch_size
+            )
+        if 'competition' in entity_types:
+            counts['competition'] = _rebuild_documents(
+                'competition', Competition.objects.select_related('venue').order_by('pk'),
+                build_competition_document, batch_size
+            )
+        if 'venue' in entity_types:
+            counts['venue'] = _rebuild_documents(
+                'venue', Venue.objects.order_by('pk'), build_venue_document, batch_size
+            )
+
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Consultas
+# ---------------------------------------------------------------------------
+
+def _filters_sql(entity_types, include_private, alias):
+    clauses, params = [], []
+    if entity_types:
+        clauses.append(f"{alias}.entity_type IN ({', '.join(['%s'] * len(entity_types))})")
+        params.extend(entity_types)
+    if not include_private:
+        clauses.append(f"{alias}.is_public = %s")
+        params.append(True)
+    return ''.join(f" AND {clause}" for clause in clauses), params
+
+
+def _search_postgresql(tokens, entity_types, include_private, limit):
+    table = SearchDocument._meta.db_table
+    normalized = ' '.join(tokens)
+    tsquery = ' & '.join(f"{token}:*" for token in tokens)
+    filters, filter_params = _filters_sql(entity_types, include_private, 'd')
+    sql = (
+        f"SELECT d.*, ts_rank(d.search_vector, q) + word_similarity(%s, d.search_text) AS rank "
+        f"FROM {table} d, to_tsquery('simple', %s) q "
+        f"WHERE (d.search_vector @@ q OR %s <%% d.search_text){filters} "
+        f"ORDER BY rank DESC, d.id LIMIT %s"
+    )
+    params = [normalized, tsquery, normalized, *filter_params, limit]
+    return list(SearchDocument.objects.raw(sql, params))
+
+
+def _search_sqlite(tokens, entity_types, include_private, limit):
+    table = SearchDocument._meta.db_table
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    filters, filter_params = _filters_sql(entity_types, include_private, 'd')
+    # bm25 devuelve valores negativos (menor es mejor); el título pesa 10 veces más
+    sql = (
+        f"SELECT d.*, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank "
+        f"FROM {FTS_TABLE} JOIN {table} d ON d.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s{filters} "
+        f"ORDER BY rank DESC, d.id LIMIT %s"
+    )
+    params = [match, *filter_params, limit]
+    return list(SearchDocument.objects.raw(sql, params))
+
+
+def _search_fallback(tokens, entity_types, include_private, limit):
+    queryset = SearchDocument.objects.all()
+    for token in tokens:
+        queryset = queryset.filter(search_text__icontains=token)
+    if entity_types:
+        queryset = queryset.filter(entity_type__in=entity_types)
+    if not include_private:
+        queryset = queryset.filter(is_public=True)
+    documents = list(queryset.order_by('search_title', 'id')[:limit])
+    for document in documents:
+        document.rank = None
+    return documents
+
+
+def search(query, entity_types=None, limit=DEFAULT_LIMIT, include_private=False):
+    """Buscar documentos ordenados por relevancia (cada documento lleva el atributo rank)"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(tokens, entity_types, include_private, limit)
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return _search_sqlite(tokens, entity_types, include_private, limit)
+    return _search_fallback(tokens, entity_types, include_private, limit)
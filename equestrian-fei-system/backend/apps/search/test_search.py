@@ -0,0 +1,117 @@
+"""
+Tests para el índice de búsqueda y el endpoint /api/search/
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from .models import SearchDocument
+from .services import rebuild_index, search
+
+User = get_user_model()
+
+
+class SearchIndexTest(APITestCase):
+    """Tests para la sincronización del índice y la consulta unificada"""
+
+    url = '/api/search/'
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer1', email='organizer1@test.com',
+            password='testpass123', role='organizer'
+        )
+        self.rider = User.objects.create_user(
+            username='mjimenez', email='rider@test.com', password='testpass123',
+            first_name='María', last_name='Jiménez', nationality='Bolivia'
+        )
+        self.venue = Venue.objects.create(
+            name='Club Hípico Los Álamos', address='Av. Principal', city='Cochabamba',
+            state_province='Cochabamba', country='Bolivia'
+        )
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Primavera', organizer=self.organizer, venue=self.venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        self.horse = Horse.objects.create(
+            name='Relámpago', registration_number='BOL-001', breed='Criollo',
+            color='Alazán', gender='gelding', birth_date='2015-01-01', height=160, owner=self.rider
+        )
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.participant = Participant.objects.create(
+            competition=self.competition, rider=self.rider, horse=self.horse, category=self.category
+        )
+        self.client.force_authenticate(self.organizer)
+
+    def _types(self, documents):
+        return {(d.entity_type, d.object_id) for d in documents}
+
+    def test_documents_are_indexed_on_save(self):
+        indexed = set(SearchDocument.objects.values_list('entity_type', 'object_id'))
+        self.assertEqual(indexed, {
+            ('venue', str(self.venue.pk)),
+            ('competition', str(self.competition.pk)),
+            ('horse', str(self.horse.pk)),
+            ('rider', str(self.rider.pk)),
+        })
+
+    def test_search_ignores_accents_and_matches_prefixes(self):
+        results = search('relampa')
+        self.assertEqual([(d.entity_type, d.object_id) for d in results][0], ('horse', str(self.horse.pk)))
+        # El jinete se encuentra por el caballo que monta
+        self.assertIn(('rider', str(self.rider.pk)), self._types(results))
+
+        self.assertIn(('venue', str(self.venue.pk)), self._types(search('alamos cochab')))
+
+    def test_updates_and_deletes_keep_index_in_sync(self):
+        self.venue.city = self.venue.state_province = 'Tarija'
+        self.venue.save()
+        self.assertIn(('competition', str(self.competition.pk)), self._types(search('tarija')))
+        self.assertNotIn(('competition', str(self.competition.pk)), self._types(search('cochabamba')))
+
+        self.participant.delete()
+        self.assertFalse(SearchDocument.objects.filter(entity_type='rider').exists())
+
+    def test_passport_numbers_are_not_searchable(self):
+        self.horse.passport_number = 'PAS-778899'
+        self.horse.save()
+
+        self.assertEqual(search('778899', include_private=True), [])
+
+    def test_draft_competitions_are_private(self):
+        self.competition.status = 'draft'
+        self.competition.save()
+
+        self.assertEqual(search('primavera'), [])
+        self.assertEqual(len(search('primavera', include_private=True)), 1)
+
+    def test_rebuild_index(self):
+        SearchDocument.objects.all().delete()
+
+        counts = rebuild_index()
+
+        self.assertEqual(counts, {'rider': 1, 'horse': 1, 'competition': 1, 'venue': 1})
+        self.assertEqual(len(search('jimenez', entity_types=['rider'])), 1)
+
+    def test_endpoint_returns_ranked_results(self):
+        response = self.client.get(self.url, {'q': 'Copa Primavera', 'type': 'competition,venue'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        result = response.data['results'][0]
+        self.assertEqual(result['type'], 'competition')
+        self.assertEqual(result['id'], str(self.competition.pk))
+        self.assertIsNotNone(result['score'])
+
+    def test_endpoint_validates_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'a'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'q': 'copa', 'type': 'judge'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import SearchViewSet
+
+app_name = 'search'
+
+urlpatterns = [
+    path('', SearchViewSet.as_view({'get': 'list'}), name='search'),
+]
@@ -0,0 +1,49 @@
+from rest_framework import viewsets, status, permissions
+from rest_framework.response import Response
+
+from .models import SearchDocument
+from .serializers import SearchResultSerializer
+from .services import DEFAULT_LIMIT, search, tokenize
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Búsqueda unificada de jinetes, caballos, competencias y sedes
+
+    Parámetros: q (mínimo 2 caracteres), type (lista separada por comas) y limit.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MIN_QUERY_LENGTH = 2
+
+    def list(self, request):
+        query = request.query_params.get('q', '').strip()
+        if len(''.join(tokenize(query))) < self.MIN_QUERY_LENGTH:
+            return Response(
+                {'error': f'La búsqueda requiere al menos {self.MIN_QUERY_LENGTH} caracteres'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        valid_types = {choice for choice, _ in SearchDocument.ENTITY_TYPES}
+        entity_types = [t for t in request.query_params.get('type', '').split(',') if t]
+        invalid = set(entity_types) - valid_types
+        if invalid:
+            return Response(
+                {'error': f'Tipos no válidos: {", ".join(sorted(invalid))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Solo los administradores ven borradores y registros inactivos
+        documents = search(
+            query, entity_types=entity_types, limit=limit,
+            include_private=request.user.is_admin()
+        )
+        return Response({
+            'query': query,
+            'count': len(documents),
+            'results': SearchResultSerializer(documents, many=True).data,
+        })
@@ -0,0 +1,485 @@
+"""
+Formato binario compacto para los datos de sincronización offline
+
+Alternativa a JSON para exportar/importar operaciones offline y para subir
+acciones de una sesión de sincronización. Se negocia por tipo de contenido
+(MEDIA_TYPE en Accept o Content-Type) y se comprime con zstd (si está
+instalado) o gzip según Content-Encoding/Accept-Encoding.
+
+La trama es una secuencia de objetos MessagePack:
+
+    {'v': 1, 'kind': 'operations', 'fields': [...], 'meta': {...}}
+    [valor, valor, ...]          <- un array por registro, en el orden de 'fields'
+    ...
+    {'end': <número de registros>}
+
+Los nombres de campo no se repiten en cada registro; los valores frecuentes
+(tipo de operación, modelo, estado) viajan como índices de tablas fijas, las
+fechas como microsegundos desde epoch, el checksum MD5 como 16 bytes y las
+claves habituales de 'data' como enteros del diccionario DATA_KEYS. Codificar
+y decodificar trabajan por fragmentos, sin armar el contenido completo en
+memoria; al leer, lo descomprimido se limita a MAX_FRAME_SIZE.
+"""
+
+import re
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+import msgpack
+
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+from .change_feed import FEED_MODELS
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional: sin él se usa gzip
+    zstandard = None
+
+MEDIA_TYPE = 'application/vnd.fei.sync+msgpack'
+FORMAT_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_SIZE = 8 * 1024 * 1024
+# Tope del contenido descomprimido de una trama (protege de bombas de compresión)
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+# Tablas compartidas entre servidor y clientes: solo se anexan valores al final
+OPERATION_TYPES = ('create', 'update', 'delete', 'bulk_create', 'bulk_update', 'score_update')
+STATUSES = ('pending', 'processing', 'synced', 'failed', 'conflict', 'completed')
+PRIORITIES = ('low', 'normal', 'high', 'urgent')
+MODEL_NAMES = FEED_MODELS
+DATA_KEYS = (
+    'id', 'scores', 'score', 'notes', 'justification', 'status', 'participant', 'judge',
+    'criteria', 'score_card', 'round_number', 'attempt_number', 'raw_score', 'final_score',
+    'total_score', 'weighted_score', 'percentage', 'technical_score', 'artistic_score',
+    'time_score', 'penalty_score', 'bonus_score', 'execution_time', 'start_time', 'end_time',
+    'competition', 'rider', 'horse', 'category', 'name', 'created_at', 'updated_at',
+    'row_version',
+)
+_DATA_KEY_INDEX = {key: index for index, key in enumerate(DATA_KEYS)}
+_OPERATION_ID = re.compile(r'^offline_([0-9a-f]{32})$')
+_UUID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+UUID_EXT = 1  # tipo de extensión MessagePack: UUID como 16 bytes
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class FormatError(ValueError):
+    """Trama binaria no válida"""
+
+
+# ----------------------------------------------------------------------
+# Valores
+# ----------------------------------------------------------------------
+
+def _encode_choice(value, table):
+    try:
+        return table.index(value)
+    except ValueError:
+        return value  # valores nuevos viajan como texto
+
+
+def _decode_choice(value, table):
+    if isinstance(value, int):
+        try:
+            return table[value]
+        except IndexError:
+            raise FormatError(f'Índice fuera de tabla: {value}')
+    return value
+
+
+def _encode_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _decode_timestamp(value):
+    if value is None:
+        return None
+    seconds, microseconds = divmod(value, 1000000)
+    return datetime.fromtimestamp(seconds, dt_timezone.utc).replace(microsecond=microseconds)
+
+
+def _encode_uuid(value):
+    """UUID en texto canónico -> extensión de 16 bytes (el resto de textos sin cambios)"""
+    if len(value) == 36 and value[8] == '-' and _UUID.match(value):
+        return msgpack.ExtType(UUID_EXT, bytes.fromhex(value.replace('-', '')))
+    return value
+
+
+def _encode_data(value):
+    """Claves conocidas de los diccionarios como enteros y UUID como bytes, recursivamente"""
+    if isinstance(value, dict):
+        return {_DATA_KEY_INDEX.get(key, key): _encode_data(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode_data(item) for item in value]
+    if isinstance(value, str):
+        return _encode_uuid(value)
+    return value
+
+
+def _decode_keys(mapping):
+    """object_hook del unpacker: claves enteras del diccionario compartido a texto"""
+    return {
+        (DATA_KEYS[key] if isinstance(key, int) and 0 <= key < len(DATA_KEYS) else key): item
+        for key, item in mapping.items()
+    }
+
+
+def _ext_hook(code, data):
+    if code == UUID_EXT:
+        hexa = data.hex()
+        return f'{hexa[:8]}-{hexa[8:12]}-{hexa[12:16]}-{hexa[16:20]}-{hexa[20:]}'
+    return msgpack.ExtType(code, data)
+
+
+def _encode_operation_id(value):
+    match = _OPERATION_ID.match(value or '')
+    return bytes.fromhex(match.group(1)) if match else value
+
+
+def _decode_operation_id(value):
+    return f'offline_{value.hex()}' if isinstance(value, bytes) else value
+
+
+def _encode_checksum(value):
+    try:
+        return bytes.fromhex(value) if value else None
+    except ValueError:
+        return value
+
+
+def _decode_checksum(value):
+    return value.hex() if isinstance(value, bytes) else value
+
+
+# ----------------------------------------------------------------------
+# Registros
+# ----------------------------------------------------------------------
+
+class RecordCodec:
+    """
+    Conversión de un tipo de registro a arrays posicionales.
+
+    FIELDS fija el orden; cada campo puede tener un par (codificar,
+    decodificar) en CONVERTERS.
+    """
+    kind = None
+    FIELDS = ()
+    CONVERTERS = {}
+
+    def encode(self, record):
+        row = []
+        for field in self.FIELDS:
+            value = record.get(field)
+            converter = self.CONVERTERS.get(field)
+            row.append(converter[0](value) if converter and value is not None else value)
+        return row
+
+    def decode(self, row, fields=None):
+        record = {}
+        for field, value in zip(fields or self.FIELDS, row):
+            converter = self.CONVERTERS.get(field)
+            record[field] = converter[1](value) if converter and value is not None else value
+        return record
+
+
+class OperationCodec(RecordCodec):
+    """Operaciones offline (formato de OfflineOperation.to_dict, sin user_id: va en la cabecera)"""
+    kind = 'operations'
+    FIELDS = (
+        'operation_id', 'operation_type', 'model_name', 'object_id', 'timestamp', 'status',
+        'sync_attempts', 'checksum', 'data', 'conflict_resolution', 'error_message', 'seq',
+    )
+    CONVERTERS = {
+        'operation_id': (_encode_operation_id, _decode_operation_id),
+        'operation_type': (lambda value: _encode_choice(value, OPERATION_TYPES),
+                           lambda value: _decode_choice(value, OPERATION_TYPES)),
+        'model_name': (lambda value: _encode_choice(value, MODEL_NAMES),
+                       lambda value: _decode_choice(value, MODEL_NAMES)),
+        'status': (lambda value: _encode_choice(value, STATUSES),
+                   lambda value: _decode_choice(value, STATUSES)),
+        'timestamp': (_encode_timestamp, _decode_timestamp),
+        'checksum': (_encode_checksum, _decode_checksum),
+        'object_id': (_encode_uuid, lambda value: value),
+        'data': (_encode_data, lambda value: value),
+    }
+
+
+class ActionCodec(RecordCodec):
+    """Acciones de una sesión de sincronización (campos de add_action)"""
+    kind = 'actions'
+    FIELDS = ('action_type', 'content_type', 'object_id', 'data', 'priority', 'base_version')
+    CONVERTERS = {
+        'action_type': (lambda value: _encode_choice(value, OPERATION_TYPES),
+                        lambda value: _decode_choice(value, OPERATION_TYPES)),
+        'object_id': (lambda value: _encode_uuid(str(value)), lambda value: value),
+        'data': (_encode_data, lambda value: value),
+        'priority': (lambda value: _encode_choice(value, PRIORITIES),
+                     lambda value: _decode_choice(value, PRIORITIES)),
+    }
+
+
+CODECS = {codec.kind: codec for codec in (OperationCodec(), ActionCodec())}
+
+
+# ----------------------------------------------------------------------
+# Compresión
+# ----------------------------------------------------------------------
+
+class _Identity:
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b''
+
+
+_DECODE_ERRORS = (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError, zlib.error)
+if zstandard is not None:
+    _DECODE_ERRORS += (zstandard.ZstdError,)
+
+
+def available_encodings():
+    return ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """'zstd', 'gzip' o None según la cabecera Accept-Encoding"""
+    accepted = {item.split(';')[0].strip().lower() for item in (accept_encoding or '').split(',')}
+    for encoding in available_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def _compressor(encoding):
+    if not encoding or encoding == 'identity':
+        return _Identity()
+    if encoding == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    raise FormatError(f'Codificación no soportada: {encoding}')
+
+
+class _ChunkStream:
+    """Objeto tipo archivo (solo read) sobre un iterable de fragmentos de bytes"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b''
+                return b''
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _inflate(chunks):
+    """gzip por partes: cada llamada entrega como máximo CHUNK_SIZE bytes"""
+    decompressor = zlib.decompressobj(31)
+    for chunk in chunks:
+        data = chunk
+        while True:
+            piece = decompressor.decompress(data, CHUNK_SIZE)
+            if piece:
+                yield piece
+            data = decompressor.unconsumed_tail
+            if not data and len(piece) < CHUNK_SIZE:
+                break
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def _decompressed_chunks(chunks, encoding, limit=None):
+    """
+    Contenido descomprimido en fragmentos de a lo sumo CHUNK_SIZE bytes.
+
+    Nunca se descomprime más de un fragmento por adelantado y el total se
+    corta en ``limit``: unos pocos KB comprimidos no pueden ocupar gigas.
+    """
+    if not encoding or encoding == 'identity':
+        pieces = (
+            chunk[start:start + CHUNK_SIZE] for chunk in chunks for start in range(0, len(chunk), CHUNK_SIZE)
+        )
+    elif encoding == 'gzip':
+        pieces = _inflate(chunks)
+    elif encoding == 'zstd' and zstandard is not None:
+        reader = zstandard.ZstdDecompressor().stream_reader(_ChunkStream(chunks))
+        pieces = iter(lambda: reader.read(CHUNK_SIZE), b'')
+    else:
+        raise FormatError(f'Codificación no soportada: {encoding}')
+
+    limit = MAX_FRAME_SIZE if limit is None else limit
+    total = 0
+    for piece in pieces:
+        total += len(piece)
+        if total > limit:
+            raise FormatError('Trama demasiado grande una vez descomprimida')
+        yield piece
+
+
+# ----------------------------------------------------------------------
+# Tramas
+# ----------------------------------------------------------------------
+
+def iter_encoded(kind, records, meta=None, encoding=None):
+    """Fragmentos (bytes) de la trama comprimida, a medida que se leen los registros"""
+    codec = CODECS[kind]
+    compressor = _compressor(encoding)
+    packer = msgpack.Packer(use_bin_type=True)
+    buffer = bytearray(packer.pack({
+        'v': FORMAT_VERSION, 'kind': kind, 'fields': list(codec.FIELDS), 'meta': meta or {},
+    }))
+
+    count = 0
+    for record in records:
+        buffer += packer.pack(codec.encode(record))
+        count += 1
+        if len(buffer) >= CHUNK_SIZE:
+            chunk = compressor.compress(bytes(buffer))
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    buffer += packer.pack({'end': count})
+    yield compressor.compress(bytes(buffer)) + compressor.flush()
+
+
+def encode(kind, records, meta=None, encoding=None):
+    return b''.join(iter_encoded(kind, records, meta, encoding))
+
+
+class StreamReader:
+    """
+    Lector incremental de una trama: ``header`` y luego los registros al iterar.
+
+    ``chunks`` es cualquier iterable de bytes (p. ej. el cuerpo de la petición
+    leído por bloques).
+    """
+
+    def __init__(self, chunks, kind=None, encoding=None):
+        self._data = _decompressed_chunks(chunks, encoding)
+        self._kind = kind
+        # Las claves y los UUID de 'data' se restauran al desempaquetar (en C)
+        self._unpacker = msgpack.Unpacker(
+            raw=False, strict_map_key=False, max_buffer_size=MAX_RECORD_SIZE,
+            object_hook=_decode_keys, ext_hook=_ext_hook
+        )
+        self._objects = self._iter_objects()
+        self._header = None
+
+    def _iter_objects(self):
+        try:
+            for data in self._data:
+                self._unpacker.feed(data)
+                yield from self._unpacker
+        except msgpack.BufferFull:
+            raise FormatError('Registro demasiado grande')
+        except FormatError:
+            raise
+        except _DECODE_ERRORS as e:
+            raise FormatError(f'Trama no válida: {e}')
+
+    @property
+    def header(self):
+        if self._header is None:
+            header = next(self._objects, None)
+            if not isinstance(header, dict) or header.get('v') != FORMAT_VERSION:
+                raise FormatError('Cabecera no válida o versión no soportada')
+            if header.get('kind') not in CODECS or (self._kind and header['kind'] != self._kind):
+                raise FormatError(f"Tipo de trama no esperado: {header.get('kind')}")
+            self._header = header
+        return self._header
+
+    @property
+    def meta(self):
+        return self.header.get('meta') or {}
+
+    def __iter__(self):
+        header = self.header
+        codec = CODECS[header['kind']]
+        fields = header.get('fields') or codec.FIELDS
+        count = 0
+        for obj in self._objects:
+            if isinstance(obj, dict):
+                if obj.get('end') != count:
+                    raise FormatError('Número de registros no coincide con el cierre de la trama')
+                return
+            if not isinstance(obj, list):
+                raise FormatError('Registro no válido')
+            count += 1
+            try:
+                record = codec.decode(obj, fields)
+            except FormatError:
+                raise
+            except (TypeError, ValueError, OverflowError, OSError) as e:
+                # p. ej. una fecha fuera de rango
+                raise FormatError(f'Registro {count} no válido: {e}')
+            yield record
+        raise FormatError('Trama incompleta')
+
+
+def decode(content, kind=None, encoding=None):
+    reader = StreamReader([content], kind, encoding)
+    return reader.meta, list(reader)
+
+
+def read_chunks(stream, size=CHUNK_SIZE):
+    """Iterar un archivo o stream de entrada por bloques"""
+    return iter(lambda: stream.read(size), b'')
+
+
+# ----------------------------------------------------------------------
+# Integración con DRF
+# ----------------------------------------------------------------------
+
+class SyncBinaryRenderer(BaseRenderer):
+    """
+    Permite negociar MEDIA_TYPE en las vistas que lo aceptan. Las tramas se
+    devuelven con StreamingHttpResponse; este renderer solo serializa las
+    respuestas normales (p. ej. errores) como MessagePack.
+    """
+    media_type = MEDIA_TYPE
+    format = 'fei-msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True, default=str)
+
+
+class SyncBinaryParser(BaseParser):
+    """Cuerpo MEDIA_TYPE: request.data es un StreamReader que lee la entrada por bloques"""
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        encoding = request.META.get('HTTP_CONTENT_ENCODING') if request is not None else None
+        return StreamReader(read_chunks(stream), encoding=encoding)
+
+
+def wants_binary(request):
+    """La negociación de DRF eligió el formato binario"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return isinstance(renderer, SyncBinaryRenderer)
+
+
+def is_binary_body(request):
+    return request.content_type.split(';')[0].strip() == MEDIA_TYPE
@@ -0,0 +1,232 @@
+"""
+Feed de cambios del servidor para la sincronización incremental de clientes
+
+Cada save()/delete() de los modelos sincronizables (ChangeFeedMixin) anexa una
+fila a ChangeFeedEntry en la misma transacción (outbox transaccional). El id
+autoincremental de la fila es el cursor: un cliente pide lo ocurrido después
+de su último cursor y el servidor lee un rango de la clave primaria.
+
+Los ids se asignan al insertar y no al confirmar: una transacción larga puede
+confirmar el id 10 después de que un cliente leyó el 11 y avanzó su cursor,
+y ese cambio no le llegaría nunca. Por eso solo se entregan las filas por
+debajo de un horizonte seguro: la primera fila con menos de
+SYNC_CHANGE_FEED_LAG_SECONDS de antigüedad y todas las posteriores esperan a
+la siguiente petición. Una transacción que tarde más que ese margen en
+confirmar todavía puede quedar atrás.
+
+Dentro de cada página los cambios se compactan: de varias escrituras sobre el
+mismo objeto solo se entrega la última.
+
+Cada fila guarda la competencia a la que pertenece el cambio. Un usuario solo
+recibe los cambios de las competencias que organiza, en las que forma parte
+del personal o en las que está inscrito, y los de los caballos que participan
+en ellas o que son suyos (los borrados de caballos, sin datos, llegan a
+todos); los datos privados (contacto de emergencia,
+pasaporte, notas) solo los recibe quien puede verlos en la API.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+FEED_MODELS = ('Competition', 'Participant', 'ScoreCard', 'IndividualScore', 'Horse')
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+DEFAULT_LAG_SECONDS = 5
+MAX_ID = 2 ** 63 - 1
+
+# Campos que solo reciben el organizador de la competencia y el jinete
+# (participantes) o el propietario (caballos), además de los administradores
+PRIVATE_FIELDS = {
+    'Participant': ('emergency_contact_name', 'emergency_contact_phone', 'special_requirements'),
+    'Horse': ('microchip_number', 'passport_number', 'notes'),
+}
+
+
+def snapshot(instance):
+    """Campos concretos del objeto en formato JSON (las FK como id)"""
+    data = {field.name: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def competition_ids(instances):
+    """
+    Competencia de cada objeto, en orden (None para los caballos).
+
+    Las tarjetas y puntuaciones la toman de su participante o tarjeta: a lo
+    sumo una consulta por modelo, ninguna si el participante ya está cargado.
+    """
+    from apps.competitions.models import Competition, Participant
+    from apps.scoring.models import IndividualScore, ScoreCard
+
+    participant_field = ScoreCard._meta.get_field('participant')
+    participant_ids = {
+        instance.participant_id for instance in instances
+        if isinstance(instance, ScoreCard) and not participant_field.is_cached(instance)
+    }
+    card_ids = {instance.score_card_id for instance in instances if isinstance(instance, IndividualScore)}
+    by_participant = dict(
+        Participant.objects.filter(pk__in=participant_ids).values_list('pk', 'competition_id')
+    ) if participant_ids else {}
+    by_card = dict(
+        ScoreCard.objects.filter(pk__in=card_ids).values_list('pk', 'participant__competition_id')
+    ) if card_ids else {}
+
+    result = []
+    for instance in instances:
+        if isinstance(instance, Competition):
+            result.append(instance.pk)
+        elif isinstance(instance, ScoreCard):
+            if participant_field.is_cached(instance):
+                result.append(instance.participant.competition_id)
+            else:
+                result.append(by_participant.get(instance.participant_id))
+        elif isinstance(instance, IndividualScore):
+            result.append(by_card.get(instance.score_card_id))
+        else:
+            result.append(getattr(instance, 'competition_id', None))
+    return result
+
+
+def _entry(instance, operation, object_id=None, competition_id=None):
+    from .models import ChangeFeedEntry
+
+    return ChangeFeedEntry(
+        model_name=instance.__class__.__name__,
+        object_id=str(object_id if object_id is not None else instance.pk),
+        operation=operation,
+        data=snapshot(instance) if operation == 'upsert' else None,
+        competition_id=competition_id,
+    )
+
+
+def record_change(instance, operation='upsert', object_id=None):
+    """Anexar un cambio al feed (llamar dentro de la transacción del save/delete)"""
+    _entry(instance, operation, object_id, competition_ids([instance])[0]).save()
+
+
+def record_changes(instances, operation='upsert', object_ids=None):
+    """Anexar varios cambios con un solo INSERT (para bulk_create/bulk_update)"""
+    from .models import ChangeFeedEntry
+
+    instances = list(instances)
+    object_ids = object_ids or [None] * len(instances)
+    ChangeFeedEntry.objects.bulk_create(
+        [
+            _entry(instance, operation, object_id, competition_id)
+            for instance, object_id, competition_id in zip(instances, object_ids, competition_ids(instances))
+        ],
+        batch_size=500
+    )
+
+
+def _is_admin(user):
+    return user.is_superuser or getattr(user, 'role', None) == 'admin'
+
+
+def visible_to(queryset, user):
+    """Filas del feed que puede recibir ``user``"""
+    from apps.competitions.models import Competition, Participant
+
+    if _is_admin(user):
+        return queryset
+    competitions = Competition.objects.filter(
+        Q(organizer=user) | Q(staff__staff_member=user) | Q(participants__rider=user)
+    ).values('pk')
+    horses = Participant.objects.filter(competition__in=competitions).values(
+        key=Cast('horse_id', CharField())
+    )
+    # Los borrados de caballos no llevan datos: se entregan a todos
+    return queryset.filter(
+        Q(competition__in=competitions)
+        | Q(model_name='Horse') & (Q(object_id__in=horses) | Q(data__owner=user.pk) | Q(operation='delete'))
+    )
+
+
+def strip_private(changes, user):
+    """Quitar de los cambios los campos privados que ``user`` no puede ver"""
+    from apps.competitions.models import Competition
+
+    if _is_admin(user):
+        return changes
+    organized = None
+    for change in changes:
+        fields = PRIVATE_FIELDS.get(change['model'])
+        data = change['data']
+        if not fields or not data:
+            continue
+        if change['model'] == 'Participant':
+            if organized is None:
+                organized = set(Competition.objects.filter(organizer=user).values_list('pk', flat=True))
+            allowed = data.get('competition') in organized or data.get('rider') == user.pk
+        else:
+            allowed = data.get('owner') == user.pk
+        if not allowed:
+            change['data'] = {key: value for key, value in data.items() if key not in fields}
+    return changes
+
+
+def safe_horizon(cursor, lag=None):
+    """
+    Primer id posterior a ``cursor`` que aún no se puede entregar (expresión).
+
+    Es la fila más antigua escrita en los últimos ``lag`` segundos: los ids
+    menores que ella pertenecen a transacciones que ya tuvieron ese margen
+    para confirmar.
+    """
+    from .models import ChangeFeedEntry
+
+    if lag is None:
+        lag = getattr(settings, 'SYNC_CHANGE_FEED_LAG_SECONDS', DEFAULT_LAG_SECONDS)
+    recent = ChangeFeedEntry.objects.filter(
+        id__gt=cursor, created_at__gt=timezone.now() - timedelta(seconds=lag)
+    ).order_by('id').values('id')[:1]
+    return Coalesce(Subquery(recent), Value(MAX_ID))
+
+
+def read_changes(cursor=0, limit=DEFAULT_LIMIT, models=None, user=None, lag=None):
+    """
+    Cambios posteriores a ``cursor``, compactados, y el cursor siguiente.
+
+    Devuelve (cambios, cursor, has_more). El cursor avanza hasta la última
+    fila leída aunque la compactación haya descartado alguna, y nunca más
+    allá del horizonte seguro (ver safe_horizon). Con ``user`` solo se leen
+    los cambios que puede recibir, sin sus campos privados.
+    """
+    from .models import ChangeFeedEntry
+
+    limit = max(1, min(limit, MAX_LIMIT))
+    queryset = ChangeFeedEntry.objects.filter(id__gt=cursor, id__lt=safe_horizon(cursor, lag))
+    if models:
+        queryset = queryset.filter(model_name__in=models)
+    if user is not None:
+        queryset = visible_to(queryset, user)
+    entries = list(queryset.order_by('id')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        key = (entry.model_name, entry.object_id)
+        latest.pop(key, None)  # reinsertar para ordenar por la última escritura
+        latest[key] = entry
+
+    changes = [
+        {
+            'seq': entry.id,
+            'model': entry.model_name,
+            'id': entry.object_id,
+            'op': entry.operation,
+            'data': entry.data,
+        }
+        for entry in latest.values()
+    ]
+    if user is not None:
+        strip_private(changes, user)
+    next_cursor = entries[-1].id if entries else cursor
+    return changes, next_cursor, has_more
@@ -0,0 +1,201 @@
+"""
+Resolución de conflictos de sincronización en lote
+
+Después de un corte de red pueden quedar miles de conflictos pendientes que
+se resuelven con la misma estrategia automática. BatchConflictResolver
+aplica una estrategia de ConflictResolver sobre un conjunto filtrado
+(competencia, modelo, rango de fechas) por lotes: cada lote es una
+transacción, carga conflictos, acciones y objetos con un IN por tabla,
+aplica los datos ganadores con los caminos en bloque de SyncManager y
+escribe los estados con bulk_update. Tras cada lote se emite el progreso.
+Las puntuaciones (score_update) se reaplican si gana el cliente; las altas
+y bajas se omiten y quedan para la resolución manual.
+"""
+
+import logging
+from typing import Dict, Iterator, List
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .managers import ConflictResolver, SyncManager
+from .models import ConflictResolution
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+AUTO_STRATEGIES = ('server_wins', 'client_wins', 'last_write_wins', 'merge')
+
+# Camino hasta la competencia de los modelos que pueden ser objeto de una
+# SyncAction (object_id es UUID: solo los de clave UUID)
+COMPETITION_LOOKUPS = {
+    ('scoring', 'scorecard'): 'participant__competition',
+    ('scoring', 'individualscore'): 'score_card__participant__competition',
+}
+
+
+class BatchResolutionError(ValueError):
+    """Estrategia o filtros no válidos"""
+
+
+def filter_conflicts(queryset, competition=None, model=None, since=None, until=None):
+    """Conflictos pendientes del queryset que cumplen los filtros"""
+    queryset = queryset.filter(status='pending')
+    if model:
+        queryset = queryset.filter(sync_action__content_type__model=model.lower())
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lte=until)
+    if competition:
+        try:
+            competition = int(competition)
+        except (TypeError, ValueError):
+            raise BatchResolutionError(f"Competencia no válida: {competition}")
+        by_competition = Q()
+        for (app_label, model_name), lookup in COMPETITION_LOOKUPS.items():
+            content_type = ContentType.objects.get_by_natural_key(app_label, model_name)
+            object_ids = content_type.model_class().objects.filter(**{lookup: competition}).values('pk')
+            by_competition |= Q(sync_action__content_type=content_type, sync_action__object_id__in=object_ids)
+        queryset = queryset.filter(by_competition)
+    return queryset
+
+
+class BatchConflictResolver:
+    """Aplica una estrategia automática a muchos conflictos, por lotes"""
+
+    APPLICABLE_ACTIONS = ('update', 'score_update')
+
+    def __init__(self, strategy: str, resolved_by=None, notes: str = '', batch_size: int = BATCH_SIZE):
+        if strategy not in AUTO_STRATEGIES:
+            raise BatchResolutionError(
+                f"Estrategia no válida para resolución en lote: {strategy}. "
+                f"Opciones: {', '.join(AUTO_STRATEGIES)}"
+            )
+        self.strategy = strategy
+        self.resolved_by = resolved_by
+        self.notes = notes
+        self.batch_size = batch_size
+        self.resolver = ConflictResolver()
+        self.manager = SyncManager()
+
+    def run(self, queryset) -> Iterator[Dict]:
+        """
+        Resolver los conflictos del queryset; produce el progreso tras cada lote.
+
+        Los ids se fijan al empezar: los conflictos que aparezcan durante la
+        ejecución quedan para la siguiente.
+        """
+        ids = list(queryset.order_by('created_at', 'id').values_list('pk', flat=True))
+        progress = {'total': len(ids), 'processed': 0, 'resolved': 0, 'skipped': 0, 'failed': 0}
+
+        for start in range(0, len(ids), self.batch_size):
+            batch_ids = ids[start:start + self.batch_size]
+            with transaction.atomic():
+                counts = self._resolve_batch(batch_ids)
+            progress['processed'] += len(batch_ids)
+            for key, value in counts.items():
+                progress[key] += value
+            yield dict(progress)
+
+        logger.info(
+            f"Resolución en lote con {self.strategy}: {progress['resolved']} resueltos, "
+            f"{progress['skipped']} omitidos, {progress['failed']} fallidos de {progress['total']}"
+        )
+
+    def resolve(self, queryset) -> Dict:
+        """Ejecutar hasta el final y devolver el resumen"""
+        progress = {'total': 0, 'processed': 0, 'resolved': 0, 'skipped': 0, 'failed': 0}
+        for progress in self.run(queryset):
+            pass
+        return progress
+
+    def _resolve_batch(self, ids: List) -> Dict:
+        conflicts = list(
+            ConflictResolution.objects.select_for_update(of=('self',))
+            .filter(pk__in=ids, status='pending')
+            .select_related('sync_action__content_type')
+        )
+        actions = [conflict.sync_action for conflict in conflicts]
+        targets = self.manager._prefetch_targets(actions)
+
+        counts = {'resolved': 0, 'skipped': 0, 'failed': 0}
+        to_apply, resolved = {}, {}
+        for conflict in conflicts:
+            action = conflict.sync_action
+            target = targets.get((action.content_type_id, str(action.object_id)))
+            if action.action_type not in self.APPLICABLE_ACTIONS or target is None:
+                # Altas, bajas o un objeto que ya no existe: se dejan pendientes
+                # para resolverlos a mano en lugar de darlos por resueltos
+                counts['skipped'] += 1
+                continue
+            if self._changed_since_conflict(conflict, target):
+                # El servidor volvió a cambiar: la resolución ya no es segura
+                counts['skipped'] += 1
+                continue
+
+            conflict.strategy = self.strategy
+            conflict.resolved_data = self.resolver.get_resolved_data(conflict)
+            changes = self._changes(conflict)
+            if changes:
+                action.data = changes  # solo en memoria: lo que se escribe en el objeto
+                action.content_object = action.sync_target = target
+                to_apply.setdefault((action.content_type_id, action.action_type), []).append(action)
+            resolved[action.pk] = conflict
+
+        score_updates = [
+            action for (_, action_type), group in to_apply.items() if action_type == 'score_update'
+            for action in group
+        ]
+        individual_scores = self.manager._prefetch_individual_scores(score_updates)
+
+        outcomes = {}
+        for (content_type_id, action_type), group in to_apply.items():
+            self.manager._apply_group(action_type, group, outcomes, individual_scores)
+        for action_pk, (status, message) in outcomes.items():
+            if status == 'failed':
+                logger.warning(f"No se pudo aplicar la resolución de la acción {action_pk}: {message}")
+                del resolved[action_pk]
+                counts['failed'] += 1
+
+        now = timezone.now()
+        conflicts = list(resolved.values())
+        for conflict in conflicts:
+            conflict.status = 'resolved'
+            conflict.resolved_at = now
+            conflict.resolved_by = self.resolved_by
+            conflict.resolution_notes = self.notes
+        ConflictResolution.objects.bulk_update(
+            conflicts,
+            ['strategy', 'status', 'resolved_data', 'resolved_at', 'resolved_by', 'resolution_notes'],
+            batch_size=self.batch_size
+        )
+        self.manager._bulk_mark(
+            [conflict.sync_action for conflict in conflicts], status='completed', processed_at=now
+        )
+        counts['resolved'] = len(conflicts)
+        return counts
+
+    def _changed_since_conflict(self, conflict: ConflictResolution, target) -> bool:
+        server_version = conflict.server_data.get('row_version')
+        if server_version is not None and self.manager._is_versioned(type(target)):
+            return target.row_version != server_version
+        return self.manager._get_current_data(target) != conflict.server_data
+
+    def _changes(self, conflict: ConflictResolution) -> Dict:
+        """Campos enviados por el cliente cuyo valor resuelto difiere del servidor"""
+        resolved_data = conflict.resolved_data or {}
+        if conflict.sync_action.action_type == 'score_update':
+            # Las puntuaciones no son campos de la tarjeta: si la estrategia se
+            # queda con las del cliente se reaplican, si no gana el servidor
+            scores = resolved_data.get('scores')
+            return {'scores': scores} if scores else {}
+        return {
+            field: resolved_data[field]
+            for field in conflict.sync_action.data
+            if field in resolved_data
+            and field not in SyncManager.PROTECTED_FIELDS
+            and resolved_data[field] != conflict.server_data.get(field)
+        }
@@ -0,0 +1,110 @@
+"""
+Comparar tamaño y tiempos del formato binario de sincronización frente a JSON
+"""
+
+import gzip
+import hashlib
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.sync import binary_format
+
+
+def scoring_day(judges, participants, rounds, criteria):
+    """Operaciones offline de un día de puntuación (formato de OfflineOperation.to_dict)"""
+    rng = random.Random(42)
+    start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    criteria_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(criteria)]
+    operations = []
+    seq = 0
+    for round_number in range(1, rounds + 1):
+        for participant in range(participants):
+            for judge in range(judges):
+                seq += 1
+                data = {
+                    'scores': [
+                        {
+                            'id': criteria_id,
+                            'score': rng.randrange(0, 21) / 2,
+                            'justification': rng.choice(['', '', 'Buen ritmo', 'Contacto irregular']),
+                        }
+                        for criteria_id in criteria_ids
+                    ],
+                    'round_number': round_number,
+                    'notes': rng.choice(['', 'Sin incidencias', 'Pérdida de cadencia en el giro']),
+                }
+                operations.append({
+                    'operation_id': f'offline_{uuid.UUID(int=rng.getrandbits(128)).hex}',
+                    'seq': seq,
+                    'operation_type': 'update',
+                    'model_name': 'ScoreCard',
+                    'data': data,
+                    'user_id': judge + 1,
+                    'object_id': str(uuid.UUID(int=rng.getrandbits(128))),
+                    'timestamp': (start + timedelta(seconds=seq * 7)).isoformat(),
+                    'status': 'pending',
+                    'sync_attempts': 0,
+                    'conflict_resolution': None,
+                    'error_message': None,
+                    'checksum': hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest(),
+                })
+    return operations
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Mide tamaño y tiempo de codificación del formato binario de sincronización contra JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--judges', type=int, default=5)
+        parser.add_argument('--participants', type=int, default=120)
+        parser.add_argument('--rounds', type=int, default=3)
+        parser.add_argument('--criteria', type=int, default=10, help='Puntuaciones por hoja')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        operations = scoring_day(options['judges'], options['participants'], options['rounds'], options['criteria'])
+        export = {'user_id': 1, 'export_timestamp': timezone.now().isoformat(),
+                  'operations_count': len(operations), 'operations': operations}
+        meta = {'user_id': 1, 'export_timestamp': export['export_timestamp']}
+        repeat = options['repeat']
+
+        def json_encode():
+            return json.dumps({'success': True, 'data': export}, separators=(',', ':'), ensure_ascii=False).encode()
+
+        variants = [
+            ('JSON', json_encode, lambda content: json.loads(content)),
+            ('JSON + gzip', lambda: gzip.compress(json_encode(), 6), lambda content: json.loads(gzip.decompress(content))),
+        ]
+        for encoding in (None,) + binary_format.available_encodings():
+            variants.append((
+                f"MessagePack + {encoding or 'sin comprimir'}",
+                lambda encoding=encoding: binary_format.encode('operations', operations, meta, encoding),
+                lambda content, encoding=encoding: binary_format.decode(content, 'operations', encoding),
+            ))
+
+        self.stdout.write(f'{len(operations)} operaciones ({options["criteria"]} puntuaciones cada una)')
+        self.stdout.write(f"{'Formato':<28}{'Bytes':>12}{'vs JSON':>9}{'Codificar ms':>15}{'Decodificar ms':>16}")
+        baseline = None
+        for name, encode, decode in variants:
+            content = encode()
+            baseline = baseline or len(content)
+            encode_ms = best_time(encode, repeat)
+            decode_ms = best_time(lambda: decode(content), repeat)
+            self.stdout.write(
+                f'{name:<28}{len(content):>12,}{len(content) / baseline:>8.0%}{encode_ms:>15.1f}{decode_ms:>16.1f}'
+            )
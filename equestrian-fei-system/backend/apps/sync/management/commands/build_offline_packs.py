@@ -0,0 +1,58 @@
+"""
+Construir en segundo plano los paquetes offline de los jueces
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.competitions.models import Competition
+from apps.sync.offline_pack import ACTIVE_STATUSES, build_packs
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye los paquetes offline de los jueces de las competencias activas '
+        'cuyos datos cambiaron desde la última versión'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--competition', type=int, action='append', dest='competitions',
+            help='ID de competencia (se puede repetir). Por defecto, las activas'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Reconstruir aunque la huella de los datos no haya cambiado'
+        )
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Repetir indefinidamente cada --interval segundos'
+        )
+        parser.add_argument('--interval', type=float, default=30, help='Segundos entre pasadas con --watch')
+
+    def handle(self, *args, **options):
+        while True:
+            self.build(options)
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+    def build(self, options):
+        queryset = Competition.objects.select_related('organizer', 'venue').prefetch_related(
+            'disciplines', 'categories'
+        ).order_by('pk')
+        if options['competitions']:
+            queryset = queryset.filter(pk__in=options['competitions'])
+        else:
+            queryset = queryset.filter(status__in=ACTIVE_STATUSES)
+
+        packs_count = 0
+        for competition in queryset:
+            packs = build_packs(competition, force=options['force'])
+            packs_count += len(packs)
+            if packs and options['verbosity'] > 1:
+                versions = ', '.join(f'juez {judge_id} v{pack.version}' for judge_id, pack in packs.items())
+                self.stdout.write(f'Competencia {competition.pk}: {versions}')
+
+        self.stdout.write(self.style.SUCCESS(f'{packs_count} paquetes offline al día'))
@@ -0,0 +1,77 @@
+"""
+Resolver en lote los conflictos de sincronización pendientes
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.sync.conflict_batch import (
+    AUTO_STRATEGIES, BATCH_SIZE, BatchConflictResolver, BatchResolutionError, filter_conflicts
+)
+from apps.sync.models import ConflictResolution
+
+
+class Command(BaseCommand):
+    help = (
+        'Aplica una estrategia automática a los conflictos pendientes, por lotes, '
+        'por ejemplo para limpiar después de un corte de red'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategy', required=True, choices=AUTO_STRATEGIES)
+        parser.add_argument('--competition', type=int, help='Solo conflictos de esta competencia')
+        parser.add_argument('--model', help='Solo conflictos de este modelo (p. ej. scorecard)')
+        parser.add_argument('--since', help='Conflictos creados desde esta fecha/hora ISO 8601')
+        parser.add_argument('--until', help='Conflictos creados hasta esta fecha/hora ISO 8601')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--user', help='Usuario que queda como responsable de la resolución')
+        parser.add_argument('--notes', default='', help='Notas de resolución')
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar los conflictos')
+
+    def handle(self, *args, **options):
+        resolved_by = None
+        if options['user']:
+            try:
+                resolved_by = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Usuario no encontrado: {options['user']}")
+
+        try:
+            resolver = BatchConflictResolver(
+                options['strategy'], resolved_by=resolved_by,
+                notes=options['notes'], batch_size=options['batch_size']
+            )
+            queryset = filter_conflicts(
+                ConflictResolution.objects.all(),
+                competition=options['competition'],
+                model=options['model'],
+                since=self.parse_moment(options['since']),
+                until=self.parse_moment(options['until']),
+            )
+        except BatchResolutionError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} conflictos pendientes')
+            return
+
+        progress = {'total': 0, 'resolved': 0, 'skipped': 0, 'failed': 0}
+        for progress in resolver.run(queryset):
+            self.stdout.write(
+                f"{progress['processed']}/{progress['total']}: {progress['resolved']} resueltos, "
+                f"{progress['skipped']} omitidos, {progress['failed']} fallidos"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{progress['resolved']} de {progress['total']} conflictos resueltos con {options['strategy']}"
+        ))
+
+    @staticmethod
+    def parse_moment(value):
+        if not value:
+            return None
+        moment = parse_datetime(value)
+        if moment is None:
+            raise CommandError(f'Fecha no válida: {value}')
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
@@ -4,10 +4,14 @@ Managers para sincronización offline
 import json
 import logging
 from typing import Dict, List, Any, Optional
-from django.db import transaction
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from .models import SyncSession, SyncAction, ConflictResolution, OfflineStorage
+from .change_feed import record_changes
+from .services.notification_service import notification_service
 try:
     from ..scoring.models import ScoreCard, IndividualScore
 except ImportError:
@@ -21,6 +25,11 @@ logger = logging.getLogger(__name__)
 class SyncManager:
     """Manager principal para coordinar sincronización"""
 
+    BULK_BATCH_SIZE = 500
+    CHUNK_SIZE = 200
+    # Campos que el cliente no puede escribir al aplicar una acción
+    PROTECTED_FIELDS = ('id', 'created_at', 'row_version')
+
     def __init__(self):
         self.conflict_resolver = ConflictResolver()
         self.data_validator = DataValidator()
@@ -37,8 +46,13 @@ class SyncManager:
 
     def add_sync_action(self, session: SyncSession, action_type: str,
                        content_object: Any, data: Dict,
-                       priority: str = 'normal') -> SyncAction:
-        """Agregar acción a la cola de sincronización"""
+                       priority: str = 'normal', base_version: int = None) -> SyncAction:
+        """
+        Agregar acción a la cola de sincronización.
+
+        base_version es la row_version que leyó el cliente; sin ella se toma
+        la versión actual del objeto.
+        """
         content_type = ContentType.objects.get_for_model(content_object)
 
         action = SyncAction.objects.create(
@@ -48,7 +62,7 @@ class SyncManager:
             content_type=content_type,
             object_id=content_object.id,
             data=data,
-            original_data=self._get_current_data(content_object)
+            **self._conflict_baseline(content_object, base_version)
         )
 
         # Actualizar contador de acciones en la sesión
@@ -58,52 +72,448 @@ class SyncManager:
         logger.info(f"Acción de sync agregada: {action.id} tipo {action_type}")
         return action
 
-    def process_sync_session(self, session: SyncSession) -> Dict:
-        """Procesar todas las acciones de una sesión"""
+    def add_sync_actions(self, session: SyncSession, records) -> Dict:
+        """
+        Agregar varias acciones a la sesión (las de add_action, en bloque).
+
+        ``records`` es un iterable de diccionarios con action_type,
+        content_type (id), object_id, data, priority y base_version
+        (opcional); puede venir de una
+        trama binaria leída por bloques. Los objetos se cargan con un IN por
+        modelo y las acciones se insertan con bulk_create por lotes.
+
+        Todo corre en una transacción: si la trama resulta no válida a mitad
+        de la lectura (FormatError) no queda ningún lote agregado.
+        """
+        added, errors = 0, []
+        batch = []
+
+        def flush():
+            nonlocal added
+            added += self._create_actions(session, batch, errors)
+            batch.clear()
+
+        with transaction.atomic():
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.BULK_BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+
+            SyncSession.objects.filter(pk=session.pk).update(actions_count=models.F('actions_count') + added)
+        session.refresh_from_db(fields=['actions_count'])
+        logger.info(f"{added} acciones de sync agregadas a la sesión {session.id}")
+        return {'added_count': added, 'errors': errors}
+
+    def _create_actions(self, session: SyncSession, records: List[Dict], errors: List) -> int:
+        ids_by_type = {}
+        for record in records:
+            ids_by_type.setdefault(record.get('content_type'), set()).add(record.get('object_id'))
+
+        objects = {}
+        for content_type_id, object_ids in ids_by_type.items():
+            try:
+                model_class = ContentType.objects.get_for_id(content_type_id).model_class()
+                for obj in model_class.objects.filter(pk__in=object_ids):
+                    objects[(content_type_id, str(obj.pk))] = obj
+            except Exception as e:
+                errors.append(f"content_type {content_type_id}: {e}")
+
+        actions = []
+        for record in records:
+            obj = objects.get((record.get('content_type'), str(record.get('object_id'))))
+            if obj is None or not record.get('action_type') or record.get('data') is None:
+                errors.append(f"Acción no válida para {record.get('content_type')}/{record.get('object_id')}")
+                continue
+            actions.append(SyncAction(
+                sync_session=session,
+                action_type=record['action_type'],
+                priority=record.get('priority') or 'normal',
+                content_type_id=record['content_type'],
+                object_id=obj.pk,
+                data=record['data'],
+                **self._conflict_baseline(obj, record.get('base_version'))
+            ))
+        SyncAction.objects.bulk_create(actions, batch_size=self.BULK_BATCH_SIZE)
+        return len(actions)
+
+    def process_sync_session(self, session: SyncSession, chunk_size: int = None) -> Dict:
+        """
+        Procesar todas las acciones pendientes de una sesión, por lotes.
+
+        Cada lote de chunk_size acciones (SYNC_SESSION_CHUNK_SIZE) es una
+        transacción que toma sus acciones con SELECT ... FOR UPDATE SKIP
+        LOCKED, de modo que dos workers sobre la misma sesión no procesan la
+        misma acción: los bloqueos duran lo que dura un lote y un fallo solo
+        deshace ese lote. Al confirmar un lote se guarda el checkpoint en la
+        sesión y se notifica el progreso; si el proceso se corta, volver a
+        llamar a este método continúa con las acciones aún pendientes.
+
+        Dentro de un lote las acciones se agrupan por modelo y tipo: los
+        objetos afectados se cargan con un IN por modelo, las creaciones y
+        actualizaciones de modelos sin save() propio se aplican con
+        bulk_create/bulk_update y los estados se escriben en bloque. Cada
+        grupo corre en un savepoint; si falla, se reintenta acción por acción
+        para aislar la que falla.
+        """
+        chunk_size = chunk_size or getattr(settings, 'SYNC_SESSION_CHUNK_SIZE', self.CHUNK_SIZE)
+        # Versiones que escribió esta sesión: no son conflicto para sus
+        # acciones siguientes sobre el mismo objeto. Al retomar una sesión
+        # cortada se empieza vacío y esas acciones quedan como conflicto.
+        own_versions = {}
         session.status = 'in_progress'
-        session.save()
+        session.save(update_fields=['status'])
 
         results = {
             'total': session.actions_count,
             'successful': 0,
             'failed': 0,
             'conflicts': 0,
-            'errors': []
+            'errors': [],
+            'chunks': 0,
+            'resumable': False
         }
 
-        try:
-            with transaction.atomic():
-                # Procesar acciones por prioridad
-                actions = session.sync_actions.filter(
-                    status='pending'
-                ).order_by('priority', 'created_at')
+        while True:
+            try:
+                with transaction.atomic():
+                    actions = self._claim_chunk(session, chunk_size)
+                    if not actions:
+                        break
+
+                    self._bulk_mark(actions, status='processing')
+                    outcomes = self._process_actions(actions, own_versions)
+                    self._record_outcomes(actions, outcomes)
+
+                    counts = {'completed': 0, 'failed': 0, 'conflict': 0}
+                    for action in actions:
+                        status, message = outcomes[action.pk]
+                        counts[status] += 1
+                        if status == 'failed':
+                            results['errors'].append(message)
+
+                    session.checkpoint(
+                        successful=counts['completed'], failed=counts['failed'], conflicts=counts['conflict']
+                    )
+
+            except Exception as e:
+                # Solo se deshizo el lote actual: la sesión queda en progreso
+                # y se retoma desde el último checkpoint
+                logger.error(f"Error en sesión de sync {session.id}: {e}")
+                results['errors'].append(str(e))
+                results['resumable'] = True
+                break
+
+            results['successful'] += counts['completed']
+            results['failed'] += counts['failed']
+            results['conflicts'] += counts['conflict']
+            results['chunks'] += 1
+            self._notify_progress(session)
+
+        results['processed'] = session.processed_actions
+        # Si otro worker aún tiene lotes tomados, la cierra él al terminar
+        if not results['resumable'] and not session.sync_actions.filter(status='pending').exists():
+            session.complete(success=session.failed_actions == 0)
 
-                for action in actions:
-                    try:
-                        result = self._process_action(action)
-                        if result['status'] == 'completed':
-                            results['successful'] += 1
-                        elif result['status'] == 'conflict':
-                            results['conflicts'] += 1
-                        else:
-                            results['failed'] += 1
-                    except Exception as e:
-                        action.mark_failed(str(e))
-                        results['failed'] += 1
-                        results['errors'].append(str(e))
-                        logger.error(f"Error procesando acción {action.id}: {e}")
-
-                # Actualizar estadísticas de la sesión
-                session.successful_actions = results['successful']
-                session.failed_actions = results['failed']
-                session.complete(success=results['failed'] == 0)
+        return results
+
+    def _claim_chunk(self, session: SyncSession, chunk_size: int) -> List[SyncAction]:
+        """
+        Tomar el siguiente lote de acciones pendientes, por prioridad.
+
+        Las filas quedan bloqueadas hasta el fin de la transacción del lote y
+        las ya bloqueadas se saltan (SKIP LOCKED): un reintento concurrente de
+        la misma sesión procesa otras acciones en lugar de aplicar dos veces
+        las mismas.
+        """
+        return list(
+            session.sync_actions.filter(status='pending')
+            .select_related('content_type')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('priority', 'created_at', 'id')[:chunk_size]
+        )
 
+    def _notify_progress(self, session: SyncSession):
+        """Enviar el avance de la sesión por WebSocket al dueño del dispositivo"""
+        try:
+            notification_service.send_notification(
+                'sync_progress',
+                recipients=[session.user_id],
+                data={
+                    'session_id': str(session.id),
+                    'device_id': session.device_id,
+                    'processed': session.processed_actions,
+                    'total': session.actions_count,
+                    'successful': session.successful_actions,
+                    'failed': session.failed_actions,
+                    'conflicts': session.conflict_actions
+                }
+            )
         except Exception as e:
-            session.complete(success=False)
-            logger.error(f"Error en sesión de sync {session.id}: {e}")
-            results['errors'].append(str(e))
+            logger.warning(f"No se pudo notificar el progreso de la sesión {session.id}: {e}")
+
+    def _process_actions(self, actions: List[SyncAction], own_versions: Dict = None) -> Dict:
+        """
+        Validar, detectar conflictos y aplicar por grupos; devuelve {pk: (estado, mensaje)}.
+
+        Para los modelos con row_version el conflicto es una comparación de
+        enteros contra los objetos ya cargados; el diff por campos solo se
+        calcula para los conflictos reales.
+        """
+        outcomes = {}
+        own_versions = {} if own_versions is None else own_versions
+        targets = self._prefetch_targets(actions)
+        conflicts = []
+        groups = {}
+
+        for action in actions:
+            key = (action.content_type_id, str(action.object_id))
+            target = targets.get(key)
+
+            if not self.data_validator.validate_action_data(action):
+                outcomes[action.pk] = ('failed', 'Datos inválidos')
+                continue
+
+            # Se compara con el estado anterior al lote
+            if self._has_conflict(action, target, own_versions.get(key)):
+                current_data = self._get_current_data(target)
+                conflicts.append(ConflictResolution(
+                    sync_action=action,
+                    strategy='last_write_wins',  # Estrategia por defecto
+                    server_data=current_data,
+                    client_data=action.data,
+                    conflict_fields=self._identify_conflict_fields(current_data, action.data)
+                ))
+                outcomes[action.pk] = ('conflict', 'Conflicto detectado')
+                continue
+
+            action.sync_target = target
+            if target is not None:
+                # Evita que content_object vuelva a consultar el objeto
+                action.content_object = target
+            groups.setdefault((action.content_type_id, action.action_type), []).append(action)
+
+        ConflictResolution.objects.bulk_create(conflicts, batch_size=self.BULK_BATCH_SIZE)
+
+        score_updates = [action for action in actions if action.action_type == 'score_update']
+        individual_scores = self._prefetch_individual_scores(score_updates)
+
+        for (content_type_id, action_type), group in groups.items():
+            self._apply_group(action_type, group, outcomes, individual_scores)
+
+        for action in actions:
+            target = getattr(action, 'sync_target', None)
+            if outcomes[action.pk][0] == 'completed' and self._is_versioned(type(target)):
+                key = (action.content_type_id, str(action.object_id))
+                own_versions.setdefault(key, set()).add(target.row_version)
+
+        return outcomes
+
+    def _prefetch_targets(self, actions: List[SyncAction]) -> Dict:
+        """
+        Objetos afectados por las acciones: un IN por modelo.
+
+        Se leen con SELECT ... FOR UPDATE (llamar dentro de la transacción
+        del lote): nadie puede cambiarlos entre la comparación de versiones y
+        la escritura.
+        """
+        ids_by_type = {}
+        for action in actions:
+            ids_by_type.setdefault(action.content_type, set()).add(action.object_id)
+
+        targets = {}
+        for content_type, ids in ids_by_type.items():
+            model_class = content_type.model_class()
+            if model_class is None:
+                continue
+            for obj in model_class.objects.filter(pk__in=ids).select_for_update(of=('self',)):
+                targets[(content_type.id, str(obj.pk))] = obj
+        return targets
+
+    def _prefetch_individual_scores(self, actions: List[SyncAction]) -> Dict:
+        """Puntuaciones individuales que tocan las acciones score_update, en una consulta"""
+        if not actions or not IndividualScore:
+            return {}
+        ids = [
+            score_data.get('id')
+            for action in actions
+            for score_data in action.data.get('scores', [])
+            if score_data.get('id')
+        ]
+        return {str(score.pk): score for score in IndividualScore.objects.filter(pk__in=ids)}
+
+    def _apply_group(self, action_type: str, actions: List[SyncAction], outcomes: Dict,
+                     individual_scores: Dict):
+        """Aplicar un grupo de acciones del mismo modelo y tipo"""
+        from apps.competitions.models import RowVersionConflict
+
+        model_class = actions[0].content_type.model_class()
+        bulk_apply = self._bulk_applier(model_class, action_type, actions)
+
+        if bulk_apply:
+            try:
+                with transaction.atomic():
+                    bulk_apply(model_class, actions)
+                for action in actions:
+                    outcomes[action.pk] = ('completed', '')
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Fallo aplicando en bloque {len(actions)} acciones {action_type} de "
+                    f"{model_class.__name__}, se reintentan una a una: {e}"
+                )
+                # Los objetos en memoria pueden tener cambios del intento fallido
+                if action_type == 'update':
+                    for obj in {action.sync_target.pk: action.sync_target for action in actions}.values():
+                        obj.refresh_from_db()
+
+        for action in actions:
+            try:
+                with transaction.atomic():
+                    if action.action_type == 'score_update':
+                        self._apply_score_update_action(action, individual_scores)
+                    else:
+                        self._apply_action(action)
+                outcomes[action.pk] = ('completed', '')
+            except RowVersionConflict as e:
+                # Otro proceso guardó el objeto después de leerlo
+                logger.warning(f"Conflicto de versión en la acción {action.id}: {e}")
+                action.content_object.refresh_from_db()
+                self._create_conflict_resolution(action)
+                outcomes[action.pk] = ('conflict', 'Conflicto detectado')
+            except Exception as e:
+                logger.error(f"Error procesando acción {action.id}: {e}")
+                outcomes[action.pk] = ('failed', str(e))
+
+    @staticmethod
+    def _uses_default_persistence(model_class) -> bool:
+        """
+        Los bulk_* se saltan save()/delete(): solo se usan si el modelo no los
+        redefine. ChangeFeedMixin y RowVersionMixin se admiten porque los
+        caminos en bloque registran el feed e incrementan la versión ellos mismos.
+        """
+        from apps.competitions.models import ChangeFeedMixin, RowVersionMixin
+
+        if model_class is None:
+            return False
+        for klass in model_class.__mro__:
+            if klass in (ChangeFeedMixin, RowVersionMixin, models.Model):
+                continue
+            if 'save' in vars(klass) or 'delete' in vars(klass):
+                return False
+        return True
 
-        return results
+    @staticmethod
+    def _is_versioned(model_class) -> bool:
+        from apps.competitions.models import RowVersionMixin
+        return isinstance(model_class, type) and issubclass(model_class, RowVersionMixin)
+
+    @staticmethod
+    def _feeds_changes(model_class) -> bool:
+        from apps.competitions.models import ChangeFeedMixin
+        return issubclass(model_class, ChangeFeedMixin)
+
+    def _bulk_applier(self, model_class, action_type: str, actions: List[SyncAction]):
+        """Función de aplicación en bloque para el grupo, o None si debe ir una a una"""
+        if len(actions) < 2 or not self._uses_default_persistence(model_class):
+            return None
+        if action_type == 'create':
+            return self._bulk_create_actions
+        if action_type in ('update', 'delete'):
+            # Sin objeto la acción falla (update) o no hace nada (delete) una a una
+            if any(action.sync_target is None for action in actions):
+                return None
+            if action_type == 'delete':
+                return self._bulk_delete_actions
+            field_names = {field.name for field in model_class._meta.concrete_fields}
+            if all(
+                field in field_names
+                for action in actions for field in action.data
+                if hasattr(action.content_object, field) and field not in self.PROTECTED_FIELDS
+            ):
+                return self._bulk_update_actions
+        return None
+
+    def _bulk_create_actions(self, model_class, actions: List[SyncAction]):
+        objects = []
+        for action in actions:
+            data = action.data.copy()
+            data.pop('id', None)
+            data.pop('created_at', None)
+            data.pop('updated_at', None)
+            data.pop('row_version', None)
+            objects.append(model_class(**data))
+        model_class.objects.bulk_create(objects, batch_size=self.BULK_BATCH_SIZE)
+        if self._feeds_changes(model_class):
+            record_changes(objects)
+        logger.info(f"Objetos creados en bloque: {model_class.__name__} x{len(objects)}")
+
+    def _bulk_update_actions(self, model_class, actions: List[SyncAction]):
+        objects = {}
+        fields = set()
+        versioned = self._is_versioned(model_class)
+        for action in actions:
+            obj = action.content_object
+            for field, value in action.data.items():
+                if hasattr(obj, field) and field not in self.PROTECTED_FIELDS:
+                    setattr(obj, field, value)
+                    fields.add(field)
+            # Una versión por acción, como si se hubieran guardado una a una
+            if versioned:
+                obj.row_version += 1
+            objects[obj.pk] = obj
+        if versioned:
+            fields.add('row_version')
+
+        # bulk_update no aplica auto_now: se resuelve como lo haría save()
+        for field in model_class._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for obj in objects.values():
+                    field.pre_save(obj, add=False)
+                fields.add(field.name)
+
+        if fields:
+            model_class.objects.bulk_update(list(objects.values()), sorted(fields), batch_size=self.BULK_BATCH_SIZE)
+            if self._feeds_changes(model_class):
+                record_changes(objects.values())
+        logger.info(f"Objetos actualizados en bloque: {model_class.__name__} x{len(objects)}")
+
+    def _bulk_delete_actions(self, model_class, actions: List[SyncAction]):
+        objects = [action.content_object for action in actions]
+        object_ids = [obj.pk for obj in objects]
+        model_class.objects.filter(pk__in=object_ids).delete()
+        if self._feeds_changes(model_class):
+            record_changes(objects, 'delete', object_ids)
+        logger.info(f"Objetos eliminados en bloque: {model_class.__name__} x{len(actions)}")
+
+    def _bulk_mark(self, actions: List[SyncAction], **changes):
+        """UPDATE de estado para varias acciones, por lotes de ids"""
+        ids = [action.pk for action in actions]
+        changes.setdefault('updated_at', timezone.now())
+        for start in range(0, len(ids), self.BULK_BATCH_SIZE):
+            SyncAction.objects.filter(pk__in=ids[start:start + self.BULK_BATCH_SIZE]).update(**changes)
+
+    def _record_outcomes(self, actions: List[SyncAction], outcomes: Dict):
+        """Escribir los estados finales: un UPDATE para las completadas, bulk_update para el resto"""
+        now = timezone.now()
+        completed = [action for action in actions if outcomes[action.pk][0] == 'completed']
+        self._bulk_mark(completed, status='completed', processed_at=now)
+
+        others = []
+        for action in actions:
+            status, message = outcomes[action.pk]
+            if status == 'completed':
+                continue
+            action.status = status
+            action.error_message = message or action.error_message
+            if status == 'failed':
+                action.retry_count += 1
+            action.updated_at = now
+            others.append(action)
+        SyncAction.objects.bulk_update(
+            others, ['status', 'error_message', 'retry_count', 'updated_at'], batch_size=self.BULK_BATCH_SIZE
+        )
 
     def _process_action(self, action: SyncAction) -> Dict:
         """Procesar una acción individual"""
@@ -129,13 +539,24 @@ class SyncManager:
             action.mark_failed(str(e))
             return {'status': 'failed', 'error': str(e)}
 
-    def _has_conflict(self, action: SyncAction) -> bool:
-        """Detectar si hay conflicto con datos del servidor"""
+    def _has_conflict(self, action: SyncAction, current_object=None, own_versions=None) -> bool:
+        """
+        Detectar si hay conflicto con datos del servidor.
+
+        Con row_version basta comparar la versión que leyó el cliente con la
+        actual (own_versions son las que escribió la propia sesión). Los
+        modelos sin versión comparan la copia de los datos originales.
+        """
         try:
-            current_object = action.content_object
+            if current_object is None:
+                current_object = action.content_object
             if not current_object:
                 return False
 
+            if action.base_version is not None and self._is_versioned(type(current_object)):
+                current_version = current_object.row_version
+                return current_version != action.base_version and current_version not in (own_versions or ())
+
             current_data = self._get_current_data(current_object)
             original_data = action.original_data
 
@@ -159,6 +580,15 @@ class SyncManager:
 
         return conflict
 
+    def _conflict_baseline(self, obj, base_version: int = None) -> Dict:
+        """Lo que guarda la acción para detectar conflictos: la versión o una copia de los datos"""
+        if self._is_versioned(type(obj)):
+            return {
+                'base_version': base_version if base_version is not None else obj.row_version,
+                'original_data': None,
+            }
+        return {'base_version': None, 'original_data': self._get_current_data(obj)}
+
     def _identify_conflict_fields(self, server_data: Dict, client_data: Dict) -> List[str]:
         """Identificar campos específicos en conflicto"""
         conflict_fields = []
@@ -191,6 +621,7 @@ class SyncManager:
         data.pop('id', None)
         data.pop('created_at', None)
         data.pop('updated_at', None)
+        data.pop('row_version', None)
 
         obj = model_class.objects.create(**data)
         logger.info(f"Objeto creado: {model_class.__name__} {obj.id}")
@@ -205,7 +636,7 @@ class SyncManager:
 
         # Actualizar campos permitidos
         for field, value in data.items():
-            if hasattr(obj, field) and field not in ['id', 'created_at']:
+            if hasattr(obj, field) and field not in self.PROTECTED_FIELDS:
                 setattr(obj, field, value)
 
         obj.save()
@@ -218,8 +649,13 @@ class SyncManager:
             obj.delete()
             logger.info(f"Objeto eliminado: {obj.__class__.__name__} {action.object_id}")
 
-    def _apply_score_update_action(self, action: SyncAction):
-        """Aplicar actualización de puntuación"""
+    def _apply_score_update_action(self, action: SyncAction, individual_scores: Dict = None):
+        """
+        Aplicar actualización de puntuación.
+
+        individual_scores ({id: IndividualScore}) evita una consulta por
+        puntuación cuando se procesan varias acciones.
+        """
         if not ScoreCard or not IndividualScore:
             raise ValueError("Modelos de scoring no disponibles")
 
@@ -232,13 +668,19 @@ class SyncManager:
 
         # Actualizar puntuaciones
         for score_data in scores_data:
-            individual_score = IndividualScore.objects.filter(
-                id=score_data.get('id')
-            ).first()
+            if individual_scores is not None:
+                individual_score = individual_scores.get(str(score_data.get('id')))
+            else:
+                individual_score = IndividualScore.objects.filter(
+                    id=score_data.get('id')
+                ).first()
 
             if individual_score:
-                individual_score.score = score_data.get('score')
-                individual_score.notes = score_data.get('justification', '')
+                individual_score.raw_score = score_data.get('score')
+                individual_score.comments = score_data.get('justification', '')
+                # Recalcula y guarda la tarjeta ya cargada (y bloqueada), no
+                # una copia: su row_version sigue siendo la vigente
+                individual_score.score_card = score_card
                 individual_score.save()
 
         # Recalcular totales si el método existe
@@ -256,14 +698,17 @@ class SyncManager:
         data = {}
         for field in obj._meta.fields:
             if field.name not in ['password']:  # Excluir campos sensibles
-                value = getattr(obj, field.name)
+                # attname: para las ForeignKey se lee el id sin cargar el objeto
+                value = getattr(obj, field.attname)
                 if hasattr(value, 'isoformat'):  # Fechas
                     value = value.isoformat()
                 elif hasattr(value, 'id'):  # ForeignKeys
                     value = value.id
                 data[field.name] = value
 
-        return data
+        # Mismo formato que al guardarlo en JSONField (UUID y Decimal como
+        # texto), para poder compararlo con original_data
+        return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
 
 
 class ConflictResolver:
@@ -276,19 +721,9 @@ class ConflictResolver:
             conflict.strategy = strategy
 
         try:
-            if conflict.strategy == 'server_wins':
-                resolved_data = conflict.server_data
-            elif conflict.strategy == 'client_wins':
-                resolved_data = conflict.client_data
-            elif conflict.strategy == 'last_write_wins':
-                resolved_data = self._apply_last_write_wins(conflict)
-            elif conflict.strategy == 'manual_resolution':
-                # Esperamos que resolved_data ya esté establecido manualmente
-                resolved_data = conflict.resolved_data
-                if not resolved_data:
-                    return False
-            else:
-                resolved_data = self._apply_merge_strategy(conflict)
+            resolved_data = self.get_resolved_data(conflict)
+            if conflict.strategy == 'manual_resolution' and not resolved_data:
+                return False
 
             conflict.resolve(resolved_data, resolved_by)
             return True
@@ -297,6 +732,19 @@ class ConflictResolver:
             logger.error(f"Error resolviendo conflicto {conflict.id}: {e}")
             return False
 
+    def get_resolved_data(self, conflict: ConflictResolution) -> Optional[Dict]:
+        """Datos que resultan de la estrategia del conflicto, sin guardar nada"""
+        if conflict.strategy == 'server_wins':
+            return conflict.server_data
+        elif conflict.strategy == 'client_wins':
+            return conflict.client_data
+        elif conflict.strategy == 'last_write_wins':
+            return self._apply_last_write_wins(conflict)
+        elif conflict.strategy == 'manual_resolution':
+            # Esperamos que resolved_data ya esté establecido manualmente
+            return conflict.resolved_data
+        return self._apply_merge_strategy(conflict)
+
     def _apply_last_write_wins(self, conflict: ConflictResolution) -> Dict:
         """Aplicar estrategia 'última escritura gana'"""
         action = conflict.sync_action
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='syncaction',
+            index=models.Index(fields=['created_at', 'id'], name='syncaction_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='syncrecord',
+            index=models.Index(fields=['created_at', 'id'], name='syncrecord_keyset_idx'),
+        ),
+    ]
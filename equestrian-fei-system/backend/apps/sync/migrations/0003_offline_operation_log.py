@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0002_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfflineLogOffset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=100, verbose_name='Consumidor')),
+                ('last_seq', models.BigIntegerField(default=0, verbose_name='Última posición procesada')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_log_offsets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Posición de Consumidor Offline',
+                'verbose_name_plural': 'Posiciones de Consumidores Offline',
+                'unique_together': {('consumer', 'user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='OfflineOperationLog',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('operation_id', models.CharField(max_length=64, unique=True, verbose_name='ID de operación')),
+                ('operation_type', models.CharField(max_length=20, verbose_name='Tipo de operación')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('object_id', models.CharField(blank=True, max_length=64, verbose_name='ID del objeto')),
+                ('data', models.JSONField(verbose_name='Datos de la operación')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Checksum')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('synced', 'Sincronizado'), ('failed', 'Fallido'), ('conflict', 'Conflicto')], default='pending', max_length=20, verbose_name='Estado')),
+                ('sync_attempts', models.IntegerField(default=0, verbose_name='Intentos de sincronización')),
+                ('conflict_resolution', models.CharField(blank=True, max_length=20, verbose_name='Resolución de conflicto')),
+                ('error_message', models.TextField(blank=True, verbose_name='Mensaje de error')),
+                ('claim_token', models.CharField(blank=True, max_length=32, verbose_name='Token de procesamiento')),
+                ('timestamp', models.DateTimeField(verbose_name='Fecha de la operación')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_operations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Operación Offline',
+                'verbose_name_plural': 'Log de Operaciones Offline',
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['user', 'status', 'seq'], name='offline_op_user_status_idx'), models.Index(fields=['status', 'seq'], name='offline_op_status_idx')],
+            },
+        ),
+    ]
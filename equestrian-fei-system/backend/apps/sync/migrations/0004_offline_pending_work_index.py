@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0003_offline_operation_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offlineoperationlog',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'processing'])), fields=['user', 'seq'], name='offline_op_pending_user_idx'),
+        ),
+    ]
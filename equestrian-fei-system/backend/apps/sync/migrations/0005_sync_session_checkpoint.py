@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0004_offline_pending_work_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncsession',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Último checkpoint'),
+        ),
+        migrations.AddField(
+            model_name='syncsession',
+            name='conflict_actions',
+            field=models.IntegerField(default=0, verbose_name='Acciones en conflicto'),
+        ),
+        migrations.AddField(
+            model_name='syncsession',
+            name='processed_actions',
+            field=models.IntegerField(default=0, verbose_name='Acciones procesadas'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0005_sync_session_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeFeedEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('object_id', models.CharField(max_length=64, verbose_name='ID del objeto')),
+                ('operation', models.CharField(choices=[('upsert', 'Creado/Actualizado'), ('delete', 'Eliminado')], max_length=10, verbose_name='Operación')),
+                ('data', models.JSONField(blank=True, null=True, verbose_name='Datos')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio del Servidor',
+                'verbose_name_plural': 'Feed de Cambios',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model_name', 'id'], name='changefeed_model_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0005_hot_query_indexes'),
+        ('sync', '0006_change_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfflinePack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Versión')),
+                ('source_fingerprint', models.CharField(max_length=40, verbose_name='Huella de los datos de origen')),
+                ('content_hash', models.CharField(max_length=40, verbose_name='Hash del contenido')),
+                ('content', models.BinaryField(verbose_name='Contenido (JSON gzip)')),
+                ('size', models.PositiveIntegerField(verbose_name='Tamaño sin comprimir')),
+                ('compressed_size', models.PositiveIntegerField(verbose_name='Tamaño comprimido')),
+                ('built_at', models.DateTimeField(auto_now_add=True)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_packs', to='competitions.competition')),
+                ('judge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_packs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Paquete Offline',
+                'verbose_name_plural': 'Paquetes Offline',
+                'ordering': ['-version'],
+                'unique_together': {('competition', 'judge', 'version')},
+            },
+        ),
+    ]
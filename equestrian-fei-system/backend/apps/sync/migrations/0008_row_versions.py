@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0007_offline_pack'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncaction',
+            name='base_version',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Versión base'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0008_row_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncjob',
+            name='export_cursor',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Último id exportado'),
+        ),
+        migrations.AddField(
+            model_name='syncjob',
+            name='export_offset',
+            field=models.PositiveIntegerField(default=0, verbose_name='Registros exportados confirmados'),
+        ),
+        migrations.AddField(
+            model_name='syncjob',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Métricas de ejecución'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0006_row_versions'),
+        ('sync', '0009_export_resume'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changefeedentry',
+            name='competition',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='competitions.competition', verbose_name='Competencia'),
+        ),
+        migrations.AddIndex(
+            model_name='changefeedentry',
+            index=models.Index(fields=['competition', 'id'], name='changefeed_competition_idx'),
+        ),
+    ]
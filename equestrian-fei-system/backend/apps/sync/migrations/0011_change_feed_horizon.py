@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0010_change_feed_scope'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changefeedentry',
+            index=models.Index(fields=['created_at'], name='changefeed_created_idx'),
+        ),
+    ]
@@ -123,6 +123,11 @@ class SyncJob(models.Model):
     processed_records = models.IntegerField(default=0, verbose_name="Registros procesados")
     success_count = models.IntegerField(default=0, verbose_name="Exitosos")
     error_count = models.IntegerField(default=0, verbose_name="Con errores")
+
+    # Reanudación de exportaciones: registros confirmados por el sistema externo
+    export_offset = models.PositiveIntegerField(default=0, verbose_name="Registros exportados confirmados")
+    export_cursor = models.CharField(max_length=64, blank=True, verbose_name="Último id exportado")
+    metrics = models.JSONField(default=dict, blank=True, verbose_name="Métricas de ejecución")
     
     # Log de ejecución
     log = models.TextField(blank=True, verbose_name="Log de ejecución")
@@ -230,6 +235,10 @@ class SyncRecord(models.Model):
         verbose_name_plural = "Registros de Sincronización"
         ordering = ['-created_at']
         unique_together = ['sync_job', 'content_type', 'external_id']
+        indexes = [
+            # Cursor de paginación (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='syncrecord_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.external_id} - {self.get_status_display()}"
@@ -341,6 +350,12 @@ class SyncSession(models.Model):
     actions_count = models.IntegerField(default=0, verbose_name="Total de acciones")
     successful_actions = models.IntegerField(default=0, verbose_name="Acciones exitosas")
     failed_actions = models.IntegerField(default=0, verbose_name="Acciones fallidas")
+    conflict_actions = models.IntegerField(default=0, verbose_name="Acciones en conflicto")
+
+    # Checkpoint del procesamiento por lotes: cada lote confirmado avanza el
+    # contador y la sesión se retoma desde las acciones aún pendientes
+    processed_actions = models.IntegerField(default=0, verbose_name="Acciones procesadas")
+    checkpoint_at = models.DateTimeField(null=True, blank=True, verbose_name="Último checkpoint")
 
     # Metadatos
     created_at = models.DateTimeField(auto_now_add=True)
@@ -365,6 +380,28 @@ class SyncSession(models.Model):
         self.end_time = timezone.now()
         self.save(update_fields=['status', 'end_time'])
 
+    def checkpoint(self, successful=0, failed=0, conflicts=0):
+        """Registrar un lote confirmado (incrementos atómicos)"""
+        processed = successful + failed + conflicts
+        SyncSession.objects.filter(pk=self.pk).update(
+            processed_actions=models.F('processed_actions') + processed,
+            successful_actions=models.F('successful_actions') + successful,
+            failed_actions=models.F('failed_actions') + failed,
+            conflict_actions=models.F('conflict_actions') + conflicts,
+            checkpoint_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=[
+            'processed_actions', 'successful_actions', 'failed_actions',
+            'conflict_actions', 'checkpoint_at',
+        ])
+
+    @property
+    def progress(self):
+        """Porcentaje de acciones procesadas"""
+        if self.actions_count == 0:
+            return 0
+        return min(100, (self.processed_actions / self.actions_count) * 100)
+
     @property
     def duration(self):
         """Duración de la sesión"""
@@ -422,6 +459,8 @@ class SyncAction(models.Model):
     # Datos
     data = models.JSONField(verbose_name="Datos de la acción")
     original_data = models.JSONField(null=True, blank=True, verbose_name="Datos originales")
+    # row_version del objeto que leyó el cliente (modelos con RowVersionMixin)
+    base_version = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Versión base")
 
     # Reintentos y errores
     retry_count = models.IntegerField(default=0, verbose_name="Número de reintentos")
@@ -442,6 +481,8 @@ class SyncAction(models.Model):
             models.Index(fields=['action_type']),
             models.Index(fields=['priority', 'status']),
             models.Index(fields=['content_type', 'object_id']),
+            # Cursor de paginación (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='syncaction_keyset_idx'),
         ]
 
     def __str__(self):
@@ -599,6 +640,78 @@ class OfflineStorage(models.Model):
         self.save(update_fields=['data', 'version', 'is_synced'])
 
 
+class OfflineOperationLog(models.Model):
+    """
+    Log de operaciones offline, solo de anexado.
+
+    seq (la clave primaria autoincremental) da el orden de llegada: las colas
+    por usuario se leen por rangos de seq con el índice (user, status, seq) y
+    los cambios de estado son UPDATE condicionados al estado anterior.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('processing', 'Procesando'),
+        ('synced', 'Sincronizado'),
+        ('failed', 'Fallido'),
+        ('conflict', 'Conflicto'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    operation_id = models.CharField(max_length=64, unique=True, verbose_name="ID de operación")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offline_operations')
+
+    operation_type = models.CharField(max_length=20, verbose_name="Tipo de operación")
+    model_name = models.CharField(max_length=100, verbose_name="Modelo")
+    object_id = models.CharField(max_length=64, blank=True, verbose_name="ID del objeto")
+    data = models.JSONField(verbose_name="Datos de la operación")
+    checksum = models.CharField(max_length=64, verbose_name="Checksum")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Estado")
+    sync_attempts = models.IntegerField(default=0, verbose_name="Intentos de sincronización")
+    conflict_resolution = models.CharField(max_length=20, blank=True, verbose_name="Resolución de conflicto")
+    error_message = models.TextField(blank=True, verbose_name="Mensaje de error")
+    claim_token = models.CharField(max_length=32, blank=True, verbose_name="Token de procesamiento")
+
+    # Momento de la operación en el dispositivo y de su registro en el servidor
+    timestamp = models.DateTimeField(verbose_name="Fecha de la operación")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Operación Offline"
+        verbose_name_plural = "Log de Operaciones Offline"
+        ordering = ['seq']
+        indexes = [
+            models.Index(fields=['user', 'status', 'seq'], name='offline_op_user_status_idx'),
+            models.Index(fields=['status', 'seq'], name='offline_op_status_idx'),
+            # Índice de trabajo pendiente: solo contiene las filas por procesar,
+            # así encontrar qué usuarios tienen cola no recorre el histórico
+            models.Index(
+                fields=['user', 'seq'], name='offline_op_pending_user_idx',
+                condition=models.Q(status__in=['pending', 'processing']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.seq} {self.operation_type} {self.model_name} - {self.get_status_display()}"
+
+
+class OfflineLogOffset(models.Model):
+    """Última posición (seq) del log procesada por un consumidor para un usuario"""
+    consumer = models.CharField(max_length=100, verbose_name="Consumidor")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offline_log_offsets')
+    last_seq = models.BigIntegerField(default=0, verbose_name="Última posición procesada")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Posición de Consumidor Offline"
+        verbose_name_plural = "Posiciones de Consumidores Offline"
+        unique_together = ['consumer', 'user']
+
+    def __str__(self):
+        return f"{self.consumer} - {self.user_id}: {self.last_seq}"
+
+
 class BackupRecord(models.Model):
     """Registro de respaldos"""
     BACKUP_TYPES = [
@@ -668,3 +781,77 @@ class BackupRecord(models.Model):
                 return f"{size:.1f} {unit}"
             size /= 1024.0
         return f"{size:.1f} PB"
+
+
+class ChangeFeedEntry(models.Model):
+    """
+    Feed de cambios de los modelos sincronizables (outbox transaccional).
+
+    El id es el cursor de los clientes; ver apps.sync.change_feed.
+    """
+    OPERATION_CHOICES = [
+        ('upsert', 'Creado/Actualizado'),
+        ('delete', 'Eliminado'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    model_name = models.CharField(max_length=50, verbose_name="Modelo")
+    object_id = models.CharField(max_length=64, verbose_name="ID del objeto")
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES, verbose_name="Operación")
+    data = models.JSONField(null=True, blank=True, verbose_name="Datos")
+    # Competencia a la que pertenece el cambio (None en los caballos): define
+    # qué usuarios lo reciben. Sin restricción de FK para conservar los borrados
+    competition = models.ForeignKey(
+        'competitions.Competition', on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name='+', verbose_name="Competencia"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Cambio del Servidor"
+        verbose_name_plural = "Feed de Cambios"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model_name', 'id'], name='changefeed_model_idx'),
+            models.Index(fields=['competition', 'id'], name='changefeed_competition_idx'),
+            models.Index(fields=['created_at'], name='changefeed_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} {self.operation} {self.model_name} {self.object_id}"
+
+
+class OfflinePack(models.Model):
+    """
+    Paquete offline de una competencia para un juez, ya serializado y comprimido.
+
+    Cada versión guarda el JSON completo con gzip; una versión nueva solo se
+    crea cuando cambia el contenido. Se conservan las últimas versiones para
+    responder deltas a los dispositivos; ver apps.sync.offline_pack.
+    """
+    competition = models.ForeignKey(
+        'competitions.Competition', on_delete=models.CASCADE, related_name='offline_packs'
+    )
+    judge = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offline_packs')
+    version = models.PositiveIntegerField(verbose_name="Versión")
+
+    source_fingerprint = models.CharField(max_length=40, verbose_name="Huella de los datos de origen")
+    content_hash = models.CharField(max_length=40, verbose_name="Hash del contenido")
+    content = models.BinaryField(verbose_name="Contenido (JSON gzip)")
+    size = models.PositiveIntegerField(verbose_name="Tamaño sin comprimir")
+    compressed_size = models.PositiveIntegerField(verbose_name="Tamaño comprimido")
+
+    built_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Paquete Offline"
+        verbose_name_plural = "Paquetes Offline"
+        ordering = ['-version']
+        unique_together = ['competition', 'judge', 'version']
+
+    def __str__(self):
+        return f"{self.competition_id} - {self.judge_id} v{self.version}"
+
+    @property
+    def etag(self):
+        return f'"offline-pack-{self.competition_id}-{self.judge_id}-v{self.version}"'
@@ -0,0 +1,343 @@
+"""
+Paquete offline de una competencia para los dispositivos de los jueces
+
+Antes de quedarse sin conexión en la pista, el dispositivo de un juez
+descarga en una sola respuesta lo que necesita para puntuar: la competencia,
+la programación y el orden de salida, participantes, caballos, criterios y
+sus tarjetas asignadas.
+
+El paquete se construye una vez por cambio de datos y se guarda ya
+comprimido (OfflinePack). Las secciones comunes se arman una sola vez para
+todos los jueces de la competencia; solo las tarjetas son por juez. Una
+huella de las tablas de origen (conteos y últimas modificaciones) decide si
+hay que reconstruir. Con If-None-Match o ?since=<versión> se responde 304 o
+solo las filas que cambiaron desde la versión que tiene el dispositivo.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from apps.competitions.bundle import CompetitionBundle, accepted_encodings, choose_encoding
+from .change_feed import PRIVATE_FIELDS, snapshot
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: los deltas se comprimen con gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PACK_SECTIONS = ['schedule', 'start_list', 'participants', 'horses', 'criteria', 'score_cards']
+SHARED_SECTIONS = PACK_SECTIONS[:-1]
+PACK_HISTORY = 5
+ACTIVE_STATUSES = ('open_registration', 'registration_closed', 'in_progress')
+# Cambia con el contenido de las secciones: fuerza a reconstruir los paquetes guardados
+PACK_FORMAT = 2
+
+
+class OfflinePackBuilder(CompetitionBundle):
+    """
+    Secciones del paquete offline de una competencia.
+
+    Reutiliza las secciones del bundle; las tarjetas de todos los jueces se
+    leen con una sola consulta y van en el formato del feed de cambios, para
+    que el dispositivo aplique después los cambios incrementales sobre ellas.
+    """
+
+    def __init__(self, competition):
+        super().__init__(competition, PACK_SECTIONS, user=None)
+
+    def get_start_list(self):
+        from apps.competitions.models import StartListEntry
+        from apps.competitions.serializers import StartListEntrySerializer
+
+        entries = list(
+            StartListEntry.objects.filter(schedule__competition=self.competition)
+            .select_related('participant__rider', 'participant__horse')
+            .order_by('schedule_id', 'round_number', 'start_time', 'arena', 'id')
+        )
+        rows = StartListEntrySerializer(entries, many=True).data
+        return [dict(row, schedule=entry.schedule_id) for entry, row in zip(entries, rows)]
+
+    def get_participants(self):
+        return _without_private(super().get_participants(), 'Participant')
+
+    def get_horses(self):
+        from apps.competitions.models import Horse
+        from apps.competitions.serializers import HorseSerializer
+
+        horses = Horse.objects.filter(
+            pk__in=self.competition.participants.values('horse_id')
+        ).select_related('owner', 'trainer').order_by('id')
+        return _without_private(HorseSerializer(horses, many=True).data, 'Horse')
+
+    def build_shared(self):
+        data = {'competition': self.get_competition()}
+        for section in SHARED_SECTIONS:
+            data[section] = getattr(self, f'get_{section}')()
+        return data
+
+    def score_cards_by_judge(self, judge_ids):
+        from apps.scoring.models import IndividualScore, ScoreCard
+
+        cards = ScoreCard.objects.filter(
+            participant__competition=self.competition, judge_id__in=judge_ids
+        ).prefetch_related(
+            Prefetch('individual_scores', IndividualScore.objects.order_by('criteria_id', 'id'))
+        ).order_by('round_number', 'participant_id', 'attempt_number', 'id')
+
+        result = {judge_id: [] for judge_id in judge_ids}
+        for card in cards:
+            row = snapshot(card)
+            row['individual_scores'] = [snapshot(score) for score in card.individual_scores.all()]
+            result[card.judge_id].append(row)
+        return result
+
+
+def _without_private(rows, model_name):
+    """
+    Filas sin los campos privados del modelo: el paquete es el mismo para
+    todos los jueces, que no son dueños de los caballos ni organizadores.
+    """
+    fields = PRIVATE_FIELDS[model_name]
+    return [{key: value for key, value in row.items() if key not in fields} for row in rows]
+
+
+def assigned_judge_ids(competition):
+    """Jueces asignados a la competencia"""
+    from apps.competitions.models import CompetitionStaff
+
+    return list(
+        CompetitionStaff.objects.filter(competition=competition, role='judge')
+        .order_by('staff_member_id').values_list('staff_member_id', flat=True).distinct()
+    )
+
+
+def source_fingerprint(competition):
+    """
+    Huella de los datos de origen del paquete: conteos y últimas
+    modificaciones de cada tabla, una consulta agregada por tabla.
+    """
+    from apps.competitions.models import CompetitionSchedule, CompetitionStaff, Participant, StartListEntry
+    from apps.scoring.models import ScoreCard
+
+    parts = [
+        PACK_FORMAT,
+        competition.updated_at,
+        CompetitionSchedule.objects.filter(competition=competition).aggregate(
+            count=Count('id'), last=Max('updated_at')
+        ),
+        # El orden de salida se regenera borrando y creando filas: el id máximo cambia
+        StartListEntry.objects.filter(schedule__competition=competition).aggregate(
+            count=Count('id'), last=Max('id')
+        ),
+        Participant.objects.filter(competition=competition).aggregate(
+            count=Count('id'), last=Max('updated_at'), horses=Max('horse__updated_at')
+        ),
+        CompetitionStaff.objects.filter(competition=competition, role='judge').aggregate(
+            count=Count('id'), last=Max('id')
+        ),
+        ScoreCard.objects.filter(participant__competition=competition).aggregate(
+            count=Count('id', distinct=True), last=Max('updated_at'),
+            scores=Count('individual_scores'), scores_last=Max('individual_scores__updated_at'),
+        ),
+        # Los criterios salen del cache en proceso: no cuestan consultas
+        OfflinePackBuilder(competition).get_criteria(),
+    ]
+    return hashlib.sha1(_dumps(parts)).hexdigest()
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _latest_packs(competition, judge_ids):
+    """Última versión guardada de cada juez (sin el contenido)"""
+    from .models import OfflinePack
+
+    latest = {}
+    packs = OfflinePack.objects.filter(
+        competition=competition, judge_id__in=judge_ids
+    ).defer('content').order_by('judge_id', '-version')
+    for pack in packs:
+        latest.setdefault(pack.judge_id, pack)
+    return latest
+
+
+def _new_pack(competition, judge_id, version, fingerprint, content_hash, sections):
+    from .models import OfflinePack
+
+    payload = {
+        'format': 'full',
+        'competition_id': competition.pk,
+        'judge_id': judge_id,
+        'version': version,
+        'built_at': timezone.now(),
+    }
+    payload.update(sections)
+    raw = _dumps(payload)
+    content = gzip.compress(raw, compresslevel=9, mtime=0)
+    return OfflinePack(
+        competition=competition, judge_id=judge_id, version=version,
+        source_fingerprint=fingerprint, content_hash=content_hash,
+        content=content, size=len(raw), compressed_size=len(content),
+    )
+
+
+def build_packs(competition, judge_ids=None, force=False):
+    """
+    Reconstruir los paquetes de los jueces cuyos datos cambiaron.
+
+    Solo se crea una versión nueva si el contenido del juez cambió. Devuelve
+    {judge_id: OfflinePack} con la última versión de cada juez (sin contenido).
+    """
+    from apps.competitions.models import Competition
+    from .models import OfflinePack
+
+    judge_ids = list(judge_ids) if judge_ids is not None else assigned_judge_ids(competition)
+    with transaction.atomic():
+        # Una sola reconstrucción a la vez por competencia
+        list(Competition.objects.select_for_update().filter(pk=competition.pk).values_list('pk'))
+        fingerprint = source_fingerprint(competition)
+        latest = _latest_packs(competition, judge_ids)
+        stale = [
+            judge_id for judge_id in judge_ids
+            if force or judge_id not in latest or latest[judge_id].source_fingerprint != fingerprint
+        ]
+        if not stale:
+            return latest
+
+        builder = OfflinePackBuilder(competition)
+        shared = builder.build_shared()
+        score_cards = builder.score_cards_by_judge(stale)
+
+        new_packs, unchanged = [], []
+        for judge_id in stale:
+            sections = dict(shared, score_cards=score_cards[judge_id])
+            content_hash = hashlib.sha1(_dumps(sections)).hexdigest()
+            current = latest.get(judge_id)
+            if current is not None and current.content_hash == content_hash:
+                current.source_fingerprint = fingerprint
+                unchanged.append(current.pk)
+                continue
+            version = current.version + 1 if current is not None else 1
+            new_packs.append(_new_pack(competition, judge_id, version, fingerprint, content_hash, sections))
+
+        if unchanged:
+            OfflinePack.objects.filter(pk__in=unchanged).update(source_fingerprint=fingerprint)
+        if new_packs:
+            OfflinePack.objects.bulk_create(new_packs)
+            expired = Q()
+            for pack in new_packs:
+                expired |= Q(judge_id=pack.judge_id, version__lte=pack.version - PACK_HISTORY)
+            OfflinePack.objects.filter(expired, competition=competition).delete()
+            latest.update(_latest_packs(competition, [pack.judge_id for pack in new_packs]))
+
+    logger.info(
+        f"Paquetes offline de la competencia {competition.pk}: "
+        f"{len(new_packs)} versiones nuevas, {len(unchanged)} sin cambios"
+    )
+    return latest
+
+
+def current_pack(competition, judge_id):
+    """Última versión del paquete del juez, reconstruida antes si los datos cambiaron"""
+    from .models import OfflinePack
+
+    pack = _latest_packs(competition, [judge_id]).get(judge_id)
+    if pack is None or pack.source_fingerprint != source_fingerprint(competition):
+        # Se reconstruyen todos los jueces: los demás dispositivos pedirán el suyo enseguida
+        judge_ids = assigned_judge_ids(competition)
+        if judge_id not in judge_ids:
+            judge_ids.append(judge_id)
+        pack = build_packs(competition, judge_ids)[judge_id]
+    return OfflinePack.objects.get(pk=pack.pk)
+
+
+def load_pack(pack):
+    return json.loads(gzip.decompress(bytes(pack.content)))
+
+
+def pack_delta(pack, base_version):
+    """
+    Cambios por sección entre base_version y el paquete: filas nuevas o
+    modificadas y ids eliminados. None si esa versión ya no se conserva.
+    """
+    from .models import OfflinePack
+
+    base = OfflinePack.objects.filter(
+        competition_id=pack.competition_id, judge_id=pack.judge_id, version=base_version
+    ).first()
+    if base is None:
+        return None
+
+    before, after = load_pack(base), load_pack(pack)
+    delta = {
+        'format': 'delta',
+        'competition_id': pack.competition_id,
+        'judge_id': pack.judge_id,
+        'base_version': base_version,
+        'version': pack.version,
+        'built_at': after['built_at'],
+        'sections': {},
+    }
+    if before['competition'] != after['competition']:
+        delta['competition'] = after['competition']
+    for section in PACK_SECTIONS:
+        old_rows = {row['id']: row for row in before[section]}
+        new_rows = {row['id']: row for row in after[section]}
+        upsert = [row for row_id, row in new_rows.items() if old_rows.get(row_id) != row]
+        delete = [row_id for row_id in old_rows if row_id not in new_rows]
+        if upsert or delete:
+            delta['sections'][section] = {'upsert': upsert, 'delete': delete}
+    return delta
+
+
+def requested_version(request, pack):
+    """Versión del paquete que ya tiene el dispositivo según If-None-Match"""
+    prefix = re.escape(pack.etag.rsplit('-v', 1)[0])
+    for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(','):
+        tag = tag.strip()
+        match = re.fullmatch(prefix + r'-v(\d+)"', tag[2:] if tag.startswith('W/') else tag)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def pack_response(request, pack, since=None):
+    """304, delta o paquete completo según la versión que ya tiene el dispositivo"""
+    base_version = since if since is not None else requested_version(request, pack)
+
+    if base_version == pack.version:
+        response = HttpResponse(status=304)
+    else:
+        delta = pack_delta(pack, base_version) if base_version else None
+        if delta is not None:
+            content = _dumps(delta)
+            encoding = choose_encoding(request, len(content))
+            if encoding == 'br':
+                content = brotli.compress(content)
+            elif encoding == 'gzip':
+                content = gzip.compress(content, compresslevel=6)
+        else:
+            # El paquete completo se guarda ya comprimido con gzip
+            accepted = accepted_encodings(request)
+            encoding = 'gzip' if 'gzip' in accepted or '*' in accepted else None
+            content = bytes(pack.content) if encoding else gzip.decompress(bytes(pack.content))
+        response = HttpResponse(content, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = pack.etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
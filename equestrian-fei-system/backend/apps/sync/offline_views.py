@@ -1,13 +1,24 @@
 """
 Views específicos para sincronización offline
 """
+import json
 import logging
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from .binary_format import FormatError, SyncBinaryParser, is_binary_body
+from .change_feed import DEFAULT_LIMIT, FEED_MODELS, read_changes
 from .models import SyncSession, SyncAction, ConflictResolution, OfflineStorage
+from .pagination import KeysetPagination
 try:
     from .managers import SyncManager, ConflictResolver
 except ImportError:
@@ -129,7 +140,8 @@ class OfflineSyncSessionViewSet(viewsets.ModelViewSet):
                 action_type=data['action_type'],
                 content_object=content_object,
                 data=data['data'],
-                priority=data.get('priority', 'normal')
+                priority=data.get('priority', 'normal'),
+                base_version=data.get('base_version')
             )
 
             return Response({
@@ -143,6 +155,42 @@ class OfflineSyncSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=True, methods=['post'],
+            parser_classes=api_settings.DEFAULT_PARSER_CLASSES + [SyncBinaryParser])
+    def add_actions(self, request, pk=None):
+        """
+        Agregar varias acciones a la sesión.
+
+        JSON: {"actions": [{action_type, content_type, object_id, data, priority}, ...]}
+        o, con Content-Type application/vnd.fei.sync+msgpack, una trama binaria
+        de tipo 'actions' (apps.sync.binary_format).
+        """
+        session = self.get_object()
+        if session.status != 'pending':
+            return Response(
+                {'error': 'La sesión no está en estado pendiente'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if is_binary_body(request):
+            records = request.data
+        else:
+            records = request.data.get('actions')
+            if not isinstance(records, list):
+                return Response(
+                    {'error': 'actions requerido'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            if is_binary_body(request) and records.header['kind'] != 'actions':
+                raise FormatError('Se esperaba una trama de acciones')
+            result = SyncManager().add_sync_actions(session, records)
+        except FormatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result)
+
     @action(detail=True, methods=['post'])
     def process_session(self, request, pk=None):
         """Procesar todas las acciones de la sesión"""
@@ -176,6 +224,8 @@ class SyncActionViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet para acciones de sincronización"""
     serializer_class = SyncActionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         user = self.request.user
@@ -337,6 +387,65 @@ class ConflictResolutionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'])
+    def batch_resolve(self, request):
+        """
+        Resolver en lote los conflictos pendientes con una estrategia automática.
+
+        Filtros opcionales: competition, model, since, until. Con dry_run solo
+        devuelve cuántos conflictos se resolverían; si no, responde con una
+        línea JSON de progreso por lote (application/x-ndjson).
+        """
+        from .conflict_batch import BatchConflictResolver, BatchResolutionError, filter_conflicts
+
+        data = request.data
+        user = request.user
+        queryset = ConflictResolution.objects.all()
+        if user.role != 'admin':
+            queryset = queryset.filter(sync_action__sync_session__user=user)
+
+        try:
+            resolver = BatchConflictResolver(
+                data.get('strategy', 'last_write_wins'), resolved_by=user, notes=data.get('notes', '')
+            )
+            queryset = filter_conflicts(
+                queryset,
+                competition=data.get('competition'),
+                model=data.get('model'),
+                since=self._parse_moment(data.get('since')),
+                until=self._parse_moment(data.get('until'), end_of_day=True),
+            )
+        except BatchResolutionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(data.get('dry_run', '')).lower() in ('1', 'true'):
+            return Response({'total': queryset.count()})
+
+        def stream():
+            for progress in resolver.run(queryset):
+                yield json.dumps(progress, cls=DjangoJSONEncoder) + '\n'
+
+        response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    def _parse_moment(value, end_of_day=False):
+        """Fecha u hora ISO 8601 de los filtros de resolución en lote"""
+        from .conflict_batch import BatchResolutionError
+
+        if not value:
+            return None
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise BatchResolutionError(f"Fecha no válida: {value}")
+            moment = datetime.combine(day, time.max if end_of_day else time.min)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
 
 class OfflineStorageViewSet(viewsets.ModelViewSet):
     """ViewSet para almacenamiento offline"""
@@ -431,4 +540,43 @@ class OfflineStorageViewSet(viewsets.ModelViewSet):
         return Response({
             'queue_size': queryset.count(),
             'items': serializer.data
-        })
\ No newline at end of file
+        })
+
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """
+    Cambios del servidor posteriores a un cursor (sincronización incremental).
+
+    GET /api/sync/changes/?cursor=<n>&limit=<n>&models=ScoreCard,Participant
+    devuelve los cambios compactados en orden y el cursor para la siguiente
+    petición; con has_more=true el cliente sigue pidiendo con ese cursor.
+    Cada usuario recibe solo los cambios de sus competencias (ver
+    apps.sync.change_feed).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        try:
+            cursor = int(request.query_params.get('cursor') or 0)
+            limit = int(request.query_params.get('limit') or DEFAULT_LIMIT)
+        except ValueError:
+            return Response(
+                {'error': 'cursor y limit deben ser enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        models = None
+        if request.query_params.get('models'):
+            models = [name.strip() for name in request.query_params['models'].split(',') if name.strip()]
+            unknown = set(models) - set(FEED_MODELS)
+            if unknown:
+                return Response(
+                    {'error': f"Modelos no válidos: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        changes, next_cursor, has_more = read_changes(cursor, limit, models, user=request.user)
+        return Response({
+            'cursor': next_cursor,
+            'has_more': has_more,
+            'changes': changes
+        })
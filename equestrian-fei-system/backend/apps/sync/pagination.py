@@ -0,0 +1,176 @@
+"""
+Paginación por clave (keyset) para colecciones grandes que solo crecen.
+
+PageNumberPagination hace COUNT(*) y OFFSET: el costo de la página N crece con
+N. Aquí el cursor guarda los valores de la última fila entregada según un
+orden compuesto y único, p. ej. ('-updated_at', '-id'), y la página siguiente
+se pide con WHERE (updated_at, id) < (v1, v2): toda página cuesta lo mismo
+que la primera si hay un índice con esas columnas.
+
+?count=false omite el COUNT(*) del total.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre un orden compuesto.
+
+    La vista indica el orden en ``keyset_ordering``; el último campo debe ser
+    único (normalmente 'id' o '-id') y ninguno puede ser nulo. Los campos de
+    una FK se indican por su columna ('ranking_id').
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Cursor no válido'
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, 'true').lower() not in ('false', '0', 'no')
+
+    # ------------------------------------------------------------------
+    # Cursor
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, values, reverse):
+        raw = json.dumps({'v': values, 'r': int(reverse)}, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """
+        (valores, reverse) del cursor pedido; None en la primera página.
+
+        Cada valor se convierte con el to_python de su campo: un cursor
+        manipulado responde 404 y no llega a la consulta.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            data = json.loads(raw)
+            values, reverse = data['v'], bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [
+                model._meta.get_field(self._field(term)).to_python(value)
+                for term, value in zip(self.ordering, values)
+            ]
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    @staticmethod
+    def _field(term):
+        return term.lstrip('-')
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(term[1:] if term.startswith('-') else f'-{term}' for term in ordering)
+
+    def keyset_filter(self, ordering, values):
+        """Filas posteriores a ``values`` en ``ordering``: (a, b) > (va, vb) expandido"""
+        condition = Q()
+        for index, term in enumerate(ordering):
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            step = Q(**{f'{self._field(term)}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                step &= Q(**{self._field(previous): value})
+            condition |= step
+        return condition
+
+    def _values(self, row):
+        return [getattr(row, self._field(term)) for term in self.ordering]
+
+    # ------------------------------------------------------------------
+    # Paginación
+    # ------------------------------------------------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor[1])
+
+        ordering = self._reverse(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        self.count = queryset.count() if self.wants_count(request) else None
+        if cursor:
+            queryset = queryset.filter(self.keyset_filter(ordering, cursor[0]))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Al retroceder siempre hay página siguiente (de ella venimos)
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._values(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._values(self.page[0]), True))
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
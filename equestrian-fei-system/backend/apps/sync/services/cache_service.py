@@ -313,4 +313,102 @@ def invalidate_cache(key: str = None, namespace: str = None,
         return cache_service.invalidate_by_tags(tags) > 0
     elif namespace:
         return cache_service.clear_namespace(namespace)
-    return False
\ No newline at end of file
+    return False
+
+# Peticiones condicionales HTTP (ETag / If-None-Match)
+ETAG_REVISION_TIMEOUT = getattr(settings, 'ETAG_REVISION_TIMEOUT', 30)  # segundos
+
+
+def _revision_key(scope: str) -> str:
+    """Clave de cache para la revisión de un recurso"""
+    return f"etag_revision:{scope}"
+
+
+def get_cached_revision(scope: str, loader) -> Optional[str]:
+    """
+    Obtener la revisión actual de un recurso.
+
+    La revisión se lee del cache; si no está, se calcula con ``loader``
+    (que debe costar como máximo una consulta indexada) y se cachea.
+    Si ``loader`` devuelve None no se cachea nada y el llamador debe
+    responder sin ETag.
+    """
+    cache_key = _revision_key(scope)
+    revision = cache.get(cache_key)
+    if revision is not None:
+        return revision
+
+    revision = loader()
+    if revision is None:
+        return None
+
+    revision = str(revision)
+    cache.set(cache_key, revision, ETAG_REVISION_TIMEOUT)
+    return revision
+
+
+def invalidate_revision(*scopes: str) -> None:
+    """Invalidar la revisión cacheada de uno o varios recursos"""
+    try:
+        cache.delete_many([_revision_key(scope) for scope in scopes])
+    except Exception as e:
+        logger.error(f"Error invalidando revisiones {scopes}: {e}")
+
+
+def build_etag(request, *parts: Any) -> str:
+    """Construir un ETag fuerte a partir de la revisión y la representación pedida"""
+    raw = '|'.join(
+        [str(part) for part in parts] +
+        [request.get_full_path(), request.META.get('HTTP_ACCEPT', '')]
+    )
+    return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Verificar si el ETag coincide con la cabecera If-None-Match"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+
+    if header.strip() == '*':
+        return True
+
+    # If-None-Match usa comparación débil (RFC 9110 §13.1.2)
+    candidates = [tag.strip() for tag in header.split(',')]
+    return any(
+        (candidate[2:] if candidate.startswith('W/') else candidate) == etag
+        for candidate in candidates
+    )
+
+
+def conditional_etag(revision_func):
+    """
+    Decorador para acciones de ViewSet que soportan If-None-Match.
+
+    ``revision_func(view, request, *args, **kwargs)`` devuelve la revisión
+    del recurso o None. Cuando el cliente ya tiene la revisión vigente se
+    responde 304 antes de consultar o serializar los datos.
+    """
+    from functools import wraps
+    from rest_framework import status
+    from rest_framework.response import Response
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            revision = revision_func(self, request, *args, **kwargs)
+            if revision is None:
+                return view_method(self, request, *args, **kwargs)
+
+            etag = build_etag(request, view_method.__name__, revision)
+            if etag_matches(request, etag):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
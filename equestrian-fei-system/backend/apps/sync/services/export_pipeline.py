@@ -0,0 +1,216 @@
+"""
+Exportación de registros a sistemas externos
+
+El queryset se recorre con iterator() en orden de clave primaria y los lotes
+se envían con concurrencia acotada sobre una sesión HTTP con pool de
+conexiones: mientras se espera la respuesta de un lote ya viajan los
+siguientes, de modo que el tiempo lo marca el ancho de banda y no la
+latencia de cada petición.
+
+Los resultados se confirman en el orden de envío. SyncJob guarda cuántos
+registros y hasta qué id confirmó el sistema externo (export_offset,
+export_cursor); si un lote falla tras los reintentos el trabajo se detiene y
+al ejecutarlo de nuevo continúa desde ese lote. Los lotes posteriores que ya
+estaban en vuelo se reenvían: la entrega es al menos una vez.
+"""
+
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from ..models import SyncJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+RECENT_BATCHES = 20
+
+
+class BatchExportError(Exception):
+    """Un lote que el sistema externo no aceptó tras los reintentos"""
+
+
+class ExportPipeline:
+    """Exporta los registros de un SyncJob de tipo export"""
+
+    def __init__(self, job: SyncJob, headers: Dict[str, str]):
+        config = job.config
+        self.job = job
+        self.headers = dict(headers, **{'Content-Type': 'application/json'})
+        self.url = f"{job.external_system.api_url.rstrip('/')}/{config.get('endpoint', '').lstrip('/')}"
+        self.batch_size = int(config.get('batch_size', DEFAULT_BATCH_SIZE))
+        self.concurrency = max(1, int(config.get('concurrency', DEFAULT_CONCURRENCY)))
+        self.max_attempts = max(1, int(config.get('max_attempts', DEFAULT_MAX_ATTEMPTS)))
+        self.backoff = float(config.get('backoff', DEFAULT_BACKOFF))
+        self.timeout = config.get('timeout', 30)
+
+        # Una conexión persistente por hilo de envío
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_queryset(self):
+        config = self.job.config
+        model_name = config.get('model')
+        if not model_name:
+            raise ValueError("Modelo no especificado en configuración")
+
+        model_class = ContentType.objects.get(model=model_name.lower()).model_class()
+        self.pk_name = model_class._meta.pk.attname
+        queryset = model_class.objects.all()
+        filters = config.get('filters', {})
+        if filters:
+            queryset = queryset.filter(**filters)
+        if self.job.export_cursor:
+            queryset = queryset.filter(pk__gt=model_class._meta.pk.to_python(self.job.export_cursor))
+        return queryset.order_by('pk')
+
+    def run(self) -> bool:
+        """Exportar lo que falta; True si el sistema externo aceptó todos los lotes"""
+        job = self.job
+        queryset = self.get_queryset()
+        pending = queryset.count()
+
+        resumed = job.export_offset > 0
+        job.total_records = job.export_offset + pending
+        job.processed_records = job.success_count = job.export_offset
+        job.error_count = 0
+        job.metrics = {'batches': 0, 'records': 0, 'bytes': 0, 'seconds': 0, 'records_per_second': 0, 'recent': []}
+        job.save(update_fields=[
+            'total_records', 'processed_records', 'success_count', 'error_count', 'metrics'
+        ])
+        if resumed:
+            job.add_log(f"Reanudando exportación tras {job.export_offset} registros (id {job.export_cursor})")
+        job.add_log(
+            f"Exportando {pending} registros de {job.config.get('model')} a {self.url} "
+            f"en lotes de {self.batch_size}, {self.concurrency} en paralelo"
+        )
+
+        started = time.perf_counter()
+        in_flight = deque()
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='sync-export') as executor:
+            for batch in self._batches(queryset):
+                in_flight.append((batch, executor.submit(self._send, batch)))
+                # Como máximo dos lotes por hilo entre enviados y en cola
+                if len(in_flight) >= self.concurrency * 2:
+                    failure = self._confirm(*in_flight.popleft(), started)
+                    if failure:
+                        break
+            while in_flight:
+                batch, future = in_flight.popleft()
+                if failure:
+                    future.cancel()
+                    continue
+                failure = self._confirm(batch, future, started)
+        self.session.close()
+
+        if failure:
+            logger.warning(f"Exportación {job.id} detenida tras {job.export_offset} registros: {failure}")
+            job.error_message = str(failure)
+            job.save(update_fields=['error_message'])
+            job.add_log(
+                f"Exportación detenida en el registro {job.export_offset + 1}: {failure}. "
+                f"Al reintentar el trabajo continúa desde ahí"
+            )
+            return False
+
+        metrics = job.metrics
+        job.add_log(
+            f"Exportados {metrics['records']} registros en {metrics['batches']} lotes, "
+            f"{metrics['seconds']} s ({metrics['records_per_second']} registros/s)"
+        )
+        return True
+
+    def _batches(self, queryset) -> Iterator[List[Dict]]:
+        batch = []
+        for record in queryset.values().iterator(chunk_size=max(self.batch_size, 2000)):
+            batch.append(record)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _send(self, batch: List[Dict]) -> Dict:
+        """Enviar un lote con reintentos (se ejecuta en un hilo del pool)"""
+        body = DjangoJSONEncoder(separators=(',', ':')).encode({'data': batch}).encode('utf-8')
+        started = time.perf_counter()
+        for attempt in range(1, self.max_attempts + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.url, data=body, headers=self.headers, timeout=self.timeout)
+                if response.status_code < 400:
+                    return {
+                        'records': len(batch),
+                        'bytes': len(body),
+                        'seconds': time.perf_counter() - started,
+                        'attempts': attempt,
+                    }
+                error = BatchExportError(f"HTTP {response.status_code}: {response.text[:200]}")
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+                retry_after = self._retry_after(response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = BatchExportError(f"Error de conexión: {e}")
+
+            if attempt < self.max_attempts:
+                delay = retry_after if retry_after is not None else self.backoff * 2 ** (attempt - 1)
+                time.sleep(min(delay, MAX_BACKOFF) * random.uniform(1, 1.25))
+        raise error
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def _confirm(self, batch: List[Dict], future, started: float) -> Optional[Exception]:
+        """Registrar el resultado de un lote en el trabajo; devuelve el error si falló"""
+        job = self.job
+        try:
+            result = future.result()
+        except Exception as e:
+            job.error_count += len(batch)
+            job.save(update_fields=['error_count'])
+            return e
+
+        job.export_offset += len(batch)
+        job.export_cursor = str(batch[-1][self.pk_name])
+        job.processed_records = job.success_count = job.export_offset
+        job.progress = int(job.processed_records / job.total_records * 100) if job.total_records else 100
+
+        metrics = job.metrics
+        metrics['batches'] += 1
+        metrics['records'] += result['records']
+        metrics['bytes'] += result['bytes']
+        metrics['seconds'] = round(time.perf_counter() - started, 3)
+        metrics['records_per_second'] = round(metrics['records'] / metrics['seconds'], 1) if metrics['seconds'] else 0
+        metrics['recent'] = metrics['recent'][-(RECENT_BATCHES - 1):] + [{
+            'offset': job.export_offset,
+            'records': result['records'],
+            'bytes': result['bytes'],
+            'seconds': round(result['seconds'], 3),
+            'attempts': result['attempts'],
+            'records_per_second': round(result['records'] / result['seconds'], 1) if result['seconds'] else 0,
+            'at': timezone.now().isoformat(),
+        }]
+        job.save(update_fields=[
+            'export_offset', 'export_cursor', 'processed_records', 'success_count', 'progress', 'metrics'
+        ])
+        return None
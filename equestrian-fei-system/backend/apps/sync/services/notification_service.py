@@ -274,6 +274,12 @@ class NotificationTemplate:
             'channels': ['websocket'],
             'priority': 'low'
         },
+        'sync_progress': {
+            'title': 'Sincronización en Curso',
+            'message': 'Procesadas {processed} de {total} acciones.',
+            'channels': ['websocket'],
+            'priority': 'low'
+        },
         'sync_failed': {
             'title': 'Error de Sincronización',
             'message': 'Ha fallado la sincronización con {system_name}. Error: {error_message}',
@@ -6,17 +6,20 @@ Permite trabajar sin conexión y sincronizar cuando se restablezca la conectivid
 import json
 import logging
 import hashlib
+import uuid
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import models, transaction
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.apps import apps
-from .cache_service import cache_service
+from ..models import OfflineLogOffset, OfflineOperationLog
 from .notification_service import notification_service
 
 logger = logging.getLogger(__name__)
+User = get_user_model()
 
 
 class OfflineOperation:
@@ -40,11 +43,11 @@ class OfflineOperation:
         self.conflict_resolution = None
         self.error_message = None
         self.checksum = self._calculate_checksum()
+        self.seq = None  # Posición en el log, asignada al guardarla
     
     def _generate_operation_id(self) -> str:
         """Generar ID único para la operación"""
-        timestamp = str(int(timezone.now().timestamp() * 1000000))
-        return f"offline_{timestamp}_{hash(str(timezone.now()))}"[:32]
+        return f"offline_{uuid.uuid4().hex}"
     
     def _calculate_checksum(self) -> str:
         """Calcular checksum de los datos"""
@@ -55,6 +58,7 @@ class OfflineOperation:
         """Convertir a diccionario"""
         return {
             'operation_id': self.operation_id,
+            'seq': self.seq,
             'operation_type': self.operation_type,
             'model_name': self.model_name,
             'data': self.data,
@@ -69,10 +73,12 @@ class OfflineOperation:
         }
     
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'OfflineOperation':
+    def from_dict(cls, data: Dict[str, Any], user: User = None) -> 'OfflineOperation':
         """Crear desde diccionario"""
-        user = User.objects.get(id=data['user_id'])
-        timestamp = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+        user = user or User.objects.get(id=data['user_id'])
+        timestamp = data['timestamp']
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
         
         op = cls(
             operation_type=data['operation_type'],
@@ -91,6 +97,42 @@ class OfflineOperation:
         op.checksum = data.get('checksum', op._calculate_checksum())
         
         return op
+    
+    @classmethod
+    def from_dicts(cls, items: List[Dict[str, Any]]) -> List['OfflineOperation']:
+        """Crear varias operaciones cargando sus usuarios en una sola consulta"""
+        users = User.objects.in_bulk({item.get('user_id') for item in items})
+        operations = []
+        for item in items:
+            user = users.get(item.get('user_id'))
+            if user is None:
+                logger.error(f"Usuario {item.get('user_id')} no encontrado para la operación {item.get('operation_id')}")
+                continue
+            try:
+                operations.append(cls.from_dict(item, user=user))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Error leyendo operación {item.get('operation_id')}: {e}")
+        return operations
+    
+    @classmethod
+    def from_log(cls, entry: OfflineOperationLog) -> 'OfflineOperation':
+        """Crear desde una entrada del log (con el usuario ya cargado)"""
+        op = cls(
+            operation_type=entry.operation_type,
+            model_name=entry.model_name,
+            data=entry.data,
+            user=entry.user,
+            object_id=entry.object_id or None,
+            timestamp=entry.timestamp
+        )
+        op.operation_id = entry.operation_id
+        op.seq = entry.seq
+        op.status = entry.status
+        op.sync_attempts = entry.sync_attempts
+        op.conflict_resolution = entry.conflict_resolution or None
+        op.error_message = entry.error_message or None
+        op.checksum = entry.checksum
+        return op
 
 
 class ConflictResolver:
@@ -184,144 +226,231 @@ class ConflictResolver:
 
 
 class OfflineStorage:
-    """Almacenamiento local para operaciones offline"""
-    
-    def __init__(self):
-        self.storage_key_prefix = "offline_ops"
-        self.user_queue_key = "offline_queue"
-    
+    """
+    Cola de operaciones offline sobre el log OfflineOperationLog.
+
+    Anexar, leer un lote y cambiar de estado cuestan una consulta cada uno,
+    sin importar cuántas operaciones tenga en cola el usuario. Los lotes se
+    reclaman de forma atómica (pending -> processing con un token) para que
+    dos workers no procesen la misma operación.
+    """
+
+    BATCH_SIZE = 500
+    PROCESSING_TIMEOUT = timedelta(minutes=10)
+
+    def _log_fields(self, operation: OfflineOperation) -> Dict[str, Any]:
+        return {
+            'user_id': operation.user.id,
+            'operation_type': operation.operation_type,
+            'model_name': operation.model_name,
+            'object_id': str(operation.object_id or ''),
+            'data': operation.data,
+            'checksum': operation.checksum,
+            'status': operation.status,
+            'sync_attempts': operation.sync_attempts,
+            'conflict_resolution': operation.conflict_resolution or '',
+            'error_message': operation.error_message or '',
+            'timestamp': operation.timestamp,
+        }
+
     def save_operation(self, operation: OfflineOperation):
-        """Guardar operación offline"""
-        # Guardar operación individual
-        op_key = f"{self.storage_key_prefix}:{operation.operation_id}"
-        cache_service.set(
-            op_key,
-            operation.to_dict(),
-            timeout=86400 * 30,  # 30 días
-            tags=['offline', 'operation', f'user_{operation.user.id}']
+        """Anexar la operación al log (o reemplazarla si ya existe)"""
+        entry, created = OfflineOperationLog.objects.update_or_create(
+            operation_id=operation.operation_id,
+            defaults=self._log_fields(operation)
         )
-        
-        # Añadir a cola del usuario
-        self._add_to_user_queue(operation.user.id, operation.operation_id)
-        
-        logger.info(f"Operación offline guardada: {operation.operation_id}")
-    
+        operation.seq = entry.seq
+        logger.info(f"Operación offline guardada: {operation.operation_id} (seq {entry.seq})")
+
+    def append_operations(self, operations: List[OfflineOperation]) -> int:
+        """Anexar varias operaciones en bloque; las ya registradas se omiten"""
+        ids = [operation.operation_id for operation in operations]
+        existing = set(
+            OfflineOperationLog.objects.filter(operation_id__in=ids).values_list('operation_id', flat=True)
+        )
+        entries = [
+            OfflineOperationLog(operation_id=operation.operation_id, **self._log_fields(operation))
+            for operation in operations if operation.operation_id not in existing
+        ]
+        OfflineOperationLog.objects.bulk_create(entries, batch_size=self.BATCH_SIZE)
+        return len(entries)
+
     def get_operation(self, operation_id: str) -> Optional[OfflineOperation]:
         """Obtener operación por ID"""
-        op_key = f"{self.storage_key_prefix}:{operation_id}"
-        data = cache_service.get(op_key)
-        
-        if data:
-            return OfflineOperation.from_dict(data)
-        return None
-    
-    def get_user_operations(self, user_id: int, status: str = None) -> List[OfflineOperation]:
-        """Obtener operaciones de un usuario"""
-        queue_key = f"{self.user_queue_key}:{user_id}"
-        operation_ids = cache_service.get(queue_key, [])
-        
-        operations = []
-        for op_id in operation_ids:
-            operation = self.get_operation(op_id)
-            if operation and (status is None or operation.status == status):
-                operations.append(operation)
-        
-        return sorted(operations, key=lambda x: x.timestamp)
-    
-    def update_operation_status(self, operation_id: str, status: str, 
-                              error_message: str = None):
-        """Actualizar estado de operación"""
-        operation = self.get_operation(operation_id)
-        if operation:
-            operation.status = status
-            operation.sync_attempts += 1
-            if error_message:
-                operation.error_message = error_message
-            
-            self.save_operation(operation)
-    
-    def remove_operation(self, operation_id: str, user_id: int):
-        """Eliminar operación"""
-        op_key = f"{self.storage_key_prefix}:{operation_id}"
-        cache_service.delete(op_key)
-        
-        # Remover de cola del usuario
-        self._remove_from_user_queue(user_id, operation_id)
-    
-    def _add_to_user_queue(self, user_id: int, operation_id: str):
-        """Añadir operación a cola del usuario"""
-        queue_key = f"{self.user_queue_key}:{user_id}"
-        queue = cache_service.get(queue_key, [])
-        
-        if operation_id not in queue:
-            queue.append(operation_id)
-            cache_service.set(
-                queue_key,
-                queue,
-                timeout=86400 * 30,
-                tags=['offline', 'queue', f'user_{user_id}']
+        entry = OfflineOperationLog.objects.select_related('user').filter(operation_id=operation_id).first()
+        return OfflineOperation.from_log(entry) if entry else None
+
+    def _queryset(self, user_id: int = None, status=None, after_seq: int = 0):
+        queryset = OfflineOperationLog.objects.select_related('user')
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        if isinstance(status, str):
+            queryset = queryset.filter(status=status)
+        elif status:
+            queryset = queryset.filter(status__in=status)
+        if after_seq:
+            queryset = queryset.filter(seq__gt=after_seq)
+        return queryset.order_by('seq')
+
+    def get_user_operations(self, user_id: int, status=None, after_seq: int = 0,
+                            limit: int = None) -> List[OfflineOperation]:
+        """Operaciones de un usuario en orden de llegada, en una sola consulta"""
+        queryset = self._queryset(user_id, status, after_seq)
+        if limit:
+            queryset = queryset[:limit]
+        return [OfflineOperation.from_log(entry) for entry in queryset]
+
+    def iter_operations(self, user_id: int = None, status=None, batch_size: int = None):
+        """Recorrer el log por lotes de seq (una consulta por lote)"""
+        batch_size = batch_size or self.BATCH_SIZE
+        after_seq = 0
+        while True:
+            batch = [
+                OfflineOperation.from_log(entry)
+                for entry in self._queryset(user_id, status, after_seq)[:batch_size]
+            ]
+            if not batch:
+                return
+            yield batch
+            after_seq = batch[-1].seq
+
+    def pending_user_ids(self) -> List[int]:
+        """Usuarios con operaciones por procesar (usa el índice parcial de pendientes)"""
+        return list(
+            OfflineOperationLog.objects.filter(status__in=['pending', 'processing'])
+            .order_by('user_id').values_list('user_id', flat=True).distinct()
+        )
+
+    def claim_operations(self, user_id: int = None, limit: int = None) -> List[OfflineOperation]:
+        """
+        Reclamar un lote de operaciones pendientes para procesarlas.
+
+        Incluye las que quedaron en processing más de PROCESSING_TIMEOUT (un
+        worker que murió a mitad del lote).
+        """
+        limit = limit or self.BATCH_SIZE
+        now = timezone.now()
+        claimable = models.Q(status='pending') | models.Q(
+            status='processing', updated_at__lt=now - self.PROCESSING_TIMEOUT
+        )
+        queryset = OfflineOperationLog.objects.filter(claimable)
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        seqs = list(queryset.order_by('seq').values_list('seq', flat=True)[:limit])
+        if not seqs:
+            return []
+
+        token = uuid.uuid4().hex
+        queryset.filter(seq__in=seqs).update(status='processing', claim_token=token, updated_at=now)
+        return [
+            OfflineOperation.from_log(entry)
+            for entry in OfflineOperationLog.objects.select_related('user').filter(
+                claim_token=token, status='processing'
+            ).order_by('seq')
+        ]
+
+    def update_operation_status(self, operation_id: str, status: str,
+                                error_message: str = None, expected_status: str = None) -> bool:
+        """Cambiar el estado con un UPDATE atómico; False si el estado esperado no coincide"""
+        queryset = OfflineOperationLog.objects.filter(operation_id=operation_id)
+        if expected_status:
+            queryset = queryset.filter(status=expected_status)
+        changes = {
+            'status': status,
+            'sync_attempts': models.F('sync_attempts') + 1,
+            'claim_token': '',
+            'updated_at': timezone.now(),
+        }
+        if error_message:
+            changes['error_message'] = error_message
+        return queryset.update(**changes) > 0
+
+    def complete_operations(self, outcomes: List[Tuple[OfflineOperation, str, Optional[str]]]):
+        """
+        Registrar el resultado de un lote: [(operación, estado, mensaje)].
+
+        Las sincronizadas se marcan con un único UPDATE; las fallidas o en
+        conflicto (que llevan su mensaje) con un bulk_update.
+        """
+        now = timezone.now()
+        synced = [operation.seq for operation, status, _ in outcomes if status == 'synced']
+        if synced:
+            OfflineOperationLog.objects.filter(seq__in=synced).update(
+                status='synced', sync_attempts=models.F('sync_attempts') + 1,
+                claim_token='', updated_at=now
             )
-    
-    def _remove_from_user_queue(self, user_id: int, operation_id: str):
-        """Remover operación de cola del usuario"""
-        queue_key = f"{self.user_queue_key}:{user_id}"
-        queue = cache_service.get(queue_key, [])
-        
-        if operation_id in queue:
-            queue.remove(operation_id)
-            cache_service.set(
-                queue_key,
-                queue,
-                timeout=86400 * 30,
-                tags=['offline', 'queue', f'user_{user_id}']
+
+        others = [
+            OfflineOperationLog(
+                seq=operation.seq, status=status, error_message=message or '',
+                sync_attempts=operation.sync_attempts + 1, claim_token='', updated_at=now
             )
-    
+            for operation, status, message in outcomes if status != 'synced'
+        ]
+        if others:
+            OfflineOperationLog.objects.bulk_update(
+                others, ['status', 'error_message', 'sync_attempts', 'claim_token', 'updated_at'],
+                batch_size=self.BATCH_SIZE
+            )
+
+    def remove_operation(self, operation_id: str, user_id: int):
+        """Eliminar operación del log"""
+        OfflineOperationLog.objects.filter(operation_id=operation_id, user_id=user_id).delete()
+
+    def purge_operations(self, before: datetime, statuses=('synced',)) -> int:
+        """Eliminar operaciones terminadas anteriores a una fecha"""
+        deleted, _ = OfflineOperationLog.objects.filter(
+            status__in=statuses, updated_at__lt=before
+        ).delete()
+        return deleted
+
+    # Posiciones de consumidores (p. ej. cada dispositivo que lee el log)
+
+    def get_offset(self, consumer: str, user_id: int) -> int:
+        offset = OfflineLogOffset.objects.filter(consumer=consumer, user_id=user_id).values_list(
+            'last_seq', flat=True
+        ).first()
+        return offset or 0
+
+    def commit_offset(self, consumer: str, user_id: int, seq: int):
+        """Avanzar la posición del consumidor (nunca retrocede)"""
+        updated = OfflineLogOffset.objects.filter(
+            consumer=consumer, user_id=user_id, last_seq__lt=seq
+        ).update(last_seq=seq, updated_at=timezone.now())
+        if not updated:
+            OfflineLogOffset.objects.get_or_create(
+                consumer=consumer, user_id=user_id, defaults={'last_seq': seq}
+            )
+
+    def read_from_offset(self, consumer: str, user_id: int, limit: int = None) -> List[OfflineOperation]:
+        """Siguiente lote de operaciones del usuario posteriores a la posición del consumidor"""
+        return self.get_user_operations(
+            user_id, after_seq=self.get_offset(consumer, user_id), limit=limit or self.BATCH_SIZE
+        )
+
     def get_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas del almacenamiento offline"""
-        # Obtener todas las operaciones
-        pattern = f"{self.storage_key_prefix}:*"
-        operation_keys = cache_service.get_keys_by_pattern(pattern)
-        
-        stats = {
-            'total_operations': len(operation_keys),
-            'by_status': {},
-            'by_type': {},
-            'by_user': {},
-            'oldest_operation': None,
-            'newest_operation': None
+        queryset = OfflineOperationLog.objects.all()
+        bounds = queryset.aggregate(
+            total=models.Count('seq'),
+            oldest=models.Min('timestamp'),
+            newest=models.Max('timestamp'),
+        )
+
+        def grouped(field):
+            return {
+                row[field]: row['count']
+                for row in queryset.order_by().values(field).annotate(count=models.Count('seq'))
+            }
+
+        return {
+            'total_operations': bounds['total'],
+            'by_status': grouped('status'),
+            'by_type': grouped('operation_type'),
+            'by_user': grouped('user_id'),
+            'oldest_operation': bounds['oldest'].isoformat() if bounds['oldest'] else None,
+            'newest_operation': bounds['newest'].isoformat() if bounds['newest'] else None,
         }
-        
-        timestamps = []
-        
-        for key in operation_keys:
-            op_data = cache_service.get(key)
-            if op_data:
-                # Por estado
-                status = op_data.get('status', 'unknown')
-                stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-                
-                # Por tipo
-                op_type = op_data.get('operation_type', 'unknown')
-                stats['by_type'][op_type] = stats['by_type'].get(op_type, 0) + 1
-                
-                # Por usuario
-                user_id = op_data.get('user_id')
-                stats['by_user'][user_id] = stats['by_user'].get(user_id, 0) + 1
-                
-                # Timestamps
-                timestamp_str = op_data.get('timestamp')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        timestamps.append(timestamp)
-                    except:
-                        pass
-        
-        if timestamps:
-            stats['oldest_operation'] = min(timestamps).isoformat()
-            stats['newest_operation'] = max(timestamps).isoformat()
-        
-        return stats
 
 
 class OfflineSyncService:
@@ -357,6 +486,10 @@ class OfflineSyncService:
             object_id=object_id
         )
         
+        # Si estamos online se guarda ya reclamada (processing) para que un
+        # sync_pending_operations concurrente no la aplique dos veces
+        if self.is_online:
+            operation.status = 'processing'
         self.storage.save_operation(operation)
         
         # Intentar sincronización inmediata si estamos online
@@ -379,90 +512,139 @@ class OfflineSyncService:
                 'failed_count': 0
             }
         
-        # Obtener operaciones pendientes
-        if user_id:
-            pending_operations = self.storage.get_user_operations(user_id, 'pending')
-        else:
-            # Obtener todas las operaciones pendientes
-            pending_operations = []
-            for user in User.objects.filter(is_active=True):
-                pending_operations.extend(
-                    self.storage.get_user_operations(user.id, 'pending')
-                )
-        
         sync_results = {
             'success': True,
             'synced_count': 0,
             'failed_count': 0,
             'conflict_count': 0,
+            'users_count': 0,
             'operations': []
         }
         
-        # Procesar operaciones en orden cronológico
-        pending_operations.sort(key=lambda x: x.timestamp)
+        # Sin usuario se recorren solo los que tienen cola (índice de
+        # pendientes): el costo depende del trabajo pendiente, no de cuántos
+        # usuarios existan
+        user_ids = [user_id] if user_id else self.storage.pending_user_ids()
+        
+        for pending_user_id in user_ids:
+            user_results = self._drain_user_queue(pending_user_id)
+            sync_results['users_count'] += 1
+            for key in ('synced_count', 'failed_count', 'conflict_count'):
+                sync_results[key] += user_results[key]
+            sync_results['operations'].extend(user_results['operations'])
+            
+            # Notificar resultados
+            if user_results['synced_count'] > 0 or user_results['failed_count'] > 0:
+                notification_service.send_notification(
+                    'sync_completed',
+                    recipients=[pending_user_id],
+                    data={
+                        'system_name': 'el servidor',
+                        'synced_count': user_results['synced_count'],
+                        'failed_count': user_results['failed_count'],
+                        'conflict_count': user_results['conflict_count']
+                    }
+                )
         
-        for operation in pending_operations:
-            try:
-                result = self._sync_operation(operation)
-                sync_results['operations'].append({
+        return sync_results
+    
+    def _drain_user_queue(self, user_id: int) -> Dict[str, Any]:
+        """
+        Procesar la cola de un usuario por lotes reclamados, en orden de llegada.
+        
+        Cada lote cuesta una consulta para reclamarlo (con los usuarios ya
+        cargados), un IN por modelo para cargar los objetos afectados y una o
+        dos para registrar sus resultados, además de la aplicación de cada
+        operación. Las versiones que escriben las operaciones del usuario no
+        cuentan como conflicto para sus operaciones siguientes.
+        """
+        results = {'synced_count': 0, 'failed_count': 0, 'conflict_count': 0, 'operations': []}
+        own_versions = {}
+        
+        while True:
+            batch = self.storage.claim_operations(user_id)
+            if not batch:
+                break
+            
+            targets = self._load_targets(batch)
+            outcomes = []
+            for operation in batch:
+                result = self._sync_operation(
+                    operation, record_status=False, targets=targets, own_versions=own_versions
+                )
+                outcomes.append((operation, result['status'], result.get('message')))
+                results['operations'].append({
                     'operation_id': operation.operation_id,
                     'status': result['status'],
                     'message': result.get('message', '')
                 })
                 
                 if result['status'] == 'synced':
-                    sync_results['synced_count'] += 1
+                    results['synced_count'] += 1
                 elif result['status'] == 'conflict':
-                    sync_results['conflict_count'] += 1
+                    results['conflict_count'] += 1
                 else:
-                    sync_results['failed_count'] += 1
-                    
-            except Exception as e:
-                logger.error(f"Error sincronizando operación {operation.operation_id}: {e}")
-                sync_results['failed_count'] += 1
-                sync_results['operations'].append({
-                    'operation_id': operation.operation_id,
-                    'status': 'failed',
-                    'message': str(e)
-                })
+                    results['failed_count'] += 1
+            
+            self.storage.complete_operations(outcomes)
         
-        # Notificar resultados
-        if user_id and (sync_results['synced_count'] > 0 or sync_results['failed_count'] > 0):
-            notification_service.send_notification(
-                'sync_completed',
-                recipients=[user_id],
-                data={
-                    'synced_count': sync_results['synced_count'],
-                    'failed_count': sync_results['failed_count'],
-                    'conflict_count': sync_results['conflict_count']
-                }
-            )
+        return results
+    
+    def _get_model(self, model_name: str):
+        model_path = self.SYNCABLE_MODELS[model_name]
+        app_label, model_name = model_path.split('.')[1], model_path.split('.')[-1]
+        return apps.get_model(app_label, model_name)
+    
+    def _load_targets(self, operations: List[OfflineOperation]) -> Dict[Tuple[str, str], Any]:
+        """Objetos que actualizan las operaciones del lote: un IN por modelo"""
+        ids_by_model = {}
+        for operation in operations:
+            if operation.operation_type == 'update' and operation.object_id:
+                ids_by_model.setdefault(operation.model_name, set()).add(operation.object_id)
         
-        return sync_results
+        targets = {}
+        for model_name, object_ids in ids_by_model.items():
+            try:
+                Model = self._get_model(model_name)
+                for obj in Model.objects.filter(pk__in=object_ids):
+                    targets[(model_name, str(obj.pk))] = obj
+            except (KeyError, LookupError, ValueError, ValidationError):
+                # Se resuelve operación por operación en _sync_operation
+                continue
+        return targets
     
-    def _sync_operation(self, operation: OfflineOperation) -> Dict[str, Any]:
-        """Sincronizar una operación específica"""
+    def _sync_operation(self, operation: OfflineOperation, record_status: bool = True,
+                        targets: Dict = None, own_versions: Dict = None) -> Dict[str, Any]:
+        """
+        Sincronizar una operación específica.
+        
+        Con record_status=False no se toca el log: quien procesa un lote
+        registra todos los resultados juntos (complete_operations). targets
+        son los objetos ya cargados del lote (_load_targets) y own_versions
+        las row_version escritas por las operaciones anteriores del lote.
+        """
         
         try:
             # Obtener modelo
-            model_path = self.SYNCABLE_MODELS[operation.model_name]
-            app_label, model_name = model_path.split('.')[-2:]
-            Model = apps.get_model(app_label, model_name.split('.')[-1])
+            Model = self._get_model(operation.model_name)
             
             with transaction.atomic():
                 if operation.operation_type == 'create':
                     result = self._sync_create(Model, operation)
                 elif operation.operation_type == 'update':
-                    result = self._sync_update(Model, operation)
+                    key = (operation.model_name, str(operation.object_id))
+                    result = self._sync_update(
+                        Model, operation, (targets or {}).get(key),
+                        own_versions.setdefault(key, set()) if own_versions is not None else None
+                    )
                 elif operation.operation_type == 'delete':
                     result = self._sync_delete(Model, operation)
                 else:
                     result = {'status': 'failed', 'message': 'Tipo de operación no soportado'}
                 
-                # Actualizar estado de la operación
-                if result['status'] == 'synced':
-                    self.storage.remove_operation(operation.operation_id, operation.user.id)
-                elif result['status'] in ['failed', 'conflict']:
+                # Actualizar estado de la operación (el log es de solo anexado:
+                # las sincronizadas se marcan, no se borran)
+                if record_status and result['status'] in ['synced', 'failed', 'conflict']:
                     self.storage.update_operation_status(
                         operation.operation_id,
                         result['status'],
@@ -475,11 +657,12 @@ class OfflineSyncService:
             error_msg = str(e)
             logger.error(f"Error sincronizando operación {operation.operation_id}: {error_msg}")
             
-            self.storage.update_operation_status(
-                operation.operation_id,
-                'failed',
-                error_msg
-            )
+            if record_status:
+                self.storage.update_operation_status(
+                    operation.operation_id,
+                    'failed',
+                    error_msg
+                )
             
             return {'status': 'failed', 'message': error_msg}
     
@@ -523,18 +706,35 @@ class OfflineSyncService:
         
         return {'status': 'synced', 'message': 'Objeto creado/actualizado correctamente'}
     
-    def _sync_update(self, Model, operation: OfflineOperation) -> Dict[str, Any]:
-        """Sincronizar operación de actualización"""
+    def _sync_update(self, Model, operation: OfflineOperation, obj=None,
+                     own_versions: set = None) -> Dict[str, Any]:
+        """
+        Sincronizar operación de actualización.
+        
+        Si data trae la row_version que leyó el dispositivo, el conflicto es
+        una comparación de enteros y el objeto solo se convierte a diccionario
+        cuando lo hay. Sin versión se comparan los datos campo por campo.
+        """
         
         if not operation.object_id:
             return {'status': 'failed', 'message': 'ID de objeto requerido para actualización'}
         
         try:
-            obj = Model.objects.get(id=operation.object_id)
-            existing_data = self._model_to_dict(obj)
+            if obj is None:
+                obj = Model.objects.get(id=operation.object_id)
+            own_versions = own_versions if own_versions is not None else set()
+            data = dict(operation.data)
+            base_version = data.pop('row_version', None)
+            
+            if base_version is not None and hasattr(obj, 'row_version'):
+                conflict = obj.row_version != base_version and obj.row_version not in own_versions
+                existing_data = self._model_to_dict(obj) if conflict else None
+            else:
+                existing_data = self._model_to_dict(obj)
+                conflict = self._data_changed(data, existing_data)
             
             # Verificar conflictos
-            if self._data_changed(operation.data, existing_data):
+            if conflict:
                 resolution, resolved_data = self.conflict_resolver.resolve_conflict(
                     operation, existing_data
                 )
@@ -548,15 +748,17 @@ class OfflineSyncService:
                 
                 # Aplicar cambios resueltos
                 for field, value in resolved_data.items():
-                    if hasattr(obj, field):
+                    if hasattr(obj, field) and field != 'row_version':
                         setattr(obj, field, value)
             else:
                 # Aplicar cambios directamente
-                for field, value in operation.data.items():
+                for field, value in data.items():
                     if hasattr(obj, field):
                         setattr(obj, field, value)
             
             obj.save()
+            if hasattr(obj, 'row_version'):
+                own_versions.add(obj.row_version)
             return {'status': 'synced', 'message': 'Objeto actualizado correctamente'}
             
         except Model.DoesNotExist:
@@ -623,9 +825,10 @@ class OfflineSyncService:
         """Obtener estado de sincronización"""
         
         if user_id:
-            pending_ops = self.storage.get_user_operations(user_id, 'pending')
-            failed_ops = self.storage.get_user_operations(user_id, 'failed')
-            conflict_ops = self.storage.get_user_operations(user_id, 'conflict')
+            open_ops = self.storage.get_user_operations(user_id, ('pending', 'failed', 'conflict'))
+            pending_ops = [op for op in open_ops if op.status == 'pending']
+            failed_ops = [op for op in open_ops if op.status == 'failed']
+            conflict_ops = [op for op in open_ops if op.status == 'conflict']
         else:
             # Estadísticas globales
             stats = self.storage.get_statistics()
@@ -669,12 +872,13 @@ class OfflineSyncService:
             return {'success': False, 'error': 'La operación no está en conflicto'}
         
         # Verificar permisos (solo el usuario propietario o admin)
-        if operation.user.id != user.id and user.user_type != 'admin':
+        if operation.user.id != user.id and user.role != 'admin':
             return {'success': False, 'error': 'Sin permisos para resolver este conflicto'}
         
         # Actualizar datos de la operación con la resolución
         operation.data = resolution_data
-        operation.status = 'pending'
+        operation.checksum = operation._calculate_checksum()
+        operation.status = 'processing'
         operation.conflict_resolution = 'manual'
         
         self.storage.save_operation(operation)
@@ -691,10 +895,9 @@ class OfflineSyncService:
         """Limpiar operaciones antiguas ya sincronizadas"""
         cutoff_date = timezone.now() - timedelta(days=days)
         
-        # Esta funcionalidad dependería de implementar timestamps en el cache
-        # Por ahora, solo retornamos 0
-        logger.info(f"Limpieza de operaciones offline anteriores a {cutoff_date}")
-        return 0
+        deleted = self.storage.purge_operations(cutoff_date)
+        logger.info(f"Limpieza de operaciones offline anteriores a {cutoff_date}: {deleted} eliminadas")
+        return deleted
     
     def export_offline_data(self, user_id: int) -> Dict[str, Any]:
         """Exportar datos offline para backup/migración"""
@@ -707,22 +910,59 @@ class OfflineSyncService:
             'operations': [op.to_dict() for op in operations]
         }
     
+    def iter_export_operations(self, user_id: int):
+        """Operaciones del usuario como diccionarios, leídas del log por lotes (para exportar en streaming)"""
+        for batch in self.storage.iter_operations(user_id):
+            for operation in batch:
+                yield operation.to_dict()
+    
+    def import_offline_stream(self, records, owner_id: int, user: User) -> Dict[str, Any]:
+        """
+        Importar operaciones desde un iterable de diccionarios (p. ej. una
+        trama binaria leída por bloques), anexándolas al log por lotes.
+
+        La importación es una transacción: si la trama resulta no válida a
+        mitad de la lectura (FormatError) no queda ningún lote importado.
+        """
+        if owner_id != user.id and user.role != 'admin':
+            return {'success': False, 'error': 'Sin permisos para importar estos datos'}
+        
+        owner = user if owner_id == user.id else User.objects.filter(id=owner_id).first()
+        if owner is None:
+            return {'success': False, 'error': 'Usuario no encontrado'}
+        
+        total_count = imported_count = 0
+        batch = []
+        with transaction.atomic():
+            for record in records:
+                total_count += 1
+                try:
+                    batch.append(OfflineOperation.from_dict(record, user=owner))
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.error(f"Error leyendo operación {record.get('operation_id')}: {e}")
+                if len(batch) >= self.storage.BATCH_SIZE:
+                    imported_count += self.storage.append_operations(batch)
+                    batch = []
+            if batch:
+                imported_count += self.storage.append_operations(batch)
+        
+        return {
+            'success': True,
+            'imported_count': imported_count,
+            'total_operations': total_count
+        }
+    
     def import_offline_data(self, data: Dict[str, Any], user: User) -> Dict[str, Any]:
         """Importar datos offline desde backup"""
         
-        if data.get('user_id') != user.id and user.user_type != 'admin':
+        if data.get('user_id') != user.id and user.role != 'admin':
             return {'success': False, 'error': 'Sin permisos para importar estos datos'}
         
         operations = data.get('operations', [])
-        imported_count = 0
+        parsed = OfflineOperation.from_dicts(operations)
         
-        for op_data in operations:
-            try:
-                operation = OfflineOperation.from_dict(op_data)
-                self.storage.save_operation(operation)
-                imported_count += 1
-            except Exception as e:
-                logger.error(f"Error importando operación: {e}")
+        # Un solo INSERT por lote; las ya registradas no se duplican
+        imported_count = self.storage.append_operations(parsed)
         
         return {
             'success': True,
@@ -184,62 +184,17 @@ class SyncService:
             raise
     
     def _execute_export_job(self, job: SyncJob) -> bool:
-        """Ejecutar trabajo de exportación"""
+        """
+        Ejecutar trabajo de exportación.
+
+        Los lotes se envían en paralelo (config.concurrency) y el avance
+        confirmado queda en el trabajo: reintentar un trabajo fallido continúa
+        desde el último lote aceptado.
+        """
+        from .export_pipeline import ExportPipeline
+
         try:
-            config = job.config
-            model_name = config.get('model')
-            endpoint = config.get('endpoint', '')
-            
-            if not model_name:
-                raise ValueError("Modelo no especificado en configuración")
-            
-            # Obtener modelo Django
-            content_type = ContentType.objects.get(model=model_name.lower())
-            model_class = content_type.model_class()
-            
-            # Obtener registros a exportar
-            queryset = model_class.objects.all()
-            
-            # Aplicar filtros si existen
-            filters = config.get('filters', {})
-            if filters:
-                queryset = queryset.filter(**filters)
-            
-            records = list(queryset.values())
-            job.total_records = len(records)
-            job.save()
-            
-            job.add_log(f"Exportando {job.total_records} registros de {model_name}")
-            
-            # URL de destino
-            url = f"{job.external_system.api_url.rstrip('/')}/{endpoint.lstrip('/')}"
-            headers = self._prepare_headers(job.external_system)
-            
-            # Exportar en lotes
-            batch_size = config.get('batch_size', 100)
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                
-                try:
-                    response = self.session.post(
-                        url,
-                        headers=headers,
-                        json={'data': batch},
-                        timeout=30
-                    )
-                    response.raise_for_status()
-                    
-                    job.success_count += len(batch)
-                except Exception as e:
-                    job.error_count += len(batch)
-                    job.add_log(f"Error exportando lote: {e}")
-                
-                job.processed_records += len(batch)
-                job.progress = int((job.processed_records / job.total_records) * 100)
-                job.save(update_fields=['processed_records', 'success_count', 'error_count', 'progress'])
-            
-            return job.error_count == 0
-            
+            return ExportPipeline(job, self._prepare_headers(job.external_system)).run()
         except Exception as e:
             job.add_log(f"Error en exportación: {e}")
             raise
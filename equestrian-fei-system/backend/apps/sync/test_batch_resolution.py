@@ -0,0 +1,196 @@
+"""
+Tests para la resolución de conflictos en lote
+"""
+
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Category, Competition, Discipline, Horse, Participant, Venue
+from apps.scoring.models import IndividualScore, ScoreCard, ScoringCriteria
+from .conflict_batch import BatchConflictResolver, filter_conflicts
+from .managers import SyncManager
+from .models import ConflictResolution
+
+User = get_user_model()
+
+
+class BatchConflictResolutionTest(APITestCase):
+    """Una estrategia aplicada a muchos conflictos con consultas por lote"""
+
+    def setUp(self):
+        self.judge = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        self.organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=self.organizer
+        )
+        now = timezone.now()
+        self.competitions, self.cards = [], []
+        for index in range(2):
+            competition = Competition.objects.create(
+                name=f'Copa {index}', organizer=self.organizer, venue=venue,
+                start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+                registration_start=now, registration_end=now + timedelta(days=9),
+                competition_type='national', status='open_registration'
+            )
+            participant = Participant.objects.create(
+                competition=competition, rider=self.organizer, horse=horse, category=category
+            )
+            self.competitions.append(competition)
+            self.cards.append([
+                ScoreCard.objects.create(participant=participant, judge=self.judge, round_number=round_number)
+                for round_number in range(1, 5)
+            ])
+
+    def create_conflicts(self, cards):
+        """Ediciones offline sobre versiones que el servidor cambió mientras tanto"""
+        manager = SyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        content_type = ContentType.objects.get_for_model(ScoreCard)
+        manager.add_sync_actions(session, [
+            {'action_type': 'update', 'content_type': content_type.id, 'object_id': card.pk,
+             'data': {'notes': f'Offline {card.round_number}'}, 'base_version': card.row_version}
+            for card in cards
+        ])
+        for card in cards:
+            card.notes = 'Servidor'
+            card.save()
+        results = manager.process_sync_session(session)
+        self.assertEqual(results['conflicts'], len(cards))
+
+    def test_client_wins_applies_data_in_batches(self):
+        self.create_conflicts(self.cards[0] + self.cards[1])
+        # El servidor vuelve a cambiar una tarjeta después del conflicto
+        stale = ScoreCard.objects.get(pk=self.cards[0][3].pk)
+        stale.notes = 'Servidor otra vez'
+        stale.save()
+
+        queryset = filter_conflicts(ConflictResolution.objects.all(), competition=self.competitions[0].pk)
+        self.assertEqual(queryset.count(), 4)
+        progress = list(BatchConflictResolver('client_wins', resolved_by=self.organizer, batch_size=2).run(queryset))
+
+        self.assertEqual(len(progress), 2)
+        self.assertEqual(progress[-1], {'total': 4, 'processed': 4, 'resolved': 3, 'skipped': 1, 'failed': 0})
+        for card in self.cards[0][:3]:
+            card.refresh_from_db()
+            self.assertEqual((card.notes, card.row_version), (f'Offline {card.round_number}', 3))
+        stale.refresh_from_db()
+        self.assertEqual(stale.notes, 'Servidor otra vez')
+
+        resolved = ConflictResolution.objects.filter(status='resolved')
+        self.assertEqual(resolved.count(), 3)
+        self.assertTrue(all(conflict.sync_action.status == 'completed' for conflict in resolved))
+        self.assertEqual(set(resolved.values_list('resolved_by', flat=True)), {self.organizer.pk})
+        # Los conflictos de la otra competencia siguen pendientes
+        self.assertEqual(ConflictResolution.objects.filter(status='pending').count(), 5)
+
+    def create_score_conflict(self, card):
+        """Puntuación offline sobre una tarjeta que el servidor cambió mientras tanto"""
+        discipline = Discipline.objects.create(name='Salto', code='JUMP', discipline_type='jumping')
+        criterion = ScoringCriteria.objects.create(
+            discipline=discipline, name='Ritmo', code='RITMO', criteria_type='technical'
+        )
+        score = IndividualScore.objects.create(score_card=card, criteria=criterion, raw_score=5)
+        card.refresh_from_db()
+
+        manager = SyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        manager.add_sync_actions(session, [{
+            'action_type': 'score_update', 'content_type': ContentType.objects.get_for_model(ScoreCard).id,
+            'object_id': card.pk, 'base_version': card.row_version,
+            'data': {'scores': [{'id': str(score.pk), 'score': 8, 'justification': 'Offline'}]},
+        }])
+        card.notes = 'Servidor'
+        card.save()
+        self.assertEqual(manager.process_sync_session(session)['conflicts'], 1)
+        return score
+
+    def test_client_wins_reapplies_score_update(self):
+        card = self.cards[0][0]
+        score = self.create_score_conflict(card)
+
+        summary = BatchConflictResolver('client_wins').resolve(ConflictResolution.objects.all())
+
+        self.assertEqual((summary['resolved'], summary['skipped']), (1, 0))
+        score.refresh_from_db()
+        self.assertEqual((score.raw_score, score.comments), (8, 'Offline'))
+        card.refresh_from_db()
+        self.assertEqual((card.technical_score, card.notes), (8, 'Servidor'))
+        conflict = ConflictResolution.objects.get()
+        self.assertEqual((conflict.status, conflict.sync_action.status), ('resolved', 'completed'))
+
+    def test_server_wins_keeps_server_scores(self):
+        score = self.create_score_conflict(self.cards[0][0])
+
+        summary = BatchConflictResolver('server_wins').resolve(ConflictResolution.objects.all())
+
+        self.assertEqual(summary['resolved'], 1)
+        score.refresh_from_db()
+        self.assertEqual(score.raw_score, 5)
+
+    def test_delete_conflicts_are_skipped(self):
+        card = self.cards[0][0]
+        manager = SyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        manager.add_sync_actions(session, [{
+            'action_type': 'delete', 'content_type': ContentType.objects.get_for_model(ScoreCard).id,
+            'object_id': card.pk, 'base_version': card.row_version, 'data': {},
+        }])
+        card.notes = 'Servidor'
+        card.save()
+        self.assertEqual(manager.process_sync_session(session)['conflicts'], 1)
+
+        summary = BatchConflictResolver('client_wins').resolve(ConflictResolution.objects.all())
+
+        self.assertEqual((summary['resolved'], summary['skipped']), (0, 1))
+        self.assertTrue(ScoreCard.objects.filter(pk=card.pk).exists())
+        conflict = ConflictResolution.objects.get()
+        self.assertEqual((conflict.status, conflict.sync_action.status), ('pending', 'conflict'))
+
+    def test_queries_do_not_grow_with_conflicts(self):
+        self.create_conflicts(self.cards[0][:2])
+        with CaptureQueriesContext(connection) as small:
+            BatchConflictResolver('client_wins').resolve(ConflictResolution.objects.filter(status='pending'))
+
+        self.create_conflicts(self.cards[1])
+        with CaptureQueriesContext(connection) as large:
+            summary = BatchConflictResolver('client_wins').resolve(ConflictResolution.objects.filter(status='pending'))
+
+        self.assertEqual(summary['resolved'], 4)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_endpoint_streams_progress(self):
+        self.create_conflicts(self.cards[0])
+        url = '/api/sync/conflicts/batch_resolve/'
+        self.client.force_authenticate(self.judge)
+
+        response = self.client.post(url, {'strategy': 'manual_resolution'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {'strategy': 'server_wins', 'dry_run': True, 'since': '2000-01-01'}, format='json')
+        self.assertEqual(response.json(), {'total': 4})
+
+        response = self.client.post(url, {'strategy': 'server_wins', 'model': 'scorecard'}, format='json')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(lines[-1]['resolved'], 4)
+        self.assertEqual(set(ScoreCard.objects.filter(pk__in=[card.pk for card in self.cards[0]])
+                             .values_list('notes', flat=True)), {'Servidor'})
+
+    def test_command_resolves_conflicts(self):
+        self.create_conflicts(self.cards[1])
+        call_command('resolve_conflicts', strategy='last_write_wins', competition=self.competitions[1].pk, verbosity=0)
+        self.assertFalse(ConflictResolution.objects.filter(status='pending').exists())
@@ -0,0 +1,198 @@
+"""
+Tests para el formato binario de sincronización
+"""
+
+import uuid
+import zlib
+from unittest import mock
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Horse
+from . import binary_format
+from .models import OfflineOperationLog, SyncSession
+from .services.offline_sync_service import OfflineOperation, OfflineStorage
+
+User = get_user_model()
+
+
+class BinaryFormatTest(APITestCase):
+    """Tramas MessagePack comprimidas, en ambos sentidos"""
+
+    export_url = '/api/sync/offline-sync/export_offline_data/'
+    import_url = '/api/sync/offline-sync/import_offline_data/'
+
+    def setUp(self):
+        self.user = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        self.client.force_authenticate(self.user)
+
+    def _operations(self, count):
+        operations = [
+            OfflineOperation(
+                'update', 'ScoreCard',
+                {'scores': [{'id': str(uuid.uuid4()), 'score': 7.5, 'justification': 'Buen ritmo'}],
+                 'custom_field': 'ñandú'},
+                self.user, object_id=str(uuid.uuid4())
+            )
+            for _ in range(count)
+        ]
+        OfflineStorage().append_operations(operations)
+        return operations
+
+    def _frame(self, kind, rows, meta=None):
+        """Trama sin comprimir con filas ya codificadas (pueden ser inválidas)"""
+        codec = binary_format.CODECS[kind]
+        packer = msgpack.Packer(use_bin_type=True)
+        header = {'v': binary_format.FORMAT_VERSION, 'kind': kind, 'fields': list(codec.FIELDS), 'meta': meta or {}}
+        return b''.join([packer.pack(header)] + [packer.pack(row) for row in rows] + [packer.pack({'end': len(rows)})])
+
+    def test_round_trip_keeps_values(self):
+        records = [operation.to_dict() for operation in self._operations(3)]
+        for encoding in (None,) + binary_format.available_encodings():
+            content = binary_format.encode('operations', records, {'user_id': self.user.id}, encoding)
+            meta, decoded = binary_format.decode(content, 'operations', encoding)
+            self.assertEqual(meta, {'user_id': self.user.id})
+            for original, record in zip(records, decoded):
+                self.assertEqual(record['operation_id'], original['operation_id'])
+                self.assertEqual(record['data'], original['data'])
+                self.assertEqual(record['checksum'], original['checksum'])
+                self.assertEqual(record['timestamp'].isoformat(), original['timestamp'])
+
+    def test_truncated_or_foreign_frames_are_rejected(self):
+        content = binary_format.encode('operations', [{'operation_id': 'x'}])
+        with self.assertRaises(binary_format.FormatError):
+            binary_format.decode(content[:-3])
+        with self.assertRaises(binary_format.FormatError):
+            binary_format.decode(content, kind='actions')
+
+    def test_invalid_values_are_format_errors(self):
+        codec = binary_format.CODECS['operations']
+        row = codec.encode(self._operations(1)[0].to_dict())
+        row[codec.FIELDS.index('timestamp')] = 2 ** 62  # año fuera de rango
+        with self.assertRaisesRegex(binary_format.FormatError, 'Registro 1 no válido'):
+            binary_format.decode(self._frame('operations', [row]))
+
+    def test_invalid_frame_imports_nothing(self):
+        # Más de un lote válido antes del registro inválido
+        codec = binary_format.CODECS['operations']
+        rows = [codec.encode(operation.to_dict()) for operation in self._operations(501)]
+        OfflineOperationLog.objects.all().delete()
+        bad = list(rows[0])
+        bad[codec.FIELDS.index('timestamp')] = 2 ** 62
+        response = self.client.generic(
+            'POST', self.import_url, self._frame('operations', rows + [bad], {'user_id': self.user.id}),
+            content_type=binary_format.MEDIA_TYPE
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OfflineOperationLog.objects.exists())
+
+        horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=self.user
+        )
+        session = SyncSession.objects.create(user=self.user, device_id='tablet-1')
+        codec = binary_format.CODECS['actions']
+        row = codec.encode({
+            'action_type': 'update', 'content_type': ContentType.objects.get_for_model(Horse).id,
+            'object_id': horse.pk, 'data': {'color': 'Tordo'},
+        })
+        bad = list(row)
+        bad[codec.FIELDS.index('priority')] = 99  # índice fuera de tabla
+        response = self.client.generic(
+            'POST', f'/api/sync/sync-sessions/{session.pk}/add_actions/',
+            self._frame('actions', [row] * 501 + [bad]), content_type=binary_format.MEDIA_TYPE
+        )
+        self.assertEqual(response.status_code, 400)
+        session.refresh_from_db()
+        self.assertEqual((session.actions_count, session.sync_actions.count()), (0, 0))
+
+    def test_decompression_is_bounded(self):
+        content = binary_format.encode('operations', [
+            {'operation_id': f'op-{index}', 'data': {'notes': 'x' * 1000}} for index in range(500)
+        ])
+        for encoding in binary_format.available_encodings():
+            compressor = binary_format._compressor(encoding)
+            compressed = compressor.compress(content) + compressor.flush()
+            pieces = list(binary_format._decompressed_chunks([compressed[:100], compressed[100:]], encoding))
+            self.assertEqual(b''.join(pieces), content)
+            self.assertLessEqual(max(len(piece) for piece in pieces), binary_format.CHUNK_SIZE)
+
+        # Pocos KB de gzip que se expanden a 16 MB
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        bomb = b''.join(compressor.compress(bytes(1024 * 1024)) for _ in range(16)) + compressor.flush()
+        self.assertLess(len(bomb), 64 * 1024)
+        with self.assertRaisesRegex(binary_format.FormatError, 'demasiado grande'):
+            for _ in binary_format._decompressed_chunks([bomb], 'gzip', limit=1024 * 1024):
+                pass
+
+        # Una trama válida que supera el tope se rechaza sin importar nada
+        record = self._operations(1)[0].to_dict()
+        OfflineOperationLog.objects.all().delete()
+        bomb = binary_format.encode('operations', (
+            dict(record, operation_id=f'offline_{uuid.uuid4().hex}', data={'notes': 'x' * 1000})
+            for _ in range(2000)
+        ), {'user_id': self.user.id}, 'gzip')
+        with mock.patch.object(binary_format, 'MAX_FRAME_SIZE', 1024 * 1024):
+            response = self.client.generic(
+                'POST', self.import_url, bomb, content_type=binary_format.MEDIA_TYPE,
+                HTTP_CONTENT_ENCODING='gzip'
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('demasiado grande', response.data['error'])
+        self.assertFalse(OfflineOperationLog.objects.exists())
+
+    def test_export_and_import_stream(self):
+        operations = self._operations(25)
+        response = self.client.post(
+            self.export_url, HTTP_ACCEPT=binary_format.MEDIA_TYPE, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], binary_format.MEDIA_TYPE)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = b''.join(response.streaming_content)
+
+        meta, records = binary_format.decode(content, 'operations', 'gzip')
+        self.assertEqual(meta['user_id'], self.user.id)
+        self.assertEqual([record['operation_id'] for record in records],
+                         [operation.operation_id for operation in operations])
+
+        OfflineOperationLog.objects.all().delete()
+        response = self.client.generic(
+            'POST', self.import_url, content, content_type=binary_format.MEDIA_TYPE,
+            HTTP_CONTENT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['imported_count'], response.data['total_operations']), (25, 25))
+        self.assertEqual(OfflineOperationLog.objects.filter(user=self.user).count(), 25)
+
+        response = self.client.generic(
+            'POST', self.import_url, b'\x00basura', content_type=binary_format.MEDIA_TYPE
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_session_actions_upload(self):
+        horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=self.user
+        )
+        session = SyncSession.objects.create(user=self.user, device_id='tablet-1')
+        content_type = ContentType.objects.get_for_model(Horse)
+        records = [
+            {'action_type': 'update', 'content_type': content_type.id, 'object_id': horse.pk,
+             'data': {'color': f'Color {index}'}, 'priority': 'high'}
+            for index in range(4)
+        ] + [{'action_type': 'update', 'content_type': content_type.id, 'object_id': 999999, 'data': {}}]
+
+        response = self.client.generic(
+            'POST', f'/api/sync/sync-sessions/{session.pk}/add_actions/',
+            binary_format.encode('actions', records), content_type=binary_format.MEDIA_TYPE
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['added_count'], 4)
+        self.assertEqual(len(response.data['errors']), 1)
+        session.refresh_from_db()
+        self.assertEqual(session.actions_count, 4)
+        self.assertEqual(session.sync_actions.filter(priority='high').count(), 4)
@@ -0,0 +1,173 @@
+"""
+Tests para el feed de cambios (sincronización incremental de clientes)
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import Category, Competition, CompetitionStaff, Horse, Participant, Venue
+from apps.scoring.models import ScoreCard
+from .models import ChangeFeedEntry
+
+User = get_user_model()
+
+
+@override_settings(SYNC_CHANGE_FEED_LAG_SECONDS=0)
+class ChangeFeedTest(APITestCase):
+    """Cambios compactados a partir de un cursor"""
+
+    url = '/api/sync/changes/'
+
+    def setUp(self):
+        self.user = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        self.client.force_authenticate(self.user)
+
+    def _horse(self, index):
+        return Horse.objects.create(
+            name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo',
+            color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=self.user
+        )
+
+    def test_saves_and_deletes_are_recorded(self):
+        horse = self._horse(1)
+        horse.color = 'Tordo'
+        horse.save()
+        horse_id = horse.pk
+        horse.delete()
+
+        entries = list(ChangeFeedEntry.objects.values_list('model_name', 'object_id', 'operation'))
+        self.assertEqual(entries, [
+            ('Horse', str(horse_id), 'upsert'),
+            ('Horse', str(horse_id), 'upsert'),
+            ('Horse', str(horse_id), 'delete'),
+        ])
+
+    def test_pull_is_compacted_and_resumable(self):
+        first, second = self._horse(1), self._horse(2)
+        first.color = 'Tordo'
+        first.save()
+
+        response = self.client.get(self.url, {'models': 'Horse'})
+        self.assertEqual(response.status_code, 200)
+        changes = response.data['changes']
+        # Dos escrituras del primer caballo se entregan como una, con su último estado
+        self.assertEqual([change['id'] for change in changes], [str(second.pk), str(first.pk)])
+        self.assertEqual(changes[1]['data']['color'], 'Tordo')
+        self.assertFalse(response.data['has_more'])
+
+        cursor = response.data['cursor']
+        second.delete()
+        third = self._horse(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'cursor': cursor, 'limit': 1})
+        feed_queries = [query for query in queries if 'sync_changefeedentry' in query['sql']]
+        self.assertEqual(len(feed_queries), 1)
+        self.assertEqual(response.data['changes'][0]['op'], 'delete')
+        self.assertTrue(response.data['has_more'])
+
+        response = self.client.get(self.url, {'cursor': response.data['cursor']})
+        self.assertEqual([change['id'] for change in response.data['changes']], [str(third.pk)])
+
+        response = self.client.get(self.url, {'cursor': response.data['cursor']})
+        self.assertEqual(response.data['changes'], [])
+
+    @override_settings(SYNC_CHANGE_FEED_LAG_SECONDS=60)
+    def test_recent_changes_wait_for_the_safe_horizon(self):
+        first, second, third = self._horse(1), self._horse(2), self._horse(3)
+        # Solo la segunda escritura es reciente: la tercera, aunque antigua,
+        # tiene un id mayor y podría tener ids anteriores sin confirmar
+        old = timezone.now() - timedelta(minutes=5)
+        ChangeFeedEntry.objects.exclude(object_id=str(second.pk)).update(created_at=old)
+
+        response = self.client.get(self.url)
+        self.assertEqual([change['id'] for change in response.data['changes']], [str(first.pk)])
+        cursor = response.data['cursor']
+        self.assertEqual(self.client.get(self.url, {'cursor': cursor}).data['changes'], [])
+
+        ChangeFeedEntry.objects.update(created_at=old)
+        response = self.client.get(self.url, {'cursor': cursor})
+        self.assertEqual(
+            [change['id'] for change in response.data['changes']], [str(second.pk), str(third.pk)]
+        )
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'models': 'User'}).status_code, 400)
+
+
+@override_settings(SYNC_CHANGE_FEED_LAG_SECONDS=0)
+class ChangeFeedScopeTest(APITestCase):
+    """Cada usuario recibe solo los cambios de sus competencias, sin datos privados"""
+
+    url = '/api/sync/changes/'
+
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        self.judge = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        self.rider = User.objects.create(username='rider1', email='rider1@test.com', role='rider')
+        self.outsider = User.objects.create(username='judge2', email='judge2@test.com', role='judge')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Feed', organizer=self.organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        CompetitionStaff.objects.create(competition=self.competition, staff_member=self.judge, role='judge')
+        self.horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=self.rider,
+            passport_number='PAS-1', notes='Cojera leve'
+        )
+        self.participant = Participant.objects.create(
+            competition=self.competition, rider=self.rider, horse=self.horse,
+            category=Category.objects.create(name='Juvenil', code='JUV', category_type='age'),
+            emergency_contact_name='Ana', emergency_contact_phone='555-1234'
+        )
+        self.card = ScoreCard.objects.create(participant=self.participant, judge=self.judge)
+
+    def _changes(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return {change['model']: change for change in response.data['changes']}
+
+    def test_changes_are_scoped_to_the_users_competitions(self):
+        self.assertEqual(self._changes(self.outsider), {})
+
+        changes = self._changes(self.judge)
+        self.assertEqual(set(changes), {'Competition', 'Participant', 'Horse', 'ScoreCard'})
+        self.assertEqual(changes['ScoreCard']['id'], str(self.card.pk))
+        # El personal no recibe los datos privados
+        self.assertNotIn('emergency_contact_phone', changes['Participant']['data'])
+        self.assertNotIn('passport_number', changes['Horse']['data'])
+        self.assertEqual(changes['Horse']['data']['name'], 'Caballo')
+
+        changes = self._changes(self.organizer)
+        self.assertEqual(changes['Participant']['data']['emergency_contact_phone'], '555-1234')
+        self.assertNotIn('notes', changes['Horse']['data'])
+
+        changes = self._changes(self.rider)
+        self.assertEqual(changes['Participant']['data']['emergency_contact_name'], 'Ana')
+        self.assertEqual(changes['Horse']['data']['passport_number'], 'PAS-1')
+
+    def test_deletes_keep_their_competition(self):
+        self.client.force_authenticate(self.judge)
+        cursor = self.client.get(self.url).data['cursor']
+        card_id = self.card.pk
+        self.card.delete()
+
+        changes = self.client.get(self.url, {'cursor': cursor}).data['changes']
+        self.assertEqual([(change['id'], change['op']) for change in changes], [(str(card_id), 'delete')])
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url, {'cursor': cursor}).data['changes'], [])
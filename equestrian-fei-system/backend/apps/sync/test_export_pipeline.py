@@ -0,0 +1,134 @@
+"""
+Tests para la exportación concurrente a sistemas externos contra un servidor FEI local
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from .models import ExternalSystem
+from .services.sync_service import SyncService
+
+User = get_user_model()
+
+
+class MockFEIServer(ThreadingHTTPServer):
+    """Servidor FEI de prueba: registra los lotes y puede fallar o tardar"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(('127.0.0.1', 0), MockFEIHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.received_ids = []
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.transient_failures = 0  # respuestas 503 antes de aceptar
+        self.reject_id = None  # id cuyo lote se rechaza siempre con 500
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class MockFEIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        records = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['data']
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            if server.transient_failures:
+                server.transient_failures -= 1
+                status = 503
+            elif server.reject_id in [record['id'] for record in records]:
+                status = 500
+            else:
+                status = 201
+        time.sleep(server.latency)
+        with server.lock:
+            server.active -= 1
+            if status == 201:
+                server.received_ids.extend(record['id'] for record in records)
+
+        body = b'{}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 503:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ExportPipelineTest(TestCase):
+    """Lotes concurrentes con reintentos y avance reanudable en el trabajo"""
+
+    def setUp(self):
+        self.server = MockFEIServer(latency=0.02)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.system = ExternalSystem.objects.create(
+            name='FEI local', system_type='fei', api_url=self.server.url, api_key='clave'
+        )
+        User.objects.bulk_create([
+            User(username=f'rider{index}', email=f'rider{index}@test.com') for index in range(230)
+        ])
+        self.user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        self.service = SyncService()
+
+    def create_job(self):
+        return self.service.create_sync_job(self.system, 'export', {
+            'model': 'user', 'endpoint': '/api/v1/athletes', 'batch_size': 20,
+            'concurrency': 4, 'backoff': 0.01,
+        })
+
+    def test_export_sends_batches_concurrently(self):
+        self.server.transient_failures = 2
+        job = self.create_job()
+
+        self.assertTrue(self.service.execute_sync_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(sorted(self.server.received_ids), self.user_ids)
+        self.assertGreater(self.server.max_active, 1)
+        self.assertEqual(self.server.requests, 12 + 2)
+        self.assertEqual((job.status, job.progress, job.success_count), ('completed', 100, 230))
+        self.assertEqual((job.export_offset, job.export_cursor), (230, str(self.user_ids[-1])))
+        self.assertEqual((job.metrics['batches'], job.metrics['records']), (12, 230))
+        self.assertGreater(job.metrics['records_per_second'], 0)
+        self.assertEqual(sum(batch['attempts'] for batch in job.metrics['recent']), 12 + 2)
+
+    def test_failed_batch_stops_and_resumes(self):
+        self.server.reject_id = self.user_ids[105]
+        job = self.create_job()
+
+        self.assertFalse(self.service.execute_sync_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        # Se confirma hasta el lote anterior al rechazado
+        self.assertEqual((job.export_offset, job.export_cursor), (100, str(self.user_ids[99])))
+        self.assertEqual(job.processed_records, 100)
+
+        self.server.reject_id = None
+        self.server.received_ids = []
+        self.assertTrue(self.service.execute_sync_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(sorted(self.server.received_ids), self.user_ids[100:])
+        self.assertEqual((job.export_offset, job.success_count, job.total_records), (230, 230, 230))
+        self.assertIn('Reanudando exportación tras 100 registros', job.log)
@@ -0,0 +1,107 @@
+"""
+Tests para el log de operaciones offline (OfflineOperationLog)
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import OfflineOperationLog
+from .services.offline_sync_service import OfflineOperation, OfflineSyncService
+
+User = get_user_model()
+
+
+class OfflineOperationLogTest(TestCase):
+    """Cola persistente con lecturas por lotes, reclamos atómicos y posiciones"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        self.service = OfflineSyncService()
+        self.storage = self.service.storage
+
+    def _queue(self, count, operation_type='bulk_update'):
+        operations = [
+            OfflineOperation(operation_type, 'ScoreCard', {'index': index}, self.user, object_id=str(index))
+            for index in range(count)
+        ]
+        self.storage.append_operations(operations)
+        return operations
+
+    def _log_queries(self, queries):
+        return [query for query in queries if 'sync_offlineoperationlog' in query['sql']]
+
+    def test_sync_cost_does_not_grow_per_operation(self):
+        self._queue(1200)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.service.sync_pending_operations(self.user.id)
+
+        # Tipo no soportado: todas fallan, pero se registran por lote
+        self.assertEqual(result['failed_count'], 1200)
+        self.assertEqual(OfflineOperationLog.objects.filter(status='failed').count(), 1200)
+        self.assertLessEqual(len(self._log_queries(queries)), 20)
+
+        status = self.service.get_sync_status(self.user.id)
+        self.assertEqual(status['failed_operations'], 1200)
+        self.assertEqual(status['operations']['failed'][0]['sync_attempts'], 1)
+
+    def test_claims_are_disjoint_and_ordered(self):
+        self._queue(5)
+        first = self.storage.claim_operations(self.user.id, limit=3)
+        second = self.storage.claim_operations(self.user.id, limit=3)
+
+        self.assertEqual([op.data['index'] for op in first], [0, 1, 2])
+        self.assertEqual([op.data['index'] for op in second], [3, 4])
+        self.assertEqual(self.storage.claim_operations(self.user.id), [])
+
+    def test_synced_operations_stay_in_log_until_cleanup(self):
+        operation_id = self.service.record_offline_operation(
+            'delete', 'Horse', {}, self.user, object_id='999999'
+        )
+        entry = OfflineOperationLog.objects.get(operation_id=operation_id)
+        self.assertEqual(entry.status, 'synced')
+        self.assertEqual(self.storage.claim_operations(self.user.id), [])
+
+        self.assertEqual(self.service.cleanup_old_operations(days=0), 1)
+        self.assertFalse(OfflineOperationLog.objects.exists())
+
+    def test_consumer_offsets(self):
+        self._queue(5)
+        batch = self.storage.read_from_offset('tablet-1', self.user.id, limit=2)
+        self.assertEqual([op.data['index'] for op in batch], [0, 1])
+
+        self.storage.commit_offset('tablet-1', self.user.id, batch[-1].seq)
+        self.storage.commit_offset('tablet-1', self.user.id, batch[0].seq)  # no retrocede
+        batch = self.storage.read_from_offset('tablet-1', self.user.id, limit=10)
+        self.assertEqual([op.data['index'] for op in batch], [2, 3, 4])
+        self.assertEqual(len(self.storage.read_from_offset('tablet-2', self.user.id)), 5)
+
+    def test_global_sweep_only_visits_users_with_pending_work(self):
+        User.objects.bulk_create(
+            User(username=f'viewer{index}', email=f'viewer{index}@test.com', role='viewer')
+            for index in range(50)
+        )
+        other = User.objects.create(username='judge2', email='judge2@test.com', role='judge')
+        self._queue(3)
+        self.storage.append_operations([OfflineOperation('bulk_update', 'ScoreCard', {}, other)])
+        self.assertEqual(self.storage.pending_user_ids(), [self.user.id, other.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.service.sync_pending_operations()
+        self.assertEqual(result['users_count'], 2)
+        self.assertEqual(result['failed_count'], 4)
+        self.assertFalse([query for query in queries if 'FROM "users_user"' in query['sql']])
+        self.assertEqual(self.storage.pending_user_ids(), [])
+
+    def test_import_loads_users_in_one_query(self):
+        exported = [op.to_dict() for op in self._queue(20)]
+        OfflineOperationLog.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.service.import_offline_data(
+                {'user_id': self.user.id, 'operations': exported}, self.user
+            )
+        self.assertEqual(result['imported_count'], 20)
+        self.assertEqual(len([query for query in queries if 'FROM "users_user"' in query['sql']]), 1)
@@ -0,0 +1,183 @@
+"""
+Tests para el paquete offline de competencia de los jueces
+"""
+
+import gzip
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.competitions.models import (
+    Category, Competition, CompetitionSchedule, CompetitionStaff, Discipline, Horse, Participant, Venue
+)
+from apps.scoring.models import IndividualScore, ScoreCard, ScoringCriteria
+from .models import OfflinePack
+
+User = get_user_model()
+
+
+class OfflinePackTest(APITestCase):
+    """Paquete versionado y comprimido por competencia y juez, con deltas"""
+
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        discipline = Discipline.objects.create(name='Dressage', code='DRE', discipline_type='dressage')
+        self.category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        self.criteria = ScoringCriteria.objects.create(
+            discipline=discipline, name='Técnica', code='TEC', criteria_type='technical'
+        )
+
+        now = timezone.now()
+        self.competition = Competition.objects.create(
+            name='Copa Offline', organizer=self.organizer, venue=venue,
+            start_date=now + timedelta(days=1), end_date=now + timedelta(days=2),
+            registration_start=now - timedelta(days=9), registration_end=now,
+            competition_type='national', status='in_progress'
+        )
+        self.competition.disciplines.add(discipline)
+        self.competition.categories.add(self.category)
+        CompetitionSchedule.objects.create(
+            competition=self.competition, title='Clase 1', schedule_type='category_start',
+            start_time=now + timedelta(days=1), discipline=discipline, category=self.category
+        )
+
+        self.judges = []
+        for index in range(2):
+            judge = User.objects.create(username=f'judge{index}', email=f'judge{index}@test.com', role='judge')
+            CompetitionStaff.objects.create(competition=self.competition, staff_member=judge, role='judge')
+            self.judges.append(judge)
+        self.participants = [self._participant(index) for index in range(3)]
+
+        card = ScoreCard.objects.create(participant=self.participants[0], judge=self.judges[0])
+        IndividualScore.objects.create(score_card=card, criteria=self.criteria, raw_score=7)
+        ScoreCard.objects.create(participant=self.participants[1], judge=self.judges[1])
+
+        self.url = f'/api/competitions/competitions/{self.competition.pk}/offline_pack/'
+        self.client.force_authenticate(self.judges[0])
+
+    def _participant(self, index):
+        rider = User.objects.create(username=f'rider{index}', email=f'rider{index}@test.com')
+        horse = Horse.objects.create(
+            name=f'Caballo {index}', registration_number=f'REG-{index}', breed='Criollo',
+            color='Alazán', gender='mare', birth_date='2015-01-01', height=160, owner=rider
+        )
+        return Participant.objects.create(
+            competition=self.competition, rider=rider, horse=horse, category=self.category
+        )
+
+    def _get(self, **extra):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', **extra)
+        if response.status_code == 200:
+            content = response.content
+            if response.get('Content-Encoding') == 'gzip':
+                content = gzip.decompress(content)
+            response.data = json.loads(content)
+        return response
+
+    def test_full_pack_is_built_once_and_cached(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        pack = response.data
+        self.assertEqual((pack['format'], pack['version']), ('full', 1))
+        self.assertEqual(pack['competition']['name'], 'Copa Offline')
+        self.assertEqual(len(pack['participants']), 3)
+        self.assertEqual(len(pack['horses']), 3)
+        self.assertEqual([c['code'] for c in pack['criteria']], ['TEC'])
+        self.assertEqual(len(pack['schedule']), 1)
+        # Solo las tarjetas del juez, con sus puntuaciones
+        self.assertEqual(len(pack['score_cards']), 1)
+        self.assertEqual(len(pack['score_cards'][0]['individual_scores']), 1)
+
+        # Se construyó de una vez para todos los jueces asignados
+        self.assertEqual(OfflinePack.objects.filter(competition=self.competition).count(), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries if 'INSERT INTO "sync_offlinepack"' in q['sql']])
+
+        # Sin gzip se entrega descomprimido
+        response = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(json.loads(response.content)['version'], 1)
+
+    def test_pack_omits_private_fields(self):
+        Horse.objects.filter(pk=self.participants[0].horse_id).update(
+            passport_number='PAS-123', microchip_number='CHIP-123', notes='Cojera leve'
+        )
+        Participant.objects.filter(pk=self.participants[0].pk).update(
+            emergency_contact_phone='70000000', special_requirements='Alergia'
+        )
+
+        pack = self._get().data
+
+        horse = next(row for row in pack['horses'] if row['id'] == self.participants[0].horse_id)
+        self.assertEqual(horse['name'], 'Caballo 0')
+        for field in ('passport_number', 'microchip_number', 'notes'):
+            self.assertNotIn(field, horse)
+        for participant in pack['participants']:
+            for field in ('emergency_contact_name', 'emergency_contact_phone', 'special_requirements'):
+                self.assertNotIn(field, participant)
+        self.assertNotIn(b'PAS-123', gzip.decompress(bytes(OfflinePack.objects.first().content)))
+
+    def test_delta_since_device_version(self):
+        etag = self._get()['ETag']
+
+        participant = self.participants[2]
+        participant.special_requirements = 'Llega tarde'
+        participant.save()
+        card = ScoreCard.objects.get(judge=self.judges[1])
+        card_id = str(card.pk)
+        card.delete()
+
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        delta = response.data
+        self.assertEqual((delta['format'], delta['base_version'], delta['version']), ('delta', 1, 2))
+        self.assertEqual(list(delta['sections']), ['participants'])
+        self.assertEqual([row['id'] for row in delta['sections']['participants']['upsert']], [participant.pk])
+        self.assertNotIn('competition', delta)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # El otro juez perdió su tarjeta: su delta la elimina
+        self.client.force_authenticate(self.judges[1])
+        delta = self._get(QUERY_STRING='since=1').data
+        self.assertEqual(delta['sections']['score_cards'], {'upsert': [], 'delete': [card_id]})
+
+        # Una versión que ya no se conserva recibe el paquete completo
+        response = self._get(HTTP_IF_NONE_MATCH=etag.replace('-v1', '-v0'))
+        self.assertEqual(response.data['format'], 'full')
+
+    def test_judge_specific_changes_only_bump_that_judge(self):
+        call_command('build_offline_packs', verbosity=0)
+        card = ScoreCard.objects.get(judge=self.judges[0])
+        card.notes = 'Revisar'
+        card.save()
+        call_command('build_offline_packs', verbosity=0)
+
+        versions = dict(
+            OfflinePack.objects.filter(competition=self.competition)
+            .values('judge_id').annotate(version=Max('version')).values_list('judge_id', 'version')
+        )
+        self.assertEqual(versions, {self.judges[0].pk: 2, self.judges[1].pk: 1})
+
+    def test_access_rules(self):
+        self.assertEqual(self._get(QUERY_STRING=f'judge={self.judges[1].pk}').status_code, 403)
+
+        self.client.force_authenticate(self.organizer)
+        response = self._get(QUERY_STRING=f'judge={self.judges[1].pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['judge_id'], self.judges[1].pk)
+        self.assertEqual(self._get().status_code, 403)  # el organizador no es juez
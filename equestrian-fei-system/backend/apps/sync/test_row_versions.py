@@ -0,0 +1,232 @@
+"""
+Tests para la detección de conflictos por versión de fila (row_version)
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Discipline, Horse, Participant, RowVersionConflict, Venue
+from apps.scoring.models import IndividualScore, ScoreCard, ScoringCriteria
+from .change_feed import read_changes
+from .managers import SyncManager
+from .models import ConflictResolution, OfflineOperationLog
+from .services.offline_sync_service import OfflineOperation, OfflineSyncService
+
+User = get_user_model()
+
+
+class CountingSyncManager(SyncManager):
+    """Cuenta las conversiones a diccionario (solo deberían ocurrir en conflictos)"""
+
+    def __init__(self):
+        super().__init__()
+        self.snapshots = 0
+
+    def _get_current_data(self, obj):
+        self.snapshots += 1
+        return super()._get_current_data(obj)
+
+
+class RacingSyncManager(SyncManager):
+    """Otro proceso guarda las tarjetas justo después de que el lote las leyó"""
+
+    def _prefetch_targets(self, actions):
+        targets = super()._prefetch_targets(actions)
+        ScoreCard.objects.filter(pk__in=[action.object_id for action in actions]).update(
+            notes='Cambio en el servidor', row_version=F('row_version') + 1
+        )
+        return targets
+
+
+class CountingOfflineSyncService(OfflineSyncService):
+    def __init__(self):
+        super().__init__()
+        self.snapshots = 0
+
+    def _model_to_dict(self, obj):
+        self.snapshots += 1
+        return super()._model_to_dict(obj)
+
+
+class RowVersionTest(TestCase):
+    """El cliente envía la versión que leyó y el servidor compara enteros"""
+
+    def setUp(self):
+        self.judge = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        competition = Competition.objects.create(
+            name='Copa Versiones', organizer=organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=organizer
+        )
+        self.participant = Participant.objects.create(
+            competition=competition, rider=organizer, horse=horse, category=category
+        )
+        self.cards = [
+            ScoreCard.objects.create(participant=self.participant, judge=self.judge, round_number=index + 1)
+            for index in range(4)
+        ]
+
+    def test_save_increments_version(self):
+        card = self.cards[0]
+        self.assertEqual(card.row_version, 1)
+        card.notes = 'Primera'
+        card.save()
+        card.notes = 'Segunda'
+        card.save(update_fields=['notes'])
+        card.refresh_from_db()
+        self.assertEqual(card.row_version, 3)
+
+        # El feed de cambios lleva la versión que el cliente debe recordar
+        changes, _, _ = read_changes(models=['ScoreCard'], lag=0)
+        latest = [change for change in changes if change['id'] == str(card.pk)][0]
+        self.assertEqual(latest['data']['row_version'], 3)
+
+    def test_stale_save_is_a_conflict(self):
+        first = ScoreCard.objects.get(pk=self.cards[0].pk)
+        second = ScoreCard.objects.get(pk=self.cards[0].pk)
+        first.notes = 'Primera'
+        first.save()
+
+        second.notes = 'Segunda'
+        with self.assertRaises(RowVersionConflict):
+            second.save(update_fields=['notes'])
+        # No se pisa el cambio ajeno y la instancia conserva la versión leída
+        self.assertEqual(second.row_version, 1)
+        card = ScoreCard.objects.get(pk=self.cards[0].pk)
+        self.assertEqual((card.notes, card.row_version), ('Primera', 2))
+
+        second.refresh_from_db()
+        second.notes = 'Segunda'
+        second.save()
+        self.assertEqual(ScoreCard.objects.get(pk=self.cards[0].pk).row_version, 3)
+
+    def test_write_after_read_is_a_session_conflict(self):
+        manager = RacingSyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        card = self.cards[0]
+        manager.add_sync_actions(session, [{
+            'action_type': 'update', 'content_type': ContentType.objects.get_for_model(ScoreCard).id,
+            'object_id': card.pk, 'data': {'notes': 'Offline'}, 'base_version': card.row_version,
+        }])
+
+        results = manager.process_sync_session(session)
+
+        self.assertEqual((results['successful'], results['conflicts']), (0, 1))
+        card.refresh_from_db()
+        self.assertEqual((card.notes, card.row_version), ('Cambio en el servidor', 2))
+        conflict = ConflictResolution.objects.get()
+        self.assertEqual(conflict.server_data['notes'], 'Cambio en el servidor')
+
+    def test_score_update_is_not_a_conflict(self):
+        discipline = Discipline.objects.create(name='Salto', code='JUMP', discipline_type='jumping')
+        criteria = [
+            ScoringCriteria.objects.create(
+                discipline=discipline, name=name, code=name.upper(), criteria_type='technical'
+            )
+            for name in ('Ritmo', 'Técnica')
+        ]
+        card = self.cards[0]
+        scores = [
+            IndividualScore.objects.create(score_card=card, criteria=criterion, raw_score=5)
+            for criterion in criteria
+        ]
+        card.refresh_from_db()
+
+        manager = SyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        manager.add_sync_actions(session, [{
+            'action_type': 'score_update', 'content_type': ContentType.objects.get_for_model(ScoreCard).id,
+            'object_id': card.pk, 'base_version': card.row_version,
+            'data': {'scores': [
+                {'id': str(scores[0].pk), 'score': 8, 'justification': 'Buen ritmo'},
+                {'id': str(scores[1].pk), 'score': 7},
+            ]},
+        }])
+
+        results = manager.process_sync_session(session)
+
+        self.assertEqual((results['successful'], results['conflicts']), (1, 0))
+        self.assertFalse(ConflictResolution.objects.exists())
+        scores[0].refresh_from_db()
+        self.assertEqual((scores[0].raw_score, scores[0].comments), (8, 'Buen ritmo'))
+        updated = ScoreCard.objects.get(pk=card.pk)
+        self.assertEqual(updated.technical_score, 15)
+        self.assertGreater(updated.row_version, card.row_version)
+
+    def test_session_conflicts_compare_versions(self):
+        manager = CountingSyncManager()
+        session = manager.create_sync_session(self.judge, 'tablet-1')
+        content_type = ContentType.objects.get_for_model(ScoreCard)
+        records = [
+            {'action_type': 'update', 'content_type': content_type.id, 'object_id': card.pk,
+             'data': {'notes': f'Nota {index}', 'row_version': 99}, 'base_version': card.row_version}
+            for index, card in enumerate(self.cards)
+        ]
+        # Dos ediciones offline del mismo objeto; la segunda se procesa en otro lote
+        records.append({
+            'action_type': 'update', 'content_type': content_type.id, 'object_id': self.cards[1].pk,
+            'data': {'notes': 'Nota 1 bis'}, 'base_version': self.cards[1].row_version, 'priority': 'urgent',
+        })
+        manager.add_sync_actions(session, records)
+        self.assertFalse(session.sync_actions.filter(original_data__isnull=False).exists())
+
+        # Cambio en el servidor después de que el juez leyó la tarjeta
+        server_card = ScoreCard.objects.get(pk=self.cards[0].pk)
+        server_card.notes = 'Cambio en el servidor'
+        server_card.save()
+
+        manager.snapshots = 0
+        results = manager.process_sync_session(session, chunk_size=1)
+
+        self.assertEqual((results['successful'], results['conflicts']), (4, 1))
+        self.assertEqual(manager.snapshots, 1)  # solo el conflicto real
+        conflict = ConflictResolution.objects.get()
+        self.assertEqual(str(conflict.sync_action.object_id), str(self.cards[0].pk))
+        self.assertIn('notes', conflict.conflict_fields)
+
+        card = ScoreCard.objects.get(pk=self.cards[1].pk)
+        self.assertEqual(card.notes, 'Nota 1 bis')
+        # Una versión por acción aplicada; la del cliente en data se ignora
+        self.assertEqual(card.row_version, 3)
+
+    def test_offline_updates_compare_versions(self):
+        service = CountingOfflineSyncService()
+        card, other = self.cards[0], self.cards[1]
+        operations = [
+            OfflineOperation('update', 'ScoreCard', {'notes': 'Offline 1', 'row_version': 1}, self.judge, str(card.pk)),
+            # Segunda edición del mismo dispositivo sobre la misma versión leída
+            OfflineOperation('update', 'ScoreCard', {'notes': 'Offline 2', 'row_version': 1}, self.judge, str(card.pk)),
+            OfflineOperation('update', 'ScoreCard', {'notes': 'Offline 3', 'row_version': 1}, self.judge, str(other.pk)),
+        ]
+        operations[2].conflict_resolution = 'manual'
+        service.storage.append_operations(operations)
+
+        other.notes = 'Cambio en el servidor'
+        other.save()
+
+        result = service.sync_pending_operations(self.judge.id)
+
+        self.assertEqual((result['synced_count'], result['conflict_count']), (2, 1))
+        self.assertEqual(service.snapshots, 1)
+        card.refresh_from_db()
+        self.assertEqual((card.notes, card.row_version), ('Offline 2', 3))
+        self.assertEqual(
+            OfflineOperationLog.objects.get(operation_id=operations[2].operation_id).status, 'conflict'
+        )
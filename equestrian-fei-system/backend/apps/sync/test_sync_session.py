@@ -0,0 +1,176 @@
+"""
+Tests para el procesamiento en bloque de sesiones de sincronización
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.competitions.models import Category, Competition, Horse, Participant, Venue
+from apps.scoring.models import ScoreCard
+from .managers import SyncManager
+from .models import ChangeFeedEntry, ConflictResolution, SyncAction
+
+User = get_user_model()
+
+
+class CrashingSyncManager(SyncManager):
+    """Falla al registrar el segundo lote, como si el worker se cortara"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = 0
+
+    def _record_outcomes(self, actions, outcomes):
+        self.chunks += 1
+        if self.chunks == 2:
+            raise RuntimeError('worker interrumpido')
+        super()._record_outcomes(actions, outcomes)
+
+
+class BusySyncManager(SyncManager):
+    """Otro worker tiene tomadas (bloqueadas) todas las acciones pendientes"""
+
+    def _claim_chunk(self, session, chunk_size):
+        return []
+
+
+class SyncSessionProcessingTest(TestCase):
+    """Las acciones se aplican agrupadas por modelo y tipo"""
+
+    def setUp(self):
+        self.judge = User.objects.create(username='judge1', email='judge1@test.com', role='judge')
+        organizer = User.objects.create(username='organizer1', email='organizer1@test.com', role='organizer')
+        venue = Venue.objects.create(
+            name='Club Hípico', address='Av. Principal', city='La Paz',
+            state_province='La Paz', country='Bolivia'
+        )
+        now = timezone.now()
+        competition = Competition.objects.create(
+            name='Copa Sync', organizer=organizer, venue=venue,
+            start_date=now + timedelta(days=10), end_date=now + timedelta(days=12),
+            registration_start=now, registration_end=now + timedelta(days=9),
+            competition_type='national', status='open_registration'
+        )
+        category = Category.objects.create(name='Juvenil', code='JUV', category_type='age')
+        horse = Horse.objects.create(
+            name='Caballo', registration_number='REG-1', breed='Criollo', color='Alazán',
+            gender='mare', birth_date='2015-01-01', height=160, owner=organizer
+        )
+        self.participant = Participant.objects.create(
+            competition=competition, rider=organizer, horse=horse, category=category
+        )
+        self.manager = SyncManager()
+        self.content_type = ContentType.objects.get_for_model(ScoreCard)
+
+    def _session(self, count, data=None):
+        attempt = ScoreCard.objects.count() + 1
+        cards = ScoreCard.objects.bulk_create(
+            ScoreCard(participant=self.participant, judge=self.judge, round_number=index + 1, attempt_number=attempt)
+            for index in range(count)
+        )
+        # Estado tal como lo leería el cliente al descargarlo
+        cards = list(ScoreCard.objects.filter(attempt_number=attempt).order_by('round_number'))
+        session = self.manager.create_sync_session(self.judge, 'tablet-1')
+        SyncAction.objects.bulk_create(
+            SyncAction(
+                sync_session=session, action_type='update', content_type=self.content_type,
+                object_id=card.pk, data=data(index) if data else {'notes': f'Nota {index}'},
+                original_data=self.manager._get_current_data(card)
+            )
+            for index, card in enumerate(cards)
+        )
+        session.actions_count = count
+        session.save(update_fields=['actions_count'])
+        return session, cards
+
+    def _counted(self, queries):
+        # El historial de notificaciones se guarda en el cache de la base de
+        # datos con ids por segundo: según el reloj es INSERT (con savepoint) o UPDATE
+        return [
+            query for query in queries
+            if 'sync_cacheentry' not in query['sql'] and 'SAVEPOINT' not in query['sql']
+        ]
+
+    def test_query_count_does_not_grow_with_actions(self):
+        # Primera sesión para que el cache de preferencias de notificación ya exista
+        warmup, _ = self._session(1)
+        self.manager.process_sync_session(warmup)
+
+        small, _ = self._session(5)
+        with CaptureQueriesContext(connection) as few:
+            self.manager.process_sync_session(small)
+
+        large, cards = self._session(120)
+        with CaptureQueriesContext(connection) as many:
+            results = self.manager.process_sync_session(large)
+
+        self.assertEqual(results['successful'], 120)
+        self.assertEqual(len(self._counted(many)), len(self._counted(few)))
+        self.assertEqual(ScoreCard.objects.get(pk=cards[7].pk).notes, 'Nota 7')
+        # El camino en bloque también alimenta el feed de cambios
+        self.assertEqual(ChangeFeedEntry.objects.filter(object_id=str(cards[7].pk)).count(), 1)
+        self.assertFalse(large.sync_actions.exclude(status='completed').exists())
+
+    def test_failing_action_is_isolated(self):
+        session, cards = self._session(
+            4, data=lambda index: {'round_number': 'x' if index == 2 else index + 10}
+        )
+        results = self.manager.process_sync_session(session)
+
+        self.assertEqual((results['successful'], results['failed']), (3, 1))
+        failed = session.sync_actions.get(status='failed')
+        self.assertEqual(str(failed.object_id), str(cards[2].pk))
+        self.assertEqual(failed.retry_count, 1)
+        self.assertEqual(ScoreCard.objects.get(pk=cards[3].pk).round_number, 13)
+
+    def test_conflicts_against_server_changes(self):
+        session, cards = self._session(3)
+        ScoreCard.objects.filter(pk=cards[0].pk).update(notes='Cambio en el servidor')
+
+        results = self.manager.process_sync_session(session)
+
+        self.assertEqual((results['successful'], results['conflicts']), (2, 1))
+        conflict = ConflictResolution.objects.get()
+        self.assertEqual(str(conflict.sync_action.object_id), str(cards[0].pk))
+        self.assertIn('notes', conflict.conflict_fields)
+        self.assertEqual(ScoreCard.objects.get(pk=cards[0].pk).notes, 'Cambio en el servidor')
+
+    def test_processes_in_chunks_and_resumes(self):
+        session, cards = self._session(5)
+
+        results = CrashingSyncManager().process_sync_session(session, chunk_size=2)
+        self.assertTrue(results['resumable'])
+        self.assertEqual(results['chunks'], 1)
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.processed_actions), ('in_progress', 2))
+        # El lote interrumpido se deshizo entero
+        self.assertEqual(session.sync_actions.filter(status='pending').count(), 3)
+        self.assertEqual(ScoreCard.objects.get(pk=cards[2].pk).notes, '')
+
+        results = self.manager.process_sync_session(session, chunk_size=2)
+        self.assertEqual((results['chunks'], results['successful'], results['processed']), (2, 3, 5))
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.successful_actions, session.progress), ('completed', 5, 100))
+        self.assertEqual(ScoreCard.objects.get(pk=cards[4].pk).notes, 'Nota 4')
+
+    def test_chunk_claimed_by_another_worker_is_skipped(self):
+        session, cards = self._session(3)
+
+        results = BusySyncManager().process_sync_session(session)
+        self.assertEqual((results['chunks'], results['processed'], results['resumable']), (0, 0, False))
+        # La sesión no se cierra mientras otro worker tenga acciones tomadas
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'in_progress')
+        self.assertEqual(session.sync_actions.filter(status='pending').count(), 3)
+        self.assertEqual(ScoreCard.objects.get(pk=cards[0].pk).notes, '')
+
+        # El worker que termina el último lote cierra la sesión
+        self.manager.process_sync_session(session)
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.processed_actions), ('completed', 3))
@@ -8,7 +8,7 @@ from .views import (
 )
 from .offline_views import (
     OfflineSyncSessionViewSet, SyncActionViewSet,
-    ConflictResolutionViewSet, OfflineStorageViewSet
+    ConflictResolutionViewSet, OfflineStorageViewSet, ChangeFeedViewSet
 )
 
 app_name = 'sync'
@@ -32,6 +32,7 @@ router.register(r'sync-sessions', OfflineSyncSessionViewSet, basename='sync-sess
 router.register(r'sync-actions', SyncActionViewSet, basename='sync-actions')
 router.register(r'conflicts', ConflictResolutionViewSet, basename='conflicts')
 router.register(r'offline-storage', OfflineStorageViewSet, basename='offline-storage')
+router.register(r'changes', ChangeFeedViewSet, basename='changes')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,7 +1,10 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.db.models import Q, Count, Avg
 from django.db import transaction
 import logging
@@ -20,6 +23,9 @@ from .serializers import (
     SyncStatusSerializer, ImportDataSerializer, ExportDataSerializer,
     BackupCreateSerializer, SystemStatsSerializer
 )
+from . import binary_format
+from .binary_format import SyncBinaryParser, SyncBinaryRenderer, is_binary_body, wants_binary
+from .pagination import KeysetPagination
 from .services.sync_service import sync_service
 from .services.cache_service import cache_service
 from .services.monitoring_service import monitoring_service
@@ -249,6 +255,8 @@ class SyncRecordViewSet(viewsets.ReadOnlyModelViewSet):
     ).all()
     serializer_class = SyncRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         queryset = self.queryset
@@ -1095,11 +1103,34 @@ class OfflineSyncViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'],
+            renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [SyncBinaryRenderer])
     def export_offline_data(self, request):
-        """Exportar datos offline para backup"""
+        """
+        Exportar datos offline para backup.
+
+        Con Accept: application/vnd.fei.sync+msgpack se responde en streaming
+        con el formato binario (apps.sync.binary_format), comprimido con zstd
+        o gzip según Accept-Encoding.
+        """
         try:
             user_id = request.user.id
+            if wants_binary(request):
+                encoding = binary_format.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+                response = StreamingHttpResponse(
+                    binary_format.iter_encoded(
+                        'operations',
+                        offline_sync_service.iter_export_operations(user_id),
+                        meta={'user_id': user_id, 'export_timestamp': timezone.now().isoformat()},
+                        encoding=encoding
+                    ),
+                    content_type=binary_format.MEDIA_TYPE
+                )
+                if encoding:
+                    response['Content-Encoding'] = encoding
+                patch_vary_headers(response, ['Accept', 'Accept-Encoding'])
+                return response
+            
             export_data = offline_sync_service.export_offline_data(user_id)
             
             return Response({
@@ -1114,10 +1145,26 @@ class OfflineSyncViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'],
+            parser_classes=api_settings.DEFAULT_PARSER_CLASSES + [SyncBinaryParser])
     def import_offline_data(self, request):
-        """Importar datos offline desde backup"""
+        """
+        Importar datos offline desde backup.
+
+        Acepta el JSON de export_offline_data o, con Content-Type
+        application/vnd.fei.sync+msgpack, la trama binaria (leída por bloques).
+        """
         try:
+            if is_binary_body(request):
+                reader = request.data
+                try:
+                    result = offline_sync_service.import_offline_stream(
+                        reader, owner_id=reader.meta.get('user_id'), user=request.user
+                    )
+                except binary_format.FormatError as e:
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                return Response(result)
+            
             import_data = request.data.get('data')
             if not import_data:
                 return Response(
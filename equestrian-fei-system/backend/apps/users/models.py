@@ -35,6 +35,20 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Un usuario nuevo aún no participa en competencias; el login solo toca last_login
+        update_fields = kwargs.get('update_fields')
+        if not adding and not (update_fields and set(update_fields) <= {'last_login', 'password'}):
+            from apps.search.services import index_rider
+            index_rider(self)
+    
+    def delete(self, *args, **kwargs):
+        from apps.search.services import remove_instance
+        remove_instance(self)
+        return super().delete(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -153,6 +167,10 @@ class AuditLog(models.Model):
         verbose_name = 'Log de Auditoría'
         verbose_name_plural = 'Logs de Auditoría'
         ordering = ['-timestamp']
+        indexes = [
+            # Cursor de paginación (timestamp, id)
+            models.Index(fields=['timestamp', 'id'], name='auditlog_keyset_idx'),
+        ]
     
     def __str__(self):
         user_str = self.user.username if self.user else "Sistema"
@@ -209,4 +209,29 @@ class IsParticipant(BasePermission):
         if request.user.is_admin():
             return True
             
-        return request.user.user_type == 'participant'
\ No newline at end of file
+        return request.user.user_type == 'participant'
+
+class IsAdminOrOrganizer(BasePermission):
+    """
+    Permite acceso solo a administradores y organizadores
+    """
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+
+        return request.user.is_admin() or request.user.is_organizer()
+
+
+class IsJudgeOrAbove(BasePermission):
+    """
+    Permite acceso a jueces, organizadores y administradores
+    """
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+
+        return (
+            request.user.is_admin()
+            or request.user.is_organizer()
+            or request.user.is_judge()
+        )
@@ -0,0 +1,90 @@
+"""
+Tests para la paginación por clave (keyset) de los listados grandes
+"""
+
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import AuditLog
+
+User = get_user_model()
+
+
+class KeysetPaginationTest(APITestCase):
+    """Recorrido del log de auditoría con cursores (timestamp, id)"""
+
+    url = '/api/users/audit-logs/'
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin1', email='admin1@test.com', role='admin')
+        self.client.force_authenticate(self.admin)
+        logs = AuditLog.objects.bulk_create(
+            AuditLog(user=self.admin, action='update', model_name='Competition', object_id=str(i))
+            for i in range(7)
+        )
+        # Marcas de tiempo repetidas: el id desempata el orden
+        now = timezone.now()
+        for index, log in enumerate(logs):
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=now - timedelta(minutes=index // 3))
+        self.expected = [
+            str(pk) for pk in AuditLog.objects.order_by('-timestamp', '-id').values_list('pk', flat=True)
+        ]
+
+    def _walk(self, url):
+        seen, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            seen.extend(str(item['id']) for item in response.data['results'])
+            url = response.data['next']
+        return seen, pages
+
+    def test_walks_every_row_once_in_order(self):
+        seen, pages = self._walk(f'{self.url}?page_size=2')
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(pages[0]['count'], 7)
+        self.assertIsNone(pages[0]['previous'])
+
+        # Retroceder desde la última página devuelve la anterior
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual([str(item['id']) for item in response.data['results']], self.expected[4:6])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_count_can_be_skipped_and_pages_use_no_offset(self):
+        first = self.client.get(self.url, {'page_size': 3, 'count': 'false'})
+        self.assertNotIn('count', first.data)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first.data['next'])
+        self.assertNotIn('count', response.data)
+        sql = [query['sql'] for query in queries if 'users_auditlog' in query['sql']]
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('OFFSET', sql[0].upper())
+        self.assertNotIn('COUNT(', sql[0].upper())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_invalid_values(self):
+        # Cursores bien formados con valores que no corresponden a los campos
+        for values in [
+            ['no-es-fecha', 1],
+            ['148108-01-01T00:00:00+00:00', 1],
+            [timezone.now().isoformat(), 'no-es-uuid'],
+            [timezone.now().isoformat(), None],
+            [{'a': 1}, [1]],
+        ]:
+            raw = json.dumps({'v': values, 'r': 0}).encode('utf-8')
+            cursor = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, values)
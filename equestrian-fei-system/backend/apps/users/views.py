@@ -19,6 +19,7 @@ from .permissions import (
     IsOwnerOrReadOnly, IsAdminUser, CanManageUsers, CanViewAuditLogs
 )
 from .middleware import create_audit_log
+from apps.sync.pagination import KeysetPagination
 
 
 @api_view(['GET'])
@@ -340,6 +341,8 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all().order_by('-timestamp')
     serializer_class = AuditLogSerializer
     permission_classes = [CanViewAuditLogs]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
     # filterset_fields =['user', 'action', 'model_name']
     search_fields = ['user__username', 'model_name', 'changes']
     ordering_fields = ['timestamp']
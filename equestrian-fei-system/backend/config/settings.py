@@ -55,6 +55,8 @@ INSTALLED_APPS = [
     'apps.competitions',
     'apps.scoring',
     'apps.sync',
+    'apps.search',
+    'apps.rankings',
     'reports',
 ]
 
@@ -209,6 +211,26 @@ else:
             }
         }
 
+# Cache compartido entre workers (revisiones de ETag, versiones de datos de referencia).
+# Sin REDIS_URL se usa el cache en memoria local por defecto de Django.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Cada cuántos segundos un worker verifica la versión de los datos de referencia
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv('REFERENCE_CACHE_CHECK_SECONDS', '1'))
+
+# Acciones por transacción al procesar una sesión de sincronización offline
+SYNC_SESSION_CHUNK_SIZE = int(os.getenv('SYNC_SESSION_CHUNK_SIZE', '200'))
+
+# Antigüedad mínima (segundos) de un cambio para entregarlo en el feed: margen
+# para que confirmen las transacciones que escribieron ids anteriores
+SYNC_CHANGE_FEED_LAG_SECONDS = float(os.getenv('SYNC_CHANGE_FEED_LAG_SECONDS', '5'))
+
 # =============== LOGGING CONFIGURATION ===============
 import os
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
@@ -331,6 +353,7 @@ REST_FRAMEWORK = {
     'DATETIME_FORMAT': '%Y-%m-%dT%H:%M:%SZ',
     'DATE_FORMAT': '%Y-%m-%d',
     'TIME_FORMAT': '%H:%M:%S',
+    'EXCEPTION_HANDLER': 'apps.competitions.exceptions.api_exception_handler',
 }
 
 # =============== CORS CONFIGURATION ===============
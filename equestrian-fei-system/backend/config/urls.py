@@ -52,6 +52,8 @@ urlpatterns = [
     path('api/competitions/', include('apps.competitions.urls')),
     path('api/scoring/', include('apps.scoring.urls')),
     path('api/sync/', include('apps.sync.urls')),
+    path('api/search/', include('apps.search.urls')),
+    path('api/rankings/', include('apps.rankings.urls')),
     path('api/reports/', include('reports.urls')),
 ]
 